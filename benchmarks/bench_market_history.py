@@ -0,0 +1,232 @@
+"""
+Benchmark of the market history parsing against the implementation based on pd.json_normalize per record.
+
+The fixture is a myhistory/render response: either a recorded response saved as JSON (passed as the first
+argument) or a synthetic response with the same structure.
+
+  python benchmarks/bench_market_history.py [response.json] [--events 1000] [--repeat 5]
+"""
+
+import os
+import sys
+
+# Run from a checkout without installing the package.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import argparse
+import json
+import random
+import time
+import pandas as pd
+from steamcrawl import parsing, schemas
+
+
+def move_column_inplace(df: pd.DataFrame, col: str, pos: int):
+  """
+  Helper function of legacy_parse_market_history to move columns of a data frame to a specified position.
+
+  :param df: The data frame that needs to move columns.
+  :type df: pd.DataFrame
+  :param col: The name of the column that needs to be moved.
+  :type col: str
+  :param pos: The new index that the column is going to move to.
+  :type pos: int
+  :return: Nothing.
+  :rtype: None
+  """
+  
+  col = df.pop(col)
+  df.insert(pos, col.name, col)
+
+
+def legacy_parse_market_history(index: list) -> pd.DataFrame:
+  """
+  The market history parsing before the single pass rewrite, with one pd.json_normalize call per record.
+
+  :param index: List of indices that needs to be extracted.
+  :type index: list
+  :return: The extracted data as a data frame.
+  :rtype: pd.DataFrame
+  """
+
+  dfCombinedAssets = []
+  dfCombinedEvents = []
+  dfCombinedListings = []
+  dfCombinedPurchases = []
+
+  for key in index[0]:
+    gameJsonObject = index[0][key]
+    for contextid in gameJsonObject:
+      itemJsonObject = gameJsonObject[contextid]
+      for listingid in itemJsonObject:
+        dfCombinedAssets.append(pd.json_normalize(itemJsonObject[listingid]))
+  dfCombinedAssets = pd.concat(dfCombinedAssets)
+  dfCombinedAssets.rename({'id': 'asset.id'}, axis=1, inplace=True)
+  dfCombinedAssets = dfCombinedAssets.drop(['currency', 'background_color'], axis=1)
+
+  dfCombinedEvents = pd.json_normalize(index[1])
+  dfCombinedEvents = dfCombinedEvents.drop(['time_event_fraction', 'date_event'], axis=1)
+  dfCombinedEvents = dfCombinedEvents.replace({'event_type': {1: 'List', 2: 'Cancel', 3: 'Sell', 4: 'Buy'}})
+
+  dfCombinedEvents['time_event'] = pd.to_datetime(dfCombinedEvents['time_event'], unit='s')
+
+  for key in index[2]:
+    dfCombinedListings.append(pd.json_normalize(index[2][key]))
+  dfCombinedListings = pd.concat(dfCombinedListings)
+  dfCombinedListings = dfCombinedListings.drop(['currencyid', 'asset.contextid', 'asset.appid', 'asset.currency', 'publisher_fee_percent', 'publisher_fee_app', 'price', 'asset.amount'], axis=1)
+
+  if len(index) == 4:
+    for key in index[3]:
+      dfCombinedPurchases.append(pd.json_normalize(index[3][key]))
+    dfCombinedPurchases = pd.concat(dfCombinedPurchases)
+    dfCombinedPurchases = dfCombinedPurchases.drop(['currencyid', 'time_sold', 'asset.id', 'asset.appid', 'needs_rollback', 'purchaseid', 'steam_fee', 'publisher_fee', 'publisher_fee_percent', 'publisher_fee_app', 'received_currencyid', 'asset.currency', 'asset.appid', 'asset.contextid', 'asset.appid', 'asset.classid', 'asset.new_contextid', 'asset.new_id', 'asset.instanceid', 'asset.amount', 'asset.status'], axis=1)
+    dfCombinedPurchases['total_paid'] = dfCombinedPurchases['paid_amount'] + dfCombinedPurchases['paid_fee'] 
+    dfCombined = pd.merge(dfCombinedAssets, 
+                          pd.merge(dfCombinedEvents, 
+                                    pd.merge(dfCombinedListings, dfCombinedPurchases, 
+                                              how='outer', on=['listingid']), 
+                                    how='outer', on=['listingid']), 
+                          how='outer', on=['asset.id'])
+    optional_columns = ['owner', 'rollback_new_id', 'rollback_new_contextid', 'market_fee', 'market_marketable_restriction', 'cancel_reason', 'cancel_reason_short', 'funds_returned', 'funds_held', 'time_funds_held_until', 'funds_revoked']
+    for column in optional_columns:
+      if column in dfCombined.columns.tolist():
+        dfCombined = dfCombined.drop([column], axis=1)
+    dfCombined.loc[dfCombined['event_type'] == 'Sell', ['paid_amount', 'paid_fee', 'total_paid', 'original_price']] = None
+    dfCombined.loc[dfCombined['event_type'] == 'List', ['paid_amount', 'paid_fee', 'total_paid', 'received_amount']] = None
+    dfCombined.loc[dfCombined['event_type'] == 'Buy', ['received_amount', 'original_price']] = None
+    move_column_inplace(dfCombined, 'paid_fee', 0)
+    move_column_inplace(dfCombined, 'paid_amount', 0)
+    move_column_inplace(dfCombined, 'total_paid', 0)
+    move_column_inplace(dfCombined, 'received_amount', 0)
+    move_column_inplace(dfCombined, 'original_price', 0)
+    move_column_inplace(dfCombined, 'event_type', 0)
+    move_column_inplace(dfCombined, 'type', 0)
+    move_column_inplace(dfCombined, 'name', 0)
+    move_column_inplace(dfCombined, 'time_event', 0)
+    return dfCombined
+  
+  else:
+    dfCombined = pd.merge(dfCombinedAssets, 
+                          pd.merge(dfCombinedEvents, dfCombinedListings, 
+                                    how='outer', on=['listingid']), 
+                          how='outer', on=['asset.id']) 
+    optional_columns = ['owner', 'rollback_new_id', 'rollback_new_contextid', 'market_fee', 'market_marketable_restriction', 'cancel_reason', 'cancel_reason_short', 'funds_returned', 'funds_held', 'time_funds_held_until', 'funds_revoked']
+    for column in optional_columns:
+      if column in dfCombined.columns.tolist():
+        dfCombined = dfCombined.drop([column], axis=1)
+    dfCombined.loc[dfCombined['event_type'] == 'Buy', 'received_amount'] = None
+    move_column_inplace(dfCombined, 'received_amount', 0)
+    move_column_inplace(dfCombined, 'event_type', 0)
+    move_column_inplace(dfCombined, 'type', 0)
+    move_column_inplace(dfCombined, 'name', 0)
+    move_column_inplace(dfCombined, 'time_event', 0)
+    return dfCombined
+
+
+def synthetic_history(count: int, seed: int = 0) -> dict:
+  """
+  Build a synthetic myhistory/render response with listings, cancellations, sales and purchases.
+
+  :param count: Number of events.
+  :type count: int
+  :param seed: Seed of the random generator. The default value is 0.
+  :type seed: int
+  :return: The response as a dictionary.
+  :rtype: dict
+  """
+
+  rnd = random.Random(seed)
+  assets = {}
+  events = []
+  listings = {}
+  purchases = {}
+
+  for i in range(count):
+    eventType = rnd.choice([1, 2, 3, 4])
+    appid = rnd.choice([730, 570, 440])
+    listingid = str(3000000000000000000 + i // 2)
+    assetid = str(20000000000 + i // 2)
+    assets.setdefault(str(appid), {}).setdefault('2', {})[assetid] = {
+      'currency': 0, 'appid': appid, 'contextid': '2', 'id': assetid, 'classid': str(rnd.randrange(10 ** 9)),
+      'instanceid': '0', 'amount': '0', 'status': 4, 'original_amount': '1', 'unowned_id': assetid,
+      'unowned_contextid': '2', 'background_color': '', 'icon_url': 'icon', 'tradable': 0,
+      'descriptions': [{'type': 'html', 'value': 'Exterior: Field-Tested'}],
+      'name': 'Item ' + str(i // 2), 'name_color': 'D2D2D2', 'type': 'Rifle', 'market_name': 'Item ' + str(i // 2),
+      'market_hash_name': 'Item ' + str(i // 2), 'commodity': 0, 'market_tradable_restriction': 7, 'marketable': 1
+    }
+
+    event = {'listingid': listingid, 'event_type': eventType, 'time_event': 1690000000 - i * 600,
+             'time_event_fraction': rnd.randrange(10 ** 6), 'steamid_actor': '76561198000000000', 'date_event': 'Jul 22'}
+    price = rnd.randrange(3, 100000)
+    listings[listingid] = {
+      'listingid': listingid, 'price': 0, 'fee': 0, 'publisher_fee_app': appid, 'publisher_fee_percent': '0.100000001',
+      'currencyid': 2001, 'asset': {'currency': 0, 'appid': appid, 'contextid': '2', 'id': assetid, 'amount': '0'},
+      'original_price': price
+    }
+    if eventType == 2:
+      listings[listingid]['cancel_reason'] = 0
+
+    if eventType in (3, 4):
+      purchaseid = str(4000000000000000000 + i)
+      event['purchaseid'] = purchaseid
+      purchases[listingid + '_' + purchaseid] = {
+        'listingid': listingid, 'purchaseid': purchaseid, 'time_sold': event['time_event'], 'steamid_purchaser': '76561198000000001',
+        'needs_rollback': 0, 'failed': 0,
+        'asset': {'currency': 0, 'appid': appid, 'contextid': '2', 'id': assetid, 'classid': '1', 'instanceid': '0',
+                  'amount': '1', 'status': 2, 'new_id': str(30000000000 + i), 'new_contextid': '2'},
+        'paid_amount': price, 'paid_fee': price // 10 + 1, 'currencyid': '2001', 'steam_fee': price // 20 + 1,
+        'publisher_fee': price // 20, 'publisher_fee_percent': '0.100000001', 'publisher_fee_app': appid,
+        'received_amount': price, 'received_currencyid': '2001'
+      }
+    events.append(event)
+
+  return {'success': True, 'pagesize': count, 'total_count': count, 'start': 0, 'assets': assets, 'events': events,
+          'listings': listings, 'purchases': purchases}
+
+
+def measure(function, index: list, repeat: int) -> tuple:
+  """
+  Helper function to get the best time of a parsing function over several runs.
+
+  :param function: The parsing function.
+  :type function: callable
+  :param index: The indices of the response.
+  :type index: list
+  :param repeat: Number of runs.
+  :type repeat: int
+  :return: The (best time in seconds, data frame of the last run).
+  :rtype: tuple
+  """
+
+  best = float('inf')
+  for _ in range(repeat):
+    start = time.perf_counter()
+    df = function(index)
+    best = min(best, time.perf_counter() - start)
+  return best, df
+
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description='Benchmark of the market history parsing.')
+  parser.add_argument('response', nargs='?', help='Path to a recorded myhistory/render response saved as JSON.')
+  parser.add_argument('--events', type=int, default=1000, help='Number of events of the synthetic response.')
+  parser.add_argument('--repeat', type=int, default=5, help='Number of runs of each implementation.')
+  args = parser.parse_args()
+
+  if args.response is not None:
+    with open(args.response, 'r', encoding='utf-8') as f:
+      contentObject = json.load(f)
+  else:
+    contentObject = synthetic_history(args.events)
+
+  index = [contentObject[key] for key in ['assets', 'events', 'listings', 'purchases'] if contentObject.get(key) not in (None, [], {})]
+  legacyTime, legacyDf = measure(legacy_parse_market_history, index, args.repeat)
+  currentTime, currentDf = measure(parsing.parse_market_history, index, args.repeat)
+  # The legacy output is converted to the schema that parse_market_history applies.
+  pd.testing.assert_frame_equal(schemas.coerce(legacyDf.reset_index(drop=True), schemas.SCHEMAS['market_history']), currentDf)
+
+  print('events:  {}'.format(len(contentObject['events'])))
+  print('rows:    {} x {} columns (identical output)'.format(*currentDf.shape))
+  print('legacy:  {:.4f} s'.format(legacyTime))
+  print('current: {:.4f} s'.format(currentTime))
+  print('speedup: {:.1f}x'.format(legacyTime / currentTime))
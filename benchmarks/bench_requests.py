@@ -0,0 +1,424 @@
+"""
+Offline benchmark of the public methods of Request against a local stand-in server.
+
+The server runs in its own process and answers with generated responses of realistic sizes, or with responses
+recorded from Steam. For each method, the benchmark reports the best wall time, the throughput in rows and requests
+per second, the latency percentiles of the requests and the peak memory traced during the call.
+
+  python benchmarks/bench_requests.py [--listings 10000] [--events 50000] [--apps 150000] [--latency 0.02]
+  python benchmarks/bench_requests.py --quick --json results.jsonl
+
+Responses can be recorded from Steam once and replayed afterwards:
+
+  python benchmarks/bench_requests.py --record fixtures --cookie <steamLoginSecure> --quick
+  python benchmarks/bench_requests.py --fixtures fixtures --quick
+"""
+
+import os
+import sys
+
+# Run from a checkout without installing the package.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import argparse
+import datetime
+import functools
+import json
+import multiprocessing
+import random
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from bench_market_history import synthetic_history
+from steamcrawl import Metrics, Request, Transport
+from steamcrawl.replay import FixtureServer, FixtureStore, RecordingSession, ReplayedResponse
+
+ITEM_NAME = 'AK-47 | Redline (Field-Tested)'
+STEAM_ID = '76561198000000000'
+
+
+def json_response(content) -> ReplayedResponse:
+  """
+  Helper function to encode a generated JSON response once, so that the server does not encode it at every request.
+
+  :param content: The decoded JSON content.
+  :type content: dict
+  :return: The response.
+  :rtype: ReplayedResponse
+  """
+
+  return ReplayedResponse(200, json.dumps(content).encode('utf-8'), {'Content-Type': 'application/json'})
+
+
+def listings_page(total: int, start: int, count: int, appid: str) -> ReplayedResponse:
+  """
+  Generate a search/render response of the community market.
+
+  :param total: Total number of listings.
+  :type total: int
+  :param start: The offset of the first listing.
+  :type start: int
+  :param count: Number of listings of the page.
+  :type count: int
+  :param appid: The app id filter, or '' for all the apps.
+  :type appid: str
+  :return: The response.
+  :rtype: ReplayedResponse
+  """
+
+  results = []
+  for i in range(start, min(start + count, total)):
+    itemAppid = int(appid) if appid else [730, 570, 440][i % 3]
+    name = 'Item {}'.format(i)
+    results.append({
+      'name': name, 'hash_name': name, 'sell_listings': 1 + i % 5000, 'sell_price': 3 + i % 100000,
+      'sell_price_text': '${:.2f}'.format((3 + i % 100000) / 100), 'app_icon': 'https://example.com/icon.jpg',
+      'app_name': {730: 'Counter-Strike 2', 570: 'Dota 2', 440: 'Team Fortress 2'}.get(itemAppid, 'App'),
+      'asset_description': {
+        'appid': itemAppid, 'classid': str(1000000 + i), 'instanceid': '0', 'background_color': '', 'icon_url': 'icon',
+        'tradable': 1, 'name': name, 'name_color': 'D2D2D2', 'type': 'Classified Rifle', 'market_name': name,
+        'market_hash_name': name, 'commodity': i % 2
+      },
+      'sale_price_text': '${:.2f}'.format((3 + i % 100000) / 115)
+    })
+  return json_response({'success': True, 'start': start, 'pagesize': count, 'total_count': total,
+                        'searchdata': {'query': '', 'search_descriptions': False, 'total_count': total, 'pagesize': count},
+                        'results': results})
+
+
+def history_page(total: int, start: int, count: int) -> ReplayedResponse:
+  """
+  Generate a myhistory/render response of the market history.
+
+  :param total: Total number of events.
+  :type total: int
+  :param start: The offset of the first event.
+  :type start: int
+  :param count: Number of events of the page.
+  :type count: int
+  :return: The response.
+  :rtype: ReplayedResponse
+  """
+
+  contentObject = synthetic_history(max(0, min(count, total - start)), seed=start)
+  contentObject.update({'pagesize': count, 'total_count': total, 'start': start})
+  return json_response(contentObject)
+
+
+def inventory_page(total: int, start_assetid: str, count: int) -> ReplayedResponse:
+  """
+  Generate a page of the inventory API, with its last_assetid cursor.
+
+  :param total: Total number of assets.
+  :type total: int
+  :param start_assetid: The asset id after which the page starts, or '' for the first page.
+  :type start_assetid: str
+  :param count: Number of assets of the page.
+  :type count: int
+  :return: The response.
+  :rtype: ReplayedResponse
+  """
+
+  first = int(start_assetid) + 1 if start_assetid else 1
+  ids = range(first, min(first + count, total + 1))
+  assets = [{'appid': 730, 'contextid': '2', 'assetid': str(i), 'classid': str(i % 500), 'instanceid': '0', 'amount': '1'} for i in ids]
+  descriptions = [{
+    'appid': 730, 'classid': str(classid), 'instanceid': '0', 'currency': 0, 'background_color': '', 'icon_url': 'icon',
+    'tradable': 1, 'name': 'Case {}'.format(classid), 'type': 'Base Grade Container', 'market_name': 'Case {}'.format(classid),
+    'market_hash_name': 'Case {}'.format(classid), 'commodity': 1, 'marketable': 1
+  } for classid in sorted({i % 500 for i in ids})]
+  contentObject = {'assets': assets, 'descriptions': descriptions, 'total_inventory_count': total, 'success': 1, 'rwgrsn': -2}
+  if len(ids) > 0 and ids[-1] < total:
+    contentObject.update({'more_items': 1, 'last_assetid': str(ids[-1])})
+  return json_response(contentObject)
+
+
+def price_history(points: int) -> ReplayedResponse:
+  """
+  Generate a pricehistory response with one point per hour.
+
+  :param points: Number of points.
+  :type points: int
+  :return: The response.
+  :rtype: ReplayedResponse
+  """
+
+  start = datetime.datetime(2013, 11, 1)
+  prices = [[(start + datetime.timedelta(hours=i)).strftime('%b %d %Y %H: +0'), round(1 + (i % 977) / 100, 3), str(1 + i % 300)]
+            for i in range(points)]
+  return json_response({'success': True, 'price_prefix': '$', 'price_suffix': '', 'prices': prices})
+
+
+def app_list(count: int) -> ReplayedResponse:
+  """
+  Generate a GetAppList response.
+
+  :param count: Number of apps.
+  :type count: int
+  :return: The response.
+  :rtype: ReplayedResponse
+  """
+
+  appids = [10, 440, 570, 730] + list(range(1000, 1000 + count - 4))
+  return json_response({'applist': {'apps': [{'appid': appid, 'name': 'App {}'.format(appid)} for appid in appids]}})
+
+
+def app_details(appids: str) -> ReplayedResponse:
+  """
+  Generate an appdetails response.
+
+  :param appids: The comma-separated app ids.
+  :type appids: str
+  :return: The response.
+  :rtype: ReplayedResponse
+  """
+
+  details = {}
+  for appid in appids.split(','):
+    details[appid] = {'success': True, 'data': {
+      'type': 'game', 'name': 'App ' + appid, 'steam_appid': int(appid), 'is_free': False, 'developers': ['Developer'],
+      'publishers': ['Publisher'], 'short_description': 'x' * 300, 'genres': [{'id': '1', 'description': 'Action'}],
+      'release_date': {'coming_soon': False, 'date': '21 Aug, 2012'},
+      'price_overview': {'currency': 'USD', 'initial': 1499, 'final': 1499, 'discount_percent': 0,
+                         'initial_formatted': '', 'final_formatted': '$14.99'}
+    }}
+  return json_response(details)
+
+
+def order_histogram(levels: int) -> ReplayedResponse:
+  """
+  Generate an itemordershistogram response.
+
+  :param levels: Number of price levels of each side.
+  :type levels: int
+  :return: The response.
+  :rtype: ReplayedResponse
+  """
+
+  sell = [[round(10 + i / 100, 2), (i + 1) * 3, '{} listings at ${:.2f} or lower'.format((i + 1) * 3, 10 + i / 100)] for i in range(levels)]
+  buy = [[round(10 - i / 100, 2), (i + 1) * 2, '{} buy orders at ${:.2f} or higher'.format((i + 1) * 2, 10 - i / 100)] for i in range(levels)]
+  return json_response({'success': 1, 'sell_order_table': '', 'sell_order_summary': '', 'buy_order_table': '',
+                        'buy_order_summary': '', 'highest_buy_order': '1000', 'lowest_sell_order': '1001',
+                        'buy_order_graph': buy, 'sell_order_graph': sell, 'graph_max_y': 100, 'graph_min_x': 0.0,
+                        'graph_max_x': 20.0, 'price_prefix': '$', 'price_suffix': ''})
+
+
+def responders(sizes: dict) -> dict:
+  """
+  Get the responders of the stand-in server, with responses of the given sizes. Responses are generated once per set of parameters.
+
+  :param sizes: The sizes of the responses, see main().
+  :type sizes: dict
+  :return: Mapping of API paths to functions generating their responses.
+  :rtype: dict
+  """
+
+  cached = functools.lru_cache(maxsize=None)
+  listings = cached(lambda start, count, appid: listings_page(sizes['listings'], start, count, appid))
+  history = cached(lambda start, count: history_page(sizes['events'], start, count))
+  inventory = cached(lambda start_assetid, count: inventory_page(sizes['inventory'], start_assetid, count))
+  prices = cached(lambda: price_history(sizes['points']))
+  apps = cached(lambda: app_list(sizes['apps']))
+  details = cached(app_details)
+  histogram = cached(lambda: order_histogram(sizes['levels']))
+
+  return {
+    '/market/search/render/': lambda params: listings(int(params.get('start', 0)), int(params.get('count', 10)), params.get('appid', '')),
+    '/market/myhistory/render/': lambda params: history(int(params.get('start', 0)), int(params.get('count', 10))),
+    '/inventory/': lambda params: inventory(params.get('start_assetid', ''), int(params.get('count', 100))),
+    '/market/pricehistory/': lambda params: prices(),
+    '/market/priceoverview/': lambda params: {'success': True, 'lowest_price': '$10.01', 'volume': '1,234', 'median_price': '$10.05'},
+    '/ISteamApps/GetAppList/': lambda params: apps(),
+    '/api/appdetails/': lambda params: details(params.get('appids', '')),
+    '/market/listings/': lambda params: b'<html><script>Market_LoadOrderSpread( 176321160 );</script></html>',
+    '/market/itemordershistogram': lambda params: histogram()
+  }
+
+
+def serve(connection, sizes: dict, fixtures: str, latency: float, jitter: float, throttle: tuple):
+  """
+  Run the stand-in server in a child process, sending its base URL back through the connection.
+
+  :param connection: The child end of a multiprocessing pipe.
+  :type connection: multiprocessing.connection.Connection
+  :param sizes: The sizes of the generated responses.
+  :type sizes: dict
+  :param fixtures: Optional path to a directory of recorded responses.
+  :type fixtures: str
+  :param latency: Number of seconds each response is delayed by.
+  :type latency: float
+  :param jitter: Maximum number of seconds randomly added to the latency.
+  :type jitter: float
+  :param throttle: Optional (rate per second, burst capacity) above which requests are throttled.
+  :type throttle: tuple
+  :return: Nothing.
+  :rtype: None
+  """
+
+  store = FixtureStore(fixtures) if fixtures else None
+  server = FixtureServer(store, responders(sizes), latency=latency, jitter=jitter, throttle=throttle).start()
+  connection.send(server.url)
+  connection.recv()
+  server.stop()
+
+
+def cases(sizes: dict) -> list:
+  """
+  Get the benchmarked calls.
+
+  :param sizes: The sizes of the responses, see main().
+  :type sizes: dict
+  :return: List of (name, function taking a Request and returning the result).
+  :rtype: list
+  """
+
+  items = [('Item {}'.format(i), '730') for i in range(sizes['items'])]
+  return [
+    ('get_all_listings', lambda request: request.get_all_listings(count=sizes['listings'])),
+    ('get_app_listings', lambda request: request.get_app_listings('730', count=sizes['listings'])),
+    ('get_all_appid', lambda request: request.get_all_appid(refresh=True)),
+    ('get_app_details', lambda request: request.get_app_details('730')),
+    ('get_item_overview', lambda request: request.get_item_overview(ITEM_NAME, '730')),
+    ('get_price_history', lambda request: request.get_price_history(ITEM_NAME, '730')),
+    ('get_price_history_many', lambda request: request.get_price_history_many(items)),
+    ('get_market_history', lambda request: request.get_market_history(count=sizes['events'])),
+    ('get_game_item_inventory', lambda request: request.get_game_item_inventory(STEAM_ID, '730')),
+    ('get_buysell_orders', lambda request: request.get_buysell_orders(ITEM_NAME, '730'))
+  ]
+
+
+def measure(request: Request, function, repeat: int) -> dict:
+  """
+  Measure a call: best wall time, latency of its requests, and peak memory in a separate traced run.
+
+  :param request: The client, with metrics set.
+  :type request: Request
+  :param function: Function taking the client and returning the result.
+  :type function: callable
+  :param repeat: Number of timed runs.
+  :type repeat: int
+  :return: The measures of the call.
+  :rtype: dict
+  """
+
+  best = float('inf')
+  latencies = []
+  for _ in range(repeat):
+    with request.metrics.trace() as trace:
+      start = time.perf_counter()
+      result = function(request)
+      elapsed = time.perf_counter() - start
+    if elapsed < best:
+      best = elapsed
+      latencies = [span['value'] for span in trace.spans if span['metric'] == 'steamcrawl_request_seconds']
+
+  tracemalloc.start()
+  function(request)
+  _, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+
+  rows = len(result) if hasattr(result, '__len__') else 1
+  return {
+    'seconds': best,
+    'rows': rows,
+    'requests': len(latencies),
+    'rows_per_second': rows / best,
+    'requests_per_second': len(latencies) / best,
+    'latency_p50_ms': float(np.percentile(latencies, 50)) * 1000 if latencies else float('nan'),
+    'latency_p95_ms': float(np.percentile(latencies, 95)) * 1000 if latencies else float('nan'),
+    'peak_memory_mb': peak / 2 ** 20
+  }
+
+
+def record(directory: str, cookie: str, sizes: dict, selected: list):
+  """
+  Record the responses of Steam for the benchmarked calls.
+
+  :param directory: Path to the fixtures directory.
+  :type directory: str
+  :param cookie: The value of the steamLoginSecure cookie.
+  :type cookie: str
+  :param sizes: The sizes of the calls.
+  :type sizes: dict
+  :param selected: Names of the calls to record, or None for all of them.
+  :type selected: list
+  :return: Nothing.
+  :rtype: None
+  """
+
+  store = FixtureStore(directory)
+  request = Request(cookie, transport=Transport(session=RecordingSession(store)))
+  for name, function in cases(sizes):
+    if selected is None or name in selected:
+      function(request)
+      print('recorded', name)
+  print('{} responses in {}'.format(len(store.keys()), directory))
+
+
+def main():
+  parser = argparse.ArgumentParser(description='Offline benchmark of the public methods of Request.')
+  parser.add_argument('--listings', type=int, default=10000, help='Number of listings of the listing calls.')
+  parser.add_argument('--events', type=int, default=50000, help='Number of events of the market history.')
+  parser.add_argument('--apps', type=int, default=150000, help='Number of apps of the app list.')
+  parser.add_argument('--inventory', type=int, default=5000, help='Number of assets of the inventory.')
+  parser.add_argument('--points', type=int, default=3000, help='Number of points of a price history.')
+  parser.add_argument('--items', type=int, default=50, help='Number of items of get_price_history_many.')
+  parser.add_argument('--levels', type=int, default=100, help='Number of price levels of the order histogram.')
+  parser.add_argument('--quick', action='store_true', help='Use small sizes, for e.g. to check the suite or to record fixtures.')
+  parser.add_argument('--latency', type=float, default=0.0, help='Latency of the stand-in server in seconds.')
+  parser.add_argument('--jitter', type=float, default=0.0, help='Maximum random latency added by the stand-in server in seconds.')
+  parser.add_argument('--throttle', type=float, nargs=2, metavar=('RATE', 'BURST'), help='Throttle the requests above RATE per second.')
+  parser.add_argument('--workers', type=int, default=4, help='max_workers of Request.')
+  parser.add_argument('--repeat', type=int, default=3, help='Number of timed runs of each call.')
+  parser.add_argument('--only', nargs='+', help='Names of the calls to run.')
+  parser.add_argument('--fixtures', help='Directory of recorded responses served before the generated ones.')
+  parser.add_argument('--record', help='Record the responses of Steam into this directory instead of benchmarking.')
+  parser.add_argument('--cookie', help='steamLoginSecure cookie used to record the responses.')
+  parser.add_argument('--json', help='Append the results as one JSON line to this file, to track them over time.')
+  args = parser.parse_args()
+
+  sizes = {name: getattr(args, name) for name in ['listings', 'events', 'apps', 'inventory', 'points', 'items', 'levels']}
+  if args.quick:
+    sizes = {'listings': 500, 'events': 1000, 'apps': 5000, 'inventory': 500, 'points': 300, 'items': 5, 'levels': 20}
+
+  if args.record is not None:
+    record(args.record, args.cookie or '', sizes, args.only)
+    return
+
+  random.seed(0)
+  parentConnection, childConnection = multiprocessing.Pipe()
+  server = multiprocessing.Process(target=serve, daemon=True, args=(childConnection, sizes, args.fixtures, args.latency,
+                                                                    args.jitter, tuple(args.throttle) if args.throttle else None))
+  server.start()
+  url = parentConnection.recv()
+
+  try:
+    baseUrls = {base: url for base in ['https://steamcommunity.com', 'https://api.steampowered.com', 'https://store.steampowered.com']}
+    rateLimiter = None if args.throttle else False
+    request = Request('benchmark', transport=Transport(base_urls=baseUrls, rate_limiter=rateLimiter),
+                      max_workers=args.workers, metrics=Metrics())
+    # The app list and the item_nameid are loaded once, as in a long-running client.
+    request.get_all_appid()
+    request.get_itemname_id(ITEM_NAME, '730')
+
+    results = {}
+    for name, function in cases(sizes):
+      if args.only is None or name in args.only:
+        results[name] = measure(request, function, args.repeat)
+  finally:
+    parentConnection.send('stop')
+    server.join(timeout=5)
+
+  df = pd.DataFrame(results).T
+  with pd.option_context('display.float_format', '{:.2f}'.format, 'display.width', 200, 'display.max_columns', None):
+    print(df)
+
+  if args.json is not None:
+    with open(args.json, 'a', encoding='utf-8') as f:
+      f.write(json.dumps({'time': datetime.datetime.now(datetime.timezone.utc).isoformat(), 'sizes': sizes,
+                          'latency': args.latency, 'results': results}) + '\n')
+
+
+if __name__ == '__main__':
+  main()
@@ -14,6 +14,7 @@ setup(
     author_email='hungmnguyen13102003@gmail.com',
     license='MIT',
     url='https://github.com/Hungreeee/steamcrawl',
-    install_requires=['requests', 'pandas', 'selenium-wire'],
+    install_requires=['requests', 'pandas'],
+    extras_require={'parquet': ['pyarrow'], 'fast': ['msgspec'], 'async': ['aiohttp']},
     classifiers = []
 )
\ No newline at end of file
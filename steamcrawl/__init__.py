@@ -1 +1,45 @@
-from .request import Request
\ No newline at end of file
+import importlib
+
+# The public classes are imported on first access, so that importing the package does not import pandas and the
+# optional dependencies of the classes that are not used.
+_EXPORTS = {
+  'Request': '.request',
+  'AsyncRequest': '.async_request',
+  'AuthCache': '.auth',
+  'Crawler': '.crawl',
+  'TaskQueue': '.crawl',
+  'SQLiteQueue': '.crawl',
+  'CredentialPool': '.credentials',
+  'JSONDecoder': '.decoders',
+  'ResponseCache': '.cache',
+  'SQLiteCache': '.cache',
+  'FileCache': '.cache',
+  'FixtureServer': '.replay',
+  'FixtureStore': '.replay',
+  'RecordingSession': '.replay',
+  'ReplaySession': '.replay',
+  'MarketHistoryStore': '.history',
+  'MarketIndex': '.marketindex',
+  'Metrics': '.metrics',
+  'PricePanel': '.analytics',
+  'StoreCatalog': '.catalog',
+  'RateLimiter': '.ratelimit',
+  'DatasetSink': '.sinks',
+  'OrderBookPoller': '.orderbook',
+  'AppRegistry': '.registry',
+  'Transport': '.transport'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+  if name not in _EXPORTS:
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+  value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+  globals()[name] = value
+  return value
+
+
+def __dir__() -> list:
+  return sorted(list(globals()) + __all__)
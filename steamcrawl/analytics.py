@@ -0,0 +1,630 @@
+import hashlib
+import json
+import os
+import pickle
+import warnings
+import numpy as np
+import pandas as pd
+from steamcrawl.exceptions import exception
+
+# Number of seconds of each resampling frequency, and the offset of its bins from the epoch. Weeks start on Monday,
+# as the epoch (1970-01-01) was a Thursday.
+FREQUENCIES = {
+  'H': (3600, 0),
+  'D': (86400, 0),
+  'W': (7 * 86400, 4 * 86400)
+}
+
+# Statistics returned by summary() and accepted by rank().
+SUMMARY_COLUMNS = ['open', 'high', 'low', 'close', 'vwap', 'volume', 'return', 'volatility', 'observations']
+
+# Number of items aggregated at once, which bounds the memory of the temporary arrays of the aggregations.
+CHUNK_ITEMS = 1024
+
+
+def _history_frame(histories) -> pd.DataFrame:
+  """
+  Helper function to get price histories as one data frame in long format.
+
+  :param histories: The price histories, as the result of get_price_history_many(), or a mapping of (item_name, appid) pairs or item names to results of get_price_history().
+  :type histories: pd.DataFrame
+  :return: The price histories, with item_name, appid, date, median_price and volume_sold columns.
+  :rtype: pd.DataFrame
+  """
+
+  if isinstance(histories, dict):
+    frames = []
+    for key, df in histories.items():
+      item_name, appid = key if isinstance(key, tuple) else (key, '')
+      frames.append(df.assign(item_name=item_name, appid=str(appid)))
+    histories = pd.concat(frames, ignore_index=True) if len(frames) > 0 else pd.DataFrame(columns=['item_name', 'appid', 'date', 'median_price', 'volume_sold'])
+
+  exception('type', histories, pd.DataFrame, "Input histories it not a valid pd.DataFrame or dict type.")
+  for column in ['item_name', 'appid', 'date', 'median_price', 'volume_sold']:
+    exception('contain', column, histories.columns, f"Input histories has no '{column}' column.")
+  return histories
+
+
+def _sorted_codes(values: pd.Series) -> tuple:
+  """
+  Helper function to factorize values into the positions of their sorted unique values as strings. The values are
+  not converted to strings, which is slow for the categorical columns of the package.
+
+  :param values: The values.
+  :type values: pd.Series
+  :return: The (code of each value, or -1 if it is missing, sorted unique values) arrays.
+  :rtype: tuple
+  """
+
+  codes, uniques = pd.factorize(values)
+  uniques = np.asarray(uniques).astype(str)
+  order = np.argsort(uniques, kind='stable')
+  # The extra -1 is the position of the missing values, whose code is -1.
+  positions = np.full(len(order) + 1, -1, dtype=np.int64)
+  positions[order] = np.arange(len(order))
+  return positions[codes], uniques[order]
+
+
+def _dense_codes(values: np.ndarray) -> tuple:
+  """
+  Helper function to factorize integers into the positions of their sorted unique values. Integers within a small
+  range, such as the item codes or the hours of a panel, are marked in an array of that range instead of being hashed.
+
+  :param values: The integers.
+  :type values: np.ndarray
+  :return: The (code of each value, sorted unique values) arrays.
+  :rtype: tuple
+  """
+
+  if len(values) == 0:
+    return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+  low = values.min()
+  span = int(values.max() - low) + 1
+  if span > max(4 * len(values), 1 << 20):
+    codes, uniques = pd.factorize(values, sort=True)
+    return codes, uniques
+  isPresent = np.zeros(span, dtype=bool)
+  isPresent[values - low] = True
+  positions = np.cumsum(isPresent) - 1
+  return positions[values - low], np.flatnonzero(isPresent) + low
+
+
+def _items_index(items) -> pd.MultiIndex:
+  """
+  Helper function to get the index of the items of a panel.
+
+  :param items: The (item_name, appid) pairs of the items.
+  :type items: list
+  :return: The index, with 'item_name' and 'appid' levels.
+  :rtype: pd.MultiIndex
+  """
+
+  items = list(items)
+  return pd.MultiIndex.from_arrays([[item[0] for item in items], [item[1] for item in items]], names=['item_name', 'appid'])
+
+
+def _aggregate(prices: np.ndarray, volumes: np.ndarray, starts: np.ndarray) -> dict:
+  """
+  Helper function to aggregate the consecutive columns of a block of items into bins.
+
+  The prices of Steam are the median price of each hour or day, so the VWAP weights them by their volume.
+
+  :param prices: The prices of the items, with NaN where an item has no entry.
+  :type prices: np.ndarray
+  :param volumes: The volumes of the items.
+  :type volumes: np.ndarray
+  :param starts: The first column of each bin, in increasing order, the first one being 0.
+  :type starts: np.ndarray
+  :return: The open, high, low, close, vwap and volume arrays, of shape (items, bins).
+  :rtype: dict
+  """
+
+  columns = prices.shape[1]
+  ends = np.append(starts[1:], columns) - 1
+  isValid = ~np.isnan(prices)
+  positions = np.arange(columns, dtype=np.int32)
+
+  volume = np.add.reduceat(volumes.astype(np.int64), starts, axis=1)
+  turnover = np.add.reduceat(np.where(isValid, prices, 0).astype(np.float64) * volumes, starts, axis=1)
+  with np.errstate(invalid='ignore', divide='ignore'):
+    vwap = np.where(volume > 0, turnover / volume, np.nan)
+
+  # The close is the last entry up to the end of the bin, if it is in the bin, and the open the first entry from its start.
+  lastValid = np.maximum.accumulate(np.where(isValid, positions, -1), axis=1)[:, ends]
+  firstValid = np.minimum.accumulate(np.where(isValid, positions, columns)[:, ::-1], axis=1)[:, ::-1][:, starts]
+  close = np.where(lastValid >= starts, np.take_along_axis(prices, np.maximum(lastValid, 0), axis=1), np.nan)
+  open = np.where(firstValid <= ends, np.take_along_axis(prices, np.minimum(firstValid, columns - 1), axis=1), np.nan)
+
+  return {
+    'open': open.astype(np.float32),
+    'high': np.fmax.reduceat(prices, starts, axis=1),
+    'low': np.fmin.reduceat(prices, starts, axis=1),
+    'close': close.astype(np.float32),
+    'vwap': vwap.astype(np.float32),
+    'volume': volume
+  }
+
+
+def _log_returns(prices: np.ndarray) -> np.ndarray:
+  """
+  Helper function to get the log returns of the items between their consecutive entries.
+
+  :param prices: The prices of the items, with NaN where an item has no entry.
+  :type prices: np.ndarray
+  :return: The log return of each entry since the previous entry of its item, with NaN where there is none.
+  :rtype: np.ndarray
+  """
+
+  columns = prices.shape[1]
+  isValid = ~np.isnan(prices) & (prices > 0)
+  lastValid = np.maximum.accumulate(np.where(isValid, np.arange(columns, dtype=np.int32), -1), axis=1)
+  previous = np.full(prices.shape, -1, dtype=np.int32)
+  previous[:, 1:] = lastValid[:, :-1]
+  with np.errstate(invalid='ignore', divide='ignore'):
+    logPrices = np.log(np.where(isValid, prices, np.nan).astype(np.float64))
+    returns = logPrices - np.take_along_axis(logPrices, np.maximum(previous, 0), axis=1)
+  return np.where(isValid & (previous >= 0), returns, np.nan)
+
+
+class PricePanel:
+
+  def __init__(self, histories=None, cache_dir: str = None):
+    """
+    Initializing a panel of the price histories of many items, aligned on one time axis.
+
+    The prices and volumes are stored as (items, times) NumPy arrays, with NaN prices and zero volumes where an item
+    has no entry, so that the candles, returns, rolling statistics and rankings of all the items are computed at once.
+    The time axis is the union of the dates of the items, hourly for the last month of Steam and daily before.
+
+      panel = PricePanel(request.get_price_history_many(items), cache_dir = 'analytics')
+      daily = panel.resample('D')
+      daily.rolling(7).tail()
+      panel.rank('return', start = '2024-01-01')
+
+    :param histories: The price histories, as the result of get_price_history_many(), or a mapping of (item_name, appid) pairs or item names to results of get_price_history(). The default value is None (an empty panel).
+    :type histories: pd.DataFrame
+    :param cache_dir: Optional directory where the results of the aggregations are cached, keyed by the content of the panel and the arguments. The default value is None.
+    :type cache_dir: str
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.cache_dir = cache_dir
+    self.__fingerprint = None
+    if cache_dir is not None:
+      exception('type', cache_dir, str, "Input cache_dir it not a valid string type.")
+      os.makedirs(cache_dir, exist_ok=True)
+
+    history = _history_frame(histories if histories is not None else {})
+    # The items and times are factorized separately, as concatenating the names and app ids of every entry is slow.
+    nameCodes, names = _sorted_codes(history['item_name'])
+    appidCodes, appids = _sorted_codes(history['appid'])
+    seconds = pd.to_datetime(history['date']).to_numpy(dtype='datetime64[s]').view(np.int64)
+    # The failed items of get_price_history_many() have one row without a date.
+    isKept = (seconds != np.datetime64('NaT').astype('datetime64[s]').view(np.int64)) & (nameCodes >= 0) & (appidCodes >= 0)
+    kept = slice(None) if isKept.all() else isKept
+
+    itemCodes, keys = _dense_codes(nameCodes[kept] * max(len(appids), 1) + appidCodes[kept])
+    items = list(zip(names[keys // max(len(appids), 1)], appids[keys % max(len(appids), 1)]))
+    # The dates of Steam are on the hour, which makes a smaller range of integers.
+    step = 3600 if not (seconds[kept] % 3600).any() else 1
+    timeCodes, times = _dense_codes(seconds[kept] // step)
+    times = (times * step).astype('datetime64[s]')
+
+    prices = np.full((len(items), len(times)), np.nan, dtype=np.float32)
+    volumes = np.zeros((len(items), len(times)), dtype=np.int32)
+    prices[itemCodes, timeCodes] = history['median_price'].to_numpy()[kept]
+    volumes[itemCodes, timeCodes] = history['volume_sold'].to_numpy()[kept]
+    self.__set_arrays(_items_index(items), times, prices, volumes)
+
+
+  def __set_arrays(self, items: pd.MultiIndex, times: np.ndarray, prices: np.ndarray, volumes: np.ndarray):
+    """
+    Helper function to set the arrays of the panel.
+
+    :param items: The (item_name, appid) of each row.
+    :type items: pd.MultiIndex
+    :param times: The sorted times of the columns.
+    :type times: np.ndarray
+    :param prices: The (items, times) prices.
+    :type prices: np.ndarray
+    :param volumes: The (items, times) volumes.
+    :type volumes: np.ndarray
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.items = items
+    self.times = times
+    self.prices = prices
+    self.volumes = volumes
+    self.__fingerprint = None
+
+
+  @classmethod
+  def from_arrays(cls, items, times: np.ndarray, prices: np.ndarray, volumes: np.ndarray, cache_dir: str = None):
+    """
+    Get a panel from its arrays.
+
+    :param items: The (item_name, appid) of each row.
+    :type items: pd.MultiIndex
+    :param times: The sorted times of the columns.
+    :type times: np.ndarray
+    :param prices: The (items, times) prices, with NaN where an item has no entry.
+    :type prices: np.ndarray
+    :param volumes: The (items, times) volumes.
+    :type volumes: np.ndarray
+    :param cache_dir: Optional directory where the results of the aggregations are cached. The default value is None.
+    :type cache_dir: str
+    :return: The panel.
+    :rtype: PricePanel
+    """
+
+    exception('contain', prices.shape, [(len(items), len(times))], "Input prices does not have one row per item and one column per time.")
+    exception('contain', volumes.shape, [prices.shape], "Input volumes does not have the shape of prices.")
+    panel = cls(cache_dir=cache_dir)
+    panel.__set_arrays(_items_index(items), np.asarray(times).astype('datetime64[s]'), prices, volumes)
+    return panel
+
+
+  def __len__(self) -> int:
+    return len(self.items)
+
+
+  def fingerprint(self) -> str:
+    """
+    Get the hash of the content of the panel, which keys its cached results.
+
+    :return: The hexadecimal SHA-256 of the items, times, prices and volumes.
+    :rtype: str
+    """
+
+    if self.__fingerprint is None:
+      digest = hashlib.sha256(json.dumps(list(self.items)).encode('utf-8'))
+      for array in [self.times.view(np.int64), self.prices, self.volumes]:
+        digest.update(str(array.dtype).encode('utf-8') + str(array.shape).encode('utf-8'))
+        digest.update(np.ascontiguousarray(array).data)
+      self.__fingerprint = digest.hexdigest()
+    return self.__fingerprint
+
+
+  def __cached(self, name: str, arguments: tuple, compute):
+    """
+    Helper function to get a result from the cache directory, computing and saving it if it is not cached.
+
+    :param name: The name of the computation.
+    :type name: str
+    :param arguments: The arguments of the computation.
+    :type arguments: tuple
+    :param compute: Function computing the result, without arguments.
+    :type compute: callable
+    :return: The result.
+    :rtype: any
+    """
+
+    if self.cache_dir is None:
+      return compute()
+
+    key = hashlib.sha256((self.fingerprint() + name + repr(arguments)).encode('utf-8')).hexdigest()[:32]
+    path = os.path.join(self.cache_dir, name + '-' + key + '.pkl')
+    try:
+      with open(path, 'rb') as f:
+        return pickle.load(f)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+      pass
+
+    result = compute()
+    with open(path + '.tmp', 'wb') as f:
+      pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + '.tmp', path)
+    return result
+
+
+  def __columns(self, start=None, end=None) -> slice:
+    """
+    Helper function to get the columns between two times.
+
+    :param start: Optional first time, inclusive. The default value is None.
+    :type start: datetime
+    :param end: Optional last time, inclusive. The default value is None.
+    :type end: datetime
+    :return: The slice of the columns.
+    :rtype: slice
+    """
+
+    first = 0 if start is None else int(np.searchsorted(self.times, np.datetime64(pd.Timestamp(start), 's'), 'left'))
+    last = len(self.times) if end is None else int(np.searchsorted(self.times, np.datetime64(pd.Timestamp(end), 's'), 'right'))
+    return slice(first, max(first, last))
+
+
+  def __aggregate(self, columns: slice, starts: np.ndarray) -> dict:
+    """
+    Helper function to aggregate columns of all the items into bins, CHUNK_ITEMS items at a time.
+
+    :param columns: The aggregated columns.
+    :type columns: slice
+    :param starts: The first column of each bin, relative to the first aggregated column.
+    :type starts: np.ndarray
+    :return: The open, high, low, close, vwap and volume arrays, of shape (items, bins).
+    :rtype: dict
+    """
+
+    blocks = [_aggregate(self.prices[first:first + CHUNK_ITEMS, columns], self.volumes[first:first + CHUNK_ITEMS, columns], starts)
+              for first in range(0, len(self), CHUNK_ITEMS)]
+    return {name: np.concatenate([block[name] for block in blocks]) for name in blocks[0]}
+
+
+  def __bins(self, freq: str, start=None, end=None) -> tuple:
+    """
+    Helper function to assign the columns between two times to the bins of a frequency.
+
+    :param freq: The frequency, 'H' (hourly), 'D' (daily) or 'W' (weekly, starting on Monday).
+    :type freq: str
+    :param start: Optional first time, inclusive. The default value is None.
+    :type start: datetime
+    :param end: Optional last time, inclusive. The default value is None.
+    :type end: datetime
+    :return: The (columns, first column of each non-empty bin, position of each non-empty bin, start time of each bin).
+    :rtype: tuple
+    """
+
+    exception('contain', freq, FREQUENCIES, "Input freq must be 'H', 'D' or 'W'.")
+    step, offset = FREQUENCIES[freq]
+    columns = self.__columns(start, end)
+    bins = (self.times[columns].astype(np.int64) - offset) // step
+    if len(bins) == 0:
+      return columns, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype='datetime64[s]')
+    positions, starts = np.unique(bins - bins[0], return_index=True)
+    times = ((np.arange(bins[0], bins[-1] + 1) * step) + offset).astype('datetime64[s]')
+    return columns, starts, positions, times
+
+
+  def __resampled(self, freq: str, start=None, end=None) -> tuple:
+    """
+    Helper function to aggregate the panel into every bin of a frequency, including the bins without entries.
+
+    :param freq: The frequency, 'H' (hourly), 'D' (daily) or 'W' (weekly, starting on Monday).
+    :type freq: str
+    :param start: Optional first time, inclusive. The default value is None.
+    :type start: datetime
+    :param end: Optional last time, inclusive. The default value is None.
+    :type end: datetime
+    :return: The (start time of each bin, aggregated arrays of shape (items, bins)).
+    :rtype: tuple
+    """
+
+    columns, starts, positions, times = self.__bins(freq, start, end)
+    if len(times) == 0 or len(self) == 0:
+      empty = {name: np.empty((len(self), len(times)), dtype=np.int64 if name == 'volume' else np.float32) for name in ['open', 'high', 'low', 'close', 'vwap', 'volume']}
+      return times, empty
+
+    aggregated = self.__aggregate(columns, starts)
+    full = {}
+    for name, values in aggregated.items():
+      full[name] = np.zeros((len(self), len(times)), dtype=values.dtype) if name == 'volume' else np.full((len(self), len(times)), np.nan, dtype=values.dtype)
+      full[name][:, positions] = values
+    return times, full
+
+
+  def resample(self, freq: str, how: str = 'vwap', start=None, end=None):
+    """
+    Resample the panel to a regular frequency, with one column per hour, day or week between the first and the last
+    entry, and the sum of the volumes of each bin. Hourly resampling of the whole history of Steam has one column per
+    hour since 2013, so it is better restricted to the last month with start.
+
+    :param freq: The frequency, 'H' (hourly), 'D' (daily) or 'W' (weekly, starting on Monday).
+    :type freq: str
+    :param how: The price of each bin. This includes 'vwap' (the close when there is no volume), 'open', 'high', 'low' and 'close'. The default value is 'vwap'.
+    :type how: str
+    :param start: Optional first time, inclusive. The default value is None.
+    :type start: datetime
+    :param end: Optional last time, inclusive. The default value is None.
+    :type end: datetime
+    :return: The resampled panel.
+    :rtype: PricePanel
+    """
+
+    exception('contain', how, ['vwap', 'open', 'high', 'low', 'close'], "Input how must be 'vwap', 'open', 'high', 'low' or 'close'.")
+
+    def compute():
+      times, aggregated = self.__resampled(freq, start, end)
+      prices = aggregated[how]
+      if how == 'vwap':
+        prices = np.where(np.isnan(prices), aggregated['close'], prices)
+      return PricePanel.from_arrays(self.items, times, prices, aggregated['volume'], self.cache_dir)
+    return self.__cached('resample', (freq, how, str(start), str(end)), compute)
+
+
+  def ohlc(self, freq: str, start=None, end=None) -> pd.DataFrame:
+    """
+    Get the candles of all the items.
+
+    :param freq: The frequency, 'H' (hourly), 'D' (daily) or 'W' (weekly, starting on Monday).
+    :type freq: str
+    :param start: Optional first time, inclusive. The default value is None.
+    :type start: datetime
+    :param end: Optional last time, inclusive. The default value is None.
+    :type end: datetime
+    :return: The item_name, appid, date, open, high, low, close, vwap and volume of each bin with entries, in long format.
+    :rtype: pd.DataFrame
+    """
+
+    def compute():
+      times, aggregated = self.__resampled(freq, start, end)
+      rows, columns = np.nonzero(~np.isnan(aggregated['close']))
+      df = pd.DataFrame({
+        'item_name': pd.Categorical.from_codes(self.items.codes[0][rows], self.items.levels[0]),
+        'appid': pd.Categorical.from_codes(self.items.codes[1][rows], self.items.levels[1]),
+        'date': times[columns].astype('datetime64[ns]')
+      })
+      for name in ['open', 'high', 'low', 'close', 'vwap', 'volume']:
+        df[name] = aggregated[name][rows, columns]
+      return df
+    return self.__cached('ohlc', (freq, str(start), str(end)), compute)
+
+
+  def frame(self, values: np.ndarray = None) -> pd.DataFrame:
+    """
+    Get values of the panel as a wide data frame, with one row per time and one column per item.
+
+    :param values: Optional (items, times) values. The default value is None (the prices).
+    :type values: np.ndarray
+    :return: The values, indexed by date, with (item_name, appid) columns.
+    :rtype: pd.DataFrame
+    """
+
+    values = self.prices if values is None else values
+    return pd.DataFrame(values.T, index=pd.DatetimeIndex(self.times.astype('datetime64[ns]'), name='date'), columns=self.items)
+
+
+  def returns(self) -> np.ndarray:
+    """
+    Get the log returns of the items between their consecutive entries.
+
+    :return: The (items, times) log returns, with NaN where an item has no entry or no previous entry.
+    :rtype: np.ndarray
+    """
+
+    return self.__cached('returns', (), lambda: _log_returns(self.prices))
+
+
+  def rolling(self, window, statistic: str = 'median', min_periods: int = 1) -> pd.DataFrame:
+    """
+    Get a rolling statistic of the prices of all the items. The windows of the entries of each item skip its missing
+    entries, and are computed for all the items at once by pandas.
+
+    :param window: The number of columns of the windows, or a duration, for e.g. '7D', which fits the irregular time axis of a panel that is not resampled.
+    :type window: int
+    :param statistic: The statistic. This includes 'median', 'mean', 'std', 'min', 'max' and 'sum'. The default value is 'median'.
+    :type statistic: str
+    :param min_periods: Minimum number of entries of a window. The default value is 1.
+    :type min_periods: int
+    :return: The statistic, indexed by date, with (item_name, appid) columns.
+    :rtype: pd.DataFrame
+    """
+
+    exception('contain', statistic, ['median', 'mean', 'std', 'min', 'max', 'sum'], "Input statistic must be 'median', 'mean', 'std', 'min', 'max' or 'sum'.")
+    return self.__cached('rolling', (window, statistic, min_periods),
+                         lambda: getattr(self.frame().rolling(window, min_periods=min_periods), statistic)())
+
+
+  def volatility(self, window=None, min_periods: int = 2) -> pd.DataFrame:
+    """
+    Get the volatility of the items, as the standard deviation of their log returns. As the entries of Steam are
+    hourly for the last month and daily before, the panel is better resampled first.
+
+    :param window: Optional number of columns of rolling windows, or a duration, for e.g. '30D'. The default value is None (the whole panel).
+    :type window: int
+    :param min_periods: Minimum number of returns of a window. The default value is 2.
+    :type min_periods: int
+    :return: The rolling volatility, indexed by date, with (item_name, appid) columns, or the volatility of each item if window is None.
+    :rtype: pd.DataFrame
+    """
+
+    def compute():
+      returns = self.returns()
+      if window is not None:
+        return self.frame(returns).rolling(window, min_periods=min_periods).std()
+      with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        counts = (~np.isnan(returns)).sum(axis=1)
+        volatility = np.where(counts >= min_periods, np.nanstd(returns, axis=1, ddof=1), np.nan)
+      return pd.DataFrame({'volatility': volatility}, index=self.items)
+    return self.__cached('volatility', (window, min_periods), compute)
+
+
+  def summary(self, start=None, end=None) -> pd.DataFrame:
+    """
+    Get the statistics of all the items between two times.
+
+    :param start: Optional first time, inclusive. The default value is None.
+    :type start: datetime
+    :param end: Optional last time, inclusive. The default value is None.
+    :type end: datetime
+    :return: The open, high, low, close, vwap, volume, return (close / open - 1), volatility and number of entries of each item.
+    :rtype: pd.DataFrame
+    """
+
+    def compute():
+      columns = self.__columns(start, end)
+      if columns.stop == columns.start or len(self) == 0:
+        return pd.DataFrame(columns=SUMMARY_COLUMNS, index=self.items)
+      aggregated = self.__aggregate(columns, np.array([0]))
+      df = pd.DataFrame({name: values[:, 0] for name, values in aggregated.items()}, index=self.items)
+      df['return'] = df['close'] / df['open'] - 1
+      returns = _log_returns(self.prices[:, columns])
+      with warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        df['volatility'] = np.where((~np.isnan(returns)).sum(axis=1) >= 2, np.nanstd(returns, axis=1, ddof=1), np.nan)
+      df['observations'] = (~np.isnan(self.prices[:, columns])).sum(axis=1)
+      return df[SUMMARY_COLUMNS]
+    return self.__cached('summary', (str(start), str(end)), compute)
+
+
+  def rank(self, by: str = 'return', start=None, end=None, top: int = None, ascending: bool = False) -> pd.DataFrame:
+    """
+    Rank the items on a statistic between two times, for e.g. the best performers of the last week.
+
+    :param by: The statistic of summary() the items are ranked on. The default value is 'return'.
+    :type by: str
+    :param start: Optional first time, inclusive. The default value is None.
+    :type start: datetime
+    :param end: Optional last time, inclusive. The default value is None.
+    :type end: datetime
+    :param top: Optional number of items returned. The default value is None (all the items).
+    :type top: int
+    :param ascending: Whether the lowest values are ranked first. The default value is False.
+    :type ascending: bool
+    :return: The statistics of the items, sorted by rank, with a 'rank' column starting at 1. Items without a value are ranked last.
+    :rtype: pd.DataFrame
+    """
+
+    exception('contain', by, SUMMARY_COLUMNS, f"Input by must be one of {SUMMARY_COLUMNS}.")
+    df = self.summary(start, end).sort_values(by, ascending=ascending, na_position='last', kind='stable')
+    df.insert(0, 'rank', df[by].rank(ascending=ascending, method='min').astype('Int64'))
+    return df if top is None else df.head(top)
+
+
+  def save(self, path: str):
+    """
+    Save the panel to a directory of .npy files, which load() memory-maps.
+
+    :param path: Path to the directory of the panel. It is created if it does not exist.
+    :type path: str
+    :return: Nothing.
+    :rtype: None
+    """
+
+    exception('type', path, str, "Input path it not a valid string type.")
+    os.makedirs(path, exist_ok=True)
+    for name in ['times', 'prices', 'volumes']:
+      filePath = os.path.join(path, name + '.npy')
+      with open(filePath + '.tmp', 'wb') as f:
+        np.save(f, np.ascontiguousarray(getattr(self, name)))
+      os.replace(filePath + '.tmp', filePath)
+    with open(os.path.join(path, 'items.json.tmp'), 'w') as f:
+      json.dump([list(item) for item in self.items], f)
+    os.replace(os.path.join(path, 'items.json.tmp'), os.path.join(path, 'items.json'))
+
+
+  @classmethod
+  def load(cls, path: str, mmap: bool = True, cache_dir: str = None):
+    """
+    Load a panel saved with save().
+
+    :param path: Path to the directory of the panel.
+    :type path: str
+    :param mmap: Whether to memory-map the files instead of reading them into memory. The default value is True.
+    :type mmap: bool
+    :param cache_dir: Optional directory where the results of the aggregations are cached. The default value is None.
+    :type cache_dir: str
+    :return: The panel.
+    :rtype: PricePanel
+    """
+
+    exception('type', path, str, "Input path it not a valid string type.")
+    with open(os.path.join(path, 'items.json'), 'r') as f:
+      items = [tuple(item) for item in json.load(f)]
+    mode = 'r' if mmap else None
+    arrays = [np.load(os.path.join(path, name + '.npy'), mmap_mode=mode) for name in ['times', 'prices', 'volumes']]
+    return cls.from_arrays(items, *arrays, cache_dir=cache_dir)
@@ -0,0 +1,862 @@
+import asyncio
+import pandas as pd
+from urllib.parse import quote
+from steamcrawl import endpoints, parsing
+from steamcrawl.auth import SHARED_AUTH_CACHE, AuthCache
+from steamcrawl.credentials import CredentialPool
+from steamcrawl.decoders import JSONDecoder
+from steamcrawl.exceptions import exception
+from steamcrawl.itemnameid import ItemNameIdMap
+from steamcrawl.ratelimit import DEFAULT_LIMITS, RateLimiter
+from steamcrawl.registry import AppRegistry, shared_registry
+from steamcrawl.schemas import SCHEMAS
+from steamcrawl.singleflight import AsyncSingleFlight, request_key
+from steamcrawl.transport import resolve_url
+
+
+class AsyncRequest:
+
+  def __init__(self, steamLoginSecure: str, appid_ttl: float = 86400, appid_snapshot: str = None,
+               max_concurrency: int = 10, timeout: float = 30, base_urls: dict = None, session=None,
+               rate_limiter: RateLimiter = None, item_nameid_path: str = None, decoder=None,
+               auth_cache: AuthCache = None, credentials: CredentialPool = None, coalesce: bool = True,
+               app_registry: AppRegistry = None):
+    """
+    Initializing the asyncio client with steamLoginSecure and APIs.
+
+    The client mirrors the methods of Request as coroutines and shares its response parsing. It requires the
+    aiohttp package and should be used as an asynchronous context manager, which opens the HTTP session and
+    sets the steamLoginSecure cookie (validated on the first authenticated call):
+
+      async with AsyncRequest('your steamLoginSecure here') as request:
+        data_frame = await request.get_market_history(count = 10)
+
+    :param steamLoginSecure: The value of your steamLoginSecure cookie.
+    :type steamLoginSecure: str
+    :param appid_ttl: Number of seconds before the cached list of app ids is refreshed. The default value is 86400 (one day).
+    :type appid_ttl: float
+    :param appid_snapshot: Optional path to a local file where the list of app ids is saved. The default value is None.
+    :type appid_snapshot: str
+    :param max_concurrency: Maximum number of requests in flight at the same time. The default value is 10.
+    :type max_concurrency: int
+    :param timeout: Total timeout of a request in seconds. The default value is 30.
+    :type timeout: float
+    :param base_urls: Optional mapping of Steam base URLs to replacement base URLs (see Transport). The default value is None.
+    :type base_urls: dict
+    :param session: Optional aiohttp.ClientSession to use instead of a new one. The default value is None.
+    :type session: aiohttp.ClientSession
+    :param rate_limiter: Rate limiter applied to all requests. By default, a RateLimiter with the Steam limits is used. Set to False to disable rate limiting.
+    :type rate_limiter: RateLimiter
+    :param item_nameid_path: Optional path to a local file where resolved item_nameid values are saved. The default value is None.
+    :type item_nameid_path: str
+    :param decoder: The JSON backend used to decode the responses. This includes 'msgspec', 'orjson', and 'json', or a JSONDecoder, for e.g. JSONDecoder('msgspec', typed=True) to skip the fields that the parsing does not use. The default value is None (the fastest installed backend).
+    :type decoder: str or JSONDecoder
+    :param auth_cache: Cache of the steamLoginSecure validations. The default value is SHARED_AUTH_CACHE, shared by all the clients of the process.
+    :type auth_cache: AuthCache
+    :param credentials: Optional pool of cookies over which the pricehistory and priceoverview requests are spread. The other authenticated APIs keep using steamLoginSecure. When no rate limiter is given, the rate limits of these APIs are raised to the budget of the pool. The default value is None.
+    :type credentials: CredentialPool
+    :param coalesce: Whether identical requests awaited at the same time share one fetch and its decoded content. The default value is True.
+    :type coalesce: bool
+    :param app_registry: Optional registry of the app ids. The default value is None (the registry of the process for appid_ttl and appid_snapshot, shared with the other clients).
+    :type app_registry: AppRegistry
+    :return: Nothing.
+    :rtype: None
+    """
+
+    exception('type', steamLoginSecure, str, "Input steamLoginSecure it not a valid string type.")
+    self.headers = {
+      'Cookie': ''
+    }
+    self.session = session
+    self.timeout = timeout
+    self.base_urls = dict(base_urls or {})
+    self.max_concurrency = max_concurrency
+    self.credentials = credentials
+    if rate_limiter is None and credentials is not None:
+      rate_limiter = RateLimiter({**DEFAULT_LIMITS, **credentials.limits()})
+    self.rate_limiter = RateLimiter() if rate_limiter is None else rate_limiter or None
+    self.decoder = decoder if isinstance(decoder, JSONDecoder) else JSONDecoder(decoder)
+    self.single_flight = AsyncSingleFlight() if coalesce else None
+    self.auth_cache = auth_cache if auth_cache is not None else SHARED_AUTH_CACHE
+    self.page_size = 100
+    self.inventory_page_size = 2000
+    self.app_registry = app_registry if app_registry is not None else shared_registry(appid_ttl, appid_snapshot)
+    self.item_nameids = ItemNameIdMap(item_nameid_path)
+    self.__steamLoginSecure = steamLoginSecure
+    self.__semaphore = asyncio.Semaphore(max_concurrency)
+    self.__registry_lock = asyncio.Lock()
+    self.__auth_lock = asyncio.Lock()
+    self.__owns_session = session is None
+
+
+  async def __aenter__(self):
+    await self.open()
+    await self.set_steam_auth(self.__steamLoginSecure)
+    return self
+
+
+  async def __aexit__(self, *args):
+    await self.close()
+
+
+  async def open(self):
+    """
+    Open the aiohttp session if it was not given.
+
+    :return: Nothing.
+    :rtype: None
+    """
+
+    if self.session is None:
+      try:
+        import aiohttp
+      except ImportError:
+        raise ImportError("AsyncRequest requires the aiohttp package. Please install it using pip install aiohttp.")
+      self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout),
+                                           headers={'Accept-Encoding': 'gzip, deflate'})
+
+
+  async def close(self):
+    """
+    Close the aiohttp session if it was opened by the client, and merge the log of the resolved item_nameid values
+    into their local file.
+
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.item_nameids.close()
+    if self.session is not None and self.__owns_session:
+      await self.session.close()
+      self.session = None
+
+
+  async def __get(self, api: str, params: dict, headers: dict) -> bytes:
+    """
+    Helper function to make a request under the concurrency semaphore and the rate limiter.
+
+    :param api: The requested API URL.
+    :type api: str
+    :param params: The parameters of the request.
+    :type params: dict
+    :param headers: The headers of the request.
+    :type headers: dict
+    :return: The raw content of the response.
+    :rtype: bytes
+    """
+
+    return (await self.__send(api, params, headers))[1]
+
+
+  async def __send(self, api: str, params: dict, headers: dict) -> tuple:
+    """
+    Helper function to make a request under the concurrency semaphore and the rate limiter, like Transport does.
+
+    If a rate limiter is set, the request is retried with backoff when Steam throttles it or when the connection
+    fails. The last response is returned once the retries are exhausted.
+
+    :param api: The requested API URL.
+    :type api: str
+    :param params: The parameters of the request.
+    :type params: dict
+    :param headers: The headers of the request.
+    :type headers: dict
+    :return: The (status code, raw content) of the response.
+    :rtype: tuple
+    """
+
+    if self.session is None:
+      await self.open()
+    params = {key: str(value) for key, value in (params or {}).items()}
+    if self.rate_limiter is None:
+      async with self.__semaphore:
+        async with self.session.get(resolve_url(api, self.base_urls), params=params, headers=headers) as response:
+          return response.status, await response.read()
+
+    import aiohttp
+    bucket = self.rate_limiter.bucket(api)
+    for attempt in range(self.rate_limiter.max_retries + 1):
+      await asyncio.sleep(bucket.reserve())
+      isLastAttempt = attempt == self.rate_limiter.max_retries
+      try:
+        async with self.__semaphore:
+          async with self.session.get(resolve_url(api, self.base_urls), params=params, headers=headers) as response:
+            content = await response.read()
+            status = response.status
+            retryAfter = response.headers.get('Retry-After')
+      except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+        if isLastAttempt:
+          raise
+        bucket.throttle()
+        await asyncio.sleep(self.rate_limiter.backoff(attempt))
+        continue
+
+      if not self.rate_limiter.is_throttled(status, content):
+        bucket.recover()
+        return status, content
+
+      bucket.throttle()
+      if isLastAttempt:
+        return status, content
+      await asyncio.sleep(self.rate_limiter.backoff(attempt, retryAfter))
+
+
+  async def set_steam_auth(self, steamLoginSecure: str, validate: bool = False):
+    """
+    Set the steamLoginSecure id as headers.
+
+    The cookie is validated on the first authenticated call, with one request whose result is kept in the auth cache.
+
+    :param steamLoginSecure: The value of your steamLoginSecure cookie.
+    :type steamLoginSecure: str
+    :param validate: Whether to validate the cookie now instead of on the first authenticated call. The default value is False.
+    :type validate: bool
+    :return: Nothing.
+    :rtype: None
+    """
+
+    exception('type', steamLoginSecure, str, "Input steamLoginSecure it not a valid string type.")
+    self.headers['Cookie'] = 'steamLoginSecure=' + steamLoginSecure + ';'
+    if validate:
+      await self.__check_auth()
+
+
+  async def __check_auth(self, rotated: bool = False):
+    """
+    Helper function to check that the steamLoginSecure cookie is set and authorized, validating it once if needed.
+
+    :param rotated: Whether the call only uses the APIs rotated over the credential pool, whose cookies are validated when they are picked. The default value is False.
+    :type rotated: bool
+    :return: Nothing.
+    :rtype: None
+    """
+
+    if rotated and self.credentials is not None:
+      return
+    header = self.headers['Cookie']
+    exception('network', header, '',
+      "Cookie not authorized. Please set your steamLoginSecure first using set_steam_auth().")
+    authorized = await self.__authorize(header)
+    exception('network', authorized, False, "Input header it not an authorized cookie header.")
+
+
+  async def __authorize(self, header: str) -> bool:
+    """
+    Helper function to check whether a Cookie header is authorized, validating it once if needed.
+
+    :param header: The Cookie header.
+    :type header: str
+    :return: Whether the cookie is authorized.
+    :rtype: bool
+    """
+
+    authorized = self.auth_cache.get(header)
+    if authorized is None:
+      async with self.__auth_lock:
+        authorized = self.auth_cache.get(header)
+        if authorized is None:
+          content = await self.__get(endpoints.AUTH_TEST_API, {}, {'Cookie': header})
+          authorized = parsing.decode_json(content, self.decoder, endpoints.AUTH_TEST_API) != []
+          self.auth_cache.set(header, authorized)
+    return authorized
+
+
+  async def __fetch_json(self, api: str, params: dict, headers: dict):
+    """
+    Helper function to make a request and decode its JSON content. Identical requests awaited at the same time share
+    one fetch and its decoded content.
+
+    :param api: The requested API URL.
+    :type api: str
+    :param params: The parameters of the request.
+    :type params: dict
+    :param headers: The headers of the request.
+    :type headers: dict
+    :return: The decoded JSON content of the response.
+    :rtype: dict
+    """
+
+    async def fetch():
+      return parsing.decode_json(await self.__get(api, params, headers), self.decoder, api)
+    return await self.__coalesced(request_key(api, params, headers.get('Cookie', '')), fetch)
+
+
+  async def __coalesced(self, key: tuple, fetch):
+    """
+    Helper function to await a fetch through the single-flight group, when coalescing is enabled.
+
+    :param key: The key of the request.
+    :type key: tuple
+    :param fetch: The coroutine function making the request and decoding its content.
+    :type fetch: callable
+    :return: The decoded JSON content of the response.
+    :rtype: dict
+    """
+
+    if self.single_flight is None:
+      return await fetch()
+    return await self.single_flight.do(key, fetch)
+
+
+  async def __fetch_rotated(self, api: str, params: dict):
+    """
+    Helper function to make a request of the pricehistory or priceoverview API and decode its JSON content.
+
+    With a credential pool, the request uses the next cookie of the pool and is made again with another cookie
+    when Steam returns a 429, an empty body, [] or null, up to once per cookie. Identical requests awaited at the same time
+    share one fetch, whichever cookie it uses.
+
+    :param api: The requested API URL.
+    :type api: str
+    :param params: The parameters of the request.
+    :type params: dict
+    :return: The decoded JSON content of the response.
+    :rtype: dict
+    """
+
+    if self.credentials is None:
+      return await self.__fetch_json(api, params, self.headers)
+    return await self.__coalesced(request_key(api, params, 'credentials'), lambda: self.__fetch_pooled(api, params))
+
+
+  async def __fetch_pooled(self, api: str, params: dict):
+    """
+    Helper function to make a request with the cookies of the credential pool and decode its JSON content.
+
+    :param api: The requested API URL.
+    :type api: str
+    :param params: The parameters of the request.
+    :type params: dict
+    :return: The decoded JSON content of the response.
+    :rtype: dict
+    """
+
+    attempts = 0
+    while attempts < len(self.credentials):
+      header, wait = self.credentials.reserve()
+      if wait > 0:
+        await asyncio.sleep(wait)
+      if not await self.__authorize(header):
+        self.credentials.disable(header)
+        continue
+      status, content = await self.__send(api, params, {**self.headers, 'Cookie': header})
+      attempts += 1
+      isEmpty = status == 429 or content.strip() in (b'', b'null', b'[]')
+      self.credentials.report(header, not isEmpty)
+      if not isEmpty:
+        break
+    return parsing.decode_json(content, self.decoder, api)
+
+
+  async def __request_helper(self, api: str, params: dict, headers: dict, index: list):
+    """
+    Helper function to make requests.
+
+    :param api: The requested API URL.
+    :type api: str
+    :param params: The parameters of the request.
+    :type params: dict
+    :param headers: The headers of the request.
+    :type headers: dict
+    :param index: List of indices that needs to be extracted.
+    :type index: list
+    :return: The extracted indices.
+    :rtype: list
+    """
+
+    contentObject = await self.__fetch_json(api, params, headers)
+    return parsing.extract_indices(contentObject, params, index)
+
+
+  async def __pagination_helper(self, api: str, params: dict, index: list, count: int, parse) -> list:
+    """
+    Helper function to fetch the pages of a paginated API concurrently.
+
+    :param api: The requested API URL.
+    :type api: str
+    :param params: The parameters of the request, without 'start' and 'count'.
+    :type params: dict
+    :param index: List of indices that needs to be extracted.
+    :type index: list
+    :param count: The total number of entries that needs to be extracted.
+    :type count: int
+    :param parse: Function applied to the extracted indices of each page.
+    :type parse: callable
+    :return: The parsed pages, in order.
+    :rtype: list
+    """
+
+    pageSize = self.page_size
+    firstParams = dict(params, start=0, count=min(count, pageSize))
+    contentObject = await self.__fetch_json(api, firstParams, self.headers)
+    firstPage = parse(parsing.extract_indices(contentObject, dict(firstParams, count=count), index))
+
+    async def fetch_page(start):
+      pageParams = dict(params, start=start, count=min(pageSize, count - start))
+      return parse(await self.__request_helper(api, pageParams, self.headers, index))
+
+    pages = await asyncio.gather(*[fetch_page(start) for start in range(pageSize, count, pageSize)])
+    return [firstPage] + list(pages)
+
+
+  async def __validate_appid(self, appid: str):
+    """
+    Helper function to check that an app id exists using the cached app registry.
+
+    :param appid: The id of the app.
+    :type appid: str
+    :return: Nothing.
+    :rtype: None
+    """
+
+    if self.app_registry.is_stale():
+      async with self.__registry_lock:
+        if self.app_registry.is_stale():
+          self.app_registry.update(await self.__load_all_appid())
+    exception('contain', int(appid), self.app_registry,
+      f"{appid} is not a valid appid. Please check the complete list using get_all_appid().")
+
+
+  async def __load_all_appid(self) -> list:
+    """
+    Helper function to download the list of all apps id.
+
+    :return: List of all apps as dictionaries with 'appid' and 'name'.
+    :rtype: list
+    """
+
+    return (await self.__request_helper(endpoints.APPID_API, {}, self.headers, ['applist']))[0]['apps']
+
+
+  async def get_all_listings(self, sortby: str='', sortdir: str='desc', count: int = 100) -> pd.DataFrame:
+    """
+    Get listings of items exactly as how they are ordered in the community market.
+
+    :param sortby: Type of listings sorting. This includes '', 'price', and 'quantity'. The default value is ''.
+    :type sortby: str
+    :param sortdir: Direction of listings sorting. This includes 'asc' and 'desc'. The default value is 'desc'.
+    :type sortby: str
+    :param count: Number of item listings from the default list to be displayed. The default value is 100.
+    :type count: int
+    :return: Listings of items (given by count).
+    :rtype: pd.DataFrame
+    """
+
+    exception('type', sortby, str, "Input sortby it not a valid string type.")
+    exception('type', sortdir, str, "Input sortdir it not a valid string type.")
+    exception('type', count, int, "Input count it not a valid integer type.")
+    exception('contain', sortby, ['price', 'quantity', ''],
+      f"{sortby} is not valid as a sortby type. It should only be '', 'price', or 'quantity'.")
+    exception('contain', sortdir, ['desc', 'asc'],
+      f"{sortdir} is not valid as a sortby type. It should only be 'desc' or 'asc'.")
+
+    params = {
+      'sort_column': sortby,
+      'sort_dir': sortdir,
+      'norender': 1
+    }
+
+    if count == 0:
+      return pd.DataFrame()
+
+    pages = await self.__pagination_helper(endpoints.ALL_LISTINGS_API, params, ['results'], count, parsing.parse_listings)
+
+    return parsing.concat_frames(pages, SCHEMAS['listings'])
+
+
+  async def get_app_listings(self, appid: str, sortby: str='', sortdir: str='desc', count: int=100) -> pd.DataFrame:
+    """
+    Get listings of items from a specific app exactly as how they are ordered in the community market listing.
+
+    :param sortby: Type of listings sorting. This includes '', 'price', 'quantity', and 'name'. The default value is ''.
+    :type sortby: str
+    :param sortdir: Direction of listings sorting. This includes 'asc' and 'desc'. The default value is 'desc'.
+    :type sortby: str
+    :param appid: Filter by app, given the id.
+    :type appid: str
+    :param count: Number of item listings from the default list to be displayed. The default value is 100.
+    :type count: int
+    :return: Listings of items given the chosen filters (parameters).
+    :rtype: pd.DataFrame
+    """
+
+    exception('type', sortby, str, "Input sortby it not a valid string type.")
+    exception('type', sortdir, str, "Input sortdir it not a valid string type.")
+    exception('type', count, int, "Input count it not a valid integer type.")
+    exception('type', appid, str, "Input appid it not a valid string type.")
+    exception('contain', sortby, ['price', 'quantity', 'name', ''],
+      f"{sortby} is not valid as a sortby type. It should only be '', 'price', 'quantity', or 'name'.")
+    exception('contain', sortdir, ['desc', 'asc'],
+      f"{sortdir} is not valid as a sortby type. It should only be 'desc' or 'asc'.")
+    if appid != '':
+      await self.__validate_appid(appid)
+
+    params = {
+      'sort_column': sortby,
+      'sort_dir': sortdir,
+      'appid': appid,
+      'norender': 1
+    }
+
+    if count == 0:
+      return pd.DataFrame()
+
+    pages = await self.__pagination_helper(endpoints.ALL_LISTINGS_API, params, ['results'], count, parsing.parse_listings)
+
+    return parsing.concat_frames(pages, SCHEMAS['listings'])
+
+
+  async def get_all_appid(self, refresh: bool = False) -> pd.DataFrame:
+    """
+    Get the list of all apps id
+
+    :param refresh: Download the list again instead of using the cached app registry. The default value is False.
+    :type refresh: bool
+    :return: List of all apps id.
+    :rtype: pd.DataFrame
+    """
+
+    if refresh or self.app_registry.is_stale():
+      async with self.__registry_lock:
+        self.app_registry.update(await self.__load_all_appid())
+    return pd.DataFrame(self.app_registry.apps(), columns=['appid', 'name'])
+
+
+  async def get_app_details(self, appid: str) -> pd.DataFrame:
+    """
+    Get the details of an app given its id.
+
+    :param appid: The id of the app.
+    :type appid: str
+    :return: Details of the app with the given id.
+    :rtype: pd.DataFrame
+    """
+
+    exception('type', appid, str, "Input appid it not a valid string type.")
+    if appid != '':
+      await self.__validate_appid(appid)
+
+    params = {
+      'appids': appid
+    }
+
+    return parsing.parse_app_details(await self.__request_helper(endpoints.APPDETAILS_API, params, self.headers, [appid]))
+
+
+  async def get_item_overview(self, item_name: str, appid: str) -> pd.DataFrame:
+    """
+    Get the overview (median price, volume) of an item.
+
+    :param item_name: The precise market name of the item.
+    :type item_name: str
+    :param appid: The id of the app.
+    :type appid: str
+    :return: The overview (median price, volume) of an item.
+    :rtype: pd.DataFrame
+    """
+
+    exception('type', item_name, str, "Input item_name it not a valid string type.")
+    exception('type', appid, str, "Input appid it not a valid string type.")
+    await self.__check_auth(rotated=True)
+    if appid != '':
+      await self.__validate_appid(appid)
+
+    return await self.__item_overview_helper(item_name, appid)
+
+
+  async def __item_overview_helper(self, item_name: str, appid: str) -> pd.DataFrame:
+    """
+    Helper function to request the overview of an item, without validating the inputs.
+
+    :param item_name: The precise market name of the item.
+    :type item_name: str
+    :param appid: The id of the app.
+    :type appid: str
+    :return: The overview (median price, volume) of an item.
+    :rtype: pd.DataFrame
+    """
+
+    params = {
+      'appid': appid,
+      'market_hash_name': item_name
+    }
+
+    return parsing.parse_item_overview(await self.__fetch_rotated(endpoints.ITEM_OVERVIEW_API, params))
+
+
+  async def get_price_history(self, item_name: str, appid: str) -> pd.DataFrame:
+    """
+    Get the price history of an item.
+
+    :param item_name: The precise market name of the item.
+    :type item_name: str
+    :param appid: The id of the app.
+    :type appid: str
+    :return: The price history of an item.
+    :rtype: pd.DataFrame
+    """
+
+    exception('type', item_name, str, "Input item_name it not a valid string type.")
+    exception('type', appid, str, "Input appid it not a valid string type.")
+    await self.__check_auth(rotated=True)
+    if appid != '':
+      await self.__validate_appid(appid)
+
+    return await self.__price_history_helper(item_name, appid)
+
+
+  async def __price_history_helper(self, item_name: str, appid: str) -> pd.DataFrame:
+    """
+    Helper function to request the price history of an item, without validating the inputs.
+
+    :param item_name: The precise market name of the item.
+    :type item_name: str
+    :param appid: The id of the app.
+    :type appid: str
+    :return: The price history of an item.
+    :rtype: pd.DataFrame
+    """
+
+    params = {
+      'appid': appid,
+      'market_hash_name': item_name
+    }
+
+    contentObject = await self.__fetch_rotated(endpoints.PRICEHISTORY_API, params)
+    return parsing.parse_price_history(parsing.extract_indices(contentObject, params, ['prices']))
+
+
+  async def __batch_helper(self, items, fetch, schema: dict = None) -> pd.DataFrame:
+    """
+    Helper function to fetch data for many items concurrently, recording the error of each failed item.
+
+    :param items: Iterable of (item_name, appid) pairs.
+    :type items: iterable
+    :param fetch: Coroutine function taking an item name and an app id and returning a data frame.
+    :type fetch: callable
+    :param schema: Optional schema applied to the combined data frame. The default value is None.
+    :type schema: dict
+    :return: The data of all items in long format, keyed by 'item_name' and 'appid'.
+    :rtype: pd.DataFrame
+    """
+
+    await self.__check_auth(rotated=True)
+
+    async def fetch_item(item):
+      item_name, appid = item
+      try:
+        exception('type', item_name, str, "Input item_name it not a valid string type.")
+        exception('type', appid, str, "Input appid it not a valid string type.")
+        if appid != '':
+          await self.__validate_appid(appid)
+        return item_name, appid, await fetch(item_name, appid), None
+      except Exception as e:
+        return item_name, appid, None, str(e)
+
+    results = await asyncio.gather(*[fetch_item(item) for item in items])
+    return parsing.parse_batch(list(results), schema=schema)
+
+
+  async def get_item_overview_many(self, items) -> pd.DataFrame:
+    """
+    Get the overview (median price, volume) of many items.
+
+    :param items: Iterable of (item_name, appid) pairs.
+    :type items: iterable
+    :return: The overview of all items, keyed by 'item_name' and 'appid', with the error of each failed item in the 'error' column.
+    :rtype: pd.DataFrame
+    """
+
+    return await self.__batch_helper(items, self.__item_overview_helper, SCHEMAS['item_overview'])
+
+
+  async def get_price_history_many(self, items) -> pd.DataFrame:
+    """
+    Get the price history of many items.
+
+    :param items: Iterable of (item_name, appid) pairs.
+    :type items: iterable
+    :return: The price history of all items in long format, keyed by 'item_name' and 'appid', with the error of each failed item in the 'error' column.
+    :rtype: pd.DataFrame
+    """
+
+    return await self.__batch_helper(items, self.__price_history_helper, SCHEMAS['price_history'])
+
+
+  async def get_market_history(self, count: int) -> pd.DataFrame:
+    """
+    Get the market trading history of the user.
+
+    :param count: The number of entries that needs to be extracted from the market history.
+    :type count: int
+    :return: The market trading history of the user.
+    :rtype: pd.DataFrame
+    """
+
+    exception('type', count, int, "Input count it not a valid integer type.")
+    await self.__check_auth()
+
+    if count == 0:
+      return pd.DataFrame()
+
+    pages = await self.__pagination_helper(endpoints.LISTINGSHISTORY_API, {}, ['assets', 'events', 'listings', 'purchases'], count, parsing.parse_market_history)
+
+    return parsing.concat_frames(pages, SCHEMAS['market_history'])
+
+
+  async def get_game_item_inventory(self, steamId: str, appid: str, count: int = None) -> pd.DataFrame:
+    """
+    Get the game items from the inventory of an user, with one row per asset.
+
+    The pages are followed with the last_assetid cursor of the inventory API and the assets are joined to the
+    descriptions of all the pages by (classid, instanceid).
+
+    :param steamId: The Steam ID64 of the user.
+    :type steamId: str
+    :param appid: The id of the app.
+    :type appid: str
+    :param count: The number of entries that needs to be extracted from the inventory. The default value is None (the whole inventory).
+    :type count: int
+    :return: The game items from the inventory of an user.
+    :rtype: pd.DataFrame
+    """
+
+    exception('type', steamId, str, "Input steamId it not a valid string type.")
+    exception('type', appid, str, "Input appid it not a valid string type.")
+    if count is not None:
+      exception('type', count, int, "Input count it not a valid integer type.")
+    await self.__check_auth()
+    if appid != '':
+      await self.__validate_appid(appid)
+
+    if count == 0:
+      return pd.DataFrame()
+
+    api = endpoints.INVENTORY_API + '/' + steamId + '/' + appid + '/2'
+    remaining = count
+    params = {}
+    descriptions = {}
+    pages = []
+    while True:
+      params['count'] = self.inventory_page_size if remaining is None else min(self.inventory_page_size, remaining)
+      contentObject = await self.__fetch_json(api, params, self.headers)
+      assets, pageDescriptions = parsing.extract_indices(contentObject, {}, ['assets', 'descriptions'])
+      pages.append(parsing.parse_inventory(assets, parsing.index_descriptions(pageDescriptions, descriptions)))
+
+      if remaining is not None:
+        remaining -= len(assets)
+        if remaining <= 0:
+          break
+      if not contentObject.get('more_items') or 'last_assetid' not in contentObject:
+        break
+      params['start_assetid'] = contentObject['last_assetid']
+
+    return parsing.concat_frames(pages, SCHEMAS['inventory'])
+
+
+  async def get_game_item_inventory_many(self, steamIds, appid: str) -> pd.DataFrame:
+    """
+    Get the game items from the inventories of many users concurrently, for e.g. to value a portfolio.
+
+    :param steamIds: Iterable of Steam ID64 of the users.
+    :type steamIds: iterable
+    :param appid: The id of the app.
+    :type appid: str
+    :return: The game items of all users in long format, keyed by 'steamid' and 'appid', with the error of each failed user in the 'error' column.
+    :rtype: pd.DataFrame
+    """
+
+    async def fetch_inventory(steamId):
+      try:
+        return steamId, appid, await self.get_game_item_inventory(steamId, appid), None
+      except Exception as e:
+        return steamId, appid, None, str(e)
+
+    results = await asyncio.gather(*[fetch_inventory(steamId) for steamId in steamIds])
+    return parsing.parse_batch(list(results), ('steamid', 'appid'), SCHEMAS['inventory'])
+
+
+  async def get_buysell_orders(self, item_name: str, appid: str, currency: int = 1, country: str = 'US', language: str = 'english') -> pd.DataFrame:
+    """
+    Get the buy/sell orders of an item in the market.
+
+    :param item_name: The precise market name of the item.
+    :type item_name: str
+    :param appid: The id of the app.
+    :type appid: str
+    :param currency: The id of the currency of the prices. The default value is 1 (USD).
+    :type currency: int
+    :param country: The country code of the request. The default value is 'US'.
+    :type country: str
+    :param language: The language of the descriptions. The default value is 'english'.
+    :type language: str
+    :return: The buy/sell orders of an item in the market.
+    :rtype: pd.DataFrame
+    """
+
+    exception('type', item_name, str, "Input item_name it not a valid string type.")
+    exception('type', appid, str, "Input appid it not a valid string type.")
+    await self.__check_auth()
+    if appid != '':
+      await self.__validate_appid(appid)
+
+    params = {
+      'country': country,
+      'language': language,
+      'currency': currency,
+      'item_nameid': await self.__item_nameid_helper(item_name, appid),
+      'two_factor': 0,
+      'norender': 1
+    }
+
+    async def fetch():
+      content = await self.__get(endpoints.ORDERS_HISTOGRAM_API, params, self.headers)
+      exception('network', str(content), 'b\'null\'', "You have reached the request limit of Steam. Please try again later.")
+      return self.decoder.decode(content)
+    contentObject = await self.__coalesced(request_key(endpoints.ORDERS_HISTOGRAM_API, params, self.headers['Cookie']), fetch)
+    return parsing.parse_buysell_orders(contentObject)
+
+
+  async def __item_nameid_helper(self, item_name: str, appid: str) -> str:
+    """
+    Helper function to resolve the item_nameid of an item, from the item_nameid map or from its market listing page.
+
+    :param item_name: The precise market name of the item.
+    :type item_name: str
+    :param appid: The id of the app.
+    :type appid: str
+    :return: The item_nameid of the item.
+    :rtype: str
+    """
+
+    item_nameid = self.item_nameids.get(item_name, appid)
+    if item_nameid is None:
+      url = endpoints.LISTING_PAGE + appid + '/' + quote(item_name)
+
+      async def fetch():
+        content = await self.__get(url, {}, self.headers)
+        return parsing.parse_item_nameid(content.decode('utf-8', errors='replace'))
+      item_nameid = await self.__coalesced(request_key(url, {}, self.headers['Cookie']), fetch)
+      self.item_nameids.add(item_name, appid, item_nameid)
+    return item_nameid
+
+
+  async def get_itemname_id(self, item_name: str, appid: str) -> str:
+    """
+    Get the id of an item given its name.
+
+    :param item_name: The precise market name of the item.
+    :type item_name: str
+    :param appid: The id of the app.
+    :type appid: str
+    :return: The id of an item given its name.
+    :rtype: str
+    """
+
+    exception('type', item_name, str, "Input item_name it not a valid string type.")
+    exception('type', appid, str, "Input appid it not a valid string type.")
+    await self.__check_auth()
+    if appid != '':
+      await self.__validate_appid(appid)
+
+    return await self.__item_nameid_helper(item_name, appid)
@@ -0,0 +1,114 @@
+import hashlib
+import threading
+import time
+
+# Number of seconds the result of a cookie validation is reused.
+AUTH_TTL = 3600
+
+
+class AuthCache:
+
+  def __init__(self, ttl: float = AUTH_TTL):
+    """
+    Initializing the cache of steamLoginSecure validations.
+
+    A cookie is validated with one request on the first authenticated call, and the result is reused by all the
+    clients that share the cache, so that new clients with the same cookie do not make the request again. The
+    cookies are keyed by their hash and are not kept.
+
+    :param ttl: Number of seconds a validation result is reused. The default value is AUTH_TTL (one hour).
+    :type ttl: float
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.ttl = ttl
+    self.__results = {}
+    self.__lock = threading.Lock()
+    self.__validation_lock = threading.Lock()
+
+
+  def __key(self, cookie: str) -> str:
+    """
+    Helper function to get the key of a cookie.
+
+    :param cookie: The Cookie header.
+    :type cookie: str
+    :return: The key of the cookie.
+    :rtype: str
+    """
+
+    return hashlib.sha256(cookie.encode('utf-8')).hexdigest()
+
+
+  def get(self, cookie: str) -> bool:
+    """
+    Get the validation result of a cookie.
+
+    :param cookie: The Cookie header.
+    :type cookie: str
+    :return: Whether the cookie is authorized, or None if it was not validated or the result expired.
+    :rtype: bool
+    """
+
+    with self.__lock:
+      result = self.__results.get(self.__key(cookie))
+    if result is None or time.monotonic() - result[1] >= self.ttl:
+      return None
+    return result[0]
+
+
+  def set(self, cookie: str, authorized: bool):
+    """
+    Store the validation result of a cookie.
+
+    :param cookie: The Cookie header.
+    :type cookie: str
+    :param authorized: Whether the cookie is authorized.
+    :type authorized: bool
+    :return: Nothing.
+    :rtype: None
+    """
+
+    with self.__lock:
+      self.__results[self.__key(cookie)] = (authorized, time.monotonic())
+
+
+  def check(self, cookie: str, validate) -> bool:
+    """
+    Get the validation result of a cookie, validating it if needed. Concurrent checks of the same cookie validate it once.
+
+    :param cookie: The Cookie header.
+    :type cookie: str
+    :param validate: Function taking the Cookie header and returning whether it is authorized.
+    :type validate: callable
+    :return: Whether the cookie is authorized.
+    :rtype: bool
+    """
+
+    authorized = self.get(cookie)
+    if authorized is not None:
+      return authorized
+
+    with self.__validation_lock:
+      authorized = self.get(cookie)
+      if authorized is None:
+        authorized = bool(validate(cookie))
+        self.set(cookie, authorized)
+    return authorized
+
+
+  def clear(self):
+    """
+    Remove all the validation results.
+
+    :return: Nothing.
+    :rtype: None
+    """
+
+    with self.__lock:
+      self.__results.clear()
+
+
+# Cache shared by all the clients of the process that are not given their own.
+SHARED_AUTH_CACHE = AuthCache()
@@ -0,0 +1,333 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+# Number of seconds a response stays fresh, by API path. Responses of other APIs are not cached.
+DEFAULT_TTLS = {
+  '/api/appdetails/': 86400,
+  '/market/pricehistory/': 3600,
+  '/ISteamApps/GetAppList/': 86400
+}
+
+
+class CachedResponse:
+
+  def __init__(self, entry: dict):
+    """
+    Initializing a response served from the cache, with the attributes of requests.Response that are used by the package.
+
+    :param entry: The cache entry.
+    :type entry: dict
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.status_code = entry['status_code']
+    self.content = entry['content']
+    self.headers = {}
+    if entry.get('etag'):
+      self.headers['ETag'] = entry['etag']
+    if entry.get('last_modified'):
+      self.headers['Last-Modified'] = entry['last_modified']
+    self.from_cache = True
+
+
+  @property
+  def text(self) -> str:
+    return self.content.decode('utf-8', errors='replace')
+
+
+class ResponseCache:
+
+  def __init__(self, ttls: dict = None, max_entries: int = 10000):
+    """
+    Initializing the response cache. This class keeps the entries in memory; use SQLiteCache or FileCache to persist them.
+
+    Responses are keyed on the URL, the normalized parameters and the cookie. A response is served from the cache
+    while it is younger than the ttl of its API. Once stale, it is revalidated with If-None-Match/If-Modified-Since
+    when Steam sent an ETag or Last-Modified header.
+
+    :param ttls: Mapping of API paths to the number of seconds their responses stay fresh. The default value is DEFAULT_TTLS.
+    :type ttls: dict
+    :param max_entries: Maximum number of entries, the least recently used ones being evicted first. The default value is 10000.
+    :type max_entries: int
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+    self.max_entries = max_entries
+    self.__entries = OrderedDict()
+    self._lock = threading.Lock()
+
+
+  def ttl(self, url: str) -> float:
+    """
+    Get the ttl of an URL, using the longest matching API path.
+
+    :param url: The requested URL.
+    :type url: str
+    :return: Number of seconds the responses of the URL stay fresh, 0 if they are not cached.
+    :rtype: float
+    """
+
+    path = urlsplit(url).path
+    best = ''
+    for prefix in self.ttls:
+      if path.startswith(prefix) and len(prefix) > len(best):
+        best = prefix
+    return self.ttls.get(best, 0)
+
+
+  def key(self, url: str, params: dict, headers: dict) -> str:
+    """
+    Get the cache key of a request.
+
+    :param url: The requested URL.
+    :type url: str
+    :param params: The parameters of the request.
+    :type params: dict
+    :param headers: The headers of the request.
+    :type headers: dict
+    :return: The cache key.
+    :rtype: str
+    """
+
+    normalized = json.dumps([url, sorted((str(k), str(v)) for k, v in (params or {}).items()), (headers or {}).get('Cookie', '')])
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+  def is_fresh(self, entry: dict, url: str) -> bool:
+    """
+    Check whether a cache entry can be served without revalidation.
+
+    :param entry: The cache entry.
+    :type entry: dict
+    :param url: The requested URL.
+    :type url: str
+    :return: Whether the entry is fresh.
+    :rtype: bool
+    """
+
+    return time.time() - entry['stored_at'] < self.ttl(url)
+
+
+  def is_cacheable(self, response) -> bool:
+    """
+    Check whether a response can be stored. Empty and failed Steam answers are never stored.
+
+    :param response: The response of the request.
+    :type response: requests.Response
+    :return: Whether the response can be stored.
+    :rtype: bool
+    """
+
+    return response.status_code == 200 and response.content.strip() not in (b'', b'null', b'[]')
+
+
+  def entry(self, response) -> dict:
+    """
+    Build a cache entry from a response.
+
+    :param response: The response of the request.
+    :type response: requests.Response
+    :return: The cache entry.
+    :rtype: dict
+    """
+
+    return {
+      'stored_at': time.time(),
+      'status_code': response.status_code,
+      'etag': response.headers.get('ETag'),
+      'last_modified': response.headers.get('Last-Modified'),
+      'content': response.content
+    }
+
+
+  def load(self, key: str) -> dict:
+    """
+    Get a cache entry and mark it as recently used.
+
+    :param key: The cache key.
+    :type key: str
+    :return: The cache entry, or None if there is no entry for the key.
+    :rtype: dict
+    """
+
+    with self._lock:
+      if key not in self.__entries:
+        return None
+      self.__entries.move_to_end(key)
+      return self.__entries[key]
+
+
+  def store(self, key: str, entry: dict):
+    """
+    Store a cache entry, evicting the least recently used entries above max_entries.
+
+    :param key: The cache key.
+    :type key: str
+    :param entry: The cache entry.
+    :type entry: dict
+    :return: Nothing.
+    :rtype: None
+    """
+
+    with self._lock:
+      self.__entries[key] = entry
+      self.__entries.move_to_end(key)
+      while len(self.__entries) > self.max_entries:
+        self.__entries.popitem(last=False)
+
+
+  def clear(self):
+    """
+    Remove all the cache entries.
+
+    :return: Nothing.
+    :rtype: None
+    """
+
+    with self._lock:
+      self.__entries.clear()
+
+
+class SQLiteCache(ResponseCache):
+
+  def __init__(self, path: str, ttls: dict = None, max_entries: int = 10000):
+    """
+    Initializing a response cache persisted in a SQLite database.
+
+    :param path: Path to the SQLite database file.
+    :type path: str
+    :param ttls: Mapping of API paths to the number of seconds their responses stay fresh. The default value is DEFAULT_TTLS.
+    :type ttls: dict
+    :param max_entries: Maximum number of entries, the least recently used ones being evicted first. The default value is 10000.
+    :type max_entries: int
+    :return: Nothing.
+    :rtype: None
+    """
+
+    super().__init__(ttls, max_entries)
+    self.path = path
+    self.__connection = sqlite3.connect(path, check_same_thread=False)
+    with self.__connection:
+      self.__connection.execute(
+        'CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, stored_at REAL, accessed_at REAL, '
+        'status_code INTEGER, etag TEXT, last_modified TEXT, content BLOB)')
+      self.__connection.execute('CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)')
+
+
+  def load(self, key: str) -> dict:
+    with self._lock:
+      row = self.__connection.execute(
+        'SELECT stored_at, status_code, etag, last_modified, content FROM responses WHERE key = ?', (key,)).fetchone()
+      if row is None:
+        return None
+      with self.__connection:
+        self.__connection.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (time.time(), key))
+    return {'stored_at': row[0], 'status_code': row[1], 'etag': row[2], 'last_modified': row[3], 'content': bytes(row[4])}
+
+
+  def store(self, key: str, entry: dict):
+    with self._lock, self.__connection:
+      self.__connection.execute(
+        'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+        (key, entry['stored_at'], time.time(), entry['status_code'], entry['etag'], entry['last_modified'], entry['content']))
+      self.__connection.execute(
+        'DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+        (self.max_entries,))
+
+
+  def clear(self):
+    with self._lock, self.__connection:
+      self.__connection.execute('DELETE FROM responses')
+
+
+class FileCache(ResponseCache):
+
+  def __init__(self, directory: str, ttls: dict = None, max_entries: int = 10000):
+    """
+    Initializing a response cache persisted in a directory, with one content file and one metadata file per entry.
+
+    :param directory: Path to the cache directory. It is created if it does not exist.
+    :type directory: str
+    :param ttls: Mapping of API paths to the number of seconds their responses stay fresh. The default value is DEFAULT_TTLS.
+    :type ttls: dict
+    :param max_entries: Maximum number of entries, the least recently used ones being evicted first. The default value is 10000.
+    :type max_entries: int
+    :return: Nothing.
+    :rtype: None
+    """
+
+    super().__init__(ttls, max_entries)
+    self.directory = directory
+    os.makedirs(directory, exist_ok=True)
+
+    metadataFiles = [name for name in os.listdir(directory) if name.endswith('.json')]
+    metadataFiles.sort(key=lambda name: os.path.getmtime(os.path.join(directory, name)))
+    self.__keys = OrderedDict((name[:-len('.json')], None) for name in metadataFiles)
+
+
+  def __paths(self, key: str) -> tuple:
+    """
+    Helper function to get the metadata and content file paths of an entry.
+
+    :param key: The cache key.
+    :type key: str
+    :return: The (metadata path, content path) of the entry.
+    :rtype: tuple
+    """
+
+    return os.path.join(self.directory, key + '.json'), os.path.join(self.directory, key + '.bin')
+
+
+  def load(self, key: str) -> dict:
+    metadataPath, contentPath = self.__paths(key)
+    with self._lock:
+      if key not in self.__keys:
+        return None
+      try:
+        with open(metadataPath, 'r', encoding='utf-8') as f:
+          entry = json.load(f)
+        with open(contentPath, 'rb') as f:
+          entry['content'] = f.read()
+      except (OSError, ValueError):
+        del self.__keys[key]
+        return None
+      self.__keys.move_to_end(key)
+      os.utime(metadataPath)
+    return entry
+
+
+  def store(self, key: str, entry: dict):
+    metadataPath, contentPath = self.__paths(key)
+    metadata = {name: value for name, value in entry.items() if name != 'content'}
+    with self._lock:
+      with open(contentPath + '.tmp', 'wb') as f:
+        f.write(entry['content'])
+      os.replace(contentPath + '.tmp', contentPath)
+      with open(metadataPath + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(metadata, f)
+      os.replace(metadataPath + '.tmp', metadataPath)
+      self.__keys[key] = None
+      self.__keys.move_to_end(key)
+      while len(self.__keys) > self.max_entries:
+        evicted, _ = self.__keys.popitem(last=False)
+        for path in self.__paths(evicted):
+          if os.path.exists(path):
+            os.remove(path)
+
+
+  def clear(self):
+    with self._lock:
+      for key in list(self.__keys):
+        for path in self.__paths(key):
+          if os.path.exists(path):
+            os.remove(path)
+      self.__keys.clear()
@@ -0,0 +1,328 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+import pandas as pd
+
+# Fields of the app details that change without the app changing, left out of the content hash of the details.
+HASH_IGNORED = {'price_overview', 'recommendations'}
+
+# Normalized columns of the details table, after the appid.
+DETAIL_COLUMNS = ['success', 'type', 'name', 'is_free', 'required_age', 'release_date', 'coming_soon', 'developers',
+                  'publishers', 'genres', 'categories', 'platforms', 'metacritic', 'recommendations', 'hash', 'fetched']
+
+# Columns of the prices table, after the appid.
+PRICE_COLUMNS = ['currency', 'initial', 'final', 'discount_percent', 'checked']
+
+# Explicit dtypes of the catalog data frame.
+CATALOG_SCHEMA = {
+  'appid': 'int32',
+  'type': 'category',
+  'is_free': 'boolean',
+  'required_age': 'Int16',
+  'coming_soon': 'boolean',
+  'platforms': 'category',
+  'metacritic': 'Int16',
+  'recommendations': 'Int32',
+  'currency': 'category',
+  'initial': 'Int32',
+  'final': 'Int32',
+  'discount_percent': 'Int16'
+}
+
+
+def content_hash(data: dict) -> str:
+  """
+  Get the hash of the details of an app, without the fields that change on their own (HASH_IGNORED).
+
+  :param data: The 'data' of an appdetails entry.
+  :type data: dict
+  :return: The first 16 hexadecimal digits of the SHA-256 of the canonical JSON of the details.
+  :rtype: str
+  """
+
+  kept = {key: value for key, value in data.items() if key not in HASH_IGNORED}
+  return hashlib.sha256(json.dumps(kept, sort_keys=True, separators=(',', ':')).encode('utf-8')).hexdigest()[:16]
+
+
+def _join(values: list, key: str = None) -> str:
+  """
+  Helper function to join the names of a list field of the app details, for e.g. its genres.
+
+  :param values: The list, of strings or of dictionaries.
+  :type values: list
+  :param key: The key of the name in the dictionaries. The default value is None (a list of strings).
+  :type key: str
+  :return: The names separated by '|', or None if the list is missing.
+  :rtype: str
+  """
+
+  if not values:
+    return None
+  return '|'.join(str(value.get(key, '')) if key is not None else str(value) for value in values)
+
+
+def detail_record(appid: int, entry: dict, fetched: float) -> tuple:
+  """
+  Normalize an entry of an appdetails response into a row of the details table.
+
+  :param appid: The id of the app.
+  :type appid: int
+  :param entry: The entry of the app, with 'success' and 'data'.
+  :type entry: dict
+  :param fetched: The time (in seconds since the epoch) at which the entry was fetched.
+  :type fetched: float
+  :return: The (appid, DETAIL_COLUMNS..., compressed JSON data) row.
+  :rtype: tuple
+  """
+
+  data = entry.get('data') if entry.get('success') else None
+  if not isinstance(data, dict):
+    return (appid, 0) + (None,) * (len(DETAIL_COLUMNS) - 2) + (int(fetched), None)
+
+  platforms = data.get('platforms') or {}
+  releaseDate = data.get('release_date') or {}
+  return (
+    appid, 1, data.get('type'), data.get('name'), int(bool(data.get('is_free'))),
+    int(data.get('required_age') or 0) if str(data.get('required_age', '0')).isdigit() else None,
+    releaseDate.get('date'), int(bool(releaseDate.get('coming_soon'))),
+    _join(data.get('developers')), _join(data.get('publishers')),
+    _join(data.get('genres'), 'description'), _join(data.get('categories'), 'description'),
+    '|'.join(name for name in ['windows', 'mac', 'linux'] if platforms.get(name)) or None,
+    (data.get('metacritic') or {}).get('score'), (data.get('recommendations') or {}).get('total'),
+    content_hash(data), int(fetched),
+    zlib.compress(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+  )
+
+
+def price_record(appid: int, entry: dict, checked: float) -> tuple:
+  """
+  Normalize an entry of an appdetails response filtered on price_overview into a row of the prices table.
+
+  :param appid: The id of the app.
+  :type appid: int
+  :param entry: The entry of the app, with 'success' and 'data'. Steam returns an empty list as data for the apps without a price.
+  :type entry: dict
+  :param checked: The time (in seconds since the epoch) at which the price was fetched.
+  :type checked: float
+  :return: The (appid, PRICE_COLUMNS...) row, with prices in cents.
+  :rtype: tuple
+  """
+
+  data = entry.get('data') if entry.get('success') else None
+  price = data.get('price_overview') if isinstance(data, dict) else None
+  if price is None:
+    return (appid, None, None, None, None, int(checked))
+  return (appid, price.get('currency'), price.get('initial'), price.get('final'), price.get('discount_percent'), int(checked))
+
+
+class StoreCatalog:
+
+  def __init__(self, path: str):
+    """
+    Initializing a local catalog of the Steam store, persisted in a SQLite database.
+
+    The catalog keeps the last app list (with the time each app was first seen, renamed or removed), the normalized
+    details of each app with a hash of their content and their compressed JSON, and the current price of each app.
+    Request.sync_store_catalog() diffs a new app list against it, so that a daily refresh only fetches the details
+    of the new, renamed or stale apps, and checks the prices in batches.
+
+    :param path: Path to the SQLite database file.
+    :type path: str
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.path = path
+    self.__connection = sqlite3.connect(path, check_same_thread=False)
+    self.__lock = threading.Lock()
+    with self.__connection:
+      self.__connection.execute(
+        'CREATE TABLE IF NOT EXISTS apps (appid INTEGER PRIMARY KEY, name TEXT, first_seen INTEGER, changed INTEGER, removed INTEGER)')
+      self.__connection.execute(
+        'CREATE TABLE IF NOT EXISTS details (appid INTEGER PRIMARY KEY, success INTEGER, type TEXT, name TEXT, is_free INTEGER, '
+        'required_age INTEGER, release_date TEXT, coming_soon INTEGER, developers TEXT, publishers TEXT, genres TEXT, '
+        'categories TEXT, platforms TEXT, metacritic INTEGER, recommendations INTEGER, hash TEXT, fetched INTEGER, data BLOB)')
+      self.__connection.execute(
+        'CREATE TABLE IF NOT EXISTS prices (appid INTEGER PRIMARY KEY, currency TEXT, initial INTEGER, final INTEGER, '
+        'discount_percent INTEGER, checked INTEGER)')
+
+
+  def update_apps(self, apps: list, now: float = None) -> dict:
+    """
+    Diff an app list against the stored one and store it.
+
+    :param apps: List of apps as dictionaries with 'appid' and 'name', for e.g. of the GetAppList API.
+    :type apps: list
+    :param now: The time (in seconds since the epoch) of the app list. The default value is None (now).
+    :type now: float
+    :return: The 'new', 'renamed' (including the apps back in the list) and 'removed' apps, as lists of (appid, name).
+    :rtype: dict
+    """
+
+    now = int(time.time() if now is None else now)
+    names = {int(app['appid']): app.get('name', '') for app in apps}
+    with self.__lock, self.__connection:
+      stored = {appid: (name, removed) for appid, name, removed in self.__connection.execute('SELECT appid, name, removed FROM apps')}
+
+      new = [(appid, name) for appid, name in names.items() if appid not in stored]
+      renamed = [(appid, name) for appid, name in names.items()
+                 if appid in stored and (stored[appid][0] != name or stored[appid][1] is not None)]
+      removed = [(appid, name) for appid, (name, isRemoved) in stored.items() if appid not in names and isRemoved is None]
+
+      self.__connection.executemany('INSERT INTO apps VALUES (?, ?, ?, ?, NULL)', [(appid, name, now, now) for appid, name in new])
+      self.__connection.executemany('UPDATE apps SET name = ?, changed = ?, removed = NULL WHERE appid = ?',
+                                    [(name, now, appid) for appid, name in renamed])
+      # The times are in whole seconds, so the details of the renamed apps are marked stale instead of relying on
+      # them being older than the rename.
+      self.__connection.executemany('UPDATE details SET fetched = NULL WHERE appid = ?', [(appid,) for appid, _ in renamed])
+      self.__connection.executemany('UPDATE apps SET removed = ? WHERE appid = ?', [(now, appid) for appid, _ in removed])
+    return {'new': new, 'renamed': renamed, 'removed': removed}
+
+
+  def pending(self, max_age: float = None, now: float = None) -> list:
+    """
+    Get the apps whose details need to be fetched: the apps without details, the apps that were renamed or came back
+    since their details were fetched, and optionally the apps whose details are older than max_age.
+
+    :param max_age: Optional age in seconds above which the details are fetched again. The default value is None.
+    :type max_age: float
+    :param now: The current time (in seconds since the epoch). The default value is None (now).
+    :type now: float
+    :return: The app ids, in increasing order.
+    :rtype: list
+    """
+
+    now = time.time() if now is None else now
+    before = int(now - max_age) if max_age is not None else -1
+    with self.__lock:
+      rows = self.__connection.execute(
+        'SELECT apps.appid FROM apps LEFT JOIN details ON apps.appid = details.appid WHERE apps.removed IS NULL AND '
+        '(details.appid IS NULL OR details.fetched IS NULL OR details.fetched < apps.changed OR details.fetched < ?) '
+        'ORDER BY apps.appid', (before,)).fetchall()
+    return [row[0] for row in rows]
+
+
+  def priced(self) -> list:
+    """
+    Get the apps whose price is checked: the apps in the store that are not free.
+
+    :return: The app ids, in increasing order.
+    :rtype: list
+    """
+
+    with self.__lock:
+      rows = self.__connection.execute(
+        'SELECT details.appid FROM details JOIN apps ON apps.appid = details.appid WHERE apps.removed IS NULL AND '
+        'details.success = 1 AND details.is_free = 0 ORDER BY details.appid').fetchall()
+    return [row[0] for row in rows]
+
+
+  def store_details(self, records: list) -> list:
+    """
+    Store normalized details, replacing the previous details of the apps.
+
+    :param records: Rows of detail_record().
+    :type records: list
+    :return: The app ids whose details already existed and changed, according to their content hash.
+    :rtype: list
+    """
+
+    if len(records) == 0:
+      return []
+    appids = [record[0] for record in records]
+    with self.__lock, self.__connection:
+      hashes = {}
+      for i in range(0, len(appids), 500):
+        chunk = appids[i:i + 500]
+        hashes.update(self.__connection.execute(
+          'SELECT appid, hash FROM details WHERE appid IN ({})'.format(','.join('?' * len(chunk))), chunk).fetchall())
+      hashIndex = 1 + DETAIL_COLUMNS.index('hash')
+      changed = [record[0] for record in records if record[0] in hashes and hashes[record[0]] != record[hashIndex]]
+      self.__connection.executemany(
+        'INSERT OR REPLACE INTO details VALUES ({})'.format(','.join('?' * (len(DETAIL_COLUMNS) + 2))), records)
+    return changed
+
+
+  def store_prices(self, records: list) -> list:
+    """
+    Store prices, replacing the previous prices of the apps.
+
+    :param records: Rows of price_record().
+    :type records: list
+    :return: The app ids whose price or discount changed since it was last checked.
+    :rtype: list
+    """
+
+    if len(records) == 0:
+      return []
+    appids = [record[0] for record in records]
+    with self.__lock, self.__connection:
+      previous = {}
+      for i in range(0, len(appids), 500):
+        chunk = appids[i:i + 500]
+        for appid, *values in self.__connection.execute(
+          'SELECT appid, currency, initial, final, discount_percent FROM prices WHERE appid IN ({})'.format(','.join('?' * len(chunk))), chunk):
+          previous[appid] = tuple(values)
+      changed = [record[0] for record in records if record[0] in previous and previous[record[0]] != tuple(record[1:5])]
+      self.__connection.executemany('INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?, ?, ?)', records)
+    return changed
+
+
+  def get_catalog(self, include_removed: bool = False) -> pd.DataFrame:
+    """
+    Get the catalog as one compact data frame, with one row per app.
+
+    :param include_removed: Whether to include the apps that are no longer in the app list. The default value is False.
+    :type include_removed: bool
+    :return: The app id, name, first seen, changed and removed times of each app, with its normalized details and its price in cents.
+    :rtype: pd.DataFrame
+    """
+
+    detailColumns = [column for column in DETAIL_COLUMNS if column not in ('success', 'name')]
+    query = ('SELECT apps.appid, apps.name, apps.first_seen, apps.changed, apps.removed, {}, {} FROM apps '
+             'LEFT JOIN details ON apps.appid = details.appid LEFT JOIN prices ON apps.appid = prices.appid {} ORDER BY apps.appid').format(
+               ', '.join('details.' + column for column in detailColumns),
+               ', '.join('prices.' + column for column in PRICE_COLUMNS),
+               '' if include_removed else 'WHERE apps.removed IS NULL')
+    with self.__lock:
+      df = pd.read_sql_query(query, self.__connection)
+    for column in ['first_seen', 'changed', 'removed', 'fetched', 'checked']:
+      # Through Int64, so that the NULL times are converted to NaT without casting NaN to an integer.
+      df[column] = pd.to_datetime(df[column].astype('Int64'), unit='s')
+    return df.astype(CATALOG_SCHEMA)
+
+
+  def get_details(self, appid: int) -> dict:
+    """
+    Get the stored details of an app, exactly as Steam returned them.
+
+    :param appid: The id of the app.
+    :type appid: int
+    :return: The 'data' of the appdetails entry of the app, or None if it has no details.
+    :rtype: dict
+    """
+
+    with self.__lock:
+      row = self.__connection.execute('SELECT data FROM details WHERE appid = ?', (int(appid),)).fetchone()
+    if row is None or row[0] is None:
+      return None
+    return json.loads(zlib.decompress(row[0]))
+
+
+  def close(self):
+    """
+    Close the database connection.
+
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.__connection.close()
+
+
+  def __len__(self) -> int:
+    with self.__lock:
+      return self.__connection.execute('SELECT COUNT(*) FROM apps WHERE removed IS NULL').fetchone()[0]
@@ -0,0 +1,563 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from steamcrawl import parsing
+from steamcrawl.exceptions import exception
+from steamcrawl.schemas import SCHEMAS
+
+# Kinds of crawl tasks and the schema of their outputs.
+TASK_KINDS = {
+  'listings': SCHEMAS['listings'],
+  'price_history': SCHEMAS['price_history']
+}
+
+
+def task_id(kind: str, params: dict) -> str:
+  """
+  Get the id of a crawl task. The same task always has the same id, so that adding it again does nothing.
+
+  :param kind: The kind of the task. This includes 'listings' and 'price_history'.
+  :type kind: str
+  :param params: The parameters of the task.
+  :type params: dict
+  :return: The id of the task.
+  :rtype: str
+  """
+
+  if kind == 'listings':
+    return 'listings/{}-{:09d}'.format(params.get('appid') or 'all', params['start'])
+  digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()[:20]
+  return kind + '/' + digest
+
+
+class TaskQueue:
+
+  def __init__(self):
+    """
+    Initializing the work queue of a crawl. This class keeps the tasks in memory, so that it can only be shared by the
+    threads of one process; use SQLiteQueue to share the tasks between processes and to resume a crawl.
+
+    A task is leased by a worker for a number of seconds. It is removed when the worker acknowledges it, and is given
+    to another worker when the lease expires, so that the tasks of a worker that stopped are not lost.
+
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.__tasks = {}
+    self.__pending = deque()
+    self.__leased = {}
+    self._lock = threading.Lock()
+
+
+  def put(self, tasks: list) -> int:
+    """
+    Add tasks to the queue. Tasks whose id is already in the queue are skipped, including the finished ones.
+
+    :param tasks: List of dictionaries with the 'id', 'kind' and 'params' of each task.
+    :type tasks: list
+    :return: Number of tasks added.
+    :rtype: int
+    """
+
+    added = 0
+    with self._lock:
+      for task in tasks:
+        if task['id'] in self.__tasks:
+          continue
+        self.__tasks[task['id']] = {'task': task, 'status': 'pending', 'attempts': 0, 'error': None}
+        self.__pending.append(task['id'])
+        added += 1
+    return added
+
+
+  def lease(self, seconds: float, max_attempts: int = None) -> dict:
+    """
+    Take the next pending task, or a leased task whose lease expired.
+
+    A task whose lease expired after max_attempts attempts is marked as failed instead, so that a task that stops
+    its workers is not retried forever.
+
+    :param seconds: Number of seconds the task is leased.
+    :type seconds: float
+    :param max_attempts: Maximum number of attempts of a task. The default value is None (no maximum).
+    :type max_attempts: int
+    :return: The task, or None if no task is available.
+    :rtype: dict
+    """
+
+    with self._lock:
+      now = time.time()
+      for id in [id for id, leaseUntil in self.__leased.items() if leaseUntil < now]:
+        del self.__leased[id]
+        state = self.__tasks[id]
+        if max_attempts is not None and state['attempts'] >= max_attempts:
+          state['status'] = 'failed'
+          state['error'] = f"The lease expired after {state['attempts']} attempts."
+        else:
+          state['status'] = 'pending'
+          self.__pending.append(id)
+
+      while len(self.__pending) > 0:
+        state = self.__tasks[self.__pending.popleft()]
+        if state['status'] != 'pending':
+          continue
+        state['status'] = 'leased'
+        state['attempts'] += 1
+        self.__leased[state['task']['id']] = now + seconds
+        return dict(state['task'], attempts=state['attempts'])
+    return None
+
+
+  def ack(self, id: str):
+    """
+    Mark a task as done.
+
+    :param id: The id of the task.
+    :type id: str
+    :return: Nothing.
+    :rtype: None
+    """
+
+    with self._lock:
+      self.__leased.pop(id, None)
+      self.__tasks[id]['status'] = 'done'
+
+
+  def fail(self, id: str, error: str, max_attempts: int):
+    """
+    Record the failure of a task, putting it back in the queue until it reached max_attempts attempts.
+
+    :param id: The id of the task.
+    :type id: str
+    :param error: The error message.
+    :type error: str
+    :param max_attempts: Maximum number of attempts of a task.
+    :type max_attempts: int
+    :return: Nothing.
+    :rtype: None
+    """
+
+    with self._lock:
+      self.__leased.pop(id, None)
+      state = self.__tasks[id]
+      state['error'] = error
+      if state['attempts'] >= max_attempts:
+        state['status'] = 'failed'
+      else:
+        state['status'] = 'pending'
+        self.__pending.append(id)
+
+
+  def counts(self) -> dict:
+    """
+    Get the number of tasks by status.
+
+    :return: Mapping of 'pending', 'leased', 'done' and 'failed' to the number of tasks.
+    :rtype: dict
+    """
+
+    counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+    with self._lock:
+      for state in self.__tasks.values():
+        counts[state['status']] += 1
+    return counts
+
+
+  def failures(self) -> list:
+    """
+    Get the tasks that failed max_attempts times.
+
+    :return: List of (task id, error message).
+    :rtype: list
+    """
+
+    with self._lock:
+      return [(id, state['error']) for id, state in self.__tasks.items() if state['status'] == 'failed']
+
+
+class SQLiteQueue(TaskQueue):
+
+  def __init__(self, path: str, timeout: float = 60.0):
+    """
+    Initializing a work queue persisted in a SQLite database, which can be shared by the worker processes of a machine
+    or of several machines with a shared file system. A crawl that stopped resumes from the tasks left in the database.
+
+    :param path: Path to the SQLite database file.
+    :type path: str
+    :param timeout: Number of seconds a worker waits for the database to be unlocked by another process. The default value is 60.0.
+    :type timeout: float
+    :return: Nothing.
+    :rtype: None
+    """
+
+    super().__init__()
+    self.path = path
+    self.timeout = timeout
+    self.__connect()
+
+
+  def __connect(self):
+    """
+    Helper function to open the database and create its table.
+
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.__connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+    self.__connection.execute('PRAGMA journal_mode=WAL')
+    self.__connection.execute(
+      'CREATE TABLE IF NOT EXISTS tasks (id TEXT PRIMARY KEY, kind TEXT, params TEXT, status TEXT, '
+      'lease_until REAL, attempts INTEGER, error TEXT)')
+    self.__connection.execute('CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_until)')
+
+
+  def __getstate__(self) -> dict:
+    return {'path': self.path, 'timeout': self.timeout}
+
+
+  def __setstate__(self, state: dict):
+    self.__init__(state['path'], state['timeout'])
+
+
+  def put(self, tasks: list) -> int:
+    rows = [(task['id'], task['kind'], json.dumps(task['params'])) for task in tasks]
+    with self._lock:
+      self.__connection.execute('BEGIN IMMEDIATE')
+      try:
+        before = self.__connection.total_changes
+        self.__connection.executemany(
+          "INSERT OR IGNORE INTO tasks VALUES (?, ?, ?, 'pending', 0, 0, NULL)", rows)
+        added = self.__connection.total_changes - before
+        self.__connection.execute('COMMIT')
+      except BaseException:
+        self.__connection.execute('ROLLBACK')
+        raise
+    return added
+
+
+  def lease(self, seconds: float, max_attempts: int = None) -> dict:
+    with self._lock:
+      now = time.time()
+      self.__connection.execute('BEGIN IMMEDIATE')
+      try:
+        if max_attempts is not None:
+          self.__connection.execute(
+            "UPDATE tasks SET status = 'failed', error = 'The lease expired after ' || attempts || ' attempts.' "
+            "WHERE status = 'leased' AND lease_until < ? AND attempts >= ?", (now, max_attempts))
+        row = self.__connection.execute(
+          "SELECT id, kind, params, attempts FROM tasks WHERE status = 'pending' "
+          "OR (status = 'leased' AND lease_until < ?) ORDER BY rowid LIMIT 1", (now,)).fetchone()
+        if row is not None:
+          self.__connection.execute(
+            "UPDATE tasks SET status = 'leased', lease_until = ?, attempts = attempts + 1 WHERE id = ?", (now + seconds, row[0]))
+        self.__connection.execute('COMMIT')
+      except BaseException:
+        self.__connection.execute('ROLLBACK')
+        raise
+    if row is None:
+      return None
+    return {'id': row[0], 'kind': row[1], 'params': json.loads(row[2]), 'attempts': row[3] + 1}
+
+
+  def ack(self, id: str):
+    with self._lock:
+      self.__connection.execute("UPDATE tasks SET status = 'done' WHERE id = ?", (id,))
+
+
+  def fail(self, id: str, error: str, max_attempts: int):
+    with self._lock:
+      self.__connection.execute(
+        "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, error = ? WHERE id = ?",
+        (max_attempts, error, id))
+
+
+  def counts(self) -> dict:
+    counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+    with self._lock:
+      for status, number in self.__connection.execute('SELECT status, COUNT(*) FROM tasks GROUP BY status'):
+        counts[status] = number
+    return counts
+
+
+  def failures(self) -> list:
+    with self._lock:
+      return self.__connection.execute("SELECT id, error FROM tasks WHERE status = 'failed' ORDER BY rowid").fetchall()
+
+
+  def close(self):
+    """
+    Close the database.
+
+    :return: Nothing.
+    :rtype: None
+    """
+
+    with self._lock:
+      self.__connection.close()
+
+
+def _work(crawler, max_tasks: int) -> int:
+  """
+  Helper function to run the worker of a crawl in a worker process.
+
+  :param crawler: The crawl.
+  :type crawler: Crawler
+  :param max_tasks: Maximum number of tasks run by the worker, or None to run until the queue is empty.
+  :type max_tasks: int
+  :return: Number of tasks run by the worker.
+  :rtype: int
+  """
+
+  return crawler.work(max_tasks)
+
+
+class Crawler:
+
+  def __init__(self, request, path: str, queue: TaskQueue = None, page_size: int = 100, price_history: bool = True,
+               lease_seconds: float = 300.0, max_attempts: int = 3, poll_interval: float = 1.0):
+    """
+    Initializing a crawl of the community market, split into idempotent tasks on a work queue.
+
+    The crawl starts with one task per page of listings. Each listings task adds one price history task per item of
+    its page. The output of each task is saved to its own checkpoint file under path before the task is acknowledged,
+    so that a task run again after a restart reuses its checkpoint instead of making the request again. merge()
+    combines the checkpoints of a kind of task into one data frame.
+
+    :param request: The value of the steamLoginSecure cookie, or a function without arguments returning a Request, for e.g. functools.partial(Request, 'cookie', credentials=pool). Each worker creates its own Request, and the function must be picklable to run worker processes.
+    :type request: str
+    :param path: Path to the directory of the checkpoints. It is created if it does not exist.
+    :type path: str
+    :param queue: The work queue. The default value is a SQLiteQueue in path/queue.db.
+    :type queue: TaskQueue
+    :param page_size: Number of listings per listings task. The default value is 100.
+    :type page_size: int
+    :param price_history: Whether to add the price history tasks of the items found by the listings tasks. The default value is True.
+    :type price_history: bool
+    :param lease_seconds: Number of seconds a task is leased by a worker before it is given to another one. The default value is 300.0.
+    :type lease_seconds: float
+    :param max_attempts: Maximum number of attempts of a task before it is marked as failed. The default value is 3.
+    :type max_attempts: int
+    :param poll_interval: Number of seconds an idle worker waits for the tasks leased by other workers to add new ones. The default value is 1.0.
+    :type poll_interval: float
+    :return: Nothing.
+    :rtype: None
+    """
+
+    if not callable(request):
+      exception('type', request, str, "Input steamLoginSecure it not a valid string type.")
+    exception('type', path, str, "Input path it not a valid string type.")
+
+    self.request = request
+    self.path = path
+    os.makedirs(path, exist_ok=True)
+    self.queue = queue if queue is not None else SQLiteQueue(os.path.join(path, 'queue.db'))
+    self.page_size = page_size
+    self.price_history = price_history
+    self.lease_seconds = lease_seconds
+    self.max_attempts = max_attempts
+    self.poll_interval = poll_interval
+    self.__local = threading.local()
+
+
+  def __getstate__(self) -> dict:
+    state = dict(self.__dict__)
+    del state['_Crawler__local']
+    return state
+
+
+  def __setstate__(self, state: dict):
+    self.__dict__.update(state)
+    self.__local = threading.local()
+
+
+  def __get_request(self):
+    """
+    Helper function to get the Request of the current worker thread, creating it on first use.
+
+    :return: The Request of the worker.
+    :rtype: Request
+    """
+
+    if getattr(self.__local, 'request', None) is None:
+      if callable(self.request):
+        self.__local.request = self.request()
+      else:
+        from steamcrawl.request import Request
+        self.__local.request = Request(self.request)
+    return self.__local.request
+
+
+  def seed(self, appid: str = '', count: int = None) -> int:
+    """
+    Add the listings tasks of the crawl to the queue. Seeding a crawl again only adds the pages that are new.
+
+    :param appid: Crawl the listings of a specific app, given the id. The default value is '' (all the apps).
+    :type appid: str
+    :param count: Number of listings to crawl. The default value is None (all the listings, counted with one request).
+    :type count: int
+    :return: Number of tasks added.
+    :rtype: int
+    """
+
+    exception('type', appid, str, "Input appid it not a valid string type.")
+    if count is None:
+      count = self.__get_request().get_listings_count(appid)
+    exception('type', count, int, "Input count it not a valid integer type.")
+
+    tasks = []
+    for start in range(0, count, self.page_size):
+      params = {'appid': appid, 'start': start, 'count': min(self.page_size, count - start)}
+      tasks.append({'id': task_id('listings', params), 'kind': 'listings', 'params': params})
+    return self.queue.put(tasks)
+
+
+  def __checkpoint_path(self, id: str) -> str:
+    """
+    Helper function to get the checkpoint file of a task.
+
+    :param id: The id of the task.
+    :type id: str
+    :return: The path of the checkpoint file.
+    :rtype: str
+    """
+
+    return os.path.join(self.path, id + '.pkl')
+
+
+  def __run_task(self, task: dict):
+    """
+    Helper function to run a task, reusing its checkpoint if it has one, and to add the tasks it finds.
+
+    :param task: The task.
+    :type task: dict
+    :return: Nothing.
+    :rtype: None
+    """
+
+    checkpoint = self.__checkpoint_path(task['id'])
+    params = task['params']
+
+    if os.path.exists(checkpoint):
+      df = pd.read_pickle(checkpoint)
+    else:
+      request = self.__get_request()
+      if task['kind'] == 'listings':
+        # The market may have shrunk since the crawl was seeded, so the pages past its end are empty.
+        pages = list(request.iter_app_listings(params['appid'], count=params['count'], start=params['start'], clamp=True))
+        df = parsing.concat_frames(pages, SCHEMAS['listings']) if len(pages) > 0 else pd.DataFrame()
+      else:
+        df = request.get_price_history(params['item_name'], params['appid'])
+        df.insert(0, 'item_name', params['item_name'])
+        df.insert(1, 'appid', params['appid'])
+
+      os.makedirs(os.path.dirname(checkpoint), exist_ok=True)
+      df.to_pickle(checkpoint + '.tmp')
+      os.replace(checkpoint + '.tmp', checkpoint)
+
+    if task['kind'] == 'listings' and self.price_history and len(df) > 0:
+      tasks = []
+      for item_name, appid in zip(df['hash_name'], df['asset_description.appid'].astype(str)):
+        itemParams = {'item_name': item_name, 'appid': appid}
+        tasks.append({'id': task_id('price_history', itemParams), 'kind': 'price_history', 'params': itemParams})
+      self.queue.put(tasks)
+
+
+  def work(self, max_tasks: int = None) -> int:
+    """
+    Run tasks of the queue until it is empty, in the current thread.
+
+    A failed task is put back in the queue and is marked as failed after max_attempts attempts, with its error. So is a
+    task whose lease expired after max_attempts attempts, for e.g. because it stopped its worker.
+
+    :param max_tasks: Maximum number of tasks to run. The default value is None (until no task is pending or leased).
+    :type max_tasks: int
+    :return: Number of tasks run.
+    :rtype: int
+    """
+
+    done = 0
+    while max_tasks is None or done < max_tasks:
+      task = self.queue.lease(self.lease_seconds, self.max_attempts)
+      if task is None:
+        if self.queue.counts()['leased'] == 0:
+          break
+        time.sleep(self.poll_interval)
+        continue
+
+      try:
+        self.__run_task(task)
+      except Exception as e:
+        self.queue.fail(task['id'], str(e), self.max_attempts)
+      else:
+        self.queue.ack(task['id'])
+      done += 1
+    return done
+
+
+  def run(self, workers: int = 4, processes: bool = False) -> dict:
+    """
+    Run the crawl with several workers until the queue is empty.
+
+    :param workers: Number of workers. The default value is 4.
+    :type workers: int
+    :param processes: Whether to run the workers in separate processes instead of threads. It requires a queue that can be shared between processes, such as SQLiteQueue. The default value is False.
+    :type processes: bool
+    :return: The number of tasks by status, see TaskQueue.counts().
+    :rtype: dict
+    """
+
+    if processes:
+      exception('type', self.queue, SQLiteQueue, "Worker processes require a queue shared between processes, such as SQLiteQueue.")
+      from concurrent.futures import ProcessPoolExecutor
+      with ProcessPoolExecutor(max_workers=workers) as executor:
+        for future in [executor.submit(_work, self, None) for _ in range(workers)]:
+          future.result()
+    else:
+      with ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in [executor.submit(self.work) for _ in range(workers)]:
+          future.result()
+
+    return self.queue.counts()
+
+
+  def merge(self, kind: str) -> pd.DataFrame:
+    """
+    Combine the checkpoints of a kind of task into one data frame.
+
+    :param kind: The kind of task. This includes 'listings' and 'price_history'.
+    :type kind: str
+    :return: The combined outputs, with the listings in the order of their pages.
+    :rtype: pd.DataFrame
+    """
+
+    exception('contain', kind, TASK_KINDS,
+      f"{kind} is not valid as a kind of task. It should only be 'listings' or 'price_history'.")
+
+    directory = os.path.join(self.path, kind)
+    if not os.path.isdir(directory):
+      return pd.DataFrame()
+    names = sorted(name for name in os.listdir(directory) if name.endswith('.pkl'))
+    frames = [pd.read_pickle(os.path.join(directory, name)) for name in names]
+    frames = [df for df in frames if len(df) > 0]
+    if len(frames) == 0:
+      return pd.DataFrame()
+    return parsing.concat_frames(frames, TASK_KINDS[kind])
+
+
+  def status(self) -> dict:
+    """
+    Get the progress of the crawl.
+
+    :return: The number of tasks by status, see TaskQueue.counts().
+    :rtype: dict
+    """
+
+    return self.queue.counts()
@@ -0,0 +1,230 @@
+import hashlib
+import threading
+import time
+from steamcrawl.exceptions import exception
+from steamcrawl.ratelimit import TokenBucket
+
+# Scheduling strategies of the credential pool.
+STRATEGIES = ['lru', 'budget']
+
+# URL prefixes of the APIs whose requests are spread over the cookies of a pool. They return market data that
+# does not depend on the account, unlike myhistory or the inventories, which always use the cookie of the client.
+ROTATED_APIS = [
+  'steamcommunity.com/market/pricehistory',
+  'steamcommunity.com/market/priceoverview'
+]
+
+
+class Credential:
+
+  def __init__(self, steamLoginSecure: str, rate: float, capacity: float):
+    """
+    Initializing the state of one cookie of a credential pool.
+
+    :param steamLoginSecure: The value of the steamLoginSecure cookie.
+    :type steamLoginSecure: str
+    :param rate: Number of requests per second allowed for the cookie.
+    :type rate: float
+    :param capacity: Maximum number of requests of a burst for the cookie.
+    :type capacity: float
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.header = 'steamLoginSecure=' + steamLoginSecure + ';'
+    self.key = hashlib.sha256(self.header.encode('utf-8')).hexdigest()[:12]
+    self.budget = TokenBucket(rate, capacity)
+    self.healthy = True
+    self.last_used = 0.0
+    self.cooldown_until = 0.0
+    self.failures = 0
+    self.requests = 0
+    self.empty_responses = 0
+
+
+class CredentialPool:
+
+  def __init__(self, cookies: list, strategy: str = 'lru', rate: float = 200 / 300, capacity: float = 20,
+               cooldown: float = 60.0, max_cooldown: float = 900.0, max_failures: int = 3):
+    """
+    Initializing a pool of steamLoginSecure cookies whose requests are scheduled across the accounts.
+
+    Steam limits the pricehistory and priceoverview APIs per cookie, so a Request given a pool spreads these
+    requests over all the cookies. Each cookie has its own budget of requests. A cookie for which Steam returns
+    an empty body, [] or null is put in cooldown, with a delay that doubles at each consecutive failure, and is
+    moved out of rotation after max_failures consecutive failures or when its validation fails.
+
+    :param cookies: The values of the steamLoginSecure cookies.
+    :type cookies: list
+    :param strategy: How the next cookie is picked. This includes 'lru' (the least recently used cookie) and 'budget' (the cookie with the most remaining requests). The default value is 'lru'.
+    :type strategy: str
+    :param rate: Number of requests per second allowed for each cookie. The default value is 200 / 300 (200 requests every 5 minutes).
+    :type rate: float
+    :param capacity: Maximum number of requests of a burst for each cookie. The default value is 20.
+    :type capacity: float
+    :param cooldown: Number of seconds a cookie is left out after its first failure. The default value is 60.0.
+    :type cooldown: float
+    :param max_cooldown: Maximum number of seconds of a cooldown. The default value is 900.0.
+    :type max_cooldown: float
+    :param max_failures: Number of consecutive failures after which a cookie is moved out of rotation. The default value is 3.
+    :type max_failures: int
+    :return: Nothing.
+    :rtype: None
+    """
+
+    exception('type', cookies, (list, tuple), "Input cookies it not a valid list type.")
+    exception('network', len(cookies), 0, "The credential pool needs at least one steamLoginSecure cookie.")
+    for cookie in cookies:
+      exception('type', cookie, str, "Input steamLoginSecure it not a valid string type.")
+    exception('contain', strategy, STRATEGIES,
+      f"{strategy} is not valid as a strategy. It should only be 'lru' or 'budget'.")
+
+    self.strategy = strategy
+    self.rate = rate
+    self.capacity = capacity
+    self.cooldown = cooldown
+    self.max_cooldown = max_cooldown
+    self.max_failures = max_failures
+    self.__credentials = {}
+    for cookie in cookies:
+      credential = Credential(cookie, rate, capacity)
+      self.__credentials.setdefault(credential.header, credential)
+    self.__lock = threading.Lock()
+
+
+  def __len__(self) -> int:
+    return len(self.__credentials)
+
+
+  def limits(self) -> dict:
+    """
+    Get the limits of the rotated APIs for the whole pool, to be added to the limits of a RateLimiter.
+
+    :return: Mapping of the rotated URL prefixes to (rate per second, burst capacity).
+    :rtype: dict
+    """
+
+    size = len(self.__credentials)
+    return {prefix: (self.rate * size, self.capacity * size) for prefix in ROTATED_APIS}
+
+
+  def reserve(self) -> tuple:
+    """
+    Pick the next cookie and take a request from its budget.
+
+    :return: The Cookie header to use and the number of seconds to wait before the request can be made.
+    :rtype: tuple
+    """
+
+    with self.__lock:
+      now = time.monotonic()
+      healthy = [credential for credential in self.__credentials.values() if credential.healthy]
+      exception('network', healthy, [], "No authorized steamLoginSecure cookie is left in the credential pool.")
+
+      ready = [credential for credential in healthy if credential.cooldown_until <= now]
+      if len(ready) == 0:
+        credential = min(healthy, key=lambda credential: credential.cooldown_until)
+      elif self.strategy == 'lru':
+        credential = min(ready, key=lambda credential: credential.last_used)
+      else:
+        credential = max(ready, key=lambda credential: credential.budget.available())
+
+      wait = max(credential.cooldown_until - now, credential.budget.reserve())
+      credential.last_used = now + max(wait, 0)
+      credential.requests += 1
+      return credential.header, max(wait, 0.0)
+
+
+  def acquire(self) -> str:
+    """
+    Pick the next cookie, sleeping until it can be used.
+
+    :return: The Cookie header to use.
+    :rtype: str
+    """
+
+    header, wait = self.reserve()
+    if wait > 0:
+      time.sleep(wait)
+    return header
+
+
+  def report(self, header: str, success: bool):
+    """
+    Record the outcome of a request made with a cookie of the pool.
+
+    :param header: The Cookie header returned by acquire() or reserve().
+    :type header: str
+    :param success: Whether Steam returned data, instead of an empty body, [] or null.
+    :type success: bool
+    :return: Nothing.
+    :rtype: None
+    """
+
+    with self.__lock:
+      credential = self.__credentials.get(header)
+      if credential is None:
+        return
+      if success:
+        credential.failures = 0
+        credential.budget.recover()
+        return
+
+      credential.failures += 1
+      credential.empty_responses += 1
+      credential.budget.throttle()
+      delay = min(self.max_cooldown, self.cooldown * 2 ** (credential.failures - 1))
+      credential.cooldown_until = time.monotonic() + delay
+      if credential.failures >= self.max_failures:
+        credential.healthy = False
+
+
+  def disable(self, header: str):
+    """
+    Move a cookie out of rotation, for e.g. when it is not authorized.
+
+    :param header: The Cookie header of the cookie.
+    :type header: str
+    :return: Nothing.
+    :rtype: None
+    """
+
+    with self.__lock:
+      if header in self.__credentials:
+        self.__credentials[header].healthy = False
+
+
+  def restore(self):
+    """
+    Put all the cookies back in rotation and clear their failures and cooldowns.
+
+    :return: Nothing.
+    :rtype: None
+    """
+
+    with self.__lock:
+      for credential in self.__credentials.values():
+        credential.healthy = True
+        credential.failures = 0
+        credential.cooldown_until = 0.0
+
+
+  def status(self) -> list:
+    """
+    Get the health of the cookies of the pool. The cookies are identified by a prefix of their hash.
+
+    :return: One record per cookie with its key, health, remaining cooldown, remaining budget, and number of requests, failures and empty responses.
+    :rtype: list
+    """
+
+    with self.__lock:
+      now = time.monotonic()
+      return [{
+        'key': credential.key,
+        'healthy': credential.healthy,
+        'cooldown': max(0.0, credential.cooldown_until - now),
+        'budget': credential.budget.available(),
+        'requests': credential.requests,
+        'failures': credential.failures,
+        'empty_responses': credential.empty_responses
+      } for credential in self.__credentials.values()]
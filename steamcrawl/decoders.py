@@ -0,0 +1,145 @@
+import importlib.util
+import json
+from typing import Any, Dict, List, Tuple, TypedDict, Union
+from urllib.parse import urlsplit
+from steamcrawl.exceptions import exception
+
+# JSON backends by order of preference. msgspec and orjson are only used when they are installed.
+BACKENDS = ['msgspec', 'orjson', 'json']
+
+
+# Typed responses of the APIs with a known schema, for the opt-in typed decoding of msgspec. The fields that are not
+# listed are skipped while decoding, without building their objects, so that new fields added by Steam are dropped too.
+
+class PriceHistoryResponse(TypedDict, total=False):
+  success: bool
+  price_prefix: str
+  price_suffix: str
+  prices: List[Tuple[str, float, str]]
+
+
+class PriceOverviewResponse(TypedDict, total=False):
+  success: bool
+  lowest_price: str
+  volume: str
+  median_price: str
+
+
+class HistoryEvent(TypedDict, total=False):
+  listingid: str
+  purchaseid: str
+  event_type: int
+  time_event: int
+  time_event_fraction: int
+  steamid_actor: str
+
+
+class HistoryListingAsset(TypedDict, total=False):
+  appid: int
+  contextid: str
+  id: str
+
+
+class HistoryListing(TypedDict, total=False):
+  listingid: str
+  fee: int
+  original_price: int
+  steamid_lister: str
+  asset: HistoryListingAsset
+
+
+class HistoryPurchase(TypedDict, total=False):
+  listingid: str
+  purchaseid: str
+  steamid_purchaser: str
+  failed: int
+  paid_amount: int
+  paid_fee: int
+  received_amount: int
+  avatar_actor: str
+  persona_actor: str
+
+
+class MarketHistoryResponse(TypedDict, total=False):
+  success: bool
+  pagesize: int
+  total_count: int
+  start: int
+  assets: Union[Dict[str, Dict[str, Dict[str, Dict[str, Any]]]], List[Any]]
+  events: List[HistoryEvent]
+  listings: Union[Dict[str, HistoryListing], List[Any]]
+  purchases: Union[Dict[str, HistoryPurchase], List[Any]]
+
+
+RESPONSE_TYPES = {
+  '/market/pricehistory/': PriceHistoryResponse,
+  '/market/priceoverview/': PriceOverviewResponse,
+  '/market/myhistory/render/': MarketHistoryResponse
+}
+
+
+class JSONDecoder:
+
+  def __init__(self, backend: str = None, typed: bool = False):
+    """
+    Initializing the JSON decoder of the responses.
+
+    All the backends decode the responses into the same objects. With typed, msgspec decodes the responses of the
+    pricehistory, priceoverview and myhistory/render APIs into the typed dictionaries of RESPONSE_TYPES instead,
+    so that the fields which are not listed there are never built, and are missing from the returned data frames.
+    Other responses, and typed responses that do not match their type, are decoded as plain JSON.
+
+    :param backend: The JSON backend. This includes 'msgspec', 'orjson', and 'json'. The default value is None (the first installed backend of BACKENDS).
+    :type backend: str
+    :param typed: Whether to decode the responses of the APIs with a known schema into their typed dictionaries. It requires the msgspec backend. The default value is False.
+    :type typed: bool
+    :return: Nothing.
+    :rtype: None
+    """
+
+    if backend is None:
+      backend = next(name for name in BACKENDS if name == 'json' or importlib.util.find_spec(name) is not None)
+    exception('contain', backend, BACKENDS,
+      f"{backend} is not valid as a JSON backend. It should only be 'msgspec', 'orjson', or 'json'.")
+    if backend != 'json' and importlib.util.find_spec(backend) is None:
+      raise ImportError(f"The {backend} JSON backend is not installed. Please install it using pip install {backend}.")
+    if typed:
+      exception('contain', backend, ['msgspec'], f"The typed decoding requires the msgspec backend, not {backend}.")
+
+    self.backend = backend
+    self.typed = typed
+    self.__typed = {}
+    if backend == 'msgspec':
+      import msgspec
+      self.__loads = msgspec.json.Decoder().decode
+      if typed:
+        self.__typed = {path: msgspec.json.Decoder(responseType).decode for path, responseType in RESPONSE_TYPES.items()}
+      self.__type_errors = (msgspec.ValidationError,)
+    elif backend == 'orjson':
+      import orjson
+      self.__loads = orjson.loads
+    else:
+      self.__loads = json.loads
+
+
+  def decode(self, content: bytes, url: str = None):
+    """
+    Decode the JSON content of a response.
+
+    :param content: The raw content of the response.
+    :type content: bytes
+    :param url: Optional URL of the request, used to find the typed response of the API. The default value is None.
+    :type url: str
+    :return: The decoded JSON content.
+    :rtype: dict
+    """
+
+    if url is not None and len(self.__typed) > 0:
+      path = urlsplit(url).path
+      for prefix, decode in self.__typed.items():
+        if path.startswith(prefix):
+          try:
+            return decode(content)
+          except self.__type_errors:
+            break
+    return self.__loads(content)
@@ -0,0 +1,12 @@
+# Steam API URLs shared by Request and AsyncRequest.
+
+ALL_LISTINGS_API = 'https://steamcommunity.com/market/search/render/?search_descriptions=0'
+APPID_API = 'https://api.steampowered.com/ISteamApps/GetAppList/v2/'
+PRICEHISTORY_API = 'https://steamcommunity.com/market/pricehistory/'
+ITEM_OVERVIEW_API = 'https://steamcommunity.com/market/priceoverview/'
+LISTINGSHISTORY_API = 'https://steamcommunity.com/market/myhistory/render/?norender=1'
+APPDETAILS_API = 'https://store.steampowered.com/api/appdetails/'
+INVENTORY_API = 'https://steamcommunity.com/inventory/'
+LISTING_PAGE = 'https://steamcommunity.com/market/listings/'
+ORDERS_HISTOGRAM_API = 'https://steamcommunity.com/market/itemordershistogram'
+AUTH_TEST_API = 'https://steamcommunity.com/market/pricehistory/?appid=730&market_hash_name=P90%20%7C%20Blind%20Spot%20(Field-Tested)'
@@ -0,0 +1,237 @@
+import json
+import sqlite3
+import threading
+import pandas as pd
+from steamcrawl import parsing
+
+
+def event_key(event: dict) -> str:
+  """
+  Get the key of an event of the market history.
+
+  :param event: An event of a myhistory/render response.
+  :type event: dict
+  :return: The key of the event, made of its listingid, purchaseid, event_type and time_event.
+  :rtype: str
+  """
+
+  return '{}/{}/{}/{}.{}'.format(event.get('listingid'), event.get('purchaseid', ''), event.get('event_type'),
+                                 event.get('time_event'), event.get('time_event_fraction', 0))
+
+
+def related_records(contentObject: dict, event: dict) -> list:
+  """
+  Get the listing, purchase and asset of an event of the market history.
+
+  :param contentObject: The decoded myhistory/render response that contains the event.
+  :type contentObject: dict
+  :param event: An event of the response.
+  :type event: dict
+  :return: List of (kind, key, record) of the records found in the response.
+  :rtype: list
+  """
+
+  records = []
+  listings = contentObject.get('listings') or {}
+  purchases = contentObject.get('purchases') or {}
+  assets = contentObject.get('assets') or {}
+
+  listing = listings.get(event.get('listingid'))
+  if listing is not None:
+    records.append(('listings', listing['listingid'], listing))
+    asset = listing.get('asset', {})
+    appid, contextid, assetid = str(asset.get('appid')), str(asset.get('contextid')), str(asset.get('id'))
+    assetRecord = assets.get(appid, {}).get(contextid, {}).get(assetid)
+    if assetRecord is not None:
+      records.append(('assets', appid + '/' + contextid + '/' + assetid, assetRecord))
+
+  if 'purchaseid' in event:
+    purchaseKey = event.get('listingid') + '_' + event['purchaseid']
+    purchase = purchases.get(purchaseKey)
+    if purchase is not None:
+      records.append(('purchases', purchaseKey, purchase))
+
+  return records
+
+
+class MarketHistoryStore:
+
+  def __init__(self, path: str):
+    """
+    Initializing a local append-only store of the market history, persisted in a SQLite database.
+
+    The events are stored with their listing, purchase and asset exactly as Steam returned them, keyed by
+    listingid, purchaseid, event_type and time_event, so that Request.sync_market_history() only needs to
+    fetch the pages that are newer than the stored events. When a sync is limited to the newest events, the
+    number of older events left to fetch is kept as a backfill cursor, which later syncs resume from.
+
+    :param path: Path to the SQLite database file.
+    :type path: str
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.path = path
+    self.__connection = sqlite3.connect(path, check_same_thread=False)
+    self.__lock = threading.Lock()
+    with self.__connection:
+      self.__connection.execute(
+        'CREATE TABLE IF NOT EXISTS events (key TEXT PRIMARY KEY, time_event INTEGER, time_event_fraction INTEGER, event TEXT)')
+      self.__connection.execute('CREATE INDEX IF NOT EXISTS events_time_event ON events (time_event, time_event_fraction)')
+      self.__connection.execute(
+        'CREATE TABLE IF NOT EXISTS records (kind TEXT, key TEXT, record TEXT, PRIMARY KEY (kind, key))')
+      self.__connection.execute('CREATE TABLE IF NOT EXISTS state (name TEXT PRIMARY KEY, value INTEGER)')
+
+
+  def known(self, events: list) -> set:
+    """
+    Get the keys of the events that are already stored.
+
+    :param events: List of events of a myhistory/render response.
+    :type events: list
+    :return: The keys of the stored events.
+    :rtype: set
+    """
+
+    keys = [event_key(event) for event in events]
+    found = set()
+    with self.__lock:
+      for i in range(0, len(keys), 500):
+        chunk = keys[i:i + 500]
+        rows = self.__connection.execute(
+          'SELECT key FROM events WHERE key IN ({})'.format(','.join('?' * len(chunk))), chunk).fetchall()
+        found.update(row[0] for row in rows)
+    return found
+
+
+  def backfill(self) -> int:
+    """
+    Get the backfill cursor: the number of events older than the stored ones that are left to fetch.
+
+    :return: The number of older events left to fetch, 0 if the stored history is complete.
+    :rtype: int
+    """
+
+    with self.__lock:
+      row = self.__connection.execute("SELECT value FROM state WHERE name = 'backfill'").fetchone()
+    return row[0] if row is not None else 0
+
+
+  def append(self, contentObject: dict, backfill: int = None) -> int:
+    """
+    Append the events of a myhistory/render response that are not stored yet, with their listings, purchases and assets.
+
+    All the events are appended in one transaction with the backfill cursor, so that an interrupted sync never leaves
+    a gap in the store that the cursor does not record.
+
+    :param contentObject: The decoded response, or the merged responses of several pages.
+    :type contentObject: dict
+    :param backfill: Optional new backfill cursor, the number of older events left to fetch. The default value is None (unchanged).
+    :type backfill: int
+    :return: Number of appended events.
+    :rtype: int
+    """
+
+    events = contentObject.get('events') or []
+    with self.__lock, self.__connection:
+      if backfill is not None:
+        self.__connection.execute("INSERT OR REPLACE INTO state VALUES ('backfill', ?)", (backfill,))
+      appended = 0
+      for event in events:
+        cursor = self.__connection.execute(
+          'INSERT OR IGNORE INTO events VALUES (?, ?, ?, ?)',
+          (event_key(event), event.get('time_event'), event.get('time_event_fraction', 0), json.dumps(event)))
+        appended += cursor.rowcount
+        for kind, key, record in related_records(contentObject, event):
+          self.__connection.execute('INSERT OR REPLACE INTO records VALUES (?, ?, ?)', (kind, key, json.dumps(record)))
+    return appended
+
+
+  def content(self) -> dict:
+    """
+    Get all the stored events as one myhistory/render response, newest events first.
+
+    :return: The stored 'assets', 'events', 'listings' and 'purchases'.
+    :rtype: dict
+    """
+
+    contentObject = {'assets': {}, 'events': [], 'listings': {}, 'purchases': {}}
+    with self.__lock:
+      events = self.__connection.execute(
+        'SELECT event FROM events ORDER BY time_event DESC, time_event_fraction DESC, rowid').fetchall()
+      records = self.__connection.execute('SELECT kind, key, record FROM records').fetchall()
+
+    contentObject['events'] = [json.loads(row[0]) for row in events]
+    for kind, key, record in records:
+      if kind == 'assets':
+        appid, contextid, assetid = key.split('/')
+        contentObject['assets'].setdefault(appid, {}).setdefault(contextid, {})[assetid] = json.loads(record)
+      else:
+        contentObject[kind][key] = json.loads(record)
+    return contentObject
+
+
+  def get_market_history(self) -> pd.DataFrame:
+    """
+    Get the stored market history, with the same columns as Request.get_market_history().
+
+    :return: The stored market trading history, newest events first.
+    :rtype: pd.DataFrame
+    """
+
+    return to_frame(self.content())
+
+
+  def close(self):
+    """
+    Close the database connection.
+
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.__connection.close()
+
+
+  def __len__(self) -> int:
+    with self.__lock:
+      return self.__connection.execute('SELECT COUNT(*) FROM events').fetchone()[0]
+
+
+def add_event(target: dict, contentObject: dict, event: dict):
+  """
+  Add an event of a myhistory/render response to another response, with its listing, purchase and asset.
+
+  :param target: The response that is updated, with 'assets', 'events', 'listings' and 'purchases'.
+  :type target: dict
+  :param contentObject: The response that contains the event.
+  :type contentObject: dict
+  :param event: The event that is added.
+  :type event: dict
+  :return: Nothing.
+  :rtype: None
+  """
+
+  target['events'].append(event)
+  for kind, key, record in related_records(contentObject, event):
+    if kind == 'assets':
+      appid, contextid, assetid = key.split('/')
+      target['assets'].setdefault(appid, {}).setdefault(contextid, {})[assetid] = record
+    else:
+      target[kind][key] = record
+
+
+def to_frame(contentObject: dict) -> pd.DataFrame:
+  """
+  Parse a myhistory/render response, or merged responses, into the market history data frame.
+
+  :param contentObject: The decoded response.
+  :type contentObject: dict
+  :return: The market trading history.
+  :rtype: pd.DataFrame
+  """
+
+  index = [contentObject[key] for key in ['assets', 'events', 'listings', 'purchases'] if contentObject.get(key) not in (None, [], {})]
+  if len(contentObject.get('events') or []) == 0 or len(index) < 3:
+    return pd.DataFrame()
+  return parsing.parse_market_history(index)
@@ -0,0 +1,223 @@
+import json
+import os
+import threading
+
+try:
+  import fcntl
+except ImportError:
+  # Windows has no fcntl, msvcrt locks the first byte of the lock file instead.
+  fcntl = None
+  import msvcrt
+
+
+class FileLock:
+
+  def __init__(self, path: str):
+    """
+    Initializing an exclusive lock shared by the processes and threads that use the same lock file.
+
+    :param path: Path to the lock file. It is created if it does not exist.
+    :type path: str
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.path = path
+    self.__file = None
+    self.__lock = threading.Lock()
+
+
+  def __enter__(self):
+    self.__lock.acquire()
+    try:
+      self.__file = open(self.path, 'a+b')
+      if fcntl is not None:
+        fcntl.flock(self.__file.fileno(), fcntl.LOCK_EX)
+      else:
+        self.__file.seek(0)
+        while True:
+          try:
+            msvcrt.locking(self.__file.fileno(), msvcrt.LK_LOCK, 1)
+            break
+          except OSError:
+            # LK_LOCK gives up after 10 seconds.
+            continue
+    except BaseException:
+      if self.__file is not None:
+        self.__file.close()
+        self.__file = None
+      self.__lock.release()
+      raise
+    return self
+
+
+  def __exit__(self, *args):
+    try:
+      if fcntl is None:
+        self.__file.seek(0)
+        msvcrt.locking(self.__file.fileno(), msvcrt.LK_UNLCK, 1)
+      # Closing the file releases the flock.
+      self.__file.close()
+      self.__file = None
+    finally:
+      self.__lock.release()
+
+
+class ItemNameIdMap:
+
+  def __init__(self, path: str = None, compact_after: int = 1000):
+    """
+    Initializing the map of resolved item_nameid values.
+
+    The item_nameid of a market item never changes, so it only needs to be resolved once. The map is kept
+    in memory and, if a path is given, saved to a local JSON file so that other processes reuse it. New values
+    are appended to a log next to the file (path + '.log'), which is merged into the file when the map is loaded
+    or closed, and once this map appended more than compact_after values or than the size of the map, so that adding
+    a value does not rewrite the whole map. The file and the log are only read and written under a lock file
+    (path + '.lock'), so that several processes or clients can share them without losing values.
+
+    :param path: Optional path to the local JSON file of the map. The default value is None.
+    :type path: str
+    :param compact_after: Minimum number of values appended to the log before it is merged into the file. The default value is 1000.
+    :type compact_after: int
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.path = path
+    self.compact_after = compact_after
+    self.__ids = {}
+    self.__appended = 0
+    self.__lock = threading.Lock()
+    self.__file_lock = FileLock(path + '.lock') if path is not None else None
+
+    if path is not None:
+      with self.__file_lock:
+        if self.__read():
+          self.__compact()
+
+
+  def __read(self) -> bool:
+    """
+    Helper function to add the values of the local file and its log to the map. The file lock must be held.
+
+    :return: Whether the log had values.
+    :rtype: bool
+    """
+
+    if os.path.exists(self.path):
+      try:
+        with open(self.path, 'r', encoding='utf-8') as f:
+          self.__ids.update(json.load(f))
+      except (OSError, ValueError):
+        pass
+
+    logged = False
+    try:
+      with open(self.path + '.log', 'r', encoding='utf-8') as f:
+        for line in f:
+          try:
+            key, item_nameid = json.loads(line)
+          except ValueError:
+            # The last line is cut when a process stopped while appending it.
+            continue
+          self.__ids[key] = item_nameid
+          logged = True
+    except OSError:
+      pass
+    return logged
+
+
+  def __compact(self):
+    """
+    Helper function to save the whole map to the local file and empty the log. The file lock must be held, and the
+    values of the file and the log must have been read first, so that the values of other processes are kept.
+
+    :return: Nothing.
+    :rtype: None
+    """
+
+    with open(self.path + '.tmp', 'w', encoding='utf-8') as f:
+      json.dump(self.__ids, f)
+    os.replace(self.path + '.tmp', self.path)
+    if os.path.exists(self.path + '.log'):
+      os.remove(self.path + '.log')
+    self.__appended = 0
+
+
+  def __key(self, item_name: str, appid: str) -> str:
+    """
+    Helper function to get the key of an item.
+
+    :param item_name: The precise market name of the item.
+    :type item_name: str
+    :param appid: The id of the app.
+    :type appid: str
+    :return: The key of the item.
+    :rtype: str
+    """
+
+    return appid + '/' + item_name
+
+
+  def get(self, item_name: str, appid: str) -> str:
+    """
+    Get the item_nameid of an item if it was already resolved.
+
+    :param item_name: The precise market name of the item.
+    :type item_name: str
+    :param appid: The id of the app.
+    :type appid: str
+    :return: The item_nameid of the item, or None if it was not resolved yet.
+    :rtype: str
+    """
+
+    return self.__ids.get(self.__key(item_name, appid))
+
+
+  def add(self, item_name: str, appid: str, item_nameid: str):
+    """
+    Add a resolved item_nameid to the map and append it to the log if a path is set.
+
+    :param item_name: The precise market name of the item.
+    :type item_name: str
+    :param appid: The id of the app.
+    :type appid: str
+    :param item_nameid: The item_nameid of the item.
+    :type item_nameid: str
+    :return: Nothing.
+    :rtype: None
+    """
+
+    key = self.__key(item_name, appid)
+    with self.__lock:
+      self.__ids[key] = item_nameid
+      if self.path is None:
+        return
+      with self.__file_lock:
+        # The log is opened for each value, since another process may have merged and removed it in between.
+        with open(self.path + '.log', 'a', encoding='utf-8') as f:
+          f.write(json.dumps([key, item_nameid]) + '\n')
+        self.__appended += 1
+        if self.__appended >= max(self.compact_after, len(self.__ids)):
+          self.__read()
+          self.__compact()
+
+
+  def close(self):
+    """
+    Merge the log into the local file, if a path is set and values were appended.
+
+    :return: Nothing.
+    :rtype: None
+    """
+
+    with self.__lock:
+      if self.path is not None and self.__appended > 0:
+        with self.__file_lock:
+          self.__read()
+          self.__compact()
+
+
+  def __len__(self) -> int:
+    return len(self.__ids)
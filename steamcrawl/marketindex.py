@@ -0,0 +1,433 @@
+import json
+import math
+import os
+import time
+import numpy as np
+import pandas as pd
+from steamcrawl.exceptions import exception
+
+# Version of the files written by MarketIndex.save().
+INDEX_VERSION = 1
+
+# The columns kept by the index, with their dtypes.
+INDEX_COLUMNS = {
+  'hash_name': 'S',
+  'appid': 'int32',
+  'sell_price': 'float32',
+  'sell_listings': 'int32',
+  'updated': 'datetime64[s]'
+}
+
+# The sorted arrays and permutations of the index, saved next to the columns.
+INDEX_ARRAYS = ['price_order', 'price_sorted', 'listings_order', 'listings_sorted', 'appid_order', 'appid_sorted']
+
+# Candidates of the columns of the listings data frames, for e.g. the app id of get_all_listings().
+APPID_COLUMNS = ['asset_description.appid', 'appid']
+
+
+def _listings_columns(listings: pd.DataFrame, updated) -> dict:
+  """
+  Helper function to extract the columns of the index from listings, keeping the last row of each item.
+
+  :param listings: The listings, for e.g. the result of get_all_listings().
+  :type listings: pd.DataFrame
+  :param updated: The time of the snapshot.
+  :type updated: np.datetime64
+  :return: The arrays of INDEX_COLUMNS.
+  :rtype: dict
+  """
+
+  exception('type', listings, pd.DataFrame, "Input listings it not a valid pd.DataFrame type.")
+  exception('contain', 'hash_name', listings.columns, "Input listings has no 'hash_name' column.")
+  appidColumn = next((column for column in APPID_COLUMNS if column in listings.columns), None)
+  exception('contain', appidColumn, listings.columns, "Input listings has no app id column.")
+
+  frame = pd.DataFrame({
+    'hash_name': listings['hash_name'].astype(str),
+    'appid': listings[appidColumn].astype('int32'),
+    'sell_price': listings['sell_price'].astype('float32') if 'sell_price' in listings.columns else np.float32('nan'),
+    'sell_listings': listings['sell_listings'].astype('int32') if 'sell_listings' in listings.columns else 0
+  }).drop_duplicates(['hash_name', 'appid'], keep='last')
+
+  return {
+    # UTF-8 bytes sort in the same order as the code points, and take one byte per character of the English names.
+    'hash_name': np.array([name.encode('utf-8') for name in frame['hash_name']], dtype='S'),
+    'appid': frame['appid'].to_numpy(),
+    'sell_price': frame['sell_price'].to_numpy(),
+    'sell_listings': frame['sell_listings'].to_numpy(),
+    'updated': np.full(len(frame), updated, dtype='datetime64[s]')
+  }
+
+
+def _bounds(sortedValues: np.ndarray, low, high) -> tuple:
+  """
+  Helper function to find the positions of the values between two bounds in a sorted array.
+
+  :param sortedValues: The sorted array.
+  :type sortedValues: np.ndarray
+  :param low: The inclusive lower bound, or None.
+  :type low: any
+  :param high: The inclusive upper bound, or None.
+  :type high: any
+  :return: The (start, stop) positions.
+  :rtype: tuple
+  """
+
+  start = 0 if low is None else int(np.searchsorted(sortedValues, _scalar(sortedValues, low, True), 'left'))
+  stop = len(sortedValues) if high is None else int(np.searchsorted(sortedValues, _scalar(sortedValues, high, False), 'right'))
+  return start, max(start, stop)
+
+
+def _scalar(sortedValues: np.ndarray, value, roundUp: bool):
+  """
+  Helper function to convert a bound to the dtype of an array, as searching a Python number converts the whole array instead.
+
+  :param sortedValues: The sorted array.
+  :type sortedValues: np.ndarray
+  :param value: The bound.
+  :type value: any
+  :param roundUp: Whether a fractional bound of an integer array is rounded up (lower bounds) or down (upper bounds).
+  :type roundUp: bool
+  :return: The bound, as a scalar of the dtype of the array.
+  :rtype: np.generic
+  """
+
+  dtype = sortedValues.dtype
+  if dtype.kind in 'iu':
+    info = np.iinfo(dtype)
+    value = math.ceil(value) if roundUp else math.floor(value)
+    return dtype.type(min(max(value, info.min), info.max))
+  if dtype.kind == 'f':
+    return dtype.type(value)
+  return value
+
+
+class MarketIndex:
+
+  def __init__(self, listings: pd.DataFrame = None, updated=None):
+    """
+    Initializing a local index of the market built from listing snapshots, for e.g. of get_all_listings().
+
+    Each item (hash_name and app id) is one row, stored in columns and ordered by name, so that an exact name or a
+    name prefix is a binary search. The prices, the numbers of listings and the app ids have sorted copies with the
+    permutations back to the rows, so that a range of each of them is a binary search too. A query starts from its
+    most selective range and filters it on the other conditions.
+
+    :param listings: Optional listings to index. The default value is None (an empty index).
+    :type listings: pd.DataFrame
+    :param updated: The time of the snapshot, as a datetime or seconds since the epoch. The default value is None (now).
+    :type updated: datetime
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.path = None
+    self.__set_columns({name: np.empty(0, dtype=dtype) for name, dtype in INDEX_COLUMNS.items()})
+    if listings is not None:
+      self.update(listings, updated)
+
+
+  def __len__(self) -> int:
+    return len(self.columns['hash_name'])
+
+
+  def __set_columns(self, columns: dict, arrays: dict = None):
+    """
+    Helper function to set the columns of the index and build their sorted arrays, unless they are given.
+
+    :param columns: The arrays of INDEX_COLUMNS, ordered by name and app id.
+    :type columns: dict
+    :param arrays: Optional arrays of INDEX_ARRAYS, for e.g. loaded from the files of the index. The default value is None.
+    :type arrays: dict
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.columns = columns
+    if arrays is None:
+      arrays = {}
+      for name, column in [('price', 'sell_price'), ('listings', 'sell_listings'), ('appid', 'appid')]:
+        order = np.argsort(columns[column], kind='stable')
+        arrays[name + '_order'] = order
+        arrays[name + '_sorted'] = columns[column][order]
+    self.arrays = arrays
+
+
+  @staticmethod
+  def __now(updated) -> np.datetime64:
+    """
+    Helper function to convert the time of a snapshot.
+
+    :param updated: The time, as a datetime or seconds since the epoch, or None for now.
+    :type updated: datetime
+    :return: The time in seconds.
+    :rtype: np.datetime64
+    """
+
+    if updated is None:
+      updated = time.time()
+    if isinstance(updated, (int, float)):
+      return np.datetime64(int(updated), 's')
+    return np.datetime64(pd.Timestamp(updated).to_datetime64(), 's')
+
+
+  def update(self, listings, updated=None) -> int:
+    """
+    Add new listings to the index, for e.g. the pages of iter_all_listings(). The items that are already indexed are
+    updated in place, and the index is only reordered when new items are added.
+
+    :param listings: The listings, as a data frame or an iterable of data frames.
+    :type listings: pd.DataFrame
+    :param updated: The time of the snapshot, as a datetime or seconds since the epoch. The default value is None (now).
+    :type updated: datetime
+    :return: The number of items added to the index.
+    :rtype: int
+    """
+
+    if not isinstance(listings, pd.DataFrame):
+      pages = list(listings)
+      if len(pages) == 0:
+        return 0
+      listings = pd.concat(pages, ignore_index=True)
+    new = _listings_columns(listings, self.__now(updated))
+    if len(new['hash_name']) == 0:
+      return 0
+
+    rows = self.__find(new['hash_name'], new['appid'])
+    isIndexed = rows >= 0
+    columns = {name: np.array(column) for name, column in self.columns.items()}
+    for name in columns:
+      columns[name][rows[isIndexed]] = new[name][isIndexed]
+
+    added = int((~isIndexed).sum())
+    if added > 0:
+      columns = {name: np.concatenate([columns[name], new[name][~isIndexed]]) for name in columns}
+      order = np.lexsort((columns['appid'], columns['hash_name']))
+      columns = {name: column[order] for name, column in columns.items()}
+    self.__set_columns(columns)
+    return added
+
+
+  def __find(self, names: np.ndarray, appids: np.ndarray) -> np.ndarray:
+    """
+    Helper function to find the rows of items.
+
+    :param names: The hash names of the items, as UTF-8 bytes.
+    :type names: np.ndarray
+    :param appids: The app ids of the items.
+    :type appids: np.ndarray
+    :return: The row of each item, or -1 if it is not indexed.
+    :rtype: np.ndarray
+    """
+
+    indexedNames, indexedAppids = self.columns['hash_name'], self.columns['appid']
+    starts = np.searchsorted(indexedNames, names, 'left')
+    stops = np.searchsorted(indexedNames, names, 'right')
+    rows = np.full(len(names), -1, dtype=np.int64)
+
+    # Most names belong to one app, and are found at their insertion point.
+    isSingle = stops - starts == 1
+    singleRows = starts[isSingle]
+    rows[isSingle] = np.where(indexedAppids[singleRows] == appids[isSingle], singleRows, -1)
+    for i in np.flatnonzero(stops - starts > 1):
+      start, stop = starts[i], stops[i]
+      position = start + int(np.searchsorted(indexedAppids[start:stop], appids[i]))
+      if position < stop and indexedAppids[position] == appids[i]:
+        rows[i] = position
+    return rows
+
+
+  def __name_bounds(self, hash_name: str = None, prefix: str = None) -> tuple:
+    """
+    Helper function to find the rows of an exact name or of a name prefix.
+
+    :param hash_name: Optional exact hash name.
+    :type hash_name: str
+    :param prefix: Optional prefix of the hash names.
+    :type prefix: str
+    :return: The (start, stop) rows.
+    :rtype: tuple
+    """
+
+    names = self.columns['hash_name']
+    key = (hash_name if hash_name is not None else prefix).encode('utf-8')
+    # No name is longer than the width of the column, and searching a longer key converts the whole column.
+    if len(key) > names.dtype.itemsize:
+      return 0, 0
+    if hash_name is not None:
+      return _bounds(names, key, key)
+    # No UTF-8 encoded text contains the byte 0xff, so it sorts after every name starting with the prefix.
+    return _bounds(names, key, (key + b'\xff')[:names.dtype.itemsize])
+
+
+  def select(self, appid: int = None, min_price: float = None, max_price: float = None, min_listings: int = None,
+             max_listings: int = None, prefix: str = None, hash_name: str = None) -> np.ndarray:
+    """
+    Get the rows of the items matching all the given conditions. The bounds are inclusive.
+
+    :param appid: Optional id of the app of the items.
+    :type appid: int
+    :param min_price: Optional lowest sell_price, in the unit of the listings (cents for Steam). The default value is None.
+    :type min_price: float
+    :param max_price: Optional highest sell_price. The default value is None.
+    :type max_price: float
+    :param min_listings: Optional lowest sell_listings. The default value is None.
+    :type min_listings: int
+    :param max_listings: Optional highest sell_listings. The default value is None.
+    :type max_listings: int
+    :param prefix: Optional prefix of the hash names. The default value is None.
+    :type prefix: str
+    :param hash_name: Optional exact hash name. The default value is None.
+    :type hash_name: str
+    :return: The rows, ordered by the condition that was searched first (price, listings, app id or name).
+    :rtype: np.ndarray
+    """
+
+    arrays, columns = self.arrays, self.columns
+    ranges = []
+    if min_price is not None or max_price is not None:
+      ranges.append(('price', _bounds(arrays['price_sorted'], min_price, max_price)))
+    if min_listings is not None or max_listings is not None:
+      ranges.append(('listings', _bounds(arrays['listings_sorted'], min_listings, max_listings)))
+    if appid is not None:
+      ranges.append(('appid', _bounds(arrays['appid_sorted'], int(appid), int(appid))))
+    if hash_name is not None or prefix is not None:
+      ranges.append(('name', self.__name_bounds(hash_name, prefix)))
+    if len(ranges) == 0:
+      return np.arange(len(self))
+
+    ranges.sort(key=lambda searched: searched[1][1] - searched[1][0])
+    (name, (start, stop)), others = ranges[0], ranges[1:]
+    rows = np.arange(start, stop) if name == 'name' else arrays[name + '_order'][start:stop]
+    if len(others) == 0 or len(rows) == 0:
+      return rows
+
+    mask = np.ones(len(rows), dtype=bool)
+    for other, (start, stop) in others:
+      if other == 'name':
+        mask &= (rows >= start) & (rows < stop)
+      elif other == 'appid':
+        mask &= columns['appid'][rows] == int(appid)
+      else:
+        column = columns['sell_price' if other == 'price' else 'sell_listings'][rows]
+        low, high = (min_price, max_price) if other == 'price' else (min_listings, max_listings)
+        if low is not None:
+          mask &= column >= low
+        if high is not None:
+          mask &= column <= high
+    return rows[mask]
+
+
+  def query(self, appid: int = None, min_price: float = None, max_price: float = None, min_listings: int = None,
+            max_listings: int = None, prefix: str = None, hash_name: str = None, limit: int = None) -> pd.DataFrame:
+    """
+    Get the items matching all the given conditions, for e.g. index.query(appid = 730, min_price = 100, max_price = 500, min_listings = 50).
+
+    :param appid: Optional id of the app of the items.
+    :type appid: int
+    :param min_price: Optional lowest sell_price, in the unit of the listings (cents for Steam). The default value is None.
+    :type min_price: float
+    :param max_price: Optional highest sell_price. The default value is None.
+    :type max_price: float
+    :param min_listings: Optional lowest sell_listings. The default value is None.
+    :type min_listings: int
+    :param max_listings: Optional highest sell_listings. The default value is None.
+    :type max_listings: int
+    :param prefix: Optional prefix of the hash names. The default value is None.
+    :type prefix: str
+    :param hash_name: Optional exact hash name. The default value is None.
+    :type hash_name: str
+    :param limit: Optional maximum number of items. The default value is None.
+    :type limit: int
+    :return: The hash_name, appid, sell_price, sell_listings and updated time of the items.
+    :rtype: pd.DataFrame
+    """
+
+    rows = self.select(appid, min_price, max_price, min_listings, max_listings, prefix, hash_name)
+    if limit is not None:
+      rows = rows[:limit]
+    return self.rows(rows)
+
+
+  def rows(self, rows: np.ndarray) -> pd.DataFrame:
+    """
+    Get the items of rows of the index.
+
+    :param rows: The rows, for e.g. returned by select().
+    :type rows: np.ndarray
+    :return: The hash_name, appid, sell_price, sell_listings and updated time of the items.
+    :rtype: pd.DataFrame
+    """
+
+    frame = {name: column[rows] for name, column in self.columns.items()}
+    frame['hash_name'] = np.char.decode(frame['hash_name'], 'utf-8').astype(object)
+    frame['updated'] = frame['updated'].astype('datetime64[ns]')
+    return pd.DataFrame(frame)
+
+
+  def appids(self) -> np.ndarray:
+    """
+    Get the app ids of the indexed items.
+
+    :return: The sorted unique app ids.
+    :rtype: np.ndarray
+    """
+
+    appids = self.arrays['appid_sorted']
+    if len(appids) == 0:
+      return appids
+    return appids[np.concatenate([[True], appids[1:] != appids[:-1]])]
+
+
+  def save(self, path: str):
+    """
+    Save the index to a directory of .npy files, which load() memory-maps. Each file is replaced atomically, and the
+    metadata is written last.
+
+    :param path: Path to the directory of the index. It is created if it does not exist.
+    :type path: str
+    :return: Nothing.
+    :rtype: None
+    """
+
+    exception('type', path, str, "Input path it not a valid string type.")
+    os.makedirs(path, exist_ok=True)
+    for name, array in list(self.columns.items()) + list(self.arrays.items()):
+      filePath = os.path.join(path, name + '.npy')
+      with open(filePath + '.tmp', 'wb') as f:
+        np.save(f, np.ascontiguousarray(array))
+      os.replace(filePath + '.tmp', filePath)
+
+    meta = {'version': INDEX_VERSION, 'items': len(self), 'columns': list(self.columns), 'arrays': INDEX_ARRAYS}
+    with open(os.path.join(path, 'meta.json.tmp'), 'w') as f:
+      json.dump(meta, f)
+    os.replace(os.path.join(path, 'meta.json.tmp'), os.path.join(path, 'meta.json'))
+    self.path = path
+
+
+  @classmethod
+  def load(cls, path: str, mmap: bool = True):
+    """
+    Load an index saved with save(). Memory-mapped indexes are only read from disk as they are queried, and are
+    shared between processes through the page cache. Updating a loaded index copies it into memory.
+
+    :param path: Path to the directory of the index.
+    :type path: str
+    :param mmap: Whether to memory-map the files instead of reading them into memory. The default value is True.
+    :type mmap: bool
+    :return: The index.
+    :rtype: MarketIndex
+    """
+
+    exception('type', path, str, "Input path it not a valid string type.")
+    with open(os.path.join(path, 'meta.json'), 'r') as f:
+      meta = json.load(f)
+    exception('exceed', meta['version'], INDEX_VERSION, f"The index at {path} was saved by a newer version of steamcrawl.")
+
+    mode = 'r' if mmap else None
+    index = cls()
+    columns = {name: np.load(os.path.join(path, name + '.npy'), mmap_mode=mode) for name in INDEX_COLUMNS}
+    arrays = {name: np.load(os.path.join(path, name + '.npy'), mmap_mode=mode) for name in INDEX_ARRAYS}
+    index.__set_columns(columns, arrays)
+    index.path = path
+    return index
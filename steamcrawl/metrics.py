@@ -0,0 +1,396 @@
+import contextlib
+import contextvars
+import functools
+import math
+import threading
+import time
+from urllib.parse import urlsplit
+from steamcrawl import endpoints
+
+# Upper bounds of the buckets of the histograms, in seconds.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Paths of the APIs, used as the endpoint label so that item names, steam ids and app ids in the paths do not
+# create a label value per request.
+ENDPOINT_PATHS = sorted({urlsplit(getattr(endpoints, name)).path for name in dir(endpoints) if name.isupper()}, key=len, reverse=True)
+
+_TRACE = contextvars.ContextVar('steamcrawl_trace', default=None)
+_SCOPE = contextvars.ContextVar('steamcrawl_scope', default={})
+
+
+def endpoint_label(url: str) -> str:
+  """
+  Get the endpoint label of a URL, which is the path of its API.
+
+  :param url: The requested URL.
+  :type url: str
+  :return: The path of the API of the URL, or the path of the URL if it is not an API of the package.
+  :rtype: str
+  """
+
+  path = urlsplit(url).path
+  for prefix in ENDPOINT_PATHS:
+    if path.startswith(prefix):
+      return prefix
+  return path
+
+
+@contextlib.contextmanager
+def scope(**attributes):
+  """
+  Add attributes to the spans recorded by the traces in this context, for e.g. the page of a paginated call.
+
+  :param attributes: The attributes of the spans.
+  :type attributes: dict
+  :return: Nothing.
+  :rtype: None
+  """
+
+  token = _SCOPE.set({**_SCOPE.get(), **attributes})
+  try:
+    yield
+  finally:
+    _SCOPE.reset(token)
+
+
+def propagated(function):
+  """
+  Wrap a function submitted to a thread pool, so that it runs in the context of the caller, with its trace and scope.
+
+  :param function: The function to run in the worker threads.
+  :type function: callable
+  :return: The wrapped function.
+  :rtype: callable
+  """
+
+  context = contextvars.copy_context()
+
+  def run(*args, **kwargs):
+    return context.copy().run(function, *args, **kwargs)
+  return run
+
+
+def instrumented(method):
+  """
+  Decorator recording the latency and the errors of a public method of a client whose metrics attribute is set.
+
+  :param method: The method.
+  :type method: callable
+  :return: The wrapped method.
+  :rtype: callable
+  """
+
+  name = method.__name__
+
+  @functools.wraps(method)
+  def wrapper(self, *args, **kwargs):
+    metrics = self.metrics
+    if metrics is None:
+      return method(self, *args, **kwargs)
+    with scope(method=name):
+      start = time.perf_counter()
+      try:
+        return method(self, *args, **kwargs)
+      except Exception:
+        metrics.increment('steamcrawl_method_errors_total', method=name)
+        raise
+      finally:
+        metrics.observe('steamcrawl_method_seconds', time.perf_counter() - start, method=name)
+  return wrapper
+
+
+def _escape(value) -> str:
+  """
+  Helper function to escape a label value of the Prometheus text format.
+
+  :param value: The label value.
+  :type value: str
+  :return: The escaped label value.
+  :rtype: str
+  """
+
+  return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: tuple) -> str:
+  """
+  Helper function to format the labels of a sample of the Prometheus text format.
+
+  :param labels: The sorted (name, value) pairs of the labels.
+  :type labels: tuple
+  :return: The formatted labels, with their braces, or '' if there are none.
+  :rtype: str
+  """
+
+  if len(labels) == 0:
+    return ''
+  return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+class Trace:
+
+  def __init__(self):
+    """
+    Initializing a trace, which keeps every value recorded while it is active, with the attributes of its scope.
+
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.spans = []
+    self.started_at = time.perf_counter()
+    self.__lock = threading.Lock()
+
+
+  def add(self, name: str, value: float, labels: dict):
+    """
+    Record a value in the trace.
+
+    :param name: The name of the metric.
+    :type name: str
+    :param value: The recorded value.
+    :type value: float
+    :param labels: The labels of the value.
+    :type labels: dict
+    :return: Nothing.
+    :rtype: None
+    """
+
+    span = {**_SCOPE.get(), **labels, 'metric': name, 'value': value, 'thread': threading.current_thread().name,
+            'at': time.perf_counter() - self.started_at}
+    with self.__lock:
+      self.spans.append(span)
+
+
+  def to_frame(self):
+    """
+    Get the spans of the trace, for e.g. trace.to_frame().pivot_table('value', 'page', 'metric', aggfunc='sum') to break a call down page by page.
+
+    :return: One row per recorded value, with its metric, value, labels, scope attributes, thread and time since the trace started.
+    :rtype: pd.DataFrame
+    """
+
+    import pandas as pd
+    with self.__lock:
+      return pd.DataFrame(list(self.spans))
+
+
+class Metrics:
+
+  def __init__(self, buckets: tuple = DEFAULT_BUCKETS, callbacks: list = None):
+    """
+    Initializing the metrics of the clients, with counters and histograms keyed by name and labels.
+
+    The transport records the count, latency, bytes, retries and throttles of the requests of each endpoint, and
+    Request records the decode and parse time of each endpoint, the app id validations, the requests shared with an
+    identical outstanding request and the latency and errors of each public method. The metrics are read with snapshot() or to_prometheus(), or pushed to callbacks.
+
+    :param buckets: Upper bounds of the buckets of the histograms, in seconds. The default value is DEFAULT_BUCKETS.
+    :type buckets: tuple
+    :param callbacks: Optional functions called with the name, value and labels of every recorded value. The default value is None.
+    :type callbacks: list
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.buckets = tuple(sorted(bound for bound in buckets if bound != math.inf))
+    self.callbacks = list(callbacks or [])
+    self.__counters = {}
+    self.__histograms = {}
+    self.__lock = threading.Lock()
+
+
+  def add_callback(self, callback):
+    """
+    Add a function called with the name, value and labels of every recorded value.
+
+    :param callback: The function, for e.g. lambda name, value, labels: statsd.gauge(name, value).
+    :type callback: callable
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.callbacks.append(callback)
+
+
+  def __notify(self, name: str, value: float, labels: dict):
+    """
+    Helper function to pass a recorded value to the active trace and the callbacks.
+
+    :param name: The name of the metric.
+    :type name: str
+    :param value: The recorded value.
+    :type value: float
+    :param labels: The labels of the value.
+    :type labels: dict
+    :return: Nothing.
+    :rtype: None
+    """
+
+    trace = _TRACE.get()
+    if trace is not None:
+      trace.add(name, value, labels)
+    for callback in self.callbacks:
+      callback(name, value, labels)
+
+
+  def increment(self, name: str, value: float = 1, **labels):
+    """
+    Add a value to a counter.
+
+    :param name: The name of the counter, for e.g. 'steamcrawl_requests_total'.
+    :type name: str
+    :param value: The added value. The default value is 1.
+    :type value: float
+    :param labels: The labels of the counter, for e.g. endpoint='/market/pricehistory/'.
+    :type labels: dict
+    :return: Nothing.
+    :rtype: None
+    """
+
+    key = (name, tuple(sorted(labels.items())))
+    with self.__lock:
+      self.__counters[key] = self.__counters.get(key, 0) + value
+    self.__notify(name, value, labels)
+
+
+  def observe(self, name: str, value: float, **labels):
+    """
+    Add a value to a histogram.
+
+    :param name: The name of the histogram, for e.g. 'steamcrawl_request_seconds'.
+    :type name: str
+    :param value: The observed value.
+    :type value: float
+    :param labels: The labels of the histogram.
+    :type labels: dict
+    :return: Nothing.
+    :rtype: None
+    """
+
+    key = (name, tuple(sorted(labels.items())))
+    with self.__lock:
+      histogram = self.__histograms.get(key)
+      if histogram is None:
+        histogram = self.__histograms[key] = {'buckets': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+      histogram['buckets'][self.__bucket(value)] += 1
+      histogram['sum'] += value
+      histogram['count'] += 1
+    self.__notify(name, value, labels)
+
+
+  def __bucket(self, value: float) -> int:
+    """
+    Helper function to find the bucket of a value.
+
+    :param value: The observed value.
+    :type value: float
+    :return: The index of the first bucket whose upper bound is at least value, or the index of the +Inf bucket.
+    :rtype: int
+    """
+
+    for i, bound in enumerate(self.buckets):
+      if value <= bound:
+        return i
+    return len(self.buckets)
+
+
+  @contextlib.contextmanager
+  def timer(self, name: str, **labels):
+    """
+    Observe the duration of a block in a histogram.
+
+    :param name: The name of the histogram.
+    :type name: str
+    :param labels: The labels of the histogram.
+    :type labels: dict
+    :return: Nothing.
+    :rtype: None
+    """
+
+    start = time.perf_counter()
+    try:
+      yield
+    finally:
+      self.observe(name, time.perf_counter() - start, **labels)
+
+
+  @contextlib.contextmanager
+  def trace(self):
+    """
+    Record every value of the block in a trace, including the values recorded by the worker threads of the block:
+
+      with request.metrics.trace() as trace:
+        request.get_market_history(5000)
+      trace.to_frame()
+
+    :return: The trace.
+    :rtype: Trace
+    """
+
+    trace = Trace()
+    token = _TRACE.set(trace)
+    try:
+      yield trace
+    finally:
+      _TRACE.reset(token)
+
+
+  def snapshot(self) -> dict:
+    """
+    Get the current values of the metrics.
+
+    :return: The counters, as {name: {labels: value}}, and the histograms, as {name: {labels: {'buckets', 'sum', 'count'}}}, with labels as sorted tuples of (name, value).
+    :rtype: dict
+    """
+
+    counters, histograms = {}, {}
+    with self.__lock:
+      for (name, labels), value in self.__counters.items():
+        counters.setdefault(name, {})[labels] = value
+      for (name, labels), histogram in self.__histograms.items():
+        histograms.setdefault(name, {})[labels] = {'buckets': dict(zip(self.buckets + (math.inf,), histogram['buckets'])),
+                                                   'sum': histogram['sum'], 'count': histogram['count']}
+    return {'counters': counters, 'histograms': histograms}
+
+
+  def to_prometheus(self) -> str:
+    """
+    Get the metrics in the Prometheus text exposition format.
+
+    :return: The metrics, with cumulative buckets for the histograms.
+    :rtype: str
+    """
+
+    snapshot = self.snapshot()
+    lines = []
+    for name in sorted(snapshot['counters']):
+      lines.append(f'# TYPE {name} counter')
+      for labels, value in sorted(snapshot['counters'][name].items()):
+        lines.append(f'{name}{_format_labels(labels)} {value:g}')
+
+    for name in sorted(snapshot['histograms']):
+      lines.append(f'# TYPE {name} histogram')
+      for labels, histogram in sorted(snapshot['histograms'][name].items()):
+        cumulative = 0
+        for bound, count in histogram['buckets'].items():
+          cumulative += count
+          le = '+Inf' if bound == math.inf else f'{bound:g}'
+          lines.append(f'{name}_bucket{_format_labels(labels + (("le", le),))} {cumulative}')
+        lines.append(f'{name}_sum{_format_labels(labels)} {histogram["sum"]:.6f}')
+        lines.append(f'{name}_count{_format_labels(labels)} {histogram["count"]}')
+
+    return '\n'.join(lines) + '\n'
+
+
+  def reset(self):
+    """
+    Remove all the recorded values.
+
+    :return: Nothing.
+    :rtype: None
+    """
+
+    with self.__lock:
+      self.__counters.clear()
+      self.__histograms.clear()
@@ -0,0 +1,297 @@
+import heapq
+import itertools
+import threading
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from steamcrawl.exceptions import exception
+
+
+def graph_levels(graph: list) -> tuple:
+  """
+  Convert an order graph of Steam into compact price levels.
+
+  The graphs of itemordershistogram list [price, cumulative quantity, description] entries. The levels are
+  returned as prices in cents and the (non-cumulative) quantity at each price, sorted by price.
+
+  :param graph: The buy_order_graph or sell_order_graph of an itemordershistogram response.
+  :type graph: list
+  :return: The (prices in cents, quantities) arrays.
+  :rtype: tuple
+  """
+
+  if len(graph) == 0:
+    return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+  prices = np.rint(np.array([level[0] for level in graph], dtype=np.float64) * 100).astype(np.int64)
+  cumulative = np.array([level[1] for level in graph], dtype=np.int64)
+  quantities = np.diff(cumulative, prepend=0)
+  order = np.argsort(prices, kind='stable')
+  return prices[order], quantities[order]
+
+
+def diff_levels(old: tuple, new: tuple) -> tuple:
+  """
+  Get the price levels that changed between two snapshots of one side of an order book.
+
+  :param old: The (prices in cents, quantities) arrays of the previous snapshot.
+  :type old: tuple
+  :param new: The (prices in cents, quantities) arrays of the new snapshot.
+  :type new: tuple
+  :return: The (prices in cents, new quantities) arrays of the changed levels, a quantity of 0 meaning that the level was removed.
+  :rtype: tuple
+  """
+
+  prices = np.union1d(old[0], new[0])
+  oldQuantities = np.zeros(len(prices), dtype=np.int64)
+  newQuantities = np.zeros(len(prices), dtype=np.int64)
+  oldQuantities[np.searchsorted(prices, old[0])] = old[1]
+  newQuantities[np.searchsorted(prices, new[0])] = new[1]
+  changed = oldQuantities != newQuantities
+  return prices[changed], newQuantities[changed]
+
+
+def deltas_to_frame(deltas: list) -> pd.DataFrame:
+  """
+  Convert order book deltas into one data frame with one row per changed price level.
+
+  :param deltas: List of deltas emitted by OrderBookPoller.
+  :type deltas: list
+  :return: The changed price levels with columns 'time', 'item_name', 'appid', 'type', 'price' and 'orders'.
+  :rtype: pd.DataFrame
+  """
+
+  dfCombined = []
+  for delta in deltas:
+    for side in ['sell', 'buy']:
+      prices, quantities = delta[side]
+      dfCombined.append(pd.DataFrame({
+        'time': pd.to_datetime(delta['time'], unit='s'),
+        'item_name': delta['item_name'],
+        'appid': delta['appid'],
+        'type': side,
+        'price': prices / 100,
+        'orders': quantities
+      }))
+
+  if len(dfCombined) == 0:
+    return pd.DataFrame(columns=['time', 'item_name', 'appid', 'type', 'price', 'orders'])
+  return pd.concat(dfCombined, ignore_index=True)
+
+
+class OrderBookPoller:
+
+  def __init__(self, request, callback=None, currency: int = 1, country: str = 'US', language: str = 'english',
+               max_workers: int = None):
+    """
+    Initializing a poller of the order books of market items.
+
+    Items are polled by priority and interval through the itemordershistogram API. The last snapshot of each
+    item is kept as numeric arrays and only the changed price levels (deltas) are emitted at every poll.
+
+    A delta is a dictionary with 'item_name', 'appid', 'time', 'initial' (True for the first snapshot of an item),
+    and 'sell'/'buy' as (prices in cents, quantities) arrays of the changed levels, where a quantity of 0 means
+    that the level was removed.
+
+    :param request: The Request object used to poll the order books.
+    :type request: Request
+    :param callback: Optional function called with the list of deltas of every poll that changed at least one item. The default value is None.
+    :type callback: callable
+    :param currency: The id of the currency of the prices. The default value is 1 (USD).
+    :type currency: int
+    :param country: The country code of the requests. The default value is 'US'.
+    :type country: str
+    :param language: The language of the requests. The default value is 'english'.
+    :type language: str
+    :param max_workers: Maximum number of items polled concurrently. The default value is the max_workers of the request.
+    :type max_workers: int
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.request = request
+    self.callback = callback
+    self.currency = currency
+    self.country = country
+    self.language = language
+    self.max_workers = max_workers if max_workers is not None else request.max_workers
+    self.errors = {}
+    self.__items = {}
+    self.__books = {}
+    self.__schedule = []
+    self.__counter = itertools.count()
+    self.__lock = threading.Lock()
+
+
+  def add(self, item_name: str, appid: str, interval: float = 60, priority: int = 0):
+    """
+    Add an item to poll, or update its interval and priority.
+
+    :param item_name: The precise market name of the item.
+    :type item_name: str
+    :param appid: The id of the app.
+    :type appid: str
+    :param interval: Number of seconds between two polls of the item. The default value is 60.
+    :type interval: float
+    :param priority: Priority of the item when several items are due, lower values being polled first. The default value is 0.
+    :type priority: int
+    :return: Nothing.
+    :rtype: None
+    """
+
+    exception('type', item_name, str, "Input item_name it not a valid string type.")
+    exception('type', appid, str, "Input appid it not a valid string type.")
+    key = (item_name, appid)
+    with self.__lock:
+      if key in self.__items:
+        self.__items[key] = (interval, priority, self.__items[key][2])
+        return
+      # The entry of the item in the schedule is identified by its counter, so that the entries left by a removed
+      # item are dropped when they are popped instead of polling the item twice once it is added again.
+      entry = next(self.__counter)
+      self.__items[key] = (interval, priority, entry)
+      heapq.heappush(self.__schedule, (time.monotonic(), priority, entry, key))
+
+
+  def remove(self, item_name: str, appid: str):
+    """
+    Stop polling an item and forget its snapshot.
+
+    :param item_name: The precise market name of the item.
+    :type item_name: str
+    :param appid: The id of the app.
+    :type appid: str
+    :return: Nothing.
+    :rtype: None
+    """
+
+    with self.__lock:
+      self.__items.pop((item_name, appid), None)
+      self.__books.pop((item_name, appid), None)
+
+
+  def book(self, item_name: str, appid: str) -> dict:
+    """
+    Get the last snapshot of the order book of an item.
+
+    :param item_name: The precise market name of the item.
+    :type item_name: str
+    :param appid: The id of the app.
+    :type appid: str
+    :return: The 'sell' and 'buy' (prices in cents, quantities) arrays, or None if the item was not polled yet.
+    :rtype: dict
+    """
+
+    return self.__books.get((item_name, appid))
+
+
+  def __due_items(self) -> list:
+    """
+    Helper function to pop the items that are due and schedule their next poll.
+
+    :return: The keys of the due items, by priority.
+    :rtype: list
+    """
+
+    now = time.monotonic()
+    due = []
+    with self.__lock:
+      while len(self.__schedule) > 0 and self.__schedule[0][0] <= now:
+        _, _, entry, key = heapq.heappop(self.__schedule)
+        if key not in self.__items or self.__items[key][2] != entry:
+          continue
+        due.append((self.__items[key][1], key))
+      # The next polls are scheduled once all the due items are popped, so that an item with an interval of 0
+      # is not popped again in the same call.
+      for priority, key in due:
+        interval, _, _ = self.__items[key]
+        entry = next(self.__counter)
+        self.__items[key] = (interval, priority, entry)
+        heapq.heappush(self.__schedule, (now + interval, priority, entry, key))
+    due.sort(key=lambda item: item[0])
+    return [key for _, key in due]
+
+
+  def __poll_item(self, key: tuple) -> dict:
+    """
+    Helper function to poll one item and compute its delta.
+
+    :param key: The (item_name, appid) of the item.
+    :type key: tuple
+    :return: The delta of the item, or None if nothing changed or the poll failed.
+    :rtype: dict
+    """
+
+    item_name, appid = key
+    try:
+      contentObject = self.request.get_order_histogram(item_name, appid, self.currency, self.country, self.language)
+      exception('network', contentObject.get('success'), 0, "Steam cannot make this API call. Please double check your parameters and try again.")
+    except Exception as e:
+      self.errors[key] = str(e)
+      return None
+    self.errors.pop(key, None)
+
+    book = {
+      'sell': graph_levels(contentObject.get('sell_order_graph', [])),
+      'buy': graph_levels(contentObject.get('buy_order_graph', []))
+    }
+    with self.__lock:
+      if key not in self.__items:
+        return None
+      previous = self.__books.get(key)
+      self.__books[key] = book
+
+    if previous is None:
+      return dict(book, item_name=item_name, appid=appid, time=time.time(), initial=True)
+
+    delta = {side: diff_levels(previous[side], book[side]) for side in ['sell', 'buy']}
+    if len(delta['sell'][0]) == 0 and len(delta['buy'][0]) == 0:
+      return None
+    return dict(delta, item_name=item_name, appid=appid, time=time.time(), initial=False)
+
+
+  def poll_once(self) -> list:
+    """
+    Poll the items that are due and emit their deltas.
+
+    :return: The deltas of the due items that changed.
+    :rtype: list
+    """
+
+    keys = self.__due_items()
+    if len(keys) == 0:
+      return []
+
+    with ThreadPoolExecutor(max_workers=min(self.max_workers, len(keys))) as executor:
+      deltas = [delta for delta in executor.map(self.__poll_item, keys) if delta is not None]
+
+    if self.callback is not None and len(deltas) > 0:
+      self.callback(deltas)
+    return deltas
+
+
+  def run(self, stop_event: threading.Event = None, duration: float = None):
+    """
+    Poll the items until stopped, sleeping until the next item is due.
+
+    :param stop_event: Optional event that stops the poller when set. The default value is None.
+    :type stop_event: threading.Event
+    :param duration: Optional number of seconds after which the poller stops. The default value is None.
+    :type duration: float
+    :return: Nothing.
+    :rtype: None
+    """
+
+    stop_event = stop_event if stop_event is not None else threading.Event()
+    endTime = time.monotonic() + duration if duration is not None else None
+
+    while not stop_event.is_set():
+      self.poll_once()
+      with self.__lock:
+        nextTime = self.__schedule[0][0] if len(self.__schedule) > 0 else time.monotonic() + 1
+      if endTime is not None:
+        if time.monotonic() >= endTime:
+          break
+        nextTime = min(nextTime, endTime)
+      stop_event.wait(max(0, nextTime - time.monotonic()))
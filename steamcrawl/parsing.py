@@ -0,0 +1,467 @@
+import json
+import re
+import numpy as np
+import pandas as pd
+from steamcrawl.exceptions import exception
+from steamcrawl.schemas import SCHEMAS, coerce
+
+# Response parsing shared by Request and AsyncRequest, so that both clients return the same data frames.
+
+# Columns of the market history that are not returned, by part of the myhistory/render response.
+MARKET_HISTORY_DROPPED = {
+  'assets': {'currency', 'background_color'},
+  'events': {'time_event_fraction', 'date_event'},
+  'listings': {'currencyid', 'asset.contextid', 'asset.appid', 'asset.currency', 'publisher_fee_percent', 'publisher_fee_app', 'price', 'asset.amount'},
+  'purchases': {'currencyid', 'time_sold', 'asset.id', 'asset.appid', 'needs_rollback', 'purchaseid', 'steam_fee', 'publisher_fee',
+                'publisher_fee_percent', 'publisher_fee_app', 'received_currencyid', 'asset.currency', 'asset.contextid', 'asset.classid',
+                'asset.new_contextid', 'asset.new_id', 'asset.instanceid', 'asset.amount', 'asset.status'},
+  'optional': {'owner', 'rollback_new_id', 'rollback_new_contextid', 'market_fee', 'market_marketable_restriction', 'cancel_reason',
+               'cancel_reason_short', 'funds_returned', 'funds_held', 'time_funds_held_until', 'funds_revoked'}
+}
+EVENT_TYPES = {1: 'List', 2: 'Cancel', 3: 'Sell', 4: 'Buy'}
+
+# Columns of the listings that are only used to display items on the market page.
+LISTINGS_DROPPED = {'asset_description.background_color', 'asset_description.name_color'}
+
+
+def decode_json(content: bytes, decoder=None, url: str = None):
+  """
+  Decode the JSON content of a response.
+
+  :param content: The raw content of the response.
+  :type content: bytes
+  :param decoder: Optional JSONDecoder used instead of json.loads. The default value is None.
+  :type decoder: JSONDecoder
+  :param url: Optional URL of the request, used by the decoder to find the typed response of the API. The default value is None.
+  :type url: str
+  :return: The decoded JSON content.
+  :rtype: dict
+  """
+
+  exception('network', content.strip(), b'', "You have reached the request limit of Steam. Please try again later.")
+  contentObject = json.loads(content) if decoder is None else decoder.decode(content, url)
+  exception('network', contentObject, None, "No information for this API call. Please double check your parameters and try again.")
+  return contentObject
+
+
+def extract_indices(contentObject: dict, params: dict, index: list) -> list:
+  """
+  Check a decoded response and extract the given indices.
+
+  :param contentObject: The decoded JSON content of the response.
+  :type contentObject: dict
+  :param params: The parameters of the request.
+  :type params: dict
+  :param index: List of indices that needs to be extracted.
+  :type index: list
+  :return: The extracted indices.
+  :rtype: list
+  """
+
+  dfGather = []
+
+  for i in index:
+    if i in contentObject:
+      if contentObject[i] != []:
+        dfGather.append(contentObject[i])
+
+  exception('network', dfGather, [], "No information for this API call. Please double check your parameters and try again.")
+
+  if 'success' in contentObject:
+    isSuccess = contentObject['success']
+    exception('network', isSuccess, False, "Steam cannot make this API call. Please double check your parameters and try again.")
+
+  elif 'success' in contentObject[index[0]]:
+    isSuccess = contentObject[index[0]]['success']
+    exception('network', isSuccess, False, "There is no information for this app.")
+    exception('network', isSuccess, 0, "There is no information for this app.")
+  
+  if 'total_count' in contentObject and 'count' in params:
+    maxPage = contentObject['total_count']
+    exception('exceed', params['count'], maxPage, f"{params['count']} is larger than the maximum number of count {maxPage}.")
+
+  elif 'total_inventory_count' in contentObject and 'count' in params:
+    maxPage = contentObject['total_inventory_count']
+    exception('exceed', params['count'], maxPage, f"{params['count']} is larger than the maximum number of count {maxPage}.")
+
+  return dfGather
+
+
+def parse_listings(index: list) -> pd.DataFrame:
+  """
+  Extract the listings from the indices of a search/render response.
+
+  :param index: List of extracted indices (only 'results').
+  :type index: list
+  :return: The listings of items.
+  :rtype: pd.DataFrame
+  """
+
+  return coerce(pd.DataFrame(flatten_records(index[0], LISTINGS_DROPPED)), SCHEMAS['listings'])
+
+
+def parse_app_details(index: list) -> pd.DataFrame:
+  """
+  Extract the details of an app from the indices of an appdetails response.
+
+  :param index: List of extracted indices (only the app id).
+  :type index: list
+  :return: Details of the app.
+  :rtype: pd.DataFrame
+  """
+
+  return pd.json_normalize(index[0]['data'])
+
+
+def parse_item_overview(jsonObject: dict) -> pd.DataFrame:
+  """
+  Check and extract the overview of an item from a priceoverview response.
+
+  :param jsonObject: The decoded JSON content of the response.
+  :type jsonObject: dict
+  :return: The overview (median price, volume) of an item.
+  :rtype: pd.DataFrame
+  """
+
+  exception('contain', 'volume', jsonObject, "No information for this item.")
+  isSuccess = jsonObject['success']
+  exception('network', isSuccess, False, "Steam cannot make this API call. Please double check your parameters and try again.")
+  df = pd.json_normalize(jsonObject).drop(['success'], axis=1)
+  for column in ['lowest_price', 'median_price']:
+    if column in df.columns:
+      df[column] = parse_price_text(df[column])
+  df['volume'] = pd.to_numeric(df['volume'].astype(str).str.replace(r'\D', '', regex=True), errors='coerce')
+  return coerce(df, SCHEMAS['item_overview'])
+
+
+def parse_price_text(values: pd.Series) -> pd.Series:
+  """
+  Convert formatted prices of Steam, for e.g. '$1,234.56' or '1.234,56€', into numbers.
+
+  :param values: The formatted prices.
+  :type values: pd.Series
+  :return: The prices as numbers, NaN for the values that are not prices.
+  :rtype: pd.Series
+  """
+
+  text = values.astype(str).str.replace(r'[^\d,.]', '', regex=True)
+  # A comma followed by one or two digits at the end is a decimal separator, for e.g. '1,23€'.
+  decimalComma = text.str.contains(r',\d{1,2}$', regex=True)
+  text = text.where(~decimalComma, text.str.replace('.', '', regex=False).str.replace(',', '.', regex=False))
+  text = text.where(decimalComma, text.str.replace(',', '', regex=False))
+  return pd.to_numeric(text, errors='coerce')
+
+
+def parse_price_history(index: list) -> pd.DataFrame:
+  """
+  Extract the price history of an item from the indices of a pricehistory response.
+
+  The entries are [date, median price, volume] lists, with dates such as 'Nov 01 2013 01: +0' (UTC, with the hour
+  of hourly entries), which are parsed in one call with an explicit format.
+
+  :param index: List of extracted indices (only 'prices').
+  :type index: list
+  :return: The price history of an item.
+  :rtype: pd.DataFrame
+  """
+
+  prices = index[0]
+  df = pd.DataFrame({
+    'date': pd.to_datetime(pd.Series([entry[0] for entry in prices], dtype=object).str[:14], format='%b %d %Y %H'),
+    'median_price': np.array([entry[1] for entry in prices], dtype=np.float32),
+    'volume_sold': np.array([entry[2] for entry in prices]).astype(np.int32)
+  })
+  return df
+
+
+def parse_batch(results: list, keys: tuple = ('item_name', 'appid'), schema: dict = None) -> pd.DataFrame:
+  """
+  Combine the results of a batch of items into one data frame in long format.
+
+  :param results: List of (key values..., data frame, error) tuples, where the data frame is None if the item failed.
+  :type results: list
+  :param keys: Names of the key columns of the items. The default value is ('item_name', 'appid').
+  :type keys: tuple
+  :param schema: Optional schema applied to the combined data frame, for e.g. SCHEMAS['price_history']. The default value is None.
+  :type schema: dict
+  :return: The data of all items, keyed by the key columns, with the error of each failed item in the 'error' column.
+  :rtype: pd.DataFrame
+  """
+
+  dfCombined = []
+  for *values, df, error in results:
+    if df is None:
+      df = pd.DataFrame(index=[0])
+    for position, (key, value) in enumerate(zip(keys, values)):
+      if key in df.columns:
+        df.pop(key)
+      df.insert(position, key, value)
+    df['error'] = error
+    dfCombined.append(df)
+
+  if len(dfCombined) == 0:
+    return pd.DataFrame(columns=list(keys) + ['error'])
+  return concat_frames(dfCombined, schema)
+
+
+def concat_frames(frames: list, schema: dict = None) -> pd.DataFrame:
+  """
+  Concatenate data frames, for e.g. the pages of a paginated API, and apply a schema to the result.
+
+  The categories of categorical columns differ between pages, so that pd.concat returns them as object columns.
+  They are converted back by the schema.
+
+  :param frames: List of data frames.
+  :type frames: list
+  :param schema: Optional mapping of column names to dtypes. The default value is None.
+  :type schema: dict
+  :return: The concatenated data frame.
+  :rtype: pd.DataFrame
+  """
+
+  df = pd.concat(frames, ignore_index=True)
+  return df if schema is None else coerce(df, schema)
+
+
+def flatten_records(records, dropped: set = frozenset(), renamed: dict = None) -> dict:
+  """
+  Flatten JSON records into columns in a single pass, with the same column names and order as pd.json_normalize.
+
+  Nested dictionaries are flattened with '.' separated names and dropped columns are never built.
+
+  :param records: Iterable of JSON records (dictionaries).
+  :type records: iterable
+  :param dropped: Names of the columns that are not built. The default value is an empty set.
+  :type dropped: set
+  :param renamed: Optional mapping of column names to new names. The default value is None.
+  :type renamed: dict
+  :return: Mapping of column names to lists of values, with NaN for missing values.
+  :rtype: dict
+  """
+
+  renamed = renamed or {}
+  columns = {}
+  rowCount = 0
+
+  def add_value(name, value):
+    if isinstance(value, dict):
+      for key, nestedValue in value.items():
+        add_value(name + '.' + key, nestedValue)
+      return
+    if name in dropped:
+      return
+    name = renamed.get(name, name)
+    column = columns.get(name)
+    if column is None:
+      column = columns[name] = [np.nan] * rowCount
+    column.append(value)
+
+  for record in records:
+    # pd.json_normalize puts the top level values before the flattened nested dictionaries.
+    for key, value in record.items():
+      if not isinstance(value, dict):
+        add_value(key, value)
+    for key, value in record.items():
+      if isinstance(value, dict):
+        add_value(key, value)
+    rowCount += 1
+    for column in columns.values():
+      if len(column) < rowCount:
+        column.append(np.nan)
+
+  return columns
+
+
+def outer_join(left: dict, right: dict, key: str) -> dict:
+  """
+  Outer join two sets of columns on a key using hash indexes, with the same rows, order and column names as pd.merge(how='outer').
+
+  :param left: Mapping of column names to lists of values of the left side.
+  :type left: dict
+  :param right: Mapping of column names to lists of values of the right side.
+  :type right: dict
+  :param key: The name of the key column, present on both sides.
+  :type key: str
+  :return: Mapping of column names to lists of values of the joined rows.
+  :rtype: dict
+  """
+
+  def build_index(keys):
+    index = {}
+    for position, value in enumerate(keys):
+      # Missing keys match each other, as in pd.merge.
+      if isinstance(value, float) and value != value:
+        value = None
+      index.setdefault(value, []).append(position)
+    return index
+
+  leftIndex = build_index(left[key])
+  rightIndex = build_index(right[key])
+  leftTake = []
+  rightTake = []
+
+  for value, leftPositions in leftIndex.items():
+    rightPositions = rightIndex.get(value, [-1])
+    for i in leftPositions:
+      for j in rightPositions:
+        leftTake.append(i)
+        rightTake.append(j)
+
+  for value, rightPositions in rightIndex.items():
+    if value not in leftIndex:
+      for j in rightPositions:
+        leftTake.append(-1)
+        rightTake.append(j)
+
+  overlap = (set(left) & set(right)) - {key}
+  columns = {}
+  for name, values in left.items():
+    if name == key:
+      rightValues = right[key]
+      columns[name] = [values[i] if i >= 0 else rightValues[j] for i, j in zip(leftTake, rightTake)]
+    else:
+      columns[name + '_x' if name in overlap else name] = [values[i] if i >= 0 else np.nan for i in leftTake]
+  for name, values in right.items():
+    if name != key:
+      columns[name + '_y' if name in overlap else name] = [values[j] if j >= 0 else np.nan for j in rightTake]
+  return columns
+
+
+def parse_market_history(index: list) -> pd.DataFrame:
+  """
+  Extract the market history from the indices of a myhistory/render response.
+
+  The assets, events, listings and purchases are flattened into columns in a single pass and joined on
+  listingid and asset.id with hash indexes, so that no intermediate data frame is built.
+
+  :param index: List of indices that needs to be extracted.
+  :type index: list
+  :return: The extracted data as a data frame.
+  :rtype: pd.DataFrame
+  """
+
+  assets = flatten_records((asset for game in index[0].values() for context in game.values() for asset in context.values()),
+                           MARKET_HISTORY_DROPPED['assets'], {'id': 'asset.id'})
+
+  events = flatten_records(index[1], MARKET_HISTORY_DROPPED['events'])
+  events['event_type'] = [EVENT_TYPES.get(eventType, eventType) for eventType in events['event_type']]
+
+  listings = flatten_records(index[2].values(), MARKET_HISTORY_DROPPED['listings'])
+
+  if len(index) == 4:
+    purchases = flatten_records(index[3].values(), MARKET_HISTORY_DROPPED['purchases'])
+    purchases['total_paid'] = [amount + fee for amount, fee in zip(purchases['paid_amount'], purchases['paid_fee'])]
+    columns = outer_join(assets, outer_join(events, outer_join(listings, purchases, 'listingid'), 'listingid'), 'asset.id')
+    nulled = {
+      'Sell': ['paid_amount', 'paid_fee', 'total_paid', 'original_price'],
+      'List': ['paid_amount', 'paid_fee', 'total_paid', 'received_amount'],
+      'Buy': ['received_amount', 'original_price']
+    }
+    front = ['time_event', 'name', 'type', 'event_type', 'original_price', 'received_amount', 'total_paid', 'paid_amount', 'paid_fee']
+
+  else:
+    columns = outer_join(assets, outer_join(events, listings, 'listingid'), 'asset.id')
+    nulled = {
+      'Buy': ['received_amount']
+    }
+    front = ['time_event', 'name', 'type', 'event_type', 'received_amount']
+
+  for column in MARKET_HISTORY_DROPPED['optional']:
+    columns.pop(column, None)
+
+  eventTypes = columns['event_type']
+  for eventType, nulledColumns in nulled.items():
+    rows = [i for i, value in enumerate(eventTypes) if value == eventType]
+    for column in nulledColumns:
+      values = columns.setdefault(column, [np.nan] * len(eventTypes))
+      for i in rows:
+        values[i] = np.nan
+
+  order = front + [column for column in columns if column not in front]
+  df = pd.DataFrame({column: columns[column] for column in order})
+  df['time_event'] = pd.to_datetime(df['time_event'], unit='s')
+  return coerce(df, SCHEMAS['market_history'])
+
+
+def parse_item_nameid(html: str) -> str:
+  """
+  Extract the item_nameid of an item from the HTML of its market listing page.
+
+  :param html: The HTML of the market listing page.
+  :type html: str
+  :return: The item_nameid of the item.
+  :rtype: str
+  """
+
+  match = re.search(r'Market_LoadOrderSpread\(\s*(\d+)\s*\)', html)
+  exception('network', match, None, "Steam cannot make this query. Please double check the item name and try again.")
+  return match.group(1)
+
+
+def parse_buysell_orders(contentObject: dict) -> pd.DataFrame:
+  """
+  Extract the buy/sell order graphs from an itemordershistogram response.
+
+  :param contentObject: The decoded JSON content of the response.
+  :type contentObject: dict
+  :return: The buy/sell orders of an item in the market.
+  :rtype: pd.DataFrame
+  """
+
+  dfSellGraph = pd.json_normalize(contentObject, record_path=['sell_order_graph'])
+  dfBuyGraph = pd.json_normalize(contentObject, record_path=['buy_order_graph'])
+  
+  dfSellGraph['type'] = 'sell'
+  dfBuyGraph['type'] = 'buy'
+  if 'success' in contentObject:
+    isSuccess = contentObject['success']
+    exception('network', isSuccess, False, "Steam cannot make this API call. Please double check your parameters and try again.")
+  dfCombined = [dfSellGraph, dfBuyGraph]
+  dfCombined = pd.concat(dfCombined, ignore_index=True)
+  dfCombined = dfCombined.rename(columns={0: 'price', 1: 'orders', 2: 'description'})
+  return dfCombined
+
+
+def index_descriptions(descriptions: list, index: dict) -> dict:
+  """
+  Add the descriptions of an inventory page to an index keyed by (classid, instanceid), keeping the descriptions already indexed.
+
+  :param descriptions: The 'descriptions' of an inventory response.
+  :type descriptions: list
+  :param index: The index of the descriptions of the previous pages.
+  :type index: dict
+  :return: The updated index.
+  :rtype: dict
+  """
+
+  for description in descriptions:
+    index.setdefault((str(description.get('classid')), str(description.get('instanceid', '0'))), description)
+  return index
+
+
+def parse_inventory(assets: list, descriptions: dict) -> pd.DataFrame:
+  """
+  Join the assets of an inventory page to their descriptions, with one row per asset.
+
+  :param assets: The 'assets' of an inventory response.
+  :type assets: list
+  :param descriptions: Index of the descriptions keyed by (classid, instanceid), built with index_descriptions.
+  :type descriptions: dict
+  :return: The game items from the inventory, with the 'assetid', 'contextid' and 'amount' of each asset.
+  :rtype: pd.DataFrame
+  """
+
+  records = []
+  for asset in assets:
+    record = {
+      'assetid': asset.get('assetid'),
+      'contextid': asset.get('contextid'),
+      'amount': asset.get('amount'),
+      'appid': asset.get('appid'),
+      'classid': asset.get('classid'),
+      'instanceid': asset.get('instanceid')
+    }
+    record.update(descriptions.get((str(asset.get('classid')), str(asset.get('instanceid', '0'))), {}))
+    records.append(record)
+
+  return coerce(pd.DataFrame(flatten_records(records, {'background_color'})), SCHEMAS['inventory'])
@@ -0,0 +1,230 @@
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Steam allows about 200 requests every 5 minutes on the community market and the store APIs.
+DEFAULT_LIMITS = {
+  'steamcommunity.com': (200 / 300, 20),
+  'store.steampowered.com': (200 / 300, 20),
+  'api.steampowered.com': (10, 10)
+}
+
+
+class TokenBucket:
+
+  def __init__(self, rate: float, capacity: float, min_rate: float = None):
+    """
+    Initializing a token bucket whose rate slows down when Steam throttles and recovers on success.
+
+    :param rate: Number of tokens (requests) added per second.
+    :type rate: float
+    :param capacity: Maximum number of tokens, i.e. the size of a burst.
+    :type capacity: float
+    :param min_rate: Lowest rate the bucket can slow down to. The default value is a tenth of rate.
+    :type min_rate: float
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.base_rate = rate
+    self.rate = rate
+    self.min_rate = min_rate if min_rate is not None else rate / 10
+    self.capacity = capacity
+    self.tokens = capacity
+    self.__updated_at = time.monotonic()
+    self.__lock = threading.Lock()
+
+
+  def __refill(self):
+    """
+    Helper function to add the tokens earned since the last update. The lock must be held.
+
+    :return: Nothing.
+    :rtype: None
+    """
+
+    now = time.monotonic()
+    self.tokens = min(self.capacity, self.tokens + (now - self.__updated_at) * self.rate)
+    self.__updated_at = now
+
+
+  def available(self) -> float:
+    """
+    Get the number of tokens left in the bucket, without taking one.
+
+    :return: Number of tokens left. It is negative when requests are already waiting.
+    :rtype: float
+    """
+
+    with self.__lock:
+      self.__refill()
+      return self.tokens
+
+
+  def reserve(self) -> float:
+    """
+    Take a token from the bucket.
+
+    :return: Number of seconds to wait before the request can be made.
+    :rtype: float
+    """
+
+    with self.__lock:
+      self.__refill()
+      self.tokens -= 1
+      if self.tokens >= 0:
+        return 0.0
+      return -self.tokens / self.rate
+
+
+  def acquire(self):
+    """
+    Take a token from the bucket, sleeping until it is available.
+
+    :return: Nothing.
+    :rtype: None
+    """
+
+    wait = self.reserve()
+    if wait > 0:
+      time.sleep(wait)
+
+
+  def throttle(self, factor: float = 0.5):
+    """
+    Slow the bucket down after Steam throttled a request.
+
+    :param factor: Factor applied to the current rate. The default value is 0.5.
+    :type factor: float
+    :return: Nothing.
+    :rtype: None
+    """
+
+    with self.__lock:
+      self.rate = max(self.min_rate, self.rate * factor)
+      self.tokens = min(self.tokens, 0)
+
+
+  def recover(self, step: float = 0.05):
+    """
+    Speed the bucket back up towards its base rate after a successful request.
+
+    :param step: Fraction of the base rate added to the current rate. The default value is 0.05.
+    :type step: float
+    :return: Nothing.
+    :rtype: None
+    """
+
+    with self.__lock:
+      self.rate = min(self.base_rate, self.rate + self.base_rate * step)
+
+
+class RateLimiter:
+
+  def __init__(self, limits: dict = None, default: tuple = (10, 10), max_retries: int = 4,
+               backoff_base: float = 1.0, backoff_max: float = 60.0):
+    """
+    Initializing the rate limiter used by the transport.
+
+    Requests are limited by one token bucket per host, or per URL prefix for finer control,
+    for e.g. {'steamcommunity.com/market/pricehistory': (0.2, 5)}. When Steam answers with HTTP 429, a
+    server error or an empty body, the bucket slows down and the request is retried after a jittered
+    exponential backoff.
+
+    :param limits: Mapping of hosts (or host and path prefixes) to (rate per second, burst capacity). The default value is DEFAULT_LIMITS.
+    :type limits: dict
+    :param default: The (rate per second, burst capacity) of hosts that are not in limits. The default value is (10, 10).
+    :type default: tuple
+    :param max_retries: Maximum number of retries of a throttled request. The default value is 4.
+    :type max_retries: int
+    :param backoff_base: Base delay of the exponential backoff in seconds. The default value is 1.0.
+    :type backoff_base: float
+    :param backoff_max: Maximum delay of the exponential backoff in seconds. The default value is 60.0.
+    :type backoff_max: float
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+    self.default = default
+    self.max_retries = max_retries
+    self.backoff_base = backoff_base
+    self.backoff_max = backoff_max
+    self.__buckets = {}
+    self.__lock = threading.Lock()
+
+
+  def __key(self, url: str) -> str:
+    """
+    Helper function to find the limits key of a URL, using the longest matching prefix.
+
+    :param url: The requested URL.
+    :type url: str
+    :return: The key of the bucket.
+    :rtype: str
+    """
+
+    parts = urlsplit(url)
+    target = (parts.hostname or '') + parts.path
+    best = parts.hostname or ''
+    for key in self.limits:
+      if target.startswith(key) and len(key) > len(best):
+        best = key
+    return best
+
+
+  def bucket(self, url: str) -> TokenBucket:
+    """
+    Get the token bucket of a URL.
+
+    :param url: The requested URL.
+    :type url: str
+    :return: The token bucket of the URL.
+    :rtype: TokenBucket
+    """
+
+    key = self.__key(url)
+    with self.__lock:
+      if key not in self.__buckets:
+        rate, capacity = self.limits.get(key, self.default)
+        self.__buckets[key] = TokenBucket(rate, capacity)
+      return self.__buckets[key]
+
+
+  def is_throttled(self, status_code: int, content: bytes) -> bool:
+    """
+    Check whether a response means that Steam throttled the request.
+
+    A 429, a server error (Steam answers with an HTML page when it is overloaded) or an empty body on a 200 is
+    throttling. A null body is a legitimate answer of some APIs (for e.g. a private inventory), so it is not retried.
+
+    :param status_code: The HTTP status code of the response.
+    :type status_code: int
+    :param content: The raw content of the response.
+    :type content: bytes
+    :return: Whether the request was throttled.
+    :rtype: bool
+    """
+
+    if status_code == 429 or status_code >= 500:
+      return True
+    return status_code == 200 and (content is None or content.strip() == b'')
+
+
+  def backoff(self, attempt: int, retry_after: str = None) -> float:
+    """
+    Get the delay before retrying a throttled request.
+
+    :param attempt: The number of the failed attempt, starting at 0.
+    :type attempt: int
+    :param retry_after: The value of the Retry-After header of the response, if any. The default value is None.
+    :type retry_after: str
+    :return: Number of seconds to wait before retrying.
+    :rtype: float
+    """
+
+    if retry_after is not None and retry_after.isdigit():
+      return min(self.backoff_max, float(retry_after))
+    delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
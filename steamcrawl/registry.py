@@ -0,0 +1,221 @@
+import json
+import os
+import threading
+import time
+
+# Registries shared by all the clients of the process that are not given their own, by (ttl, snapshot path).
+_SHARED_REGISTRIES = {}
+_SHARED_REGISTRIES_LOCK = threading.Lock()
+
+
+class AppRegistry:
+
+  def __init__(self, loader, ttl: float = 86400, path: str = None):
+    """
+    Initializing the shared registry of Steam app ids.
+
+    The registry keeps the app ids as a set of integers and the app names as a dictionary,
+    so that membership checks do not require downloading and scanning the full app list.
+
+    :param loader: Function without arguments that returns the list of apps as dictionaries with 'appid' and 'name', or None for a registry that is only filled with update(), for e.g. by a coroutine.
+    :type loader: callable
+    :param ttl: Number of seconds before the registry is refreshed. The default value is 86400 (one day).
+    :type ttl: float
+    :param path: Optional path to a local JSON snapshot of the registry. The default value is None.
+    :type path: str
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.loader = loader
+    self.ttl = ttl
+    self.path = path
+    self.__appids = frozenset()
+    self.__names = {}
+    self.__loaded_at = None
+    self.__lock = threading.Lock()
+
+    if path is not None and os.path.exists(path):
+      self.__load_snapshot()
+
+
+  def __load_snapshot(self):
+    """
+    Helper function to load the registry from the local snapshot.
+
+    :return: Nothing.
+    :rtype: None
+    """
+
+    try:
+      with open(self.path, 'r', encoding='utf-8') as f:
+        snapshot = json.load(f)
+    except (OSError, ValueError):
+      return
+
+    self.__set_apps(snapshot.get('apps', []), snapshot.get('loaded_at'))
+
+
+  def __save_snapshot(self):
+    """
+    Helper function to save the registry to the local snapshot.
+
+    :return: Nothing.
+    :rtype: None
+    """
+
+    snapshot = {
+      'loaded_at': self.__loaded_at,
+      'apps': [{'appid': appid, 'name': name} for appid, name in self.__names.items()]
+    }
+    temp_path = self.path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+      json.dump(snapshot, f)
+    os.replace(temp_path, self.path)
+
+
+  def __set_apps(self, apps: list, loaded_at: float):
+    """
+    Helper function to replace the content of the registry.
+
+    :param apps: List of apps as dictionaries with 'appid' and 'name'.
+    :type apps: list
+    :param loaded_at: The time (in seconds since the epoch) at which the apps were loaded.
+    :type loaded_at: float
+    :return: Nothing.
+    :rtype: None
+    """
+
+    names = {int(app['appid']): app.get('name', '') for app in apps}
+    self.__names = names
+    self.__appids = frozenset(names)
+    self.__loaded_at = loaded_at
+
+
+  def is_stale(self) -> bool:
+    """
+    Check whether the registry needs to be (re)loaded.
+
+    :return: Whether the registry is empty or older than its ttl.
+    :rtype: bool
+    """
+
+    if self.__loaded_at is None:
+      return True
+    return time.time() - self.__loaded_at > self.ttl
+
+
+  def update(self, apps: list):
+    """
+    Replace the content of the registry with a freshly downloaded app list.
+
+    :param apps: List of apps as dictionaries with 'appid' and 'name'.
+    :type apps: list
+    :return: Nothing.
+    :rtype: None
+    """
+
+    with self.__lock:
+      self.__set_apps(apps, time.time())
+      if self.path is not None:
+        self.__save_snapshot()
+
+
+  def refresh(self, force: bool = False, loader=None):
+    """
+    Reload the registry using the loader if it is stale. A registry without loader keeps its content until update()
+    is called, or until refresh() is given a loader.
+
+    :param force: Reload even if the registry is not stale. The default value is False.
+    :type force: bool
+    :param loader: Optional loader used if the registry has none, for e.g. the one of the client using a shared registry. The default value is None.
+    :type loader: callable
+    :return: Nothing.
+    :rtype: None
+    """
+
+    loader = self.loader if self.loader is not None else loader
+    if loader is None or (not force and not self.is_stale()):
+      return
+
+    with self.__lock:
+      if not force and not self.is_stale():
+        return
+      self.__set_apps(loader(), time.time())
+      if self.path is not None:
+        self.__save_snapshot()
+
+
+  def contains(self, appid) -> bool:
+    """
+    Check whether an app id exists.
+
+    :param appid: The id of the app.
+    :type appid: str or int
+    :return: Whether the app id exists.
+    :rtype: bool
+    """
+
+    self.refresh()
+    try:
+      return int(appid) in self.__appids
+    except ValueError:
+      return False
+
+
+  def name(self, appid) -> str:
+    """
+    Get the name of an app given its id.
+
+    :param appid: The id of the app.
+    :type appid: str or int
+    :return: The name of the app, or None if the app id does not exist.
+    :rtype: str
+    """
+
+    self.refresh()
+    return self.__names.get(int(appid))
+
+
+  def apps(self) -> list:
+    """
+    Get the list of all apps in the registry.
+
+    :return: List of apps as dictionaries with 'appid' and 'name'.
+    :rtype: list
+    """
+
+    self.refresh()
+    return [{'appid': appid, 'name': name} for appid, name in self.__names.items()]
+
+
+  def __contains__(self, appid) -> bool:
+    return self.contains(appid)
+
+
+  def __len__(self) -> int:
+    self.refresh()
+    return len(self.__appids)
+
+
+def shared_registry(ttl: float = 86400, path: str = None) -> AppRegistry:
+  """
+  Get the registry shared by all the clients of the process with the same ttl and snapshot path, so that the app list
+  is downloaded once per process instead of once per client (for e.g. per thread of a Crawler).
+
+  The shared registry has no loader: each client refreshes it with its own, and the first one to find it stale
+  downloads the app list for all of them.
+
+  :param ttl: Number of seconds before the registry is refreshed. The default value is 86400 (one day).
+  :type ttl: float
+  :param path: Optional path to a local JSON snapshot of the registry. The default value is None.
+  :type path: str
+  :return: The shared registry.
+  :rtype: AppRegistry
+  """
+
+  with _SHARED_REGISTRIES_LOCK:
+    registry = _SHARED_REGISTRIES.get((ttl, path))
+    if registry is None:
+      registry = _SHARED_REGISTRIES[(ttl, path)] = AppRegistry(None, ttl, path)
+    return registry
@@ -0,0 +1,401 @@
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+from steamcrawl.exceptions import exception
+from steamcrawl.metrics import endpoint_label
+from steamcrawl.ratelimit import TokenBucket
+
+# Base URLs of Steam that a FixtureServer stands in for.
+STEAM_BASE_URLS = ['https://steamcommunity.com', 'https://api.steampowered.com', 'https://store.steampowered.com']
+
+
+def fixture_key(url: str, params: dict = None) -> str:
+  """
+  Get the key of a recorded response. It only depends on the path and the parameters, so that a response recorded
+  from Steam is found again when it is requested from a stand-in server.
+
+  :param url: The requested URL, with or without its query string.
+  :type url: str
+  :param params: The parameters of the request. The default value is None.
+  :type params: dict
+  :return: The key of the response, made of the endpoint and a hash of the path and the parameters.
+  :rtype: str
+  """
+
+  parts = urlsplit(url)
+  query = parse_qsl(parts.query, keep_blank_values=True) + [(str(name), str(value)) for name, value in (params or {}).items()]
+  normalized = json.dumps([parts.path, sorted(query)])
+  endpoint = endpoint_label(url).strip('/').replace('/', '_') or 'root'
+  return endpoint + '-' + hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:24]
+
+
+class ReplayedResponse:
+
+  def __init__(self, status_code: int, content: bytes, headers: dict = None):
+    """
+    Initializing a response served from the fixtures, with the attributes of requests.Response that are used by the package.
+
+    :param status_code: The HTTP status code.
+    :type status_code: int
+    :param content: The raw content.
+    :type content: bytes
+    :param headers: The headers of the response. The default value is None.
+    :type headers: dict
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.status_code = status_code
+    self.content = content
+    self.headers = dict(headers or {})
+
+
+  @property
+  def text(self) -> str:
+    return self.content.decode('utf-8', errors='replace')
+
+
+class FixtureStore:
+
+  def __init__(self, directory: str):
+    """
+    Initializing a directory of recorded responses, with one JSON file per response.
+
+    The files keep the URL, the parameters, the status code, the content type and the content of each response,
+    so that they can be read and edited. The cookies are not recorded.
+
+    :param directory: Path to the fixtures directory. It is created if it does not exist.
+    :type directory: str
+    :return: Nothing.
+    :rtype: None
+    """
+
+    exception('type', directory, str, "Input directory it not a valid string type.")
+    self.directory = directory
+    os.makedirs(directory, exist_ok=True)
+    self.__lock = threading.Lock()
+
+
+  def __path(self, key: str) -> str:
+    """
+    Helper function to get the file of a response.
+
+    :param key: The key of the response.
+    :type key: str
+    :return: The path of the file.
+    :rtype: str
+    """
+
+    return os.path.join(self.directory, key + '.json')
+
+
+  def __contains__(self, key: str) -> bool:
+    return os.path.exists(self.__path(key))
+
+
+  def keys(self) -> list:
+    """
+    Get the keys of the recorded responses.
+
+    :return: The sorted keys.
+    :rtype: list
+    """
+
+    return sorted(name[:-len('.json')] for name in os.listdir(self.directory) if name.endswith('.json'))
+
+
+  def save(self, url: str, params: dict, response) -> str:
+    """
+    Record a response.
+
+    :param url: The requested URL.
+    :type url: str
+    :param params: The parameters of the request.
+    :type params: dict
+    :param response: The response, for e.g. a requests.Response.
+    :type response: requests.Response
+    :return: The key of the response.
+    :rtype: str
+    """
+
+    key = fixture_key(url, params)
+    fixture = {
+      'url': url.split('?')[0],
+      'params': {str(name): str(value) for name, value in (params or {}).items()},
+      'status_code': response.status_code,
+      'content_type': response.headers.get('Content-Type', 'application/json'),
+      # Contents that are not valid UTF-8 are kept byte for byte through the escaped surrogates.
+      'content': response.content.decode('utf-8', errors='surrogateescape')
+    }
+    path = self.__path(key)
+    with self.__lock:
+      with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(fixture, f)
+      os.replace(path + '.tmp', path)
+    return key
+
+
+  def load(self, key: str) -> ReplayedResponse:
+    """
+    Get a recorded response.
+
+    :param key: The key of the response.
+    :type key: str
+    :return: The response, or None if it was not recorded.
+    :rtype: ReplayedResponse
+    """
+
+    try:
+      with open(self.__path(key), 'r', encoding='utf-8') as f:
+        fixture = json.load(f)
+    except FileNotFoundError:
+      return None
+    return ReplayedResponse(fixture['status_code'], fixture['content'].encode('utf-8', errors='surrogateescape'),
+                            {'Content-Type': fixture['content_type']})
+
+
+class RecordingSession:
+
+  def __init__(self, fixtures: FixtureStore, session=None):
+    """
+    Initializing a session that makes the requests and records their responses, to be passed to Transport(session=...).
+
+    :param fixtures: The store where the responses are recorded.
+    :type fixtures: FixtureStore
+    :param session: The session that makes the requests. The default value is a new requests.Session.
+    :type session: requests.Session
+    :return: Nothing.
+    :rtype: None
+    """
+
+    if session is None:
+      import requests
+      session = requests.Session()
+    self.fixtures = fixtures
+    self.session = session
+
+
+  def get(self, url: str, params: dict = None, **kwargs):
+    response = self.session.get(url, params=params, **kwargs)
+    self.fixtures.save(url, params, response)
+    return response
+
+
+  def close(self):
+    self.session.close()
+
+
+class ReplaySession:
+
+  def __init__(self, fixtures: FixtureStore, latency: float = 0.0):
+    """
+    Initializing a session that serves the recorded responses without any network, to be passed to Transport(session=...).
+
+    :param fixtures: The store of the recorded responses.
+    :type fixtures: FixtureStore
+    :param latency: Number of seconds each response is delayed by. The default value is 0.0.
+    :type latency: float
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.fixtures = fixtures
+    self.latency = latency
+
+
+  def get(self, url: str, params: dict = None, **kwargs) -> ReplayedResponse:
+    key = fixture_key(url, params)
+    response = self.fixtures.load(key)
+    exception('network', response, None, f"No recorded response for {url} with {params} (fixture {key}).")
+    if self.latency > 0:
+      time.sleep(self.latency)
+    return response
+
+
+  def close(self):
+    pass
+
+
+class FixtureServer:
+
+  def __init__(self, fixtures: FixtureStore = None, responders: dict = None, latency: float = 0.0, jitter: float = 0.0,
+               throttle: tuple = None, throttle_status: int = 429, host: str = '127.0.0.1', port: int = 0):
+    """
+    Initializing a local HTTP server that stands in for Steam, serving recorded responses or generated ones.
+
+    A request is answered with its recorded response if there is one, and otherwise with the responder of the
+    longest matching path, a function taking the parameters of the request and returning the decoded JSON content,
+    the raw content of an HTML page as bytes, or a ReplayedResponse. Requests above the throttle rate are answered with throttle_status, like Steam does
+    when the rate limit of a cookie is reached. Use it with Transport(base_urls=server.base_urls()).
+
+    :param fixtures: Optional store of the recorded responses. The default value is None.
+    :type fixtures: FixtureStore
+    :param responders: Optional mapping of paths to functions generating the responses, for e.g. {'/market/pricehistory/': lambda params: {...}}. The default value is None.
+    :type responders: dict
+    :param latency: Number of seconds each response is delayed by. The default value is 0.0.
+    :type latency: float
+    :param jitter: Maximum number of seconds randomly added to the latency. The default value is 0.0.
+    :type jitter: float
+    :param throttle: Optional (rate per second, burst capacity) above which requests are throttled. The default value is None.
+    :type throttle: tuple
+    :param throttle_status: The status code of the throttled requests. The default value is 429.
+    :type throttle_status: int
+    :param host: The host the server listens on. The default value is '127.0.0.1'.
+    :type host: str
+    :param port: The port the server listens on. The default value is 0 (a free port).
+    :type port: int
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.fixtures = fixtures
+    self.responders = dict(responders or {})
+    self.latency = latency
+    self.jitter = jitter
+    self.throttle_status = throttle_status
+    self.requests = 0
+    self.throttled = 0
+    self.__bucket = TokenBucket(*throttle) if throttle is not None else None
+    self.__lock = threading.Lock()
+    self.__server = ThreadingHTTPServer((host, port), self.__handler())
+    self.__server.daemon_threads = True
+    self.__thread = None
+
+
+  @property
+  def url(self) -> str:
+    """
+    The base URL of the server.
+
+    :return: The base URL, for e.g. 'http://127.0.0.1:8000'.
+    :rtype: str
+    """
+
+    host, port = self.__server.server_address[:2]
+    return f'http://{host}:{port}'
+
+
+  def base_urls(self) -> dict:
+    """
+    Get the base URL replacements that send the requests of the package to the server.
+
+    :return: Mapping of the Steam base URLs to the URL of the server.
+    :rtype: dict
+    """
+
+    return {base: self.url for base in STEAM_BASE_URLS}
+
+
+  def respond(self, path: str) -> tuple:
+    """
+    Get the response of a request.
+
+    :param path: The path and query string of the request.
+    :type path: str
+    :return: The (status code, content type, content) of the response.
+    :rtype: tuple
+    """
+
+    with self.__lock:
+      self.requests += 1
+    delay = self.latency + (random.uniform(0, self.jitter) if self.jitter > 0 else 0)
+    if delay > 0:
+      time.sleep(delay)
+
+    if self.__bucket is not None:
+      if self.__bucket.available() < 1:
+        with self.__lock:
+          self.throttled += 1
+        return self.throttle_status, 'application/json', b''
+      self.__bucket.reserve()
+
+    if self.fixtures is not None:
+      response = self.fixtures.load(fixture_key(path))
+      if response is not None:
+        return response.status_code, response.headers['Content-Type'], response.content
+
+    parts = urlsplit(path)
+    best = None
+    for prefix in self.responders:
+      if parts.path.startswith(prefix) and (best is None or len(prefix) > len(best)):
+        best = prefix
+    if best is None:
+      return 404, 'application/json', b'null'
+
+    content = self.responders[best](dict(parse_qsl(parts.query, keep_blank_values=True)))
+    if isinstance(content, ReplayedResponse):
+      return content.status_code, content.headers.get('Content-Type', 'application/json'), content.content
+    if isinstance(content, bytes):
+      return 200, 'text/html; charset=utf-8', content
+    return 200, 'application/json', json.dumps(content).encode('utf-8')
+
+
+  def __handler(self):
+    """
+    Helper function to build the request handler class of the server.
+
+    :return: The request handler class.
+    :rtype: type
+    """
+
+    server = self
+
+    class Handler(BaseHTTPRequestHandler):
+      protocol_version = 'HTTP/1.1'
+      # The headers and the content are written separately, which Nagle's algorithm would delay on kept-alive connections.
+      disable_nagle_algorithm = True
+
+      def do_GET(self):
+        status, contentType, content = server.respond(self.path)
+        self.send_response(status)
+        self.send_header('Content-Type', contentType)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+      def log_message(self, *args):
+        pass
+
+    return Handler
+
+
+  def start(self):
+    """
+    Start serving in a background thread.
+
+    :return: The server.
+    :rtype: FixtureServer
+    """
+
+    if self.__thread is None:
+      self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+      self.__thread.start()
+    return self
+
+
+  def stop(self):
+    """
+    Stop the server.
+
+    :return: Nothing.
+    :rtype: None
+    """
+
+    if self.__thread is not None:
+      self.__server.shutdown()
+      self.__thread.join()
+      self.__thread = None
+    self.__server.server_close()
+
+
+  def __enter__(self):
+    return self.start()
+
+
+  def __exit__(self, *args):
+    self.stop()
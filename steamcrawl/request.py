@@ -1,21 +1,64 @@
-import requests
-import json
+import contextlib
 import pandas as pd
+import time
 import warnings
-from seleniumwire import webdriver
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+from steamcrawl import endpoints, history, parsing
+from steamcrawl.auth import SHARED_AUTH_CACHE, AuthCache
+from steamcrawl.cache import ResponseCache
+from steamcrawl.catalog import StoreCatalog, detail_record, price_record
+from steamcrawl.credentials import CredentialPool
+from steamcrawl.decoders import JSONDecoder
 from steamcrawl.exceptions import exception
+from steamcrawl.history import MarketHistoryStore
+from steamcrawl.itemnameid import ItemNameIdMap
+from steamcrawl.metrics import Metrics, endpoint_label, instrumented, propagated, scope
+from steamcrawl.ratelimit import DEFAULT_LIMITS, RateLimiter
+from steamcrawl.registry import AppRegistry, shared_registry
+from steamcrawl.schemas import SCHEMAS
+from steamcrawl.singleflight import SingleFlight, request_key
+from steamcrawl.transport import Transport
 
 warnings.simplefilter(action = "ignore", category = RuntimeWarning)
 
 
 class Request:
 
-  def __init__(self, steamLoginSecure: str):
+  def __init__(self, steamLoginSecure: str, appid_ttl: float = 86400, appid_snapshot: str = None, transport: Transport = None, 
+               max_workers: int = 4, cache: ResponseCache = None, item_nameid_path: str = None, decoder=None,
+               auth_cache: AuthCache = None, credentials: CredentialPool = None, metrics: Metrics = None, coalesce: bool = True,
+               app_registry: AppRegistry = None):
     """
     Initializing the class with steamLoginSecure and APIs
 
     :param steamLoginSecure: The value of your steamLoginSecure cookie.
     :type steamLoginSecure: str
+    :param appid_ttl: Number of seconds before the cached list of app ids is refreshed. The default value is 86400 (one day).
+    :type appid_ttl: float
+    :param appid_snapshot: Optional path to a local file where the list of app ids is saved, so that new processes do not download it again. The default value is None.
+    :type appid_snapshot: str
+    :param transport: Optional transport used for all HTTP requests. By default, a new pooled Transport is created.
+    :type transport: Transport
+    :param max_workers: Maximum number of pages fetched concurrently by paginated methods. The default value is 4.
+    :type max_workers: int
+    :param cache: Optional response cache set on the transport, for e.g. SQLiteCache('steam.db') or FileCache('steam_cache'). The default value is None.
+    :type cache: ResponseCache
+    :param item_nameid_path: Optional path to a local file where resolved item_nameid values are saved. The default value is None.
+    :type item_nameid_path: str
+    :param decoder: The JSON backend used to decode the responses. This includes 'msgspec', 'orjson', and 'json', or a JSONDecoder, for e.g. JSONDecoder('msgspec', typed=True) to skip the fields that the parsing does not use. The default value is None (the fastest installed backend).
+    :type decoder: str or JSONDecoder
+    :param auth_cache: Cache of the steamLoginSecure validations. The default value is SHARED_AUTH_CACHE, shared by all the clients of the process.
+    :type auth_cache: AuthCache
+    :param credentials: Optional pool of cookies over which the pricehistory and priceoverview requests are spread, for e.g. CredentialPool(['cookie 1', 'cookie 2']). The other authenticated APIs keep using steamLoginSecure. When no transport is given, the rate limits of these APIs are raised to the budget of the pool. The default value is None.
+    :type credentials: CredentialPool
+    :param metrics: Optional metrics where the requests, decode and parse times, app id validations and public method calls are recorded. It is also set on the transport if it has none. The default value is None.
+    :type metrics: Metrics
+    :param coalesce: Whether identical requests made at the same time by several threads share one fetch and its decoded content. The default value is True.
+    :type coalesce: bool
+    :param app_registry: Optional registry of the app ids. The default value is None (the registry of the process for appid_ttl and appid_snapshot, shared by all the clients, so that the app list is downloaded once).
+    :type app_registry: AppRegistry
     :return: Nothing.
     :rtype: None
     """
@@ -23,34 +66,229 @@ class Request:
     self.headers = {
       'Cookie': ''
     }
-    self.__all_listings_api = 'https://steamcommunity.com/market/search/render/?search_descriptions=0'
-    self.__appid_api = 'https://api.steampowered.com/ISteamApps/GetAppList/v2/'
-    self.__pricehistory_api = 'https://steamcommunity.com/market/pricehistory/'
-    self.__item_overview_api = 'https://steamcommunity.com/market/priceoverview/'
-    self.__listingshistory_api = 'https://steamcommunity.com/market/myhistory/render/?norender=1'
-    self.__appdetails_api = 'https://store.steampowered.com/api/appdetails/'
-    self.__inventory_api = 'https://steamcommunity.com/inventory/'
+    self.credentials = credentials
+    self.__owns_transport = transport is None
+    if transport is None and credentials is not None:
+      transport = Transport(rate_limiter=RateLimiter({**DEFAULT_LIMITS, **credentials.limits()}))
+    self.transport = transport if transport is not None else Transport()
+    if cache is not None:
+      self.transport.cache = cache
+    self.metrics = metrics
+    if metrics is not None and self.transport.metrics is None:
+      self.transport.metrics = metrics
+    self.max_workers = max_workers
+    self.decoder = decoder if isinstance(decoder, JSONDecoder) else JSONDecoder(decoder)
+    self.single_flight = SingleFlight(self.__record_shared) if coalesce else None
+    self.auth_cache = auth_cache if auth_cache is not None else SHARED_AUTH_CACHE
+    self.page_size = 100
+    self.inventory_page_size = 2000
+    self.__all_listings_api = endpoints.ALL_LISTINGS_API
+    self.__appid_api = endpoints.APPID_API
+    self.__pricehistory_api = endpoints.PRICEHISTORY_API
+    self.__item_overview_api = endpoints.ITEM_OVERVIEW_API
+    self.__listingshistory_api = endpoints.LISTINGSHISTORY_API
+    self.__appdetails_api = endpoints.APPDETAILS_API
+    self.__inventory_api = endpoints.INVENTORY_API
+    self.__listing_page = endpoints.LISTING_PAGE
+    self.__orders_histogram_api = endpoints.ORDERS_HISTOGRAM_API
+    self.item_nameids = ItemNameIdMap(item_nameid_path)
+    self.app_registry = app_registry if app_registry is not None else shared_registry(appid_ttl, appid_snapshot)
 
     self.set_steam_auth(steamLoginSecure)
 
 
-  def set_steam_auth(self, steamLoginSecure: str):
+  def __enter__(self):
+    return self
+
+
+  def __exit__(self, *args):
+    self.close()
+
+
+  def close(self):
+    """
+    Merge the log of the resolved item_nameid values into their local file, and close the pooled connections of the
+    transport if it was created by the Request object.
+
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.item_nameids.close()
+    if self.__owns_transport:
+      self.transport.close()
+
+
+  def set_steam_auth(self, steamLoginSecure: str, validate: bool = False):
     """
     Set the steamLoginSecure id as headers.
 
+    The cookie is validated on the first authenticated call, with one request whose result is kept in the auth cache.
+
     :param steamLoginSecure: The value of your steamLoginSecure cookie.
     :type steamLoginSecure: str
+    :param validate: Whether to validate the cookie now instead of on the first authenticated call. The default value is False.
+    :type validate: bool
     :return: Nothing.
     :rtype: None
     """
 
     exception('type', steamLoginSecure, str, "Input steamLoginSecure it not a valid string type.")
-    header = 'steamLoginSecure=' + steamLoginSecure + ';'
-    testApi = 'https://steamcommunity.com/market/pricehistory/?appid=730&market_hash_name=P90%20%7C%20Blind%20Spot%20(Field-Tested)'
-    requestObject = requests.get(testApi, headers={'Cookie': header}).content
-    jsonObject = json.loads(requestObject)
-    exception('network', jsonObject, [], "Input header it not an authorized cookie header.")
-    self.headers['Cookie'] = header
+    self.headers['Cookie'] = 'steamLoginSecure=' + steamLoginSecure + ';'
+    if validate:
+      self.__check_auth()
+
+
+  def __validate_cookie(self, header: str) -> bool:
+    """
+    Helper function to check with Steam whether a Cookie header is authorized.
+
+    :param header: The Cookie header.
+    :type header: str
+    :return: Whether the cookie is authorized.
+    :rtype: bool
+    """
+
+    requestObject = self.transport.get(endpoints.AUTH_TEST_API, headers={'Cookie': header}).content
+    return parsing.decode_json(requestObject, self.decoder, endpoints.AUTH_TEST_API) != []
+
+
+  def __check_auth(self, rotated: bool = False):
+    """
+    Helper function to check that the steamLoginSecure cookie is set and authorized, validating it once if needed.
+
+    :param rotated: Whether the call only uses the APIs rotated over the credential pool, whose cookies are validated when they are picked. The default value is False.
+    :type rotated: bool
+    :return: Nothing.
+    :rtype: None
+    """
+
+    if rotated and self.credentials is not None:
+      return
+    exception('network', self.headers['Cookie'], '', 
+      "Cookie not authorized. Please set your steamLoginSecure first using set_steam_auth().")
+    authorized = self.auth_cache.check(self.headers['Cookie'], self.__validate_cookie)
+    exception('network', authorized, False, "Input header it not an authorized cookie header.")
+
+
+  def __fetch_json(self, api: str, params: dict, headers: dict):
+    """
+    Helper function to make a request and decode its JSON content. Identical requests made at the same time share
+    one fetch and its decoded content.
+
+    :param api: The requested API URL.
+    :type api: str
+    :param params: The parameters of the request.
+    :type params: dict
+    :param headers: The headers of the request.
+    :type headers: dict
+    :return: The decoded JSON content of the response.
+    :rtype: dict
+    """
+
+    def fetch():
+      requestObject = self.transport.get(api, params=params, headers=headers)
+      with self.__timer('steamcrawl_decode_seconds', api):
+        return parsing.decode_json(requestObject.content, self.decoder, api)
+    return self.__coalesced(request_key(api, params, headers.get('Cookie', '')), fetch)
+
+
+  def __coalesced(self, key: tuple, fetch):
+    """
+    Helper function to run a fetch through the single-flight group, when coalescing is enabled.
+
+    :param key: The key of the request.
+    :type key: tuple
+    :param fetch: The function making the request and decoding its content.
+    :type fetch: callable
+    :return: The decoded JSON content of the response.
+    :rtype: dict
+    """
+
+    if self.single_flight is None:
+      return fetch()
+    return self.single_flight.do(key, fetch)
+
+
+  def __record_shared(self, key: tuple):
+    """
+    Helper function to count a request that got the content of an identical outstanding request, when metrics are set.
+
+    :param key: The key of the request.
+    :type key: tuple
+    :return: Nothing.
+    :rtype: None
+    """
+
+    if self.metrics is not None:
+      self.metrics.increment('steamcrawl_coalesced_total', endpoint=endpoint_label(key[0]))
+
+
+  def __timer(self, name: str, api: str):
+    """
+    Helper function to observe the duration of a block for an API, when metrics are set.
+
+    :param name: The name of the histogram, for e.g. 'steamcrawl_parse_seconds'.
+    :type name: str
+    :param api: The requested API URL.
+    :type api: str
+    :return: Context manager observing the duration of the block.
+    :rtype: contextlib.AbstractContextManager
+    """
+
+    if self.metrics is None:
+      return contextlib.nullcontext()
+    return self.metrics.timer(name, endpoint=endpoint_label(api))
+
+
+  def __fetch_rotated(self, api: str, params: dict):
+    """
+    Helper function to make a request of the pricehistory or priceoverview API and decode its JSON content.
+
+    With a credential pool, the request uses the next cookie of the pool, which is validated the first time it is
+    picked. When Steam returns an empty body, [] or null, the failure is reported to the pool and the request is
+    made again with another cookie, up to once per cookie. Identical requests made at the same time share one fetch,
+    whichever cookie it uses.
+
+    :param api: The requested API URL.
+    :type api: str
+    :param params: The parameters of the request.
+    :type params: dict
+    :return: The decoded JSON content of the response.
+    :rtype: dict
+    """
+
+    if self.credentials is None:
+      return self.__fetch_json(api, params, self.headers)
+    return self.__coalesced(request_key(api, params, 'credentials'), lambda: self.__fetch_pooled(api, params))
+
+
+  def __fetch_pooled(self, api: str, params: dict):
+    """
+    Helper function to make a request with the cookies of the credential pool and decode its JSON content.
+
+    :param api: The requested API URL.
+    :type api: str
+    :param params: The parameters of the request.
+    :type params: dict
+    :return: The decoded JSON content of the response.
+    :rtype: dict
+    """
+
+    attempts = 0
+    while attempts < len(self.credentials):
+      header = self.credentials.acquire()
+      if not self.auth_cache.check(header, self.__validate_cookie):
+        self.credentials.disable(header)
+        continue
+      requestObject = self.transport.get(api, params=params, headers={**self.headers, 'Cookie': header})
+      attempts += 1
+      isEmpty = requestObject.status_code == 429 or requestObject.content.strip() in (b'', b'null', b'[]')
+      self.credentials.report(header, not isEmpty)
+      if not isEmpty:
+        break
+    with self.__timer('steamcrawl_decode_seconds', api):
+      return parsing.decode_json(requestObject.content, self.decoder, api)
 
 
   def __request_helper(self, api: str, params: dict, headers: dict, index: list):
@@ -65,42 +303,115 @@ class Request:
     :type headers: dict
     :param index: List of indices that needs to be extracted.
     :type index: list
-    :return: Nothing.
-    :rtype: None
+    :return: The extracted indices.
+    :rtype: list
     """
 
-    dfGather = []
-    requestObject = requests.get(api, params=params, headers=headers)
-    contentObject = json.loads(requestObject.content)
-    exception('network', contentObject, None, "No information for this API call. Please double check your parameters and try again.")
+    contentObject = self.__fetch_json(api, params, headers)
+    return parsing.extract_indices(contentObject, params, index)
 
-    for i in index:
-      if i in contentObject:
-        if contentObject[i] != []:
-          dfGather.append(contentObject[i])
 
-    exception('network', dfGather, [], "No information for this API call. Please double check your parameters and try again.")
+  def __iter_pages(self, api: str, params: dict, index: list, count: int, parse, start: int = 0, as_records: bool = False,
+                   clamp: bool = False):
+    """
+    Helper function to fetch the pages of a paginated API concurrently and yield them in order as they arrive.
 
-    if 'success' in contentObject:
-      isSuccess = contentObject['success']
-      exception('network', isSuccess, False, "Steam cannot make this API call. Please double check your parameters and try again.")
+    The first page is fetched alone to check count against total_count. The remaining pages are fetched on a
+    thread pool of at most max_workers threads, with at most max_workers pages in flight, so that only a few
+    pages are kept in memory.
 
-    elif 'success' in contentObject[index[0]]:
-      isSuccess = contentObject[index[0]]['success']
-      exception('network', isSuccess, False, "There is no information for this app.")
-      exception('network', isSuccess, 0, "There is no information for this app.")
-    
-    if 'total_count' in contentObject and 'count' in params:
-      maxPage = contentObject['total_count']
-      exception('exceed', params['count'], maxPage, f"{params['count']} is larger than the maximum number of count {maxPage}.")
+    :param api: The requested API URL.
+    :type api: str
+    :param params: The parameters of the request, without 'start' and 'count'.
+    :type params: dict
+    :param index: List of indices that needs to be extracted.
+    :type index: list
+    :param count: The total number of entries that needs to be extracted, or None for all the entries from start.
+    :type count: int
+    :param parse: Function applied to the extracted indices of each page.
+    :type parse: callable
+    :param start: The offset of the first entry. The default value is 0.
+    :type start: int
+    :param as_records: Whether to yield the pages as lists of dictionaries instead of data frames. The default value is False.
+    :type as_records: bool
+    :param clamp: Whether to stop at total_count instead of raising when there are fewer than start + count entries. The default value is False.
+    :type clamp: bool
+    :return: Generator of the parsed pages, in order.
+    :rtype: generator
+    """
 
-    elif 'total_inventory_count' in contentObject and 'count' in params:
-      maxPage = contentObject['total_inventory_count']
-      exception('exceed', params['count'], maxPage, f"{params['count']} is larger than the maximum number of count {maxPage}.")
+    pageSize = self.page_size
+    convert = (lambda df: df.to_dict('records')) if as_records else (lambda df: df)
+
+    firstParams = dict(params, start=start, count=pageSize if count is None else min(count, pageSize))
+    with scope(page=start):
+      contentObject = self.__fetch_json(api, firstParams, self.headers)
+      totalCount = contentObject.get('total_count')
+      if clamp and contentObject.get('success') and totalCount is not None and start >= totalCount:
+        return
+      if count is None or clamp:
+        checkParams = {name: value for name, value in firstParams.items() if name != 'count'}
+      else:
+        checkParams = dict(firstParams, count=start + count)
+      with self.__timer('steamcrawl_parse_seconds', api):
+        firstPage = parse(parsing.extract_indices(contentObject, checkParams, index))
+    yield convert(firstPage)
+
+    if count is None:
+      count = max(0, (totalCount or 0) - start)
+    elif clamp and totalCount is not None:
+      count = min(count, totalCount - start)
+
+    def fetch_page(offset):
+      pageParams = dict(params, start=offset, count=min(pageSize, start + count - offset))
+      with scope(page=offset):
+        extracted = self.__request_helper(api, pageParams, self.headers, index)
+        with self.__timer('steamcrawl_parse_seconds', api):
+          return parse(extracted)
+    fetch_page = propagated(fetch_page)
+
+    offsets = range(start + pageSize, start + count, pageSize)
+    if len(offsets) == 0:
+      return
+
+    pending = deque()
+    executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(offsets)))
+    try:
+      for offset in offsets:
+        pending.append(executor.submit(fetch_page, offset))
+        if len(pending) >= self.max_workers:
+          yield convert(pending.popleft().result())
+      while len(pending) > 0:
+        yield convert(pending.popleft().result())
+    finally:
+      # Pages that were not started are dropped when the generator is closed early.
+      for future in pending:
+        future.cancel()
+      executor.shutdown(wait=True)
+
+
+  def __pagination_helper(self, api: str, params: dict, index: list, count: int, parse) -> list:
+    """
+    Helper function to fetch all the pages of a paginated API concurrently.
 
-    return dfGather
-  
-  
+    :param api: The requested API URL.
+    :type api: str
+    :param params: The parameters of the request, without 'start' and 'count'.
+    :type params: dict
+    :param index: List of indices that needs to be extracted.
+    :type index: list
+    :param count: The total number of entries that needs to be extracted.
+    :type count: int
+    :param parse: Function applied to the extracted indices of each page.
+    :type parse: callable
+    :return: The parsed pages, in order.
+    :rtype: list
+    """
+
+    return list(self.__iter_pages(api, params, index, count, parse))
+
+
+  @instrumented
   def get_all_listings(self, sortby: str='', sortdir: str='desc', count: int = 100) -> pd.DataFrame:
     """
     Get listings of items exactly as how they are ordered in the community market.
@@ -125,41 +436,18 @@ class Request:
     params = {
       'sort_column': sortby,
       'sort_dir': sortdir,
-      'start': 0, 
-      'count': count,
       'norender': 1
     }
 
-    jsonObject = self.__request_helper(self.__all_listings_api, params, self.headers, ['results'])[0]
-
     if count == 0:
       return pd.DataFrame()
-    
-    if count <= 100: 
-      return pd.json_normalize(jsonObject)
-    
-    else:
-      remainCount = count % 100
-      params['count'] = 100
-      dfCombined = []
-
-      for i in range(0, count - remainCount, 100):
-        params['start'] = i
 
-        jsonObject = self.__request_helper(self.__all_listings_api, params, self.headers, ['results'])[0]
-        dfCombined.append(pd.json_normalize(jsonObject))
+    pages = self.__pagination_helper(self.__all_listings_api, params, ['results'], count, parsing.parse_listings)
 
-      if remainCount == 0:
-        return pd.concat(dfCombined, ignore_index=True)
-      
-      else:
-        params['start'] = count - remainCount
-        params['count'] = remainCount
-        jsonObject = self.__request_helper(self.__all_listings_api, params, self.headers, ['results'])[0]
-        dfCombined.append(pd.json_normalize(jsonObject))
-        return pd.concat(dfCombined, ignore_index=True)
+    return parsing.concat_frames(pages, SCHEMAS['listings'])
 
 
+  @instrumented
   def get_app_listings(self, appid: str, sortby: str='', sortdir: str='desc', count: int=100) -> pd.DataFrame:
     """
     Get listings of items from a specific app exactly as how they are ordered in the community market listing.
@@ -185,59 +473,185 @@ class Request:
     exception('contain', sortdir, ['desc', 'asc'], 
       f"{sortdir} is not valid as a sortby type. It should only be 'desc' or 'asc'.")
     if appid != '':
-      exception('contain', int(appid), list(self.get_all_appid()['appid']), 
-        f"{appid} is not a valid appid. Please check the complete list using get_all_appid().")
+      self.__validate_appid(appid)
     
     params = {
       'sort_column': sortby,
       'sort_dir': sortdir,
       'appid': appid,
-      'start': 0, 
-      'count': count,
       'norender': 1
     }
 
-    jsonObject = self.__request_helper(self.__all_listings_api, params, self.headers, ['results'])[0]
-
     if count == 0:
       return pd.DataFrame()
-    
-    if count <= 100: 
-      return pd.json_normalize(jsonObject)
-    
-    else:
-      remainCount = count % 100
-      params['count'] = 100
-      dfCombined = []
 
-      for i in range(0, count - remainCount, 100):
-        params['start'] = i
+    pages = self.__pagination_helper(self.__all_listings_api, params, ['results'], count, parsing.parse_listings)
 
-        jsonObject = self.__request_helper(self.__all_listings_api, params, self.headers, ['results'])[0]
-        dfCombined.append(pd.json_normalize(jsonObject))
+    return parsing.concat_frames(pages, SCHEMAS['listings'])
 
-      if remainCount == 0:
-        return pd.concat(dfCombined, ignore_index=True)
-      
-      else:
-        params['count'] = remainCount
-        jsonObject = self.__request_helper(self.__all_listings_api, params, self.headers, ['results'])[0]
-        dfCombined.append(pd.json_normalize(jsonObject))
-        return pd.concat(dfCombined, ignore_index=True)
-    
 
-  def get_all_appid(self) -> pd.DataFrame:
+  def iter_all_listings(self, sortby: str='', sortdir: str='desc', count: int = None, start: int = 0, as_records: bool = False,
+                        clamp: bool = False):
+    """
+    Iterate over the listings of items of the community market, one page at a time as soon as it arrives.
+
+    :param sortby: Type of listings sorting. This includes '', 'price', and 'quantity'. The default value is ''.
+    :type sortby: str
+    :param sortdir: Direction of listings sorting. This includes 'asc' and 'desc'. The default value is 'desc'.
+    :type sortdir: str
+    :param count: Number of item listings to iterate over. The default value is None (all the listings from start).
+    :type count: int
+    :param start: The offset of the first listing. The default value is 0.
+    :type start: int
+    :param as_records: Whether to yield the pages as lists of dictionaries instead of data frames. The default value is False.
+    :type as_records: bool
+    :param clamp: Whether to stop at the last listing instead of raising when there are fewer than start + count listings, for e.g. when the market shrank since count was taken. The default value is False.
+    :type clamp: bool
+    :return: Generator of the pages of listings.
+    :rtype: generator
+    """
+
+    exception('type', sortby, str, "Input sortby it not a valid string type.")
+    exception('type', sortdir, str, "Input sortdir it not a valid string type.")
+    exception('type', start, int, "Input start it not a valid integer type.")
+    if count is not None:
+      exception('type', count, int, "Input count it not a valid integer type.")
+    exception('contain', sortby, ['price', 'quantity', ''], 
+      f"{sortby} is not valid as a sortby type. It should only be '', 'price', or 'quantity'.")
+    exception('contain', sortdir, ['desc', 'asc'], 
+      f"{sortdir} is not valid as a sortby type. It should only be 'desc' or 'asc'.")
+
+    params = {
+      'sort_column': sortby,
+      'sort_dir': sortdir,
+      'norender': 1
+    }
+
+    if count == 0:
+      return iter([])
+
+    return self.__iter_pages(self.__all_listings_api, params, ['results'], count, parsing.parse_listings, start, as_records, clamp)
+
+
+  def iter_app_listings(self, appid: str, sortby: str='', sortdir: str='desc', count: int = None, start: int = 0, as_records: bool = False,
+                        clamp: bool = False):
+    """
+    Iterate over the listings of items from a specific app, one page at a time as soon as it arrives.
+
+    :param appid: Filter by app, given the id.
+    :type appid: str
+    :param sortby: Type of listings sorting. This includes '', 'price', 'quantity', and 'name'. The default value is ''.
+    :type sortby: str
+    :param sortdir: Direction of listings sorting. This includes 'asc' and 'desc'. The default value is 'desc'.
+    :type sortdir: str
+    :param count: Number of item listings to iterate over. The default value is None (all the listings from start).
+    :type count: int
+    :param start: The offset of the first listing. The default value is 0.
+    :type start: int
+    :param as_records: Whether to yield the pages as lists of dictionaries instead of data frames. The default value is False.
+    :type as_records: bool
+    :param clamp: Whether to stop at the last listing instead of raising when there are fewer than start + count listings, for e.g. when the market shrank since count was taken. The default value is False.
+    :type clamp: bool
+    :return: Generator of the pages of listings.
+    :rtype: generator
+    """
+
+    exception('type', sortby, str, "Input sortby it not a valid string type.")
+    exception('type', sortdir, str, "Input sortdir it not a valid string type.")
+    exception('type', appid, str, "Input appid it not a valid string type.")
+    exception('type', start, int, "Input start it not a valid integer type.")
+    if count is not None:
+      exception('type', count, int, "Input count it not a valid integer type.")
+    exception('contain', sortby, ['price', 'quantity', 'name', ''], 
+      f"{sortby} is not valid as a sortby type. It should only be '', 'price', 'quantity', or 'name'.")
+    exception('contain', sortdir, ['desc', 'asc'], 
+      f"{sortdir} is not valid as a sortby type. It should only be 'desc' or 'asc'.")
+    if appid != '':
+      self.__validate_appid(appid)
+
+    params = {
+      'sort_column': sortby,
+      'sort_dir': sortdir,
+      'appid': appid,
+      'norender': 1
+    }
+
+    if count == 0:
+      return iter([])
+
+    return self.__iter_pages(self.__all_listings_api, params, ['results'], count, parsing.parse_listings, start, as_records, clamp)
+
+
+  @instrumented
+  def get_listings_count(self, appid: str = '') -> int:
+    """
+    Get the total number of item listings of the community market, or of a specific app.
+
+    :param appid: Filter by app, given the id. The default value is '' (all the apps).
+    :type appid: str
+    :return: The total number of item listings.
+    :rtype: int
+    """
+
+    exception('type', appid, str, "Input appid it not a valid string type.")
+    if appid != '':
+      self.__validate_appid(appid)
+
+    params = {
+      'appid': appid,
+      'start': 0,
+      'count': 1,
+      'norender': 1
+    }
+
+    contentObject = self.__fetch_json(self.__all_listings_api, params, self.headers)
+    exception('contain', 'total_count', contentObject, "No information for this API call. Please double check your parameters and try again.")
+    return int(contentObject['total_count'])
+
+
+  def __load_all_appid(self) -> list:
+    """
+    Helper function to download the list of all apps id.
+
+    :return: List of all apps as dictionaries with 'appid' and 'name'.
+    :rtype: list
+    """
+
+    return self.__request_helper(self.__appid_api, {}, self.headers, ['applist'])[0]['apps']
+
+
+  def __validate_appid(self, appid: str):
+    """
+    Helper function to check that an app id exists using the cached app registry.
+
+    :param appid: The id of the app.
+    :type appid: str
+    :return: Nothing.
+    :rtype: None
+    """
+
+    with self.__timer('steamcrawl_validate_appid_seconds', self.__appid_api):
+      self.app_registry.refresh(loader=self.__load_all_appid)
+      exception('contain', int(appid), self.app_registry, 
+        f"{appid} is not a valid appid. Please check the complete list using get_all_appid().")
+
+
+  @instrumented
+  def get_all_appid(self, refresh: bool = False) -> pd.DataFrame:
     """
     Get the list of all apps id
 
+    :param refresh: Download the list again instead of using the cached app registry. The default value is False.
+    :type refresh: bool
     :return: List of all apps id.
     :rtype: pd.DataFrame
     """
     
-    jsonObject = self.__request_helper(self.__appid_api, {}, self.headers, ['applist'])[0]['apps']
-    return pd.json_normalize(jsonObject)
+    self.app_registry.refresh(force=refresh, loader=self.__load_all_appid)
+    return pd.DataFrame(self.app_registry.apps(), columns=['appid', 'name'])
   
   
+  @instrumented
   def get_app_details(self, appid: str):
     """
     Get the details of an app given its id.
@@ -250,17 +664,95 @@ class Request:
 
     exception('type', appid, str, "Input appid it not a valid string type.")
     if appid != '':
-      exception('contain', int(appid), list(self.get_all_appid()['appid']), 
-        f"{appid} is not a valid appid. Please check the complete list using get_all_appid().")
+      self.__validate_appid(appid)
       
     params = {
       'appids': appid
     }
 
-    jsonObject = self.__request_helper(self.__appdetails_api, params, self.headers, [appid])[0]
-    return pd.json_normalize(jsonObject['data'])
+    extracted = self.__request_helper(self.__appdetails_api, params, self.headers, [appid])
+    with self.__timer('steamcrawl_parse_seconds', self.__appdetails_api):
+      return parsing.parse_app_details(extracted)
   
 
+  @instrumented
+  def sync_store_catalog(self, catalog: StoreCatalog, max_age: float = None, prices: bool = True, limit: int = None,
+                         batch_size: int = 100, country: str = None) -> pd.DataFrame:
+    """
+    Refresh a local catalog of the Steam store.
+
+    The app list is downloaded and diffed against the catalog, and only the details of the new, renamed or stale apps
+    are fetched, concurrently under the rate limiter and stored as they arrive, so that an interrupted sync resumes
+    where it stopped. The prices of the apps that are not free are then checked in batches of batch_size app ids,
+    which the appdetails API accepts when it is filtered on price_overview.
+
+    :param catalog: The local catalog of the store.
+    :type catalog: StoreCatalog
+    :param max_age: Optional age in seconds above which the details of an app are fetched again, for e.g. 30 * 86400. The default value is None (only new and renamed apps).
+    :type max_age: float
+    :param prices: Whether to check the prices of the apps. The default value is True.
+    :type prices: bool
+    :param limit: Optional maximum number of apps whose details are fetched, for e.g. to spread the first sync over several runs. The default value is None.
+    :type limit: int
+    :param batch_size: Number of app ids of each price request, and of the details stored at once. The default value is 100.
+    :type batch_size: int
+    :param country: Optional country code of the prices, for e.g. 'us'. The default value is None (the country of the request).
+    :type country: str
+    :return: The changes of the catalog, with the appid, name and change of each app ('new', 'renamed', 'removed', 'details', 'price' or 'failed').
+    :rtype: pd.DataFrame
+    """
+
+    exception('type', catalog, StoreCatalog, "Input catalog it not a valid StoreCatalog type.")
+    exception('type', batch_size, int, "Input batch_size it not a valid integer type.")
+
+    self.app_registry.refresh(force=True, loader=self.__load_all_appid)
+    names = {app['appid']: app['name'] for app in self.app_registry.apps()}
+    diff = catalog.update_apps([{'appid': appid, 'name': name} for appid, name in names.items()])
+    changes = [(appid, name, change) for change in ['new', 'renamed', 'removed'] for appid, name in diff[change]]
+    params = {} if country is None else {'cc': country}
+
+    def fetch_details(appid):
+      try:
+        contentObject = self.__fetch_json(self.__appdetails_api, {'appids': appid, **params}, self.headers)
+        return appid, detail_record(appid, contentObject.get(str(appid)) or {}, time.time())
+      except Exception:
+        # The app stays pending, and is fetched again by the next sync.
+        return appid, None
+
+    def fetch_prices(appids):
+      try:
+        contentObject = self.__fetch_json(self.__appdetails_api, {'appids': ','.join(map(str, appids)), 'filters': 'price_overview', **params}, self.headers)
+      except Exception:
+        return []
+      checked = time.time()
+      return [price_record(appid, contentObject.get(str(appid)) or {}, checked) for appid in appids]
+
+    pending = catalog.pending(max_age)
+    if limit is not None:
+      pending = pending[:limit]
+
+    with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+      records = []
+      for appid, record in executor.map(propagated(fetch_details), pending):
+        if record is None:
+          changes.append((appid, names.get(appid, ''), 'failed'))
+          continue
+        records.append(record)
+        if len(records) >= batch_size:
+          changes += [(changed, names.get(changed, ''), 'details') for changed in catalog.store_details(records)]
+          records = []
+      changes += [(changed, names.get(changed, ''), 'details') for changed in catalog.store_details(records)]
+
+      if prices:
+        priced = catalog.priced()
+        batches = [priced[i:i + batch_size] for i in range(0, len(priced), batch_size)]
+        for records in executor.map(propagated(fetch_prices), batches):
+          changes += [(changed, names.get(changed, ''), 'price') for changed in catalog.store_prices(records)]
+
+    return pd.DataFrame(changes, columns=['appid', 'name', 'change'])
+
+
+  @instrumented
   def get_item_overview(self, item_name: str, appid: str) -> pd.DataFrame:
     """
     Get the overview (median price, volume) of an item.
@@ -275,25 +767,36 @@ class Request:
 
     exception('type', item_name, str, "Input item_name it not a valid string type.")
     exception('type', appid, str, "Input appid it not a valid string type.")
-    exception('network', self.headers['Cookie'], '', 
-      "Cookie not authorized. Please set your steamLoginSecure first using set_steam_auth().")
+    self.__check_auth(rotated=True)
     if appid != '':
-      exception('contain', int(appid), list(self.get_all_appid()['appid']), 
-        f"{appid} is not a valid appid. Please check the complete list using get_all_appid().")
+      self.__validate_appid(appid)
+
+    return self.__item_overview_helper(item_name, appid)
+
+
+  def __item_overview_helper(self, item_name: str, appid: str) -> pd.DataFrame:
+    """
+    Helper function to request the overview of an item, without validating the inputs.
+
+    :param item_name: The precise market name of the item.
+    :type item_name: str
+    :param appid: The id of the app.
+    :type appid: str
+    :return: The overview (median price, volume) of an item.
+    :rtype: pd.DataFrame
+    """
 
     params = {
       'appid': appid,
       'market_hash_name': item_name
     }
 
-    requestObject = requests.get(self.__item_overview_api, params=params, headers=self.headers)
-    jsonObject = json.loads(requestObject.content)
-    exception('contain', 'volume', jsonObject, "No information for this item.")
-    isSuccess = jsonObject['success']
-    exception('network', isSuccess, False, "Steam cannot make this API call. Please double check your parameters and try again.")
-    return pd.json_normalize(jsonObject).drop(['success'], axis=1)
-    
+    contentObject = self.__fetch_rotated(self.__item_overview_api, params)
+    with self.__timer('steamcrawl_parse_seconds', self.__item_overview_api):
+      return parsing.parse_item_overview(contentObject)
+
 
+  @instrumented
   def get_price_history(self, item_name: str, appid: str) -> pd.DataFrame:
     """
     Get the price history of an item.
@@ -308,127 +811,100 @@ class Request:
 
     exception('type', item_name, str, "Input item_name it not a valid string type.")
     exception('type', appid, str, "Input appid it not a valid string type.")
-    exception('network', self.headers['Cookie'], '', 
-      "Cookie not authorized. Please set your steamLoginSecure first using set_steam_auth().")
+    self.__check_auth(rotated=True)
     if appid != '':
-      exception('contain', int(appid), list(self.get_all_appid()['appid']), 
-        f"{appid} is not a valid appid. Please check the complete list using get_all_appid().")
+      self.__validate_appid(appid)
+
+    return self.__price_history_helper(item_name, appid)
+
+
+  def __price_history_helper(self, item_name: str, appid: str) -> pd.DataFrame:
+    """
+    Helper function to request the price history of an item, without validating the inputs.
+
+    :param item_name: The precise market name of the item.
+    :type item_name: str
+    :param appid: The id of the app.
+    :type appid: str
+    :return: The price history of an item.
+    :rtype: pd.DataFrame
+    """
 
     params = {
       'appid': appid,
       'market_hash_name': item_name
     }
 
-    jsonObject = self.__request_helper(self.__pricehistory_api, params, self.headers, ['prices'])[0]
-    df = pd.read_json(json.dumps(jsonObject))
-    df[0] = df[0].apply(lambda x: x[0:11])
-    pd.to_datetime(df[0], format='%b %d %Y')
-    df = df.set_axis(['date', 'median_price', 'volume_sold'], axis=1, copy=False)
-    return df
+    contentObject = self.__fetch_rotated(self.__pricehistory_api, params)
+    with self.__timer('steamcrawl_parse_seconds', self.__pricehistory_api):
+      return parsing.parse_price_history(parsing.extract_indices(contentObject, params, ['prices']))
 
 
-  def __move_column_inplace(self, df, col, pos):
+  def __batch_helper(self, items, fetch, schema: dict = None) -> pd.DataFrame:
+    """
+    Helper function to fetch data for many items concurrently.
+
+    Each item is validated and fetched on its own, so that an error is recorded in the 'error' column
+    of that item instead of aborting the whole batch.
+
+    :param items: Iterable of (item_name, appid) pairs.
+    :type items: iterable
+    :param fetch: Function taking an item name and an app id and returning a data frame.
+    :type fetch: callable
+    :param schema: Optional schema applied to the combined data frame. The default value is None.
+    :type schema: dict
+    :return: The data of all items in long format, keyed by 'item_name' and 'appid'.
+    :rtype: pd.DataFrame
     """
-    Helper function to move columns of a data frame to a specified position.
 
-    :param df: The data frame that needs to move columns.
-    :type df: pd.DataFrame
-    :param col: The name of the column that needs to be moved.
-    :type col: str
-    :param pos: The new index that the column is going to move to.
-    :type pos: int
-    :return: Nothing.
-    :rtype: None
+    self.__check_auth(rotated=True)
+
+    def fetch_item(item):
+      item_name, appid = item
+      try:
+        exception('type', item_name, str, "Input item_name it not a valid string type.")
+        exception('type', appid, str, "Input appid it not a valid string type.")
+        if appid != '':
+          self.__validate_appid(appid)
+        return item_name, appid, fetch(item_name, appid), None
+      except Exception as e:
+        return item_name, appid, None, str(e)
+
+    with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+      results = list(executor.map(propagated(fetch_item), items))
+
+    return parsing.parse_batch(results, schema=schema)
+
+
+  @instrumented
+  def get_item_overview_many(self, items) -> pd.DataFrame:
     """
-    
-    col = df.pop(col)
-    df.insert(pos, col.name, col)
+    Get the overview (median price, volume) of many items.
+
+    :param items: Iterable of (item_name, appid) pairs.
+    :type items: iterable
+    :return: The overview of all items, keyed by 'item_name' and 'appid', with the error of each failed item in the 'error' column.
+    :rtype: pd.DataFrame
+    """
+
+    return self.__batch_helper(items, self.__item_overview_helper, SCHEMAS['item_overview'])
 
 
-  def __market_history_helper(self, index: list) -> pd.DataFrame:
+  @instrumented
+  def get_price_history_many(self, items) -> pd.DataFrame:
     """
-    Helper function to extract market history.
+    Get the price history of many items.
 
-    :param index: List of indices that needs to be extracted.
-    :type index: list
-    :return: The extracted data as a data frame.
+    :param items: Iterable of (item_name, appid) pairs.
+    :type items: iterable
+    :return: The price history of all items in long format, keyed by 'item_name' and 'appid', with the error of each failed item in the 'error' column.
     :rtype: pd.DataFrame
     """
 
-    dfCombinedAssets = []
-    dfCombinedEvents = []
-    dfCombinedListings = []
-    dfCombinedPurchases = []
-
-    for key in index[0]:
-      gameJsonObject = index[0][key]
-      for contextid in gameJsonObject:
-        itemJsonObject = gameJsonObject[contextid]
-        for listingid in itemJsonObject:
-          dfCombinedAssets.append(pd.json_normalize(itemJsonObject[listingid]))
-    dfCombinedAssets = pd.concat(dfCombinedAssets)
-    dfCombinedAssets.rename({'id': 'asset.id'}, axis=1, inplace=True)
-    dfCombinedAssets = dfCombinedAssets.drop(['currency', 'background_color'], axis=1)
-
-    dfCombinedEvents = pd.json_normalize(index[1])
-    dfCombinedEvents = dfCombinedEvents.drop(['time_event_fraction', 'date_event'], axis=1)
-    dfCombinedEvents = dfCombinedEvents.replace({'event_type': {1: 'List', 2: 'Cancel', 3: 'Sell', 4: 'Buy'}})
-
-    dfCombinedEvents['time_event'] = pd.to_datetime(dfCombinedEvents['time_event'], unit='s')
-
-    for key in index[2]:
-      dfCombinedListings.append(pd.json_normalize(index[2][key]))
-    dfCombinedListings = pd.concat(dfCombinedListings)
-    dfCombinedListings = dfCombinedListings.drop(['currencyid', 'asset.contextid', 'asset.appid', 'asset.currency', 'publisher_fee_percent', 'publisher_fee_app', 'price', 'asset.amount'], axis=1)
-
-    if len(index) == 4:
-      for key in index[3]:
-        dfCombinedPurchases.append(pd.json_normalize(index[3][key]))
-      dfCombinedPurchases = pd.concat(dfCombinedPurchases)
-      dfCombinedPurchases = dfCombinedPurchases.drop(['currencyid', 'time_sold', 'asset.id', 'asset.appid', 'needs_rollback', 'purchaseid', 'steam_fee', 'publisher_fee', 'publisher_fee_percent', 'publisher_fee_app', 'received_currencyid', 'asset.currency', 'asset.appid', 'asset.contextid', 'asset.appid', 'asset.classid', 'asset.new_contextid', 'asset.new_id', 'asset.instanceid', 'asset.amount', 'asset.status'], axis=1)
-      dfCombinedPurchases['total_paid'] = dfCombinedPurchases['paid_amount'] + dfCombinedPurchases['paid_fee'] 
-      dfCombined = pd.merge(dfCombinedAssets, 
-                            pd.merge(dfCombinedEvents, 
-                                      pd.merge(dfCombinedListings, dfCombinedPurchases, 
-                                                how='outer', on=['listingid']), 
-                                      how='outer', on=['listingid']), 
-                            how='outer', on=['asset.id'])
-      optional_columns = ['owner', 'rollback_new_id', 'rollback_new_contextid', 'market_fee', 'market_marketable_restriction', 'cancel_reason', 'cancel_reason_short', 'funds_returned', 'funds_held', 'time_funds_held_until', 'funds_revoked']
-      for column in optional_columns:
-        if column in dfCombined.columns.tolist():
-          dfCombined = dfCombined.drop([column], axis=1)
-      dfCombined.loc[dfCombined['event_type'] == 'Sell', ['paid_amount', 'paid_fee', 'total_paid', 'original_price']] = None
-      dfCombined.loc[dfCombined['event_type'] == 'List', ['paid_amount', 'paid_fee', 'total_paid', 'received_amount']] = None
-      dfCombined.loc[dfCombined['event_type'] == 'Buy', ['received_amount', 'original_price']] = None
-      self.__move_column_inplace(dfCombined, 'paid_fee', 0)
-      self.__move_column_inplace(dfCombined, 'paid_amount', 0)
-      self.__move_column_inplace(dfCombined, 'total_paid', 0)
-      self.__move_column_inplace(dfCombined, 'received_amount', 0)
-      self.__move_column_inplace(dfCombined, 'original_price', 0)
-      self.__move_column_inplace(dfCombined, 'event_type', 0)
-      self.__move_column_inplace(dfCombined, 'type', 0)
-      self.__move_column_inplace(dfCombined, 'name', 0)
-      self.__move_column_inplace(dfCombined, 'time_event', 0)
-      return dfCombined
-    
-    else:
-      dfCombined = pd.merge(dfCombinedAssets, 
-                            pd.merge(dfCombinedEvents, dfCombinedListings, 
-                                      how='outer', on=['listingid']), 
-                            how='outer', on=['asset.id']) 
-      optional_columns = ['owner', 'rollback_new_id', 'rollback_new_contextid', 'market_fee', 'market_marketable_restriction', 'cancel_reason', 'cancel_reason_short', 'funds_returned', 'funds_held', 'time_funds_held_until', 'funds_revoked']
-      for column in optional_columns:
-        if column in dfCombined.columns.tolist():
-          dfCombined = dfCombined.drop([column], axis=1)
-      dfCombined.loc[dfCombined['event_type'] == 'Buy', 'received_amount'] = None
-      self.__move_column_inplace(dfCombined, 'received_amount', 0)
-      self.__move_column_inplace(dfCombined, 'event_type', 0)
-      self.__move_column_inplace(dfCombined, 'type', 0)
-      self.__move_column_inplace(dfCombined, 'name', 0)
-      self.__move_column_inplace(dfCombined, 'time_event', 0)
-      return dfCombined
+    return self.__batch_helper(items, self.__price_history_helper, SCHEMAS['price_history'])
 
 
+  @instrumented
   def get_market_history(self, count: int) -> pd.DataFrame:
     """
     Get the market trading history of the user.
@@ -440,43 +916,159 @@ class Request:
     """
 
     exception('type', count, int, "Input count it not a valid integer type.")
-    exception('network', self.headers['Cookie'], '', 
-      "Cookie not authorized. Please set your steamLoginSecure first using set_steam_auth().")
+    self.__check_auth()
     
-    params = {
-      'start': 0,
-      'count': count
-    }
+    if count == 0:
+      return pd.DataFrame()
+
+    pages = self.__pagination_helper(self.__listingshistory_api, {}, ['assets', 'events', 'listings', 'purchases'], count, parsing.parse_market_history)
+
+    return parsing.concat_frames(pages, SCHEMAS['market_history'])
+
+
+  def iter_market_history(self, count: int = None, start: int = 0, as_records: bool = False):
+    """
+    Iterate over the market trading history of the user, one page at a time as soon as it arrives.
+
+    :param count: The number of entries to iterate over. The default value is None (all the entries from start).
+    :type count: int
+    :param start: The offset of the first entry. The default value is 0.
+    :type start: int
+    :param as_records: Whether to yield the pages as lists of dictionaries instead of data frames. The default value is False.
+    :type as_records: bool
+    :return: Generator of the pages of the market trading history.
+    :rtype: generator
+    """
 
-    jsonObjectList = self.__request_helper(self.__listingshistory_api, params, self.headers, ['assets', 'events', 'listings', 'purchases'])
+    exception('type', start, int, "Input start it not a valid integer type.")
+    if count is not None:
+      exception('type', count, int, "Input count it not a valid integer type.")
+    self.__check_auth()
 
     if count == 0:
-      return pd.DataFrame()
-    
-    if count <= 100: 
-      return self.__market_history_helper(jsonObjectList).reset_index(drop=True)
-    
-    else:
-      remainCount = count % 100
-      params['count'] = 100
-      dfCombined = []
-
-      for i in range(0, count - remainCount, 100):
-        params['start'] = i
-        jsonObjectList = self.__request_helper(self.__listingshistory_api, params, self.headers, ['assets', 'events', 'listings', 'purchases'])
-        dfCombined.append(self.__market_history_helper(jsonObjectList))
-      
-      if remainCount == 0:
-        return pd.concat(dfCombined).reset_index(drop=True)
-      
-      else:
-        params['start'] = count - remainCount
-        params['count'] = remainCount
-        jsonObjectList = self.__request_helper(self.__listingshistory_api, params, self.headers, ['assets', 'events', 'listings', 'purchases'])
-        dfCombined.append(self.__market_history_helper(jsonObjectList))
-        return pd.concat(dfCombined).reset_index(drop=True)
-      
-  def get_buysell_orders(self, item_name: str, appid: str) -> pd.DataFrame: 
+      return iter([])
+
+    return self.__iter_pages(self.__listingshistory_api, {}, ['assets', 'events', 'listings', 'purchases'], count,
+                             parsing.parse_market_history, start, as_records)
+
+
+  @instrumented
+  def sync_market_history(self, store: MarketHistoryStore, full: bool = False, max_count: int = None) -> pd.DataFrame:
+    """
+    Fetch the market trading history of the user that is newer than a local store, and append it to the store.
+
+    The pages are fetched from the newest event on and the sync stops at the first page that contains an event
+    which is already stored, so that a regular sync only costs one or two requests. With max_count, the first sync
+    only fetches the newest max_count events and records the number of older events in the backfill cursor of the
+    store; each later sync then fetches up to max_count of these older events, until the history is complete.
+
+    :param store: The local store of the market history.
+    :type store: MarketHistoryStore
+    :param full: Whether to return the whole stored history instead of the new events only. The default value is False.
+    :type full: bool
+    :param max_count: Optional maximum number of older events fetched by a sync, for e.g. to spread the first sync of a large account over several runs. The events newer than the store are always fetched. The default value is None.
+    :type max_count: int
+    :return: The new and backfilled events, or the whole stored history if full is True.
+    :rtype: pd.DataFrame
+    """
+
+    exception('type', store, MarketHistoryStore, "Input store it not a valid MarketHistoryStore type.")
+    self.__check_auth()
+
+    delta = {'assets': {}, 'events': [], 'listings': {}, 'purchases': {}}
+    seen = set()
+    start = 0
+    # Only the first sync is limited, so that the store keeps at most one gap, recorded by the backfill cursor.
+    limit = max_count if len(store) == 0 else None
+    backfill = store.backfill()
+    totalCount = 0
+
+    while limit is None or start < limit:
+      pageSize = self.page_size if limit is None else min(self.page_size, limit - start)
+      contentObject = self.__fetch_history_page(start, pageSize)
+      events = contentObject.get('events') or []
+      totalCount = contentObject.get('total_count', 0)
+
+      known = self.__add_new_events(delta, seen, store, contentObject, events)
+
+      start += len(events)
+      if len(known) > 0 or len(events) == 0 or start >= totalCount:
+        break
+
+    if limit is not None and start >= limit:
+      backfill = max(0, totalCount - start)
+
+    store.append(delta, backfill)
+
+    budget = None if max_count is None else max_count - (start if limit is not None else 0)
+    while backfill > 0 and (budget is None or budget > 0):
+      # The cursor counts from the oldest event, so new events shifting the pages do not move it.
+      offset = totalCount - backfill
+      pageSize = min(self.page_size, backfill) if budget is None else min(self.page_size, backfill, budget)
+      contentObject = self.__fetch_history_page(offset, pageSize)
+      events = contentObject.get('events') or []
+      totalCount = contentObject.get('total_count', totalCount)
+
+      page = {'assets': {}, 'events': [], 'listings': {}, 'purchases': {}}
+      self.__add_new_events(page, seen, store, contentObject, events)
+      for event in page['events']:
+        history.add_event(delta, page, event)
+
+      backfill = max(0, totalCount - offset - len(events)) if len(events) > 0 else 0
+      store.append(page, backfill)
+      if budget is not None:
+        budget -= len(events)
+
+    return store.get_market_history() if full else history.to_frame(delta)
+
+
+  def __fetch_history_page(self, start: int, count: int) -> dict:
+    """
+    Helper function to fetch a page of the market trading history.
+
+    :param start: The offset of the first event, from the newest one.
+    :type start: int
+    :param count: The number of events of the page.
+    :type count: int
+    :return: The decoded myhistory/render response.
+    :rtype: dict
+    """
+
+    contentObject = self.__fetch_json(self.__listingshistory_api, {'start': start, 'count': count}, self.headers)
+    exception('network', contentObject.get('success'), False, "Steam cannot make this API call. Please double check your parameters and try again.")
+    return contentObject
+
+
+  def __add_new_events(self, target: dict, seen: set, store: MarketHistoryStore, contentObject: dict, events: list) -> set:
+    """
+    Helper function to add the events of a page that are neither stored nor already seen by the sync to a response.
+
+    :param target: The response that is updated, with 'assets', 'events', 'listings' and 'purchases'.
+    :type target: dict
+    :param seen: The keys of the events already seen by the sync, updated with the added events.
+    :type seen: set
+    :param store: The local store of the market history.
+    :type store: MarketHistoryStore
+    :param contentObject: The decoded myhistory/render response of the page.
+    :type contentObject: dict
+    :param events: The events of the page.
+    :type events: list
+    :return: The keys of the events of the page that are already stored.
+    :rtype: set
+    """
+
+    known = store.known(events)
+    for event in events:
+      key = history.event_key(event)
+      # New events shift the pages while syncing, so the same event can be returned twice.
+      if key not in known and key not in seen:
+        seen.add(key)
+        history.add_event(target, contentObject, event)
+    return known
+
+
+  @instrumented
+  def get_buysell_orders(self, item_name: str, appid: str, currency: int = 1, country: str = 'US', language: str = 'english') -> pd.DataFrame:
     """
     Get the buy/sell orders of an item in the market.
 
@@ -484,44 +1076,110 @@ class Request:
     :type item_name: str
     :param appid: The id of the app.
     :type appid: str
+    :param currency: The id of the currency of the prices. The default value is 1 (USD).
+    :type currency: int
+    :param country: The country code of the request. The default value is 'US'.
+    :type country: str
+    :param language: The language of the descriptions. The default value is 'english'.
+    :type language: str
     :return: The buy/sell orders of an item in the market.
     :rtype: pd.DataFrame
     """
 
     exception('type', item_name, str, "Input item_name it not a valid string type.")
     exception('type', appid, str, "Input appid it not a valid string type.")
-    exception('network', self.headers['Cookie'], '', 
-      "Cookie not authorized. Please set your steamLoginSecure first using set_steam_auth().")
+    self.__check_auth()
     if appid != '':
-      exception('contain', int(appid), list(self.get_all_appid()['appid']), 
-        f"{appid} is not a valid appid. Please check the complete list using get_all_appid().")
-      
-    api = ""
-    driver = webdriver.Chrome()
-    driver.get('https://steamcommunity.com/market/listings/' + appid + '/' + item_name)
-
-    for request in driver.requests:
-        if request.response:
-          if str(request.url[34:53]) == 'itemordershistogram':
-            api = request.url
-            break
-    exception('network', api, "", "Steam cannot make this query. Please double check the item name and try again.")
-    response = requests.get(api + '&norender=1', headers=self.headers)
-    exception('network', str(response.content), 'b\'null\'', "You have reached the request limit of Steam. Please try again later.")
-    contentObject = json.loads(response.content)
-    dfSellGraph = pd.json_normalize(contentObject, record_path=['sell_order_graph'])
-    dfBuyGraph = pd.json_normalize(contentObject, record_path=['buy_order_graph'])
-    
-    dfSellGraph['type'] = 'sell'
-    dfBuyGraph['type'] = 'buy'
-    if 'success' in contentObject:
-      isSuccess = contentObject['success']
-      exception('network', isSuccess, False, "Steam cannot make this API call. Please double check your parameters and try again.")
-    dfCombined = [dfSellGraph, dfBuyGraph]
-    dfCombined = pd.concat(dfCombined, ignore_index=True)
-    dfCombined = dfCombined.rename(columns={0: 'price', 1: 'orders', 2: 'description'})
-    return dfCombined
-  
+      self.__validate_appid(appid)
+
+    return parsing.parse_buysell_orders(self.__order_histogram_helper(item_name, appid, currency, country, language))
+
+
+  @instrumented
+  def get_order_histogram(self, item_name: str, appid: str, currency: int = 1, country: str = 'US', language: str = 'english') -> dict:
+    """
+    Get the raw order histogram (buy/sell order graphs and summaries) of an item in the market.
+
+    :param item_name: The precise market name of the item.
+    :type item_name: str
+    :param appid: The id of the app.
+    :type appid: str
+    :param currency: The id of the currency of the prices. The default value is 1 (USD).
+    :type currency: int
+    :param country: The country code of the request. The default value is 'US'.
+    :type country: str
+    :param language: The language of the descriptions. The default value is 'english'.
+    :type language: str
+    :return: The decoded itemordershistogram response.
+    :rtype: dict
+    """
+
+    exception('type', item_name, str, "Input item_name it not a valid string type.")
+    exception('type', appid, str, "Input appid it not a valid string type.")
+    self.__check_auth()
+    if appid != '':
+      self.__validate_appid(appid)
+
+    return self.__order_histogram_helper(item_name, appid, currency, country, language)
+
+
+  def __order_histogram_helper(self, item_name: str, appid: str, currency: int, country: str, language: str) -> dict:
+    """
+    Helper function to request the order histogram of an item, without validating the inputs.
+
+    :param item_name: The precise market name of the item.
+    :type item_name: str
+    :param appid: The id of the app.
+    :type appid: str
+    :param currency: The id of the currency of the prices.
+    :type currency: int
+    :param country: The country code of the request.
+    :type country: str
+    :param language: The language of the descriptions.
+    :type language: str
+    :return: The decoded itemordershistogram response.
+    :rtype: dict
+    """
+
+    params = {
+      'country': country,
+      'language': language,
+      'currency': currency,
+      'item_nameid': self.__item_nameid_helper(item_name, appid),
+      'two_factor': 0,
+      'norender': 1
+    }
+
+    def fetch():
+      response = self.transport.get(self.__orders_histogram_api, params=params, headers=self.headers)
+      exception('network', str(response.content), 'b\'null\'', "You have reached the request limit of Steam. Please try again later.")
+      with self.__timer('steamcrawl_decode_seconds', self.__orders_histogram_api):
+        return self.decoder.decode(response.content)
+    return self.__coalesced(request_key(self.__orders_histogram_api, params, self.headers['Cookie']), fetch)
+
+
+  def __item_nameid_helper(self, item_name: str, appid: str) -> str:
+    """
+    Helper function to resolve the item_nameid of an item, from the item_nameid map or from its market listing page.
+
+    :param item_name: The precise market name of the item.
+    :type item_name: str
+    :param appid: The id of the app.
+    :type appid: str
+    :return: The item_nameid of the item.
+    :rtype: str
+    """
+
+    item_nameid = self.item_nameids.get(item_name, appid)
+    if item_nameid is None:
+      url = self.__listing_page + appid + '/' + quote(item_name)
+      item_nameid = self.__coalesced(request_key(url, {}, self.headers['Cookie']),
+                                     lambda: parsing.parse_item_nameid(self.transport.get(url, headers=self.headers).text))
+      self.item_nameids.add(item_name, appid, item_nameid)
+    return item_nameid
+
+
+  @instrumented
   def get_itemname_id(self, item_name: str, appid: str) -> str:
     """
     Get the id of an item given its name.
@@ -536,54 +1194,129 @@ class Request:
 
     exception('type', item_name, str, "Input item_name it not a valid string type.")
     exception('type', appid, str, "Input appid it not a valid string type.")
-    exception('network', self.headers['Cookie'], '', 
-      "Cookie not authorized. Please set your steamLoginSecure first using set_steam_auth().")
+    self.__check_auth()
     if appid != '':
-      exception('contain', int(appid), list(self.get_all_appid()['appid']), 
-        f"{appid} is not a valid appid. Please check the complete list using get_all_appid().")
-      
-    api = ""
-    id = ""
-    driver = webdriver.Chrome()
-    driver.get('https://steamcommunity.com/market/listings/' + appid + '/' + item_name)
-    for request in driver.requests:
-        if request.response:
-          if str(request.url[34:53]) == 'itemordershistogram':
-            api = request.url
-            id = api.split('&')[-2][12:]
-            break
-    exception('network', api, "", "Steam cannot make this query. Please double check the item name and try again.")
-    return id
-  
-  def get_game_item_inventory(self, steamId: str, appid: str, count: int) -> pd.DataFrame:
+      self.__validate_appid(appid)
+
+    return self.__item_nameid_helper(item_name, appid)
+
+
+  @instrumented
+  def get_game_item_inventory(self, steamId: str, appid: str, count: int = None) -> pd.DataFrame:
     """
-    Get the game items from the inventory of an user.
+    Get the game items from the inventory of an user, with one row per asset.
 
     :param steamId: The Steam ID64 of the user.
     :type steamId: str
     :param appid: The id of the app.
     :type appid: str
-    :param count: The number of entries that needs to be extracted from the inventory.
+    :param count: The number of entries that needs to be extracted from the inventory. The default value is None (the whole inventory).
     :type count: int
     :return: The game items from the inventory of an user.
     :rtype: pd.DataFrame
     """
-    
+
+    pages = list(self.iter_game_item_inventory(steamId, appid, count))
+    if len(pages) == 0:
+      return pd.DataFrame()
+    return parsing.concat_frames(pages, SCHEMAS['inventory'])
+
+
+  @instrumented
+  def get_game_item_inventory_many(self, steamIds, appid: str) -> pd.DataFrame:
+    """
+    Get the game items from the inventories of many users concurrently, for e.g. to value a portfolio.
+
+    :param steamIds: Iterable of Steam ID64 of the users.
+    :type steamIds: iterable
+    :param appid: The id of the app.
+    :type appid: str
+    :return: The game items of all users in long format, keyed by 'steamid' and 'appid', with the error of each failed user in the 'error' column.
+    :rtype: pd.DataFrame
+    """
+
+    exception('type', appid, str, "Input appid it not a valid string type.")
+    self.__check_auth()
+    if appid != '':
+      self.__validate_appid(appid)
+
+    def fetch_inventory(steamId):
+      try:
+        return steamId, appid, self.get_game_item_inventory(steamId, appid), None
+      except Exception as e:
+        return steamId, appid, None, str(e)
+
+    with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+      results = list(executor.map(propagated(fetch_inventory), steamIds))
+
+    return parsing.parse_batch(results, ('steamid', 'appid'), SCHEMAS['inventory'])
+
+
+  def iter_game_item_inventory(self, steamId: str, appid: str, count: int = None, as_records: bool = False):
+    """
+    Iterate over the game items from the inventory of an user, one page at a time as soon as it arrives.
+
+    The pages are followed with the last_assetid cursor of the inventory API, so they are fetched one after the other.
+
+    :param steamId: The Steam ID64 of the user.
+    :type steamId: str
+    :param appid: The id of the app.
+    :type appid: str
+    :param count: The number of entries to iterate over. The default value is None (the whole inventory).
+    :type count: int
+    :param as_records: Whether to yield the pages as lists of dictionaries instead of data frames. The default value is False.
+    :type as_records: bool
+    :return: Generator of the pages of game items.
+    :rtype: generator
+    """
+
     exception('type', steamId, str, "Input steamId it not a valid string type.")
     exception('type', appid, str, "Input appid it not a valid string type.")
-    exception('type', count, int, "Input appid it not a valid string type.")
-    exception('network', self.headers['Cookie'], '', 
-      "Cookie not authorized. Please set your steamLoginSecure first using set_steam_auth().")
+    if count is not None:
+      exception('type', count, int, "Input count it not a valid integer type.")
+    self.__check_auth()
     if appid != '':
-      exception('contain', int(appid), list(self.get_all_appid()['appid']), 
-        f"{appid} is not a valid appid. Please check the complete list using get_all_appid().")
-      
-    params = {
-      'count': count
-    }
-    
-    jsonObject = self.__request_helper(self.__inventory_api + '/' + steamId + '/' + appid + '/2', params, self.headers, ['descriptions'])[0]
-    df = pd.json_normalize(jsonObject)
-    df = df.drop(columns=['background_color'], axis=1)
-    return df
+      self.__validate_appid(appid)
+
+    if count == 0:
+      return iter([])
+
+    return self.__iter_inventory_pages(self.__inventory_api + '/' + steamId + '/' + appid + '/2', count, as_records)
+
+
+  def __iter_inventory_pages(self, api: str, count: int, as_records: bool):
+    """
+    Helper function to follow the last_assetid cursor of the inventory API and yield the parsed pages.
+
+    The descriptions are indexed by (classid, instanceid) once across all the pages, and the assets of each page
+    are joined to them through this index.
+
+    :param api: The inventory URL of the user and app.
+    :type api: str
+    :param count: The number of entries to iterate over, or None for the whole inventory.
+    :type count: int
+    :param as_records: Whether to yield the pages as lists of dictionaries instead of data frames.
+    :type as_records: bool
+    :return: Generator of the parsed pages.
+    :rtype: generator
+    """
 
+    remaining = count
+    params = {}
+    descriptions = {}
+    while True:
+      params['count'] = self.inventory_page_size if remaining is None else min(self.inventory_page_size, remaining)
+      contentObject = self.__fetch_json(api, params, self.headers)
+      # The page size can be larger than the inventory, so count is not checked against total_inventory_count here.
+      assets, pageDescriptions = parsing.extract_indices(contentObject, {}, ['assets', 'descriptions'])
+      with self.__timer('steamcrawl_parse_seconds', api):
+        df = parsing.parse_inventory(assets, parsing.index_descriptions(pageDescriptions, descriptions))
+      yield df.to_dict('records') if as_records else df
+
+      if remaining is not None:
+        remaining -= len(contentObject.get('assets', []))
+        if remaining <= 0:
+          break
+      if not contentObject.get('more_items') or 'last_assetid' not in contentObject:
+        break
+      params['start_assetid'] = contentObject['last_assetid']
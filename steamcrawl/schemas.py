@@ -0,0 +1,89 @@
+import pandas as pd
+
+# Explicit dtypes of the data frames returned by the package, by dataset. Columns that are not listed keep their dtype.
+SCHEMAS = {
+  'listings': {
+    'sell_listings': 'int32',
+    'sell_price': 'float32',
+    'app_name': 'category',
+    'asset_description.appid': 'int32',
+    'asset_description.type': 'category',
+    'asset_description.tradable': 'int8',
+    'asset_description.commodity': 'int8'
+  },
+  'item_overview': {
+    'lowest_price': 'float32',
+    'median_price': 'float32',
+    'volume': 'int32'
+  },
+  'price_history': {
+    'item_name': 'category',
+    'appid': 'category',
+    'date': 'datetime64[ns]',
+    'median_price': 'float32',
+    'volume_sold': 'int32'
+  },
+  'market_history': {
+    'time_event': 'datetime64[ns]',
+    'name': 'category',
+    'type': 'category',
+    'event_type': 'category',
+    'original_price': 'float32',
+    'received_amount': 'float32',
+    'total_paid': 'float32',
+    'paid_amount': 'float32',
+    'paid_fee': 'float32',
+    'fee': 'float32',
+    'appid': 'int32',
+    'status': 'int8',
+    'tradable': 'int8',
+    'commodity': 'int8',
+    'marketable': 'int8',
+    'market_name': 'category',
+    'market_hash_name': 'category'
+  },
+  'inventory': {
+    'appid': 'int32',
+    'amount': 'int32',
+    'currency': 'int8',
+    'tradable': 'int8',
+    'marketable': 'int8',
+    'commodity': 'int8',
+    'name': 'category',
+    'type': 'category',
+    'market_name': 'category',
+    'market_hash_name': 'category'
+  }
+}
+
+
+def coerce(df: pd.DataFrame, schema: dict) -> pd.DataFrame:
+  """
+  Convert the columns of a data frame to the dtypes of a schema.
+
+  Values that cannot be converted become missing values, and integer columns with missing values use the
+  nullable integer dtypes of pandas (for e.g. 'Int32').
+
+  :param df: The data frame that needs to be converted. It is modified in place.
+  :type df: pd.DataFrame
+  :param schema: Mapping of column names to dtypes, for e.g. SCHEMAS['listings'].
+  :type schema: dict
+  :return: The converted data frame.
+  :rtype: pd.DataFrame
+  """
+
+  for column, dtype in schema.items():
+    if column not in df.columns or df[column].dtype == dtype:
+      continue
+
+    if dtype.startswith('datetime64'):
+      df[column] = pd.to_datetime(df[column], errors='coerce')
+    elif dtype == 'category':
+      df[column] = df[column].astype('category')
+    else:
+      values = pd.to_numeric(df[column], errors='coerce')
+      if dtype.startswith('int') and values.isna().any():
+        dtype = dtype.capitalize()
+      df[column] = values.astype(dtype)
+
+  return df
@@ -0,0 +1,180 @@
+import asyncio
+import threading
+
+
+def request_key(api: str, params: dict, auth: str = '') -> tuple:
+  """
+  Get the key identifying a request, so that identical requests made at the same time share one fetch.
+
+  :param api: The requested API URL.
+  :type api: str
+  :param params: The parameters of the request. Their order and the types of their values do not matter.
+  :type params: dict
+  :param auth: The credentials the request is made with, for e.g. the Cookie header. The default value is ''.
+  :type auth: str
+  :return: The (api, sorted parameters, auth) key.
+  :rtype: tuple
+  """
+
+  return (api, tuple(sorted((str(name), str(value)) for name, value in (params or {}).items())), auth)
+
+
+class _Call:
+
+  def __init__(self):
+    """
+    Initializing an outstanding call, whose result or error is kept for the callers waiting on it.
+
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.done = threading.Event()
+    self.result = None
+    self.error = None
+
+
+class SingleFlight:
+
+  def __init__(self, on_shared=None):
+    """
+    Initializing a single-flight group for threads. While a call of a key is outstanding, the other calls of the same
+    key wait for it and get its result, or its error, instead of running the function again.
+
+    The result is shared by all these callers, so it must not be modified by them.
+
+    :param on_shared: Optional function called with the key of every call that got the result of an outstanding call. The default value is None.
+    :type on_shared: callable
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.on_shared = on_shared
+    self.calls = 0
+    self.shared = 0
+    self.__calls = {}
+    self.__lock = threading.Lock()
+
+
+  def do(self, key, function):
+    """
+    Run a function, unless a call of the same key is outstanding, in which case its result is returned.
+
+    :param key: The key of the call, for e.g. request_key(api, params, cookie).
+    :type key: hashable
+    :param function: The function making the call, without arguments.
+    :type function: callable
+    :return: The result of the function.
+    :rtype: any
+    """
+
+    with self.__lock:
+      call = self.__calls.get(key)
+      isLeader = call is None
+      if isLeader:
+        call = self.__calls[key] = _Call()
+        self.calls += 1
+      else:
+        self.shared += 1
+
+    if not isLeader:
+      if self.on_shared is not None:
+        self.on_shared(key)
+      call.done.wait()
+      if call.error is not None:
+        raise call.error
+      return call.result
+
+    try:
+      call.result = function()
+      return call.result
+    except BaseException as e:
+      call.error = e
+      raise
+    finally:
+      with self.__lock:
+        del self.__calls[key]
+      call.done.set()
+
+
+  def outstanding(self) -> int:
+    """
+    Get the number of outstanding calls.
+
+    :return: The number of keys being fetched.
+    :rtype: int
+    """
+
+    with self.__lock:
+      return len(self.__calls)
+
+
+class AsyncSingleFlight:
+
+  def __init__(self, on_shared=None):
+    """
+    Initializing a single-flight group for coroutines of one event loop. While a call of a key is outstanding, the
+    other calls of the same key await it and get its result, or its error, instead of running the coroutine again.
+
+    The result is shared by all these callers, so it must not be modified by them. If the caller running the call is
+    cancelled, the callers awaiting it are cancelled too.
+
+    :param on_shared: Optional function called with the key of every call that got the result of an outstanding call. The default value is None.
+    :type on_shared: callable
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.on_shared = on_shared
+    self.calls = 0
+    self.shared = 0
+    self.__calls = {}
+
+
+  async def do(self, key, function):
+    """
+    Await a coroutine function, unless a call of the same key is outstanding, in which case its result is returned.
+
+    :param key: The key of the call, for e.g. request_key(api, params, cookie).
+    :type key: hashable
+    :param function: The coroutine function making the call, without arguments.
+    :type function: callable
+    :return: The result of the coroutine.
+    :rtype: any
+    """
+
+    future = self.__calls.get(key)
+    if future is not None:
+      self.shared += 1
+      if self.on_shared is not None:
+        self.on_shared(key)
+      # Shielded, so that cancelling one of the waiting callers does not cancel the call of the others.
+      return await asyncio.shield(future)
+
+    future = self.__calls[key] = asyncio.get_running_loop().create_future()
+    self.calls += 1
+    try:
+      result = await function()
+      future.set_result(result)
+      return result
+    except asyncio.CancelledError:
+      future.cancel()
+      raise
+    except BaseException as e:
+      future.set_exception(e)
+      # Retrieved here, so that the error is not logged as never retrieved when no other caller was waiting.
+      future.exception()
+      raise
+    finally:
+      del self.__calls[key]
+
+
+  def outstanding(self) -> int:
+    """
+    Get the number of outstanding calls.
+
+    :return: The number of keys being fetched.
+    :rtype: int
+    """
+
+    return len(self.__calls)
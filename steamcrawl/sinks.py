@@ -0,0 +1,225 @@
+import datetime
+import uuid
+import pandas as pd
+from steamcrawl import schemas
+from steamcrawl.exceptions import exception
+
+# The (app id column, date column) of each dataset. Datasets with a date column are partitioned by its month, the
+# others by the date they were written. The price histories are partitioned by write date, as one item already has
+# thousands of days of history, which would be written as one tiny file per day (and at most 1024 partitions per batch).
+DATASETS = {
+  'listings': ('asset_description.appid', None),
+  'price_history': ('appid', None),
+  'market_history': ('appid', 'time_event'),
+  'inventory': ('appid', None)
+}
+
+
+def _import_pyarrow():
+  """
+  Helper function to import pyarrow, which is only required by the dataset sinks.
+
+  :return: The pyarrow, pyarrow.dataset, pyarrow.fs and pyarrow.parquet modules.
+  :rtype: tuple
+  """
+
+  try:
+    import pyarrow
+    import pyarrow.dataset
+    import pyarrow.fs
+    import pyarrow.parquet
+  except ImportError:
+    raise ImportError("DatasetSink requires the pyarrow package. Please install it using pip install pyarrow.")
+  return pyarrow, pyarrow.dataset, pyarrow.fs, pyarrow.parquet
+
+
+def read_dataset(path: str, format: str = 'parquet', columns: list = None, filters=None, memory_map: bool = True) -> pd.DataFrame:
+  """
+  Read a dataset written by DatasetSink.
+
+  The schemas of all the files are unified, so that columns which only appear in some batches are kept.
+
+  :param path: Path to the root directory of the dataset.
+  :type path: str
+  :param format: The file format of the dataset, 'parquet' or 'arrow'. The default value is 'parquet'.
+  :type format: str
+  :param columns: Optional list of columns to read. The default value is None (all the columns).
+  :type columns: list
+  :param filters: Optional filters on the rows, as a pyarrow expression or a list of (column, operator, value), for e.g. [('appid', '=', 730)]. The default value is None.
+  :type filters: list
+  :param memory_map: Whether to memory-map the files instead of reading them into memory. The default value is True.
+  :type memory_map: bool
+  :return: The data of the dataset.
+  :rtype: pd.DataFrame
+  """
+
+  pa, ds, fs, pq = _import_pyarrow()
+  fileFormat = 'ipc' if format == 'arrow' else format
+  filesystem = fs.LocalFileSystem(use_mmap=memory_map)
+  dataset = ds.dataset(path, format=fileFormat, partitioning='hive', filesystem=filesystem)
+  schema = pa.unify_schemas([dataset.schema] + [fragment.physical_schema for fragment in dataset.get_fragments()])
+  dataset = ds.dataset(path, schema=schema, format=fileFormat, partitioning='hive', filesystem=filesystem)
+
+  if filters is not None and not isinstance(filters, ds.Expression):
+    filters = pq.filters_to_expression(filters)
+  return dataset.to_table(columns=columns, filter=filters).to_pandas()
+
+
+class DatasetSink:
+
+  def __init__(self, path: str, dataset: str, format: str = 'parquet', batch_rows: int = 100000):
+    """
+    Initializing a sink that writes crawl results to a columnar dataset partitioned by app id and date.
+
+    Data frames are buffered as they arrive and written in batches of batch_rows rows, with the explicit dtypes of
+    schemas.SCHEMAS, into the directories path/appid=.../day=YYYY-MM-DD/ (the write date), or
+    path/appid=.../month=YYYY-MM/ for the market history. It requires the pyarrow package.
+
+    :param path: Path to the root directory of the dataset.
+    :type path: str
+    :param dataset: The kind of data. This includes 'listings', 'price_history', 'market_history', and 'inventory'.
+    :type dataset: str
+    :param format: The file format, 'parquet' or 'arrow' (Arrow IPC files, which can be memory-mapped without decoding). The default value is 'parquet'.
+    :type format: str
+    :param batch_rows: Number of buffered rows above which a batch is written. The default value is 100000.
+    :type batch_rows: int
+    :return: Nothing.
+    :rtype: None
+    """
+
+    exception('type', path, str, "Input path it not a valid string type.")
+    exception('contain', dataset, DATASETS,
+      f"{dataset} is not valid as a dataset. It should only be 'listings', 'price_history', 'market_history', or 'inventory'.")
+    exception('contain', format, ['parquet', 'arrow'],
+      f"{format} is not valid as a format. It should only be 'parquet' or 'arrow'.")
+    _import_pyarrow()
+
+    self.path = path
+    self.dataset = dataset
+    self.format = format
+    self.batch_rows = batch_rows
+    self.rows = 0
+    self.__buffer = []
+    self.__buffered_rows = 0
+
+
+  def write(self, df: pd.DataFrame, appid: str = None):
+    """
+    Add a data frame to the sink, writing a batch if enough rows are buffered.
+
+    :param df: A data frame returned by the methods of Request, for e.g. a page of iter_all_listings().
+    :type df: pd.DataFrame
+    :param appid: The id of the app of all the rows, required when the data frame has no app id column, for e.g. the result of get_price_history(). The default value is None.
+    :type appid: str
+    :return: Nothing.
+    :rtype: None
+    """
+
+    if isinstance(df, list):
+      df = pd.DataFrame(df)
+    if len(df) == 0:
+      return
+    appidColumn = DATASETS[self.dataset][0]
+    if appid is not None:
+      df = df.assign(**{appidColumn: str(appid)})
+    exception('contain', appidColumn, list(df.columns),
+      f"The data frame has no {appidColumn} column. Please pass the appid of its rows.")
+    self.__buffer.append(df)
+    self.__buffered_rows += len(df)
+    if self.__buffered_rows >= self.batch_rows:
+      self.flush()
+
+
+  def write_pages(self, pages, appid: str = None) -> int:
+    """
+    Write the pages of a generator as they arrive, for e.g. sink.write_pages(request.iter_all_listings()).
+
+    :param pages: Iterable of data frames or lists of records.
+    :type pages: iterable
+    :param appid: The id of the app of all the rows, required when the pages have no app id column. The default value is None.
+    :type appid: str
+    :return: Total number of rows written by the sink.
+    :rtype: int
+    """
+
+    for page in pages:
+      self.write(page, appid)
+    self.flush()
+    return self.rows
+
+
+  def flush(self):
+    """
+    Write the buffered data frames as one batch.
+
+    :return: Nothing.
+    :rtype: None
+    """
+
+    if len(self.__buffer) == 0:
+      return
+    pa, ds, _, _ = _import_pyarrow()
+
+    df = pd.concat(self.__buffer, ignore_index=True)
+    self.__buffer = []
+    self.__buffered_rows = 0
+    schemas.coerce(df, schemas.SCHEMAS[self.dataset])
+
+    appidColumn, dateColumn = DATASETS[self.dataset]
+    df['appid'] = df[appidColumn].astype(str)
+    if dateColumn is not None:
+      period = 'month'
+      df[period] = df[dateColumn].dt.strftime('%Y-%m')
+    else:
+      period = 'day'
+      df[period] = datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%d')
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # The index type of categorical columns depends on the number of categories, so it is fixed to keep the batches compatible.
+    for i, field in enumerate(table.schema):
+      if pa.types.is_dictionary(field.type):
+        table = table.set_column(i, field.name, table.column(i).cast(pa.dictionary(pa.int32(), field.type.value_type)))
+
+    extension = 'parquet' if self.format == 'parquet' else 'arrow'
+    ds.write_dataset(table, self.path, format='parquet' if self.format == 'parquet' else 'ipc',
+                     partitioning=['appid', period], partitioning_flavor='hive',
+                     basename_template='part-' + uuid.uuid4().hex + '-{i}.' + extension,
+                     existing_data_behavior='overwrite_or_ignore')
+    self.rows += len(df)
+
+
+  def read(self, columns: list = None, filters=None, memory_map: bool = True) -> pd.DataFrame:
+    """
+    Read the data written by the sink, with the buffered rows flushed first.
+
+    :param columns: Optional list of columns to read. The default value is None (all the columns).
+    :type columns: list
+    :param filters: Optional filters on the rows, for e.g. [('appid', '=', 730)]. The default value is None.
+    :type filters: list
+    :param memory_map: Whether to memory-map the files instead of reading them into memory. The default value is True.
+    :type memory_map: bool
+    :return: The data of the dataset.
+    :rtype: pd.DataFrame
+    """
+
+    self.flush()
+    return read_dataset(self.path, self.format, columns, filters, memory_map)
+
+
+  def close(self):
+    """
+    Write the buffered data frames.
+
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.flush()
+
+
+  def __enter__(self):
+    return self
+
+
+  def __exit__(self, *args):
+    self.close()
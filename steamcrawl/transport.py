@@ -0,0 +1,279 @@
+import importlib.util
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+from steamcrawl.cache import CachedResponse, ResponseCache
+from steamcrawl.metrics import Metrics, endpoint_label
+from steamcrawl.ratelimit import RateLimiter
+
+# urllib3 only decodes brotli bodies when one of these packages is installed.
+if importlib.util.find_spec('brotli') or importlib.util.find_spec('brotlicffi'):
+  _ACCEPT_ENCODING = 'gzip, deflate, br'
+else:
+  _ACCEPT_ENCODING = 'gzip, deflate'
+
+
+def resolve_url(url: str, base_urls: dict) -> str:
+  """
+  Get the URL that is actually requested, after applying the base URL replacements.
+
+  :param url: The requested URL.
+  :type url: str
+  :param base_urls: Mapping of Steam base URLs to replacement base URLs.
+  :type base_urls: dict
+  :return: The URL that is actually requested.
+  :rtype: str
+  """
+
+  for base, replacement in base_urls.items():
+    if url.startswith(base):
+      return replacement + url[len(base):]
+  return url
+
+
+class Transport:
+
+  def __init__(self, pool_connections: int = 4, pool_maxsize: int = 10, pool_sizes: dict = None,
+               timeout: tuple = (5, 30), base_urls: dict = None, session: requests.Session = None,
+               rate_limiter: RateLimiter = None, cache: ResponseCache = None, metrics: Metrics = None):
+    """
+    Initializing the HTTP transport shared by all requests of a Request object.
+
+    The transport keeps a pooled requests.Session, so that connections to Steam are kept alive and reused
+    between pages and calls instead of paying a new TCP and TLS handshake for every request.
+
+    :param pool_connections: Number of hosts for which connection pools are cached. The default value is 4.
+    :type pool_connections: int
+    :param pool_maxsize: Maximum number of connections kept alive per host. The default value is 10.
+    :type pool_maxsize: int
+    :param pool_sizes: Optional maximum number of connections per host, for e.g. {'steamcommunity.com': 20}. The default value is None.
+    :type pool_sizes: dict
+    :param timeout: The (connect, read) timeouts in seconds. The default value is (5, 30).
+    :type timeout: tuple
+    :param base_urls: Optional mapping of Steam base URLs to replacement base URLs, for e.g. {'https://steamcommunity.com': 'http://127.0.0.1:8000'} to use a local stand-in server. The default value is None.
+    :type base_urls: dict
+    :param session: Optional session (or any object with the same get() method) to use instead of a new requests.Session. The default value is None.
+    :type session: requests.Session
+    :param rate_limiter: Rate limiter applied to all requests. By default, a RateLimiter with the Steam limits is used. Set to False to disable rate limiting.
+    :type rate_limiter: RateLimiter
+    :param cache: Optional response cache, for e.g. SQLiteCache('steam.db') or FileCache('steam_cache'). The default value is None.
+    :type cache: ResponseCache
+    :param metrics: Optional metrics where the count, latency, bytes, retries and throttles of the requests of each endpoint are recorded. The default value is None.
+    :type metrics: Metrics
+    :return: Nothing.
+    :rtype: None
+    """
+
+    self.timeout = timeout
+    self.base_urls = dict(base_urls or {})
+    self.pool_connections = pool_connections
+    self.pool_maxsize = pool_maxsize
+    self.pool_sizes = dict(pool_sizes or {})
+    self.rate_limiter = RateLimiter() if rate_limiter is None else rate_limiter or None
+    self.cache = cache
+    self.metrics = metrics
+
+    self.__session = session
+    self.__session_lock = threading.Lock()
+
+
+  @property
+  def session(self) -> requests.Session:
+    """
+    The pooled session, created on the first request so that creating a transport is cheap.
+
+    :return: The session.
+    :rtype: requests.Session
+    """
+
+    if self.__session is None:
+      with self.__session_lock:
+        if self.__session is None:
+          session = requests.Session()
+          session.headers.update({
+            'Accept-Encoding': _ACCEPT_ENCODING,
+            'Connection': 'keep-alive'
+          })
+          self.__mount_adapters(session)
+          self.__session = session
+    return self.__session
+
+
+  def __mount_adapters(self, session: requests.Session):
+    """
+    Helper function to mount the pooled adapters on a session.
+
+    :param session: The session to mount the adapters on.
+    :type session: requests.Session
+    :return: Nothing.
+    :rtype: None
+    """
+
+    adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    for host, size in self.pool_sizes.items():
+      hostAdapter = HTTPAdapter(pool_connections=1, pool_maxsize=size)
+      session.mount('https://' + host, hostAdapter)
+      for base, replacement in self.base_urls.items():
+        if urlsplit(base).hostname == host:
+          session.mount(replacement, hostAdapter)
+
+
+  def resolve(self, url: str) -> str:
+    """
+    Get the URL that is actually requested, after applying the base URL replacements.
+
+    :param url: The requested URL.
+    :type url: str
+    :return: The URL that is actually requested.
+    :rtype: str
+    """
+
+    return resolve_url(url, self.base_urls)
+
+
+  def get(self, url: str, params: dict = None, headers: dict = None) -> requests.Response:
+    """
+    Make a GET request through the pooled session.
+
+    If a cache is set and the API of the URL has a ttl, a fresh cached response is returned without any request,
+    and a stale one is revalidated with its ETag or Last-Modified value.
+
+    :param url: The requested URL.
+    :type url: str
+    :param params: The parameters of the request. The default value is None.
+    :type params: dict
+    :param headers: The headers of the request. The default value is None.
+    :type headers: dict
+    :return: The response of the request.
+    :rtype: requests.Response
+    """
+
+    if self.cache is None or self.cache.ttl(url) <= 0:
+      return self.__send(url, params, headers)
+
+    key = self.cache.key(url, params, headers)
+    entry = self.cache.load(key)
+    if entry is not None:
+      if self.cache.is_fresh(entry, url):
+        if self.metrics is not None:
+          self.metrics.increment('steamcrawl_cache_hits_total', endpoint=endpoint_label(url))
+        return CachedResponse(entry)
+      headers = dict(headers or {})
+      if entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+      if entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+
+    response = self.__send(url, params, headers)
+
+    if response.status_code == 304 and entry is not None:
+      entry['stored_at'] = time.time()
+      self.cache.store(key, entry)
+      return CachedResponse(entry)
+
+    if self.cache.is_cacheable(response):
+      self.cache.store(key, self.cache.entry(response))
+    return response
+
+
+  def __send(self, url: str, params: dict, headers: dict) -> requests.Response:
+    """
+    Helper function to send a request through the pooled session.
+
+    If a rate limiter is set, the request waits for a token of its host and is retried with backoff
+    when Steam throttles it. The last response is returned once the retries are exhausted.
+
+    :param url: The requested URL.
+    :type url: str
+    :param params: The parameters of the request.
+    :type params: dict
+    :param headers: The headers of the request.
+    :type headers: dict
+    :return: The response of the request.
+    :rtype: requests.Response
+    """
+
+    if self.rate_limiter is None:
+      return self.__get(url, params, headers)
+
+    bucket = self.rate_limiter.bucket(url)
+    for attempt in range(self.rate_limiter.max_retries + 1):
+      if attempt > 0 and self.metrics is not None:
+        self.metrics.increment('steamcrawl_retries_total', endpoint=endpoint_label(url))
+      bucket.acquire()
+      isLastAttempt = attempt == self.rate_limiter.max_retries
+      try:
+        response = self.__get(url, params, headers)
+      except (requests.ConnectionError, requests.Timeout):
+        if isLastAttempt:
+          raise
+        bucket.throttle()
+        time.sleep(self.rate_limiter.backoff(attempt))
+        continue
+
+      if not self.rate_limiter.is_throttled(response.status_code, response.content):
+        bucket.recover()
+        return response
+
+      bucket.throttle()
+      if self.metrics is not None:
+        self.metrics.increment('steamcrawl_throttled_total', endpoint=endpoint_label(url))
+      if isLastAttempt:
+        return response
+      time.sleep(self.rate_limiter.backoff(attempt, response.headers.get('Retry-After')))
+
+
+  def __get(self, url: str, params: dict, headers: dict) -> requests.Response:
+    """
+    Helper function to make one GET request, recording its latency, status and size when metrics are set.
+
+    :param url: The requested URL.
+    :type url: str
+    :param params: The parameters of the request.
+    :type params: dict
+    :param headers: The headers of the request.
+    :type headers: dict
+    :return: The response of the request.
+    :rtype: requests.Response
+    """
+
+    if self.metrics is None:
+      return self.session.get(self.resolve(url), params=params, headers=headers, timeout=self.timeout)
+
+    endpoint = endpoint_label(url)
+    start = time.perf_counter()
+    try:
+      response = self.session.get(self.resolve(url), params=params, headers=headers, timeout=self.timeout)
+    except (requests.ConnectionError, requests.Timeout):
+      self.metrics.increment('steamcrawl_request_errors_total', endpoint=endpoint)
+      raise
+    finally:
+      self.metrics.observe('steamcrawl_request_seconds', time.perf_counter() - start, endpoint=endpoint)
+    self.metrics.increment('steamcrawl_requests_total', endpoint=endpoint, status=response.status_code)
+    self.metrics.increment('steamcrawl_response_bytes_total', len(response.content), endpoint=endpoint)
+    return response
+
+
+  def close(self):
+    """
+    Close all the pooled connections.
+
+    :return: Nothing.
+    :rtype: None
+    """
+
+    if self.__session is not None:
+      self.__session.close()
+
+
+  def __enter__(self):
+    return self
+
+
+  def __exit__(self, *args):
+    self.close()
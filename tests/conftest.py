@@ -0,0 +1,67 @@
+import os
+import sys
+import pandas as pd
+import pytest
+
+# The tests run from a checkout, with the benchmarks importable for their legacy parsers and generated responses.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from bench_market_history import legacy_parse_market_history
+from steamcrawl import AppRegistry, AuthCache, FixtureServer, Request, Transport, history, schemas
+
+COOKIE = 'test'
+
+
+def legacy_frame(*pages: dict) -> pd.DataFrame:
+  """
+  Market history of responses parsed page by page by the legacy parser, with the schema that parse_market_history applies.
+  """
+
+  frames = [legacy_parse_market_history([page[key] for key in ['assets', 'events', 'listings', 'purchases']]) for page in pages]
+  return schemas.coerce(pd.concat(frames, ignore_index=True), schemas.SCHEMAS['market_history'])
+
+
+@pytest.fixture
+def auth_cache() -> AuthCache:
+  """
+  Auth cache where the test cookie is already validated, so that no request checks it.
+  """
+
+  cache = AuthCache()
+  cache.set('steamLoginSecure=' + COOKIE + ';', True)
+  return cache
+
+
+@pytest.fixture
+def make_request(auth_cache):
+  """
+  Factory of Request objects on a FixtureServer, without rate limiting and with their own app registry.
+  """
+
+  def make(server: FixtureServer, **kwargs) -> Request:
+    kwargs.setdefault('app_registry', AppRegistry(None))
+    transport = Transport(base_urls=server.base_urls(), rate_limiter=kwargs.pop('rate_limiter', False))
+    return Request(COOKIE, transport=transport, auth_cache=auth_cache, **kwargs)
+  return make
+
+
+@pytest.fixture
+def history_responder():
+  """
+  Factory of responders of the myhistory/render API serving the pages of one response, newest events first, each
+  with the records of its events only. shift[0] hides that many of the newest events, as if they had not happened yet.
+  """
+
+  def make(contentObject: dict, shift: list = None):
+    shift = shift if shift is not None else [0]
+
+    def respond(params: dict) -> dict:
+      start, count = int(params.get('start', 0)) + shift[0], int(params.get('count', 10))
+      page = {'assets': {}, 'events': [], 'listings': {}, 'purchases': {}}
+      for event in contentObject['events'][start:start + count]:
+        history.add_event(page, contentObject, event)
+      return dict(page, success=True, start=start - shift[0], pagesize=count, total_count=len(contentObject['events']) - shift[0])
+    return respond
+  return make
@@ -0,0 +1,142 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from steamcrawl import PricePanel
+
+
+def random_histories(seed: int = 0) -> pd.DataFrame:
+  """
+  Price histories of three items in long format, on the hour, each with its own gaps.
+  """
+
+  random = np.random.default_rng(seed)
+  dates = pd.date_range('2024-01-01', periods=24 * 20, freq='H')
+  frames = []
+  for item_name, appid in [('Case', '730'), ('Key', '730'), ('Key', '440')]:
+    kept = np.sort(random.choice(len(dates), len(dates) // 2, replace=False))
+    frames.append(pd.DataFrame({
+      'item_name': item_name, 'appid': appid, 'date': dates[kept],
+      'median_price': random.uniform(1, 10, len(kept)).astype('float32'), 'volume_sold': random.integers(0, 50, len(kept))
+    }))
+  return pd.concat(frames, ignore_index=True)
+
+
+def reference_ohlc(histories: pd.DataFrame, freq: str) -> pd.DataFrame:
+  grouped = histories.sort_values('date').groupby(['item_name', 'appid', pd.Grouper(key='date', freq=freq)])
+  df = grouped['median_price'].agg(['first', 'max', 'min', 'last'])
+  df.columns = ['open', 'high', 'low', 'close']
+  df['volume'] = grouped['volume_sold'].sum()
+  df['vwap'] = grouped.apply(lambda group: (group['median_price'].astype('float64') * group['volume_sold']).sum() / group['volume_sold'].sum()
+                             if group['volume_sold'].sum() > 0 else np.nan)
+  return df.reset_index()
+
+
+@pytest.mark.parametrize('freq, grouper', [('D', 'D'), ('W', 'W-SUN')])
+def test_candles_match_a_pandas_groupby(freq, grouper):
+  histories = random_histories()
+  candles = PricePanel(histories).ohlc(freq).astype({'item_name': str, 'appid': str})
+  # Weeks start on Monday, which is the start of the weeks ending on Sunday of pandas.
+  expected = reference_ohlc(histories, grouper)
+  if freq == 'W':
+    expected['date'] = expected['date'] - pd.Timedelta(days=6)
+
+  keys = ['item_name', 'appid', 'date']
+  candles = candles.sort_values(keys, ignore_index=True)
+  expected = expected.sort_values(keys, ignore_index=True)
+  assert candles[keys].equals(expected[keys])
+  for column in ['open', 'high', 'low', 'close', 'vwap']:
+    assert np.allclose(candles[column], expected[column], equal_nan=True, rtol=1e-5)
+  assert (candles['volume'] == expected['volume']).all()
+
+
+def test_panels_align_the_items_on_one_time_axis():
+  histories = {
+    ('Case', '730'): pd.DataFrame({'date': pd.to_datetime(['2024-01-01', '2024-01-03']), 'median_price': [1.0, 2.0], 'volume_sold': [5, 6]}),
+    'Key': pd.DataFrame({'date': pd.to_datetime(['2024-01-02']), 'median_price': [3.0], 'volume_sold': [7]})
+  }
+  panel = PricePanel(histories)
+
+  assert list(panel.items) == [('Case', '730'), ('Key', '')]
+  assert panel.times.tolist() == pd.to_datetime(['2024-01-01', '2024-01-02', '2024-01-03']).to_numpy(dtype='datetime64[s]').tolist()
+  assert np.array_equal(panel.prices, np.array([[1, np.nan, 2], [np.nan, 3, np.nan]], dtype='float32'), equal_nan=True)
+  assert panel.volumes.tolist() == [[5, 0, 6], [0, 7, 0]]
+
+
+def test_failed_items_without_a_date_are_dropped():
+  histories = random_histories()
+  failed = pd.DataFrame({'item_name': ['Missing'], 'appid': ['730'], 'date': [pd.NaT], 'median_price': [np.nan], 'volume_sold': [0]})
+  panel = PricePanel(pd.concat([histories, failed], ignore_index=True))
+  assert ('Missing', '730') not in list(panel.items) and len(panel) == 3
+
+
+def test_daily_resampling_fills_the_days_without_entries():
+  histories = pd.DataFrame({'item_name': 'Case', 'appid': '730', 'date': pd.to_datetime(['2024-01-01 10:00', '2024-01-01 12:00', '2024-01-04 09:00']),
+                            'median_price': [1.0, 3.0, 5.0], 'volume_sold': [1, 3, 0]})
+  daily = PricePanel(histories).resample('D')
+
+  assert len(daily.times) == 4
+  # The VWAP of the first day, then no entries, then the close of a day without volume.
+  assert np.array_equal(daily.prices[0], np.array([2.5, np.nan, np.nan, 5.0], dtype='float32'), equal_nan=True)
+  assert daily.volumes[0].tolist() == [4, 0, 0, 0]
+
+
+def test_summary_and_rank_between_two_times():
+  histories = pd.DataFrame({
+    'item_name': ['Up', 'Up', 'Down', 'Down', 'Flat'], 'appid': '730',
+    'date': pd.to_datetime(['2024-01-01', '2024-01-05', '2024-01-01', '2024-01-05', '2024-01-03']),
+    'median_price': [1.0, 2.0, 4.0, 2.0, 3.0], 'volume_sold': 1
+  })
+  panel = PricePanel(histories)
+
+  summary = panel.summary()
+  assert summary.loc[('Up', '730'), 'return'] == pytest.approx(1.0)
+  assert summary.loc[('Down', '730'), 'return'] == pytest.approx(-0.5)
+  assert summary.loc[('Flat', '730'), 'observations'] == 1
+
+  ranked = panel.rank('return')
+  assert [item[0] for item in ranked.index] == ['Up', 'Flat', 'Down']
+  assert ranked['rank'].tolist() == [1, 2, 3]
+  assert [item[0] for item in panel.rank('return', top=1, ascending=True).index] == ['Down']
+  # Only the entry of Flat is between these times.
+  assert panel.summary(start='2024-01-02', end='2024-01-04')['observations'].tolist() == [0, 1, 0]
+
+
+def test_returns_rolling_and_volatility_skip_the_missing_entries():
+  histories = pd.DataFrame({'item_name': 'Case', 'appid': '730', 'date': pd.to_datetime(['2024-01-01', '2024-01-03', '2024-01-04']),
+                            'median_price': [1.0, 2.0, 4.0], 'volume_sold': 1})
+  other = histories.assign(item_name='Key', date=pd.to_datetime(['2024-01-02', '2024-01-03', '2024-01-04']))
+  panel = PricePanel(pd.concat([histories, other], ignore_index=True))
+
+  returns = panel.returns()
+  assert np.allclose(returns[0], [np.nan, np.nan, np.log(2), np.log(2)], equal_nan=True)
+  assert panel.volatility()['volatility'].tolist() == [pytest.approx(0.0), pytest.approx(0.0)]
+  rolling = panel.rolling(2, 'max')
+  assert rolling[('Case', '730')].tolist() == [1.0, 1.0, 2.0, 4.0]
+
+
+def test_results_are_cached_by_the_content_of_the_panel(tmp_path):
+  histories = random_histories()
+  cache_dir = str(tmp_path / 'cache')
+  panel = PricePanel(histories, cache_dir=cache_dir)
+  candles = panel.ohlc('D')
+  files = os.listdir(cache_dir)
+  assert len(files) == 1
+
+  assert PricePanel(histories, cache_dir=cache_dir).ohlc('D').equals(candles)
+  assert os.listdir(cache_dir) == files
+  changed = PricePanel(histories.assign(volume_sold=histories['volume_sold'] + 1), cache_dir=cache_dir)
+  assert changed.fingerprint() != panel.fingerprint()
+  changed.ohlc('D')
+  assert len(os.listdir(cache_dir)) == 2
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+def test_saved_panels_load_with_the_same_arrays(tmp_path, mmap):
+  panel = PricePanel(random_histories())
+  panel.save(str(tmp_path / 'panel'))
+  loaded = PricePanel.load(str(tmp_path / 'panel'), mmap=mmap)
+
+  assert list(loaded.items) == list(panel.items)
+  assert loaded.fingerprint() == panel.fingerprint()
+  assert loaded.ohlc('W').equals(panel.ohlc('W'))
@@ -0,0 +1,85 @@
+import asyncio
+import pandas as pd
+import pytest
+from bench_market_history import synthetic_history
+from steamcrawl import AppRegistry, CredentialPool, FixtureServer, RateLimiter
+from steamcrawl.replay import ReplayedResponse
+from conftest import COOKIE
+
+aiohttp = pytest.importorskip('aiohttp')
+from steamcrawl import AsyncRequest
+
+OVERVIEW = {'success': True, 'lowest_price': '$1.00', 'volume': '10', 'median_price': '$1.05'}
+
+
+class FlakySession:
+  """
+  Session whose first requests fail to connect, before the others go through an aiohttp session.
+  """
+
+  def __init__(self, failures: int):
+    self.session = aiohttp.ClientSession()
+    self.failures = failures
+    self.calls = 0
+
+  def get(self, url: str, **kwargs):
+    self.calls += 1
+    if self.calls <= self.failures:
+      raise aiohttp.ClientConnectionError('connection refused')
+    return self.session.get(url, **kwargs)
+
+
+def make_async_request(server: FixtureServer, auth_cache, **kwargs) -> AsyncRequest:
+  kwargs.setdefault('rate_limiter', False)
+  return AsyncRequest(COOKIE, base_urls=server.base_urls(), auth_cache=auth_cache, app_registry=AppRegistry(None), **kwargs)
+
+
+def test_async_client_returns_the_same_frames(make_request, auth_cache, history_responder):
+  contentObject = synthetic_history(150, seed=3)
+
+  async def fetch(server):
+    async with make_async_request(server, auth_cache) as request:
+      return await request.get_market_history(count=150)
+
+  with FixtureServer(responders={'/market/myhistory/render/': history_responder(contentObject)}) as server:
+    expected = make_request(server).get_market_history(count=150)
+    pd.testing.assert_frame_equal(asyncio.run(fetch(server)), expected)
+
+
+def test_connection_errors_are_retried(auth_cache):
+  rateLimiter = RateLimiter(limits={'steamcommunity.com': (10000, 10000)}, backoff_base=0.001, backoff_max=0.01)
+
+  async def fetch(server, failures):
+    session = FlakySession(failures)
+    try:
+      async with make_async_request(server, auth_cache, session=session, rate_limiter=rateLimiter) as request:
+        return await request.get_item_overview('AK-47 | Redline (Field-Tested)', '')
+    finally:
+      await session.session.close()
+
+  with FixtureServer(responders={'/market/priceoverview/': lambda params: OVERVIEW}) as server:
+    df = asyncio.run(fetch(server, rateLimiter.max_retries))
+    assert df['median_price'].tolist() == [pytest.approx(1.05)]
+    with pytest.raises(aiohttp.ClientConnectionError):
+      asyncio.run(fetch(server, rateLimiter.max_retries + 1))
+
+
+def test_pooled_requests_move_on_after_a_429(auth_cache):
+  cookies = ['first', 'second']
+  for cookie in cookies:
+    auth_cache.set('steamLoginSecure=' + cookie + ';', True)
+  credentials = CredentialPool(cookies)
+  responses = [ReplayedResponse(429, b'{"success": false}')]
+
+  def respond(params: dict):
+    return responses.pop() if responses else OVERVIEW
+
+  async def fetch(server):
+    async with make_async_request(server, auth_cache, credentials=credentials) as request:
+      return await request.get_item_overview('AK-47 | Redline (Field-Tested)', '')
+
+  with FixtureServer(responders={'/market/priceoverview/': respond}) as server:
+    df = asyncio.run(fetch(server))
+
+  assert df['median_price'].tolist() == [pytest.approx(1.05)]
+  assert sorted((status['requests'], status['failures']) for status in credentials.status()) == [(1, 0), (1, 1)]
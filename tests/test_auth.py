@@ -0,0 +1,71 @@
+import subprocess
+import sys
+import pytest
+from bench_requests import responders
+from steamcrawl import AuthCache, FixtureServer, Request, Transport
+from conftest import COOKIE, ROOT
+
+AUTH_ITEM = 'P90 | Blind Spot (Field-Tested)'
+
+
+def counting_routes(authorized: bool, checks: list) -> dict:
+  routes = responders({'events': 20, 'points': 5})
+  prices = routes['/market/pricehistory/']
+
+  def respond(params: dict):
+    if params.get('market_hash_name') != AUTH_ITEM:
+      return prices(params)
+    checks.append(params)
+    return prices(params) if authorized else []
+  routes['/market/pricehistory/'] = respond
+  return routes
+
+
+def make(server: FixtureServer, cache: AuthCache, cookie: str = COOKIE) -> Request:
+  return Request(cookie, transport=Transport(base_urls=server.base_urls(), rate_limiter=False), auth_cache=cache)
+
+
+def test_construction_makes_no_request():
+  with FixtureServer(responders=counting_routes(True, [])) as server:
+    Request(COOKIE, transport=Transport(base_urls=server.base_urls(), rate_limiter=False), auth_cache=AuthCache())
+  assert server.requests == 0
+
+
+def test_cookie_is_validated_once_per_cache():
+  checks = []
+  cache = AuthCache()
+  with FixtureServer(responders=counting_routes(True, checks)) as server:
+    first, second = make(server, cache), make(server, cache)
+    first.get_market_history(count=10)
+    second.get_market_history(count=10)
+    first.get_market_history(count=10)
+    assert len(checks) == 1
+    make(server, AuthCache()).get_market_history(count=10)
+    assert len(checks) == 2
+
+
+def test_unauthorized_cookie_is_rejected():
+  checks = []
+  cache = AuthCache()
+  with FixtureServer(responders=counting_routes(False, checks)) as server:
+    request = make(server, cache, 'expired')
+    for _ in range(2):
+      with pytest.raises(ConnectionError):
+        request.get_market_history(count=10)
+  assert len(checks) == 1 and cache.get('steamLoginSecure=expired;') is False
+
+
+def test_validation_expires_after_the_ttl(monkeypatch):
+  now = [100.0]
+  monkeypatch.setattr('steamcrawl.auth.time.monotonic', lambda: now[0])
+  cache = AuthCache(ttl=60)
+  cache.set('steamLoginSecure=a;', True)
+  assert cache.get('steamLoginSecure=a;') is True
+  now[0] += 60
+  assert cache.get('steamLoginSecure=a;') is None
+
+
+def test_import_does_not_load_the_dependencies():
+  code = ("import sys, steamcrawl; steamcrawl.AuthCache; "
+          "assert 'pandas' not in sys.modules and 'steamcrawl.request' not in sys.modules")
+  subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
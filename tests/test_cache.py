@@ -0,0 +1,93 @@
+import time
+import pytest
+from steamcrawl import FileCache, ResponseCache, SQLiteCache, Transport
+from steamcrawl.replay import ReplayedResponse
+
+URL = 'https://steamcommunity.com/market/pricehistory/'
+PRICES = b'{"success": true, "prices": [["Nov 01 2013 00: +0", 1.5, "3"]]}'
+
+
+class RecordingSession:
+  """
+  Session answering with the given response, or with a 304 when the request is revalidated with the same ETag.
+  """
+
+  def __init__(self, response: ReplayedResponse):
+    self.response = response
+    self.requests = []
+
+  def get(self, url: str, params: dict = None, headers: dict = None, **kwargs):
+    self.requests.append(dict(headers or {}))
+    etag = self.response.headers.get('ETag')
+    if etag is not None and (headers or {}).get('If-None-Match') == etag:
+      return ReplayedResponse(304, b'')
+    return self.response
+
+
+@pytest.fixture(params=['memory', 'sqlite', 'file'])
+def cache(request, tmp_path) -> ResponseCache:
+  if request.param == 'sqlite':
+    return SQLiteCache(str(tmp_path / 'cache.db'))
+  if request.param == 'file':
+    return FileCache(str(tmp_path / 'cache'))
+  return ResponseCache()
+
+
+def test_fresh_responses_are_served_from_the_cache(cache):
+  session = RecordingSession(ReplayedResponse(200, PRICES))
+  transport = Transport(session=session, rate_limiter=False, cache=cache)
+  first = transport.get(URL, {'market_hash_name': 'Item 1'}, {'Cookie': 'a'})
+  second = transport.get(URL, {'market_hash_name': 'Item 1'}, {'Cookie': 'a'})
+  transport.get(URL, {'market_hash_name': 'Item 1'}, {'Cookie': 'b'})
+  transport.get(URL, {'market_hash_name': 'Item 2'}, {'Cookie': 'a'})
+
+  assert first.content == second.content == PRICES
+  assert getattr(second, 'from_cache', False)
+  assert len(session.requests) == 3
+
+
+def test_stale_responses_are_revalidated(cache):
+  cache.ttls = {'/market/pricehistory/': 0.001}
+  session = RecordingSession(ReplayedResponse(200, PRICES, {'ETag': '"v1"'}))
+  transport = Transport(session=session, rate_limiter=False, cache=cache)
+  transport.get(URL, {'market_hash_name': 'Item 1'})
+  time.sleep(0.01)
+  response = transport.get(URL, {'market_hash_name': 'Item 1'})
+
+  assert response.status_code == 200 and response.content == PRICES
+  assert [headers.get('If-None-Match') for headers in session.requests] == [None, '"v1"']
+
+
+@pytest.mark.parametrize('status, content', [(200, b'null'), (200, b'[]'), (500, b'{}')])
+def test_failed_answers_are_not_cached(cache, status, content):
+  session = RecordingSession(ReplayedResponse(status, content))
+  transport = Transport(session=session, rate_limiter=False, cache=cache)
+  transport.get(URL)
+  transport.get(URL)
+  assert len(session.requests) == 2
+
+
+def test_apis_without_ttl_are_not_cached(cache):
+  session = RecordingSession(ReplayedResponse(200, b'{"success": true}'))
+  transport = Transport(session=session, rate_limiter=False, cache=cache)
+  for _ in range(2):
+    transport.get('https://steamcommunity.com/market/priceoverview/')
+  assert len(session.requests) == 2
+
+
+def test_least_recently_used_entries_are_evicted(cache):
+  cache.max_entries = 2
+  entry = {'stored_at': 0.0, 'status_code': 200, 'etag': None, 'last_modified': None, 'content': b'{}'}
+  for key in ['a', 'b']:
+    cache.store(key, dict(entry))
+  cache.load('a')
+  cache.store('c', dict(entry))
+  assert [cache.load(key) is not None for key in ['a', 'b', 'c']] == [True, False, True]
+
+
+def test_entries_persist_across_instances(tmp_path):
+  path = str(tmp_path / 'cache.db')
+  session = RecordingSession(ReplayedResponse(200, PRICES))
+  Transport(session=session, rate_limiter=False, cache=SQLiteCache(path)).get(URL)
+  Transport(session=session, rate_limiter=False, cache=SQLiteCache(path)).get(URL)
+  assert len(session.requests) == 1
@@ -0,0 +1,142 @@
+import warnings
+import pytest
+from steamcrawl import FixtureServer, StoreCatalog
+from steamcrawl.catalog import content_hash, detail_record, price_record
+
+
+def details_entry(appid: int, name: str, is_free: bool = False, description: str = 'v1', total: int = 100) -> dict:
+  """
+  Entry of an appdetails response for one app.
+  """
+
+  return {'success': True, 'data': {
+    'type': 'game', 'name': name, 'steam_appid': appid, 'is_free': is_free, 'required_age': 0,
+    'developers': ['Developer'], 'publishers': ['Publisher'], 'genres': [{'id': '1', 'description': 'Action'}],
+    'platforms': {'windows': True, 'mac': False, 'linux': True}, 'release_date': {'coming_soon': False, 'date': '1 Jan, 2020'},
+    'recommendations': {'total': total}, 'short_description': description
+  }}
+
+
+class FakeStore:
+  """
+  Stand-in for the app list and appdetails APIs, counting the requests of each kind.
+  """
+
+  def __init__(self, count: int):
+    self.apps = {appid: 'App {}'.format(appid) for appid in range(10, 10 * count + 10, 10)}
+    self.descriptions = {}
+    self.prices = {}
+    self.details_calls = 0
+    self.price_batches = []
+
+  def app_list(self, params: dict) -> dict:
+    return {'applist': {'apps': [{'appid': appid, 'name': name} for appid, name in self.apps.items()]}}
+
+  def app_details(self, params: dict) -> dict:
+    appids = params['appids'].split(',')
+    if params.get('filters') == 'price_overview':
+      self.price_batches.append(len(appids))
+      return {appid: {'success': True, 'data': {'price_overview': {
+        'currency': 'USD', 'initial': 999, 'final': self.prices.get(int(appid), 999), 'discount_percent': 0}}} for appid in appids}
+    self.details_calls += 1
+    appid = int(appids[0])
+    return {appids[0]: details_entry(appid, self.apps.get(appid, ''), is_free=appid % 30 == 0,
+                                     description=self.descriptions.get(appid, 'v1'))}
+
+  def responders(self) -> dict:
+    return {'/ISteamApps/GetAppList/': self.app_list, '/api/appdetails/': self.app_details}
+
+
+@pytest.fixture
+def catalog(tmp_path):
+  catalog = StoreCatalog(str(tmp_path / 'catalog.db'))
+  yield catalog
+  catalog.close()
+
+
+def test_app_list_diffs(catalog):
+  diff = catalog.update_apps([{'appid': 1, 'name': 'a'}, {'appid': 2, 'name': 'b'}], now=100)
+  assert diff == {'new': [(1, 'a'), (2, 'b')], 'renamed': [], 'removed': []}
+  assert catalog.pending(now=100) == [1, 2]
+
+  diff = catalog.update_apps([{'appid': 1, 'name': 'A'}, {'appid': 3, 'name': 'c'}], now=200)
+  assert diff == {'new': [(3, 'c')], 'renamed': [(1, 'A')], 'removed': [(2, 'b')]}
+  assert len(catalog) == 2
+
+  # An app back in the list is reported as renamed, so that its details are fetched again.
+  diff = catalog.update_apps([{'appid': 1, 'name': 'A'}, {'appid': 2, 'name': 'b'}, {'appid': 3, 'name': 'c'}], now=300)
+  assert diff == {'new': [], 'renamed': [(2, 'b')], 'removed': []}
+
+
+def test_pending_details(catalog):
+  catalog.update_apps([{'appid': 1, 'name': 'a'}, {'appid': 2, 'name': 'b'}], now=100)
+  catalog.store_details([detail_record(1, details_entry(1, 'a'), 150), detail_record(2, details_entry(2, 'b'), 150)])
+  assert catalog.pending(now=200) == []
+  assert catalog.pending(max_age=30, now=200) == [1, 2]
+
+  catalog.update_apps([{'appid': 1, 'name': 'a'}, {'appid': 2, 'name': 'B'}], now=300)
+  assert catalog.pending(now=300) == [2]
+
+
+def test_content_hash_ignores_volatile_fields(catalog):
+  assert content_hash(details_entry(1, 'a', total=1)['data']) == content_hash(details_entry(1, 'a', total=2)['data'])
+  assert content_hash(details_entry(1, 'a')['data']) != content_hash(details_entry(1, 'a', description='v2')['data'])
+
+  catalog.update_apps([{'appid': 1, 'name': 'a'}, {'appid': 2, 'name': 'b'}], now=100)
+  assert catalog.store_details([detail_record(1, details_entry(1, 'a'), 100), detail_record(2, details_entry(2, 'b'), 100)]) == []
+  changed = catalog.store_details([detail_record(1, details_entry(1, 'a', total=5), 200),
+                                   detail_record(2, details_entry(2, 'b', description='v2'), 200)])
+  assert changed == [2]
+  assert catalog.get_details(2)['short_description'] == 'v2'
+
+
+def test_price_changes(catalog):
+  entry = {'success': True, 'data': {'price_overview': {'currency': 'EUR', 'initial': 500, 'final': 500, 'discount_percent': 0}}}
+  sale = {'success': True, 'data': {'price_overview': {'currency': 'EUR', 'initial': 500, 'final': 250, 'discount_percent': 50}}}
+  assert catalog.store_prices([price_record(1, entry, 100)]) == []
+  assert catalog.store_prices([price_record(1, entry, 200)]) == []
+  assert catalog.store_prices([price_record(1, sale, 300)]) == [1]
+  assert price_record(2, {'success': True, 'data': []}, 100) == (2, None, None, None, None, 100)
+
+
+def test_get_catalog_without_warnings(catalog):
+  catalog.update_apps([{'appid': 1, 'name': 'a'}, {'appid': 2, 'name': 'b'}], now=100)
+  catalog.update_apps([{'appid': 1, 'name': 'a'}], now=200)
+  with warnings.catch_warnings():
+    warnings.simplefilter('error')
+    df = catalog.get_catalog()
+    everything = catalog.get_catalog(include_removed=True)
+
+  assert df['appid'].tolist() == [1]
+  assert str(df['removed'].dtype) == 'datetime64[ns]' and df['removed'].isna().all()
+  assert everything['removed'].notna().tolist() == [False, True]
+
+
+def test_sync_only_fetches_changes(catalog, make_request):
+  store = FakeStore(250)
+  with FixtureServer(responders=store.responders()) as server:
+    request = make_request(server)
+    changes = request.sync_store_catalog(catalog, batch_size=100)
+    assert changes['change'].value_counts().to_dict() == {'new': 250}
+    assert store.details_calls == 250
+    # The free apps (every third one) are not priced.
+    assert sum(store.price_batches) == 250 - 250 // 3
+
+    store.details_calls, store.price_batches = 0, []
+    assert len(request.sync_store_catalog(catalog)) == 0
+    assert store.details_calls == 0
+
+    store.apps[5000] = 'New'
+    store.apps[20] = 'Renamed'
+    del store.apps[40]
+    store.prices[10] = 499
+    store.details_calls = 0
+    changes = request.sync_store_catalog(catalog)
+
+  assert store.details_calls == 2
+  assert sorted(map(tuple, changes[['appid', 'change']].values.tolist())) == [
+    (10, 'price'), (20, 'details'), (20, 'renamed'), (40, 'removed'), (5000, 'new')]
+  df = catalog.get_catalog()
+  assert len(df) == 250
+  assert df.set_index('appid').loc[10, 'final'] == 499
+  assert catalog.get_details(20)['name'] == 'Renamed'
@@ -0,0 +1,124 @@
+import functools
+import pytest
+from bench_requests import listings_page, responders
+from steamcrawl import Crawler, FixtureServer, SQLiteQueue, TaskQueue
+from steamcrawl.crawl import task_id
+
+
+def shrinking_routes(total: list) -> dict:
+  """
+  Responders whose market has total[0] listings, so that a test can shrink it between the seed and the work.
+  """
+
+  routes = responders({'points': 20, 'apps': 10})
+  routes['/market/search/render/'] = lambda params: listings_page(
+    total[0], int(params.get('start', 0)), int(params.get('count', 10)), params.get('appid', ''))
+  return routes
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def queue(request, tmp_path):
+  if request.param == 'memory':
+    yield TaskQueue()
+  else:
+    queue = SQLiteQueue(str(tmp_path / 'queue.db'))
+    yield queue
+    queue.close()
+
+
+def test_crawl_runs_every_task_and_merges_the_checkpoints(make_request, tmp_path):
+  with FixtureServer(responders=responders({'listings': 25, 'points': 20, 'apps': 10})) as server:
+    crawler = Crawler(functools.partial(make_request, server), str(tmp_path / 'crawl'), page_size=10)
+    assert crawler.seed(count=25) == 3
+    counts = crawler.run(workers=2)
+
+  assert counts == {'pending': 0, 'leased': 0, 'done': 3 + 25, 'failed': 0}
+  listings = crawler.merge('listings')
+  assert sorted(listings['hash_name']) == sorted('Item {}'.format(i) for i in range(25))
+  histories = crawler.merge('price_history')
+  assert histories.groupby('item_name').size().to_dict() == {'Item {}'.format(i): 20 for i in range(25)}
+
+
+def test_seeding_again_adds_only_the_new_pages(make_request, tmp_path):
+  with FixtureServer(responders=responders({'listings': 25, 'apps': 10})) as server:
+    crawler = Crawler(functools.partial(make_request, server), str(tmp_path / 'crawl'), page_size=10, price_history=False)
+    assert crawler.seed(count=25) == 3
+    assert crawler.seed(count=35) == 1
+    assert crawler.seed() == 0
+
+
+def test_checkpoints_are_reused_after_a_restart(make_request, tmp_path):
+  path = str(tmp_path / 'crawl')
+  with FixtureServer(responders=responders({'listings': 30, 'apps': 10})) as server:
+    crawler = Crawler(functools.partial(make_request, server), path, page_size=10, price_history=False)
+    crawler.seed(count=30)
+    crawler.work()
+    requests = server.requests
+
+    # A new queue, as if the queue had been lost, runs the tasks again from their checkpoints.
+    restarted = Crawler(functools.partial(make_request, server), path, queue=TaskQueue(), page_size=10, price_history=False)
+    restarted.seed(count=30)
+    assert restarted.work() == 3
+    assert server.requests == requests
+
+  assert restarted.merge('listings').equals(crawler.merge('listings'))
+
+
+def test_pages_past_the_end_of_a_shrunk_market_are_empty(make_request, tmp_path):
+  total = [35]
+  with FixtureServer(responders=shrinking_routes(total)) as server:
+    crawler = Crawler(functools.partial(make_request, server), str(tmp_path / 'crawl'), page_size=10, price_history=False)
+    crawler.seed(count=35)
+    total[0] = 12
+    counts = crawler.run(workers=2)
+
+  assert counts == {'pending': 0, 'leased': 0, 'done': 4, 'failed': 0}
+  assert sorted(crawler.merge('listings')['hash_name']) == sorted('Item {}'.format(i) for i in range(12))
+
+
+def test_clamped_listings_stop_at_the_live_total_count(make_request):
+  total = [25]
+  with FixtureServer(responders=shrinking_routes(total)) as server:
+    request = make_request(server)
+    with pytest.raises(Exception):
+      list(request.iter_all_listings(count=10, start=20))
+    pages = list(request.iter_all_listings(count=10, start=20, clamp=True))
+    assert list(request.iter_all_listings(count=10, start=30, clamp=True)) == []
+
+  assert [len(page) for page in pages] == [5]
+
+
+def test_an_expired_lease_is_given_again(queue):
+  queue.put([{'id': 'a', 'kind': 'listings', 'params': {}}])
+  assert queue.lease(-1)['attempts'] == 1
+  assert queue.lease(60, 3)['attempts'] == 2
+  assert queue.lease(60, 3) is None
+  assert queue.counts()['leased'] == 1
+
+
+def test_an_expired_lease_at_max_attempts_is_failed(queue):
+  queue.put([{'id': 'a', 'kind': 'listings', 'params': {}}])
+  assert queue.lease(-1, 2)['attempts'] == 1
+  assert queue.lease(-1, 2)['attempts'] == 2
+  # The second lease expired as well, so the task is failed instead of being given a third time.
+  assert queue.lease(60, 2) is None
+
+  assert queue.counts() == {'pending': 0, 'leased': 0, 'done': 0, 'failed': 1}
+  assert [(id, error) for id, error in queue.failures()] == [('a', 'The lease expired after 2 attempts.')]
+
+
+def test_failed_tasks_are_retried_until_max_attempts(queue):
+  queue.put([{'id': 'a', 'kind': 'listings', 'params': {}}])
+  for attempt in range(3):
+    task = queue.lease(60, 3)
+    queue.fail(task['id'], 'error {}'.format(attempt), 3)
+
+  assert queue.lease(60, 3) is None
+  assert [tuple(failure) for failure in queue.failures()] == [('a', 'error 2')]
+
+
+def test_task_ids_do_not_depend_on_the_order_of_the_params():
+  params = {'item_name': 'Item 1', 'appid': '730'}
+  assert task_id('price_history', params) == task_id('price_history', dict(reversed(list(params.items()))))
+  assert task_id('price_history', params) != task_id('price_history', dict(params, appid='570'))
+  assert task_id('listings', {'appid': '', 'start': 100, 'count': 100}) == 'listings/all-000000100'
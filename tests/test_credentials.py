@@ -0,0 +1,101 @@
+import pytest
+from bench_requests import responders
+from steamcrawl import CredentialPool, FixtureServer
+
+
+def header(cookie: str) -> str:
+  return 'steamLoginSecure=' + cookie + ';'
+
+
+def statuses(pool: CredentialPool) -> dict:
+  return {status['key']: status for status in pool.status()}
+
+
+def test_lru_cycles_over_the_cookies():
+  pool = CredentialPool(['a', 'b', 'c', 'a'])
+  assert len(pool) == 3
+  picked = [pool.reserve()[0] for _ in range(6)]
+  assert picked[:3] == picked[3:] and sorted(picked[:3]) == [header(cookie) for cookie in 'abc']
+
+
+def test_budget_picks_the_cookie_with_the_most_requests_left():
+  pool = CredentialPool(['a', 'b'], strategy='budget', rate=0.001, capacity=3)
+  first = pool.reserve()[0]
+  assert pool.reserve()[0] != first
+  picked = [pool.reserve()[0] for _ in range(4)]
+  assert sorted(picked) == sorted([header('a'), header('b')] * 2)
+  assert pool.reserve()[1] > 0
+
+
+def test_failed_cookies_cool_down_then_leave_the_rotation(monkeypatch):
+  now = [1000.0]
+  monkeypatch.setattr('steamcrawl.credentials.time.monotonic', lambda: now[0])
+  pool = CredentialPool(['a', 'b'], cooldown=10, max_failures=3)
+
+  pool.report(header('a'), False)
+  assert [pool.reserve()[0] for _ in range(3)] == [header('b')] * 3
+  now[0] += 10
+  assert header('a') in [pool.reserve()[0] for _ in range(2)]
+
+  pool.report(header('a'), False)
+  assert max(status['cooldown'] for status in pool.status()) == 20
+  pool.report(header('a'), False)
+  assert sorted((status['healthy'], status['failures']) for status in pool.status()) == [(False, 3), (True, 0)]
+  now[0] += 3600
+  assert {pool.reserve()[0] for _ in range(4)} == {header('b')}
+
+  pool.restore()
+  assert all(status['healthy'] and status['failures'] == 0 for status in pool.status())
+
+
+def test_success_clears_the_failures():
+  pool = CredentialPool(['a'], cooldown=10)
+  pool.report(header('a'), False)
+  pool.report(header('a'), True)
+  status, = pool.status()
+  assert status['failures'] == 0 and status['empty_responses'] == 1
+
+
+def test_a_pool_without_authorized_cookies_fails():
+  pool = CredentialPool(['a', 'b'])
+  pool.disable(header('a'))
+  pool.disable(header('b'))
+  with pytest.raises(ConnectionError):
+    pool.reserve()
+  with pytest.raises(ValueError):
+    CredentialPool(['a'], strategy='random')
+  with pytest.raises(ConnectionError):
+    CredentialPool([])
+
+
+def test_limits_scale_with_the_pool():
+  limits = CredentialPool(['a', 'b', 'c'], rate=1, capacity=5).limits()
+  assert limits['steamcommunity.com/market/pricehistory'] == (3, 15)
+
+
+def test_price_requests_are_spread_over_the_pool(make_request, auth_cache):
+  cookies = ['a', 'b', 'c']
+  for cookie in cookies:
+    auth_cache.set(header(cookie), True)
+  pool = CredentialPool(cookies)
+  with FixtureServer(responders=responders({'points': 10, 'apps': 10})) as server:
+    df = make_request(server, credentials=pool).get_price_history_many([('Item {}'.format(i), '730') for i in range(9)])
+
+  assert df['error'].isna().all() and len(df) == 90
+  assert [status['requests'] for status in pool.status()] == [3, 3, 3]
+
+
+def test_empty_answers_move_on_to_the_next_cookie(make_request, auth_cache):
+  for cookie in ['a', 'b']:
+    auth_cache.set(header(cookie), True)
+  pool = CredentialPool(['a', 'b'])
+  routes = responders({'points': 10, 'apps': 10})
+  prices = routes['/market/pricehistory/']
+  answers = [[]]
+  routes['/market/pricehistory/'] = lambda params: answers.pop() if answers else prices(params)
+
+  with FixtureServer(responders=routes) as server:
+    df = make_request(server, credentials=pool).get_price_history('Item 1', '730')
+
+  assert len(df) == 10
+  assert sorted((status['requests'], status['empty_responses']) for status in pool.status()) == [(1, 0), (1, 1)]
@@ -0,0 +1,55 @@
+import importlib.util
+import json
+import pandas as pd
+import pytest
+from bench_market_history import synthetic_history
+from steamcrawl import FixtureServer, JSONDecoder
+
+BACKENDS = [pytest.param(name, marks=pytest.mark.skipif(name != 'json' and importlib.util.find_spec(name) is None,
+                                                        reason=f'{name} is not installed')) for name in ['msgspec', 'orjson', 'json']]
+HISTORY_URL = 'https://steamcommunity.com/market/myhistory/render/'
+
+
+def history_with_new_fields() -> dict:
+  contentObject = synthetic_history(120, seed=5)
+  contentObject.update({'success': True, 'start': 0, 'pagesize': 120, 'total_count': 120, 'hovers': 'x' * 1000})
+  for listing in contentObject['listings'].values():
+    listing['time_created'] = 1700000000
+  return contentObject
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_backends_keep_every_field(backend):
+  contentObject = history_with_new_fields()
+  decoded = JSONDecoder(backend).decode(json.dumps(contentObject).encode('utf-8'), HISTORY_URL)
+  assert decoded == contentObject
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_backends_return_the_same_frames(make_request, backend):
+  contentObject = history_with_new_fields()
+  with FixtureServer(responders={'/market/myhistory/render/': lambda params: contentObject}) as server:
+    expected = make_request(server, decoder='json').get_market_history(count=120)
+    df = make_request(server, decoder=backend).get_market_history(count=120)
+  assert 'time_created' in df.columns
+  pd.testing.assert_frame_equal(df, expected)
+
+
+def test_typed_decoding_is_opt_in():
+  pytest.importorskip('msgspec')
+  contentObject = history_with_new_fields()
+  content = json.dumps(contentObject).encode('utf-8')
+  decoded = JSONDecoder('msgspec', typed=True).decode(content, HISTORY_URL)
+  assert 'hovers' not in decoded
+  assert 'time_created' not in next(iter(decoded['listings'].values()))
+  assert [event['listingid'] for event in decoded['events']] == [event['listingid'] for event in contentObject['events']]
+
+  # Responses that do not match their type are decoded as plain JSON.
+  assert JSONDecoder('msgspec', typed=True).decode(b'{"success": "yes"}', HISTORY_URL) == {'success': 'yes'}
+
+
+def test_typed_decoding_requires_msgspec():
+  with pytest.raises(ValueError):
+    JSONDecoder('json', typed=True)
+  with pytest.raises(ValueError):
+    JSONDecoder('simplejson')
@@ -0,0 +1,49 @@
+import pandas as pd
+from bench_market_history import synthetic_history
+from steamcrawl import FixtureServer, MarketHistoryStore
+
+
+def test_sync_only_fetches_new_events(tmp_path, make_request, history_responder):
+  contentObject = synthetic_history(300)
+  shift = [40]
+  store = MarketHistoryStore(str(tmp_path / 'history.db'))
+  with FixtureServer(responders={'/market/myhistory/render/': history_responder(contentObject, shift)}) as server:
+    request = make_request(server)
+    request.sync_market_history(store)
+    assert len(store) == 260 and store.backfill() == 0
+
+    shift[0] = 25
+    requests = server.requests
+    request.sync_market_history(store)
+    assert len(store) == 300 - 25
+    assert server.requests - requests == 1
+
+    shift[0] = 0
+    full = request.sync_market_history(store, full=True)
+    expected = request.get_market_history(300)
+  pd.testing.assert_frame_equal(full.sort_values(['time_event', 'event_type'], ignore_index=True),
+                                expected.sort_values(['time_event', 'event_type'], ignore_index=True))
+
+
+def test_capped_sync_is_backfilled(tmp_path, make_request, history_responder):
+  contentObject = synthetic_history(400)
+  shift = [50]
+  store = MarketHistoryStore(str(tmp_path / 'history.db'))
+  with FixtureServer(responders={'/market/myhistory/render/': history_responder(contentObject, shift)}) as server:
+    request = make_request(server)
+    request.sync_market_history(store, max_count=120)
+    assert len(store) == 120 and store.backfill() == 350 - 120
+
+    # New events arrive while the backfill goes on, shifting the pages.
+    syncs = 0
+    while store.backfill() > 0:
+      shift[0] = max(0, shift[0] - 20)
+      request.sync_market_history(store, max_count=120)
+      syncs += 1
+    assert syncs == 2
+    assert len(store) == 400 - shift[0]
+
+    shift[0] = 0
+    request.sync_market_history(store, max_count=120)
+  reopened = MarketHistoryStore(str(tmp_path / 'history.db'))
+  assert reopened.backfill() == 0 and len(reopened) == 400
@@ -0,0 +1,33 @@
+from bench_requests import responders
+from steamcrawl import FixtureServer
+from steamcrawl.replay import ReplayedResponse
+
+STEAMID = '76561198000000000'
+
+
+def test_inventory_pages_are_followed_and_joined(make_request):
+  with FixtureServer(responders=responders({'inventory': 4500, 'apps': 10})) as server:
+    request = make_request(server)
+    df = request.get_game_item_inventory(STEAMID, '730')
+    first = request.get_game_item_inventory(STEAMID, '730', count=2500)
+
+  assert len(df) == 4500 and df['assetid'].astype(int).tolist() == list(range(1, 4501))
+  assert (df['market_hash_name'] == 'Case ' + (df['classid'].astype(int)).astype(str)).all()
+  assert len(first) == 2500
+  # The app list, then 3 and 2 pages.
+  assert server.requests == 1 + 3 + 2
+
+
+def test_many_inventories_keep_the_errors_of_private_ones(make_request):
+  routes = responders({'inventory': 30, 'apps': 10})
+  # The inventory URLs are built with a double slash after /inventory/.
+  routes['/inventory//2/'] = lambda params: ReplayedResponse(403, b'null')
+
+  with FixtureServer(responders=routes) as server:
+    request = make_request(server)
+    request.inventory_page_size = 7
+    df = request.get_game_item_inventory_many(['1', '2'], '730')
+
+  assert df.groupby('steamid').size().to_dict() == {'1': 30, '2': 1}
+  assert df.loc[df['steamid'] == '1', 'error'].isna().all()
+  assert df.loc[df['steamid'] == '2', 'error'].notna().all()
@@ -0,0 +1,87 @@
+import json
+import multiprocessing
+from steamcrawl import FixtureServer
+from steamcrawl.itemnameid import ItemNameIdMap
+
+LISTING_PAGE = b'<html><script>Market_LoadOrderSpread( 176321160 );</script></html>'
+
+
+def add_ids(path: str, worker: int, count: int):
+  names = ItemNameIdMap(path, compact_after=7)
+  for i in range(count):
+    names.add('Item {}-{}'.format(worker, i), '730', str(i))
+  names.close()
+
+
+def test_values_are_logged_and_merged_on_close(tmp_path):
+  path = str(tmp_path / 'ids.json')
+  names = ItemNameIdMap(path)
+  names.add('Item 1', '730', '1')
+  names.add('Item 2', '730', '2')
+  assert (tmp_path / 'ids.json.log').read_text().splitlines() == ['["730/Item 1", "1"]', '["730/Item 2", "2"]']
+
+  names.close()
+  assert not (tmp_path / 'ids.json.log').exists()
+  assert json.loads((tmp_path / 'ids.json').read_text()) == {'730/Item 1': '1', '730/Item 2': '2'}
+  assert ItemNameIdMap(path).get('Item 2', '730') == '2'
+
+
+def test_log_is_replayed_on_load(tmp_path):
+  path = str(tmp_path / 'ids.json')
+  (tmp_path / 'ids.json').write_text(json.dumps({'730/Item 1': '1'}))
+  (tmp_path / 'ids.json.log').write_text('["730/Item 2", "2"]\n["730/Item 3", "3"]\n["730/It')
+
+  names = ItemNameIdMap(path)
+  assert len(names) == 3 and names.get('Item 3', '730') == '3'
+  assert not (tmp_path / 'ids.json.log').exists()
+  assert len(json.loads((tmp_path / 'ids.json').read_text())) == 3
+
+
+def test_log_is_merged_once_it_outgrows_the_map(tmp_path):
+  path = str(tmp_path / 'ids.json')
+  names = ItemNameIdMap(path, compact_after=3)
+  for i in range(5):
+    names.add('Item {}'.format(i), '730', str(i))
+  assert len(json.loads((tmp_path / 'ids.json').read_text())) == 3
+  assert len((tmp_path / 'ids.json.log').read_text().splitlines()) == 2
+
+
+def test_processes_share_one_file(tmp_path):
+  path = str(tmp_path / 'ids.json')
+  processes = [multiprocessing.Process(target=add_ids, args=(path, worker, 40)) for worker in range(4)]
+  for process in processes:
+    process.start()
+  for process in processes:
+    process.join()
+
+  assert all(process.exitcode == 0 for process in processes)
+  assert len(ItemNameIdMap(path)) == 160
+
+
+def test_clients_share_one_file(tmp_path):
+  path = str(tmp_path / 'ids.json')
+  first, second = ItemNameIdMap(path), ItemNameIdMap(path)
+  first.add('Item 1', '730', '1')
+  second.add('Item 2', '730', '2')
+  first.close()
+  second.add('Item 3', '730', '3')
+  second.close()
+  assert len(ItemNameIdMap(path)) == 3
+
+
+def test_request_resolves_each_item_once_and_saves_on_close(tmp_path, make_request):
+  path = str(tmp_path / 'ids.json')
+  calls = []
+
+  def respond(params: dict) -> bytes:
+    calls.append(params)
+    return LISTING_PAGE
+
+  with FixtureServer(responders={'/market/listings/': respond}) as server:
+    with make_request(server, item_nameid_path=path) as request:
+      assert request.get_itemname_id('AK-47 | Redline (Field-Tested)', '') == '176321160'
+      assert request.get_itemname_id('AK-47 | Redline (Field-Tested)', '') == '176321160'
+    assert json.loads((tmp_path / 'ids.json').read_text()) == {'/AK-47 | Redline (Field-Tested)': '176321160'}
+    with make_request(server, item_nameid_path=path) as request:
+      assert request.get_itemname_id('AK-47 | Redline (Field-Tested)', '') == '176321160'
+  assert len(calls) == 1
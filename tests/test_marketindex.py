@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+from steamcrawl import MarketIndex
+
+UPDATED = pd.Timestamp('2024-01-01')
+
+
+def random_listings(size: int, seed: int = 0) -> pd.DataFrame:
+  random = np.random.default_rng(seed)
+  return pd.DataFrame({
+    'hash_name': ['{} {}'.format(random.choice(['Case', 'Sticker', 'Operation Pass']), i) for i in range(size)],
+    'asset_description.appid': random.choice([730, 570, 440], size),
+    'sell_price': random.integers(1, 1000, size).astype('float32'),
+    'sell_listings': random.integers(0, 200, size)
+  })
+
+
+def brute_force(listings: pd.DataFrame, appid=None, min_price=None, max_price=None, min_listings=None, max_listings=None,
+                prefix=None) -> set:
+  mask = pd.Series(True, index=listings.index)
+  if appid is not None:
+    mask &= listings['asset_description.appid'] == appid
+  if min_price is not None:
+    mask &= listings['sell_price'] >= min_price
+  if max_price is not None:
+    mask &= listings['sell_price'] <= max_price
+  if min_listings is not None:
+    mask &= listings['sell_listings'] >= min_listings
+  if max_listings is not None:
+    mask &= listings['sell_listings'] <= max_listings
+  if prefix is not None:
+    mask &= listings['hash_name'].str.startswith(prefix)
+  return set(listings.loc[mask, 'hash_name'])
+
+
+@pytest.mark.parametrize('conditions', [
+  {},
+  {'appid': 730},
+  {'min_price': 100, 'max_price': 500},
+  {'min_price': 99.5, 'max_price': 100.5},
+  {'appid': 570, 'min_listings': 50, 'max_listings': 120},
+  {'prefix': 'Operation '},
+  {'prefix': 'Sticker', 'max_price': 300},
+  {'appid': 12345}
+])
+def test_queries_match_a_brute_force_filter(conditions):
+  listings = random_listings(2000)
+  index = MarketIndex(listings, updated=UPDATED)
+  assert set(index.query(**conditions)['hash_name']) == brute_force(listings, **conditions)
+
+
+def test_exact_names_and_limits():
+  listings = random_listings(100)
+  index = MarketIndex(listings, updated=UPDATED)
+  name = listings['hash_name'][42]
+
+  item = index.query(hash_name=name)
+  assert item['hash_name'].tolist() == [name]
+  assert item['sell_price'].tolist() == [listings['sell_price'][42]]
+  assert (item['updated'] == UPDATED).all()
+  assert len(index.query(limit=7)) == 7
+  assert index.query(hash_name='missing').empty
+
+
+def test_updates_change_the_indexed_items_and_add_the_new_ones():
+  listings = random_listings(50)
+  index = MarketIndex(listings, updated=UPDATED)
+  page = listings.iloc[:5].assign(sell_price=np.float32(0.5))
+  new = pd.DataFrame({'hash_name': ['New item'], 'asset_description.appid': [730], 'sell_price': [np.float32(7)], 'sell_listings': [1]})
+
+  assert index.update(iter([page, new]), updated=UPDATED + pd.Timedelta(days=1)) == 1
+  assert len(index) == 51
+  assert set(index.query(max_price=0.5)['hash_name']) == set(page['hash_name'])
+  assert index.query(hash_name='New item')['updated'].tolist() == [UPDATED + pd.Timedelta(days=1)]
+  assert index.update([]) == 0
+
+
+def test_the_same_name_in_two_apps_is_two_items():
+  listings = pd.DataFrame({'hash_name': ['Key', 'Key'], 'appid': [730, 440], 'sell_price': [250.0, 240.0], 'sell_listings': [5, 6]})
+  index = MarketIndex(listings, updated=UPDATED)
+  assert len(index) == 2
+  assert index.query(hash_name='Key', appid=440)['sell_price'].tolist() == [240.0]
+  assert index.appids().tolist() == [440, 730]
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+def test_saved_indexes_load_with_the_same_items(tmp_path, mmap):
+  listings = random_listings(500)
+  index = MarketIndex(listings, updated=UPDATED)
+  index.save(str(tmp_path / 'index'))
+
+  loaded = MarketIndex.load(str(tmp_path / 'index'), mmap=mmap)
+  assert len(loaded) == len(index)
+  conditions = {'appid': 730, 'min_price': 100, 'max_price': 500}
+  assert loaded.query(**conditions).sort_values('hash_name', ignore_index=True).equals(
+    index.query(**conditions).sort_values('hash_name', ignore_index=True))
+
+  # Updating a memory-mapped index copies it, so the files are left unchanged.
+  loaded.update(listings.iloc[:1].assign(sell_price=np.float32(1)))
+  assert MarketIndex.load(str(tmp_path / 'index')).query(hash_name=listings['hash_name'][0])['sell_price'].tolist() == \
+    [listings['sell_price'][0]]
+
+
+def test_listings_without_an_app_id_are_rejected():
+  with pytest.raises(ValueError):
+    MarketIndex(pd.DataFrame({'hash_name': ['Key'], 'sell_price': [1.0]}))
@@ -0,0 +1,108 @@
+import math
+import threading
+import pytest
+from bench_requests import responders
+from steamcrawl import FixtureServer, Metrics, RateLimiter
+from steamcrawl.metrics import endpoint_label, propagated, scope
+from steamcrawl.replay import ReplayedResponse
+
+OVERVIEW = {'success': True, 'lowest_price': '$1.00', 'volume': '10', 'median_price': '$1.05'}
+
+
+def labels(**values) -> tuple:
+  return tuple(sorted(values.items()))
+
+
+@pytest.mark.parametrize('url, label', [
+  ('https://steamcommunity.com/market/pricehistory/?appid=730&market_hash_name=AK-47', '/market/pricehistory/'),
+  ('https://steamcommunity.com/inventory/76561198000000000/730/2', '/inventory/'),
+  ('https://steamcommunity.com/market/listings/730/AK-47%20%7C%20Redline', '/market/listings/'),
+  ('https://example.com/other/path', '/other/path')
+])
+def test_endpoint_labels_drop_the_variable_parts_of_the_paths(url, label):
+  assert endpoint_label(url) == label
+
+
+def test_counters_and_histograms_are_keyed_by_labels():
+  metrics = Metrics(buckets=(0.1, 1.0))
+  metrics.increment('hits', endpoint='/a/')
+  metrics.increment('hits', 2, endpoint='/a/')
+  metrics.increment('hits', endpoint='/b/')
+  for value in [0.05, 0.5, 5.0]:
+    metrics.observe('seconds', value, endpoint='/a/')
+
+  snapshot = metrics.snapshot()
+  assert snapshot['counters'] == {'hits': {labels(endpoint='/a/'): 3, labels(endpoint='/b/'): 1}}
+  histogram = snapshot['histograms']['seconds'][labels(endpoint='/a/')]
+  assert histogram['buckets'] == {0.1: 1, 1.0: 1, math.inf: 1}
+  assert histogram['count'] == 3 and histogram['sum'] == pytest.approx(5.55)
+
+  metrics.reset()
+  assert metrics.snapshot() == {'counters': {}, 'histograms': {}}
+
+
+def test_prometheus_text_has_cumulative_buckets_and_escaped_labels():
+  metrics = Metrics(buckets=(0.1, 1.0))
+  metrics.increment('steamcrawl_requests_total', endpoint='/a/', status=200)
+  metrics.increment('steamcrawl_requests_total', item='say "hi"\n')
+  metrics.observe('steamcrawl_request_seconds', 0.5, endpoint='/a/')
+
+  assert metrics.to_prometheus().splitlines() == [
+    '# TYPE steamcrawl_requests_total counter',
+    'steamcrawl_requests_total{endpoint="/a/",status="200"} 1',
+    'steamcrawl_requests_total{item="say \\"hi\\"\\n"} 1',
+    '# TYPE steamcrawl_request_seconds histogram',
+    'steamcrawl_request_seconds_bucket{endpoint="/a/",le="0.1"} 0',
+    'steamcrawl_request_seconds_bucket{endpoint="/a/",le="1"} 1',
+    'steamcrawl_request_seconds_bucket{endpoint="/a/",le="+Inf"} 1',
+    'steamcrawl_request_seconds_sum{endpoint="/a/"} 0.500000',
+    'steamcrawl_request_seconds_count{endpoint="/a/"} 1'
+  ]
+
+
+def test_callbacks_and_traces_get_every_value_with_its_scope():
+  received = []
+  metrics = Metrics(callbacks=[lambda name, value, labels: received.append((name, value, labels))])
+
+  with metrics.trace() as trace:
+    with scope(page=100):
+      metrics.increment('hits', endpoint='/a/')
+      worker = threading.Thread(target=propagated(lambda: metrics.observe('seconds', 0.5)))
+      worker.start()
+      worker.join()
+  metrics.increment('hits', endpoint='/a/')
+
+  assert received == [('hits', 1, {'endpoint': '/a/'}), ('seconds', 0.5, {}), ('hits', 1, {'endpoint': '/a/'})]
+  spans = trace.to_frame()
+  assert spans['metric'].tolist() == ['hits', 'seconds']
+  assert spans['page'].tolist() == [100, 100]
+
+
+def test_requests_retries_and_methods_are_recorded(make_request):
+  routes = responders({'apps': 10})
+  calls = []
+
+  def overview(params):
+    calls.append(params)
+    return ReplayedResponse(429, b'') if len(calls) == 1 else OVERVIEW
+  routes['/market/priceoverview/'] = overview
+
+  metrics = Metrics()
+  limiter = RateLimiter(limits={'steamcommunity.com': (10000, 10000)}, backoff_base=0.001, backoff_max=0.01)
+  with FixtureServer(responders=routes) as server:
+    request = make_request(server, metrics=metrics, rate_limiter=limiter)
+    request.get_item_overview('AK-47 | Redline (Field-Tested)', '')
+    with pytest.raises(Exception):
+      request.get_item_overview('AK-47 | Redline (Field-Tested)', 'not an app')
+
+  counters = metrics.snapshot()['counters']
+  endpoint = '/market/priceoverview/'
+  # The invalid app id is checked against the app list, fetched once.
+  assert counters['steamcrawl_requests_total'] == {labels(endpoint=endpoint, status=429): 1, labels(endpoint=endpoint, status=200): 1,
+                                                   labels(endpoint='/ISteamApps/GetAppList/v2/', status=200): 1}
+  assert counters['steamcrawl_retries_total'] == {labels(endpoint=endpoint): 1}
+  assert counters['steamcrawl_throttled_total'] == {labels(endpoint=endpoint): 1}
+  assert counters['steamcrawl_method_errors_total'] == {labels(method='get_item_overview'): 1}
+  histograms = metrics.snapshot()['histograms']
+  assert histograms['steamcrawl_method_seconds'][labels(method='get_item_overview')]['count'] == 2
+  assert histograms['steamcrawl_request_seconds'][labels(endpoint=endpoint)]['count'] == 2
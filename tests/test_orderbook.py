@@ -0,0 +1,94 @@
+import numpy as np
+from steamcrawl.orderbook import OrderBookPoller, deltas_to_frame, diff_levels, graph_levels
+
+
+class FakeRequest:
+  """
+  Request answering with the order graphs set per item, and counting the polls of each item.
+  """
+
+  max_workers = 2
+
+  def __init__(self):
+    self.books = {}
+    self.polls = []
+
+  def get_order_histogram(self, item_name: str, appid: str, currency: int, country: str, language: str) -> dict:
+    self.polls.append(item_name)
+    if item_name not in self.books:
+      raise ValueError(f"{item_name} is not listed.")
+    sell, buy = self.books[item_name]
+    return {'success': 1, 'sell_order_graph': sell, 'buy_order_graph': buy}
+
+
+def test_graphs_become_levels():
+  prices, quantities = graph_levels([[1.03, 2, ''], [1.02, 3, ''], [1.01, 5, '']])
+  assert prices.tolist() == [101, 102, 103]
+  assert quantities.tolist() == [2, 1, 2]
+  assert [array.tolist() for array in graph_levels([])] == [[], []]
+
+
+def test_only_changed_levels_are_diffed():
+  old = (np.array([100, 101, 102]), np.array([1, 2, 3]))
+  new = (np.array([101, 102, 104]), np.array([2, 5, 1]))
+  prices, quantities = diff_levels(old, new)
+  assert prices.tolist() == [100, 102, 104]
+  assert quantities.tolist() == [0, 5, 1]
+
+
+def test_poller_emits_deltas():
+  request = FakeRequest()
+  request.books['Case'] = ([[1.0, 2, ''], [1.1, 5, '']], [[0.9, 4, '']])
+  emitted = []
+  poller = OrderBookPoller(request, callback=emitted.append)
+  poller.add('Case', '730', interval=0)
+
+  initial, = poller.poll_once()
+  assert initial['initial'] and initial['sell'][0].tolist() == [100, 110] and initial['buy'][1].tolist() == [4]
+  assert poller.poll_once() == []
+
+  request.books['Case'] = ([[1.0, 2, ''], [1.2, 3, '']], [[0.9, 4, '']])
+  delta, = poller.poll_once()
+  assert not delta['initial']
+  assert delta['sell'][0].tolist() == [110, 120] and delta['sell'][1].tolist() == [0, 1]
+  assert len(delta['buy'][0]) == 0
+  assert len(emitted) == 2
+  assert poller.book('Case', '730')['sell'][0].tolist() == [100, 120]
+
+  frame = deltas_to_frame([delta])
+  assert frame[['type', 'price', 'orders']].values.tolist() == [['sell', 1.1, 0], ['sell', 1.2, 1]]
+
+
+def test_items_are_polled_by_interval_and_priority():
+  request = FakeRequest()
+  request.books = {name: ([[1.0, 1, '']], []) for name in ['Slow', 'Fast', 'Urgent']}
+  poller = OrderBookPoller(request, max_workers=1)
+  poller.add('Slow', '730', interval=3600)
+  poller.add('Fast', '730', interval=0, priority=1)
+  poller.add('Urgent', '730', interval=0, priority=-1)
+  for _ in range(3):
+    poller.poll_once()
+  assert request.polls == ['Urgent', 'Slow', 'Fast', 'Urgent', 'Fast', 'Urgent', 'Fast']
+
+
+def test_readded_item_is_polled_once():
+  request = FakeRequest()
+  request.books['Case'] = ([[1.0, 1, '']], [])
+  poller = OrderBookPoller(request)
+  poller.add('Case', '730', interval=0)
+  poller.remove('Case', '730')
+  poller.add('Case', '730', interval=0)
+  poller.add('Case', '730', interval=0, priority=2)
+  for _ in range(3):
+    poller.poll_once()
+  assert request.polls == ['Case'] * 3
+
+
+def test_failed_polls_are_recorded():
+  request = FakeRequest()
+  poller = OrderBookPoller(request)
+  poller.add('Missing', '730', interval=0)
+  assert poller.poll_once() == []
+  assert 'not listed' in poller.errors[('Missing', '730')]
+  request.books['Missing'] = ([], [[1.0, 1, '']])
+  assert len(poller.poll_once()) == 1 and poller.errors == {}
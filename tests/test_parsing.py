@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+from bench_market_history import legacy_parse_market_history, synthetic_history
+from steamcrawl import parsing, schemas
+from conftest import legacy_frame
+
+RECORDS = [
+  {'id': 1, 'name': 'a', 'app': {'appid': 730, 'icon': 'x'}},
+  {'id': 2, 'app': {'appid': 570}, 'price': 1.5},
+  {'name': 'c', 'price': 2.0, 'app': {'icon': 'y', 'extra': {'deep': True}}}
+]
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_market_history_matches_legacy_parser(seed):
+  contentObject = synthetic_history(300, seed=seed)
+  index = [contentObject[key] for key in ['assets', 'events', 'listings', 'purchases']]
+  pd.testing.assert_frame_equal(parsing.parse_market_history(index), legacy_frame(contentObject))
+
+
+def test_market_history_without_purchases_matches_legacy_parser():
+  contentObject = synthetic_history(200, seed=4)
+  events = [event for event in contentObject['events'] if event['event_type'] != 4]
+  index = [contentObject['assets'], events, contentObject['listings']]
+  expected = schemas.coerce(legacy_parse_market_history(index), schemas.SCHEMAS['market_history'])
+  pd.testing.assert_frame_equal(parsing.parse_market_history(index), expected)
+
+
+def test_records_are_flattened_like_json_normalize():
+  columns = parsing.flatten_records(RECORDS)
+  expected = pd.json_normalize(RECORDS)
+  assert list(columns) == list(expected.columns)
+  pd.testing.assert_frame_equal(pd.DataFrame(columns), expected)
+
+  dropped = parsing.flatten_records(RECORDS, dropped={'app.icon'}, renamed={'id': 'asset.id'})
+  assert list(dropped) == ['asset.id', 'name', 'app.appid', 'price', 'app.extra.deep']
+
+
+def test_outer_join_matches_merge():
+  left = {'key': [1, 2, 2, np.nan], 'value': ['a', 'b', 'c', 'd'], 'shared': [1, 2, 3, 4]}
+  right = {'key': [2, 3, np.nan], 'other': ['x', 'y', 'z'], 'shared': [5, 6, 7]}
+  joined = pd.DataFrame(parsing.outer_join(left, right, 'key'))
+  expected = pd.merge(pd.DataFrame(left), pd.DataFrame(right), how='outer', on='key')
+  pd.testing.assert_frame_equal(joined, expected)
@@ -0,0 +1,98 @@
+import pytest
+from steamcrawl import FixtureServer, RateLimiter, Transport
+from steamcrawl.ratelimit import TokenBucket
+from steamcrawl.replay import ReplayedResponse
+
+URL = 'https://steamcommunity.com/inventory/76561198000000000/730/2'
+OVERLOADED = ReplayedResponse(502, b'<html><body>Bad Gateway</body></html>', {'Content-Type': 'text/html'})
+
+
+class Sequence:
+  """
+  Responder answering with the given responses in order, then with the last one.
+  """
+
+  def __init__(self, *responses):
+    self.responses = list(responses)
+    self.calls = 0
+
+  def __call__(self, params: dict):
+    self.calls += 1
+    return self.responses[min(self.calls, len(self.responses)) - 1]
+
+
+def fast_limiter() -> RateLimiter:
+  return RateLimiter(limits={'steamcommunity.com': (10000, 10000)}, backoff_base=0.001, backoff_max=0.01)
+
+
+@pytest.mark.parametrize('status, content, calls', [
+  (403, b'null', 1),
+  (200, b'null', 1),
+  (200, b'[]', 1),
+  (429, b'', 5),
+  (502, OVERLOADED.content, 5),
+  (503, b'', 5),
+  (200, b'', 5),
+  (200, b' \n', 5)
+])
+def test_throttled_responses_are_retried(status, content, calls):
+  responder = Sequence(ReplayedResponse(status, content))
+  with FixtureServer(responders={'/inventory/': responder}) as server:
+    response = Transport(base_urls=server.base_urls(), rate_limiter=fast_limiter()).get(URL)
+  assert response.status_code == status
+  assert responder.calls == calls
+
+
+def test_retry_returns_the_first_good_response():
+  responder = Sequence(ReplayedResponse(429, b''), OVERLOADED, ReplayedResponse(200, b''), ReplayedResponse(200, b'{"success": 1}'))
+  with FixtureServer(responders={'/inventory/': responder}) as server:
+    response = Transport(base_urls=server.base_urls(), rate_limiter=fast_limiter()).get(URL)
+  assert response.content == b'{"success": 1}'
+  assert responder.calls == 4
+
+
+def test_server_errors_do_not_reach_the_parser(make_request):
+  overview = ReplayedResponse(200, b'{"success": true, "lowest_price": "$1.00", "volume": "10", "median_price": "$1.05"}')
+  responder = Sequence(OVERLOADED, overview)
+  with FixtureServer(responders={'/market/priceoverview/': responder}) as server:
+    df = make_request(server, rate_limiter=fast_limiter()).get_item_overview('AK-47 | Redline (Field-Tested)', '')
+  assert df['volume'].tolist() == [10]
+  assert responder.calls == 2
+
+
+def test_bucket_waits_for_its_tokens():
+  bucket = TokenBucket(10, 2)
+  assert bucket.reserve() == 0.0 and bucket.reserve() == 0.0
+  assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+  assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_bucket_slows_down_and_recovers():
+  bucket = TokenBucket(10, 5)
+  bucket.throttle()
+  assert bucket.rate == 5 and bucket.tokens <= 0
+  for _ in range(10):
+    bucket.throttle()
+  assert bucket.rate == 1
+  for _ in range(5):
+    bucket.recover()
+  assert bucket.rate == pytest.approx(3.5)
+  for _ in range(100):
+    bucket.recover()
+  assert bucket.rate == 10
+
+
+def test_buckets_are_picked_by_the_longest_prefix():
+  limiter = RateLimiter(limits={'steamcommunity.com': (1, 1), 'steamcommunity.com/market/pricehistory': (0.2, 5)})
+  history = limiter.bucket('https://steamcommunity.com/market/pricehistory/?appid=730')
+  assert (history.rate, history.capacity) == (0.2, 5)
+  assert limiter.bucket('https://steamcommunity.com/market/search/render/') is limiter.bucket('https://steamcommunity.com/inventory/1/730/2')
+  assert limiter.bucket('https://api.steampowered.com/ISteamApps/GetAppList/v2/').rate == 10
+
+
+def test_backoff_follows_retry_after():
+  limiter = RateLimiter(backoff_base=1, backoff_max=30)
+  assert limiter.backoff(0, '12') == 12
+  assert limiter.backoff(0, '120') == 30
+  assert 2 <= limiter.backoff(2) <= 4
+  assert 15 <= limiter.backoff(10) <= 30
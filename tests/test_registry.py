@@ -0,0 +1,83 @@
+import json
+import pytest
+from steamcrawl import AppRegistry, FixtureServer
+from steamcrawl.registry import shared_registry
+
+APPS = [{'appid': 10, 'name': 'Counter-Strike'}, {'appid': 730, 'name': 'Counter-Strike 2'}]
+
+
+class CountingLoader:
+
+  def __init__(self, apps: list = APPS):
+    self.apps = apps
+    self.calls = 0
+
+  def __call__(self) -> list:
+    self.calls += 1
+    return self.apps
+
+
+def test_fresh_registry_is_not_reloaded():
+  loader = CountingLoader()
+  registry = AppRegistry(loader, ttl=3600)
+  assert 730 in registry and '10' in registry and 440 not in registry
+  assert registry.name(730) == 'Counter-Strike 2'
+  assert len(registry) == 2
+  assert loader.calls == 1
+
+
+def test_stale_registry_is_reloaded(monkeypatch):
+  loader = CountingLoader()
+  registry = AppRegistry(loader, ttl=60)
+  now = [1000.0]
+  monkeypatch.setattr('steamcrawl.registry.time.time', lambda: now[0])
+
+  assert registry.is_stale()
+  assert registry.contains(730)
+  assert not registry.is_stale() and loader.calls == 1
+
+  now[0] += 61
+  assert registry.is_stale()
+  loader.apps = APPS + [{'appid': 440, 'name': 'Team Fortress 2'}]
+  assert registry.contains(440)
+  assert loader.calls == 2
+
+  registry.refresh(force=True)
+  assert loader.calls == 3
+
+
+def test_snapshot_starts_warm(tmp_path):
+  path = str(tmp_path / 'apps.json')
+  AppRegistry(CountingLoader(), path=path).refresh()
+  assert json.loads((tmp_path / 'apps.json').read_text())['apps'] == APPS
+
+  loader = CountingLoader()
+  registry = AppRegistry(loader, path=path)
+  assert not registry.is_stale()
+  assert 730 in registry and loader.calls == 0
+
+
+def test_registry_without_loader_keeps_its_content():
+  registry = AppRegistry(None, ttl=0)
+  assert 730 not in registry
+  registry.update(APPS)
+  # Stale right away, but there is nothing to reload it with.
+  assert registry.is_stale()
+  assert 730 in registry
+
+
+def test_clients_share_one_registry(make_request):
+  loader = CountingLoader()
+  with FixtureServer(responders={'/ISteamApps/GetAppList/': lambda params: {'applist': {'apps': loader()}}}) as server:
+    # A ttl of its own, so that the registry is not shared with the other tests.
+    requests = [make_request(server, app_registry=None, appid_ttl=123.5) for _ in range(3)]
+    assert requests[0].app_registry is requests[1].app_registry is shared_registry(123.5)
+    for request in requests:
+      assert len(request.get_all_appid()) == 2
+  assert loader.calls == 1
+
+
+def test_unknown_appid_is_rejected(make_request):
+  with FixtureServer(responders={'/ISteamApps/GetAppList/': lambda params: {'applist': {'apps': APPS}}}) as server:
+    with pytest.raises(ValueError):
+      make_request(server).get_app_listings('440')
@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+from bench_market_history import synthetic_history
+from bench_requests import listings_page
+from steamcrawl import FixtureServer, FixtureStore, RecordingSession, ReplaySession, Request, Transport
+from conftest import COOKIE
+
+
+def test_recorded_responses_are_replayed_without_network(tmp_path, make_request, auth_cache, history_responder):
+  fixtures = FixtureStore(str(tmp_path))
+  responders = {
+    '/market/search/render/': lambda params: listings_page(250, int(params['start']), int(params['count']), ''),
+    '/market/myhistory/render/': history_responder(synthetic_history(150))
+  }
+  with FixtureServer(responders=responders) as server:
+    recording = Request(COOKIE, transport=Transport(base_urls=server.base_urls(), rate_limiter=False,
+                                                    session=RecordingSession(fixtures)), auth_cache=auth_cache)
+    listings = recording.get_all_listings(count=250)
+    history = recording.get_market_history(count=150)
+
+  offline = Request(COOKIE, transport=Transport(rate_limiter=False, session=ReplaySession(fixtures)), auth_cache=auth_cache)
+  pd.testing.assert_frame_equal(offline.get_all_listings(count=250), listings)
+  pd.testing.assert_frame_equal(offline.get_market_history(count=150), history)
+  assert len(fixtures.keys()) == 5
+
+  with pytest.raises(ConnectionError):
+    offline.get_market_history(count=10)
+
+
+def test_server_serves_fixtures_before_responders(tmp_path, make_request, auth_cache):
+  fixtures = FixtureStore(str(tmp_path))
+  calls = []
+
+  def respond(params: dict):
+    calls.append(params)
+    return listings_page(100, int(params['start']), int(params['count']), '')
+
+  with FixtureServer(responders={'/market/search/render/': respond}) as server:
+    recording = Request(COOKIE, transport=Transport(base_urls=server.base_urls(), rate_limiter=False,
+                                                    session=RecordingSession(fixtures)), auth_cache=auth_cache)
+    recording.get_all_listings(count=100)
+  with FixtureServer(fixtures, responders={'/market/search/render/': respond}) as server:
+    df = make_request(server).get_all_listings(count=100)
+
+  assert len(calls) == 1
+  assert df['hash_name'].tolist() == ['Item {}'.format(i) for i in range(100)]
+
+
+def test_server_throttles_above_its_rate(make_request):
+  with FixtureServer(responders={'/market/priceoverview/': lambda params: {'success': True}}, throttle=(0.001, 2)) as server:
+    transport = Transport(base_urls=server.base_urls(), rate_limiter=False)
+    statuses = [transport.get('https://steamcommunity.com/market/priceoverview/').status_code for _ in range(4)]
+
+  assert statuses == [200, 200, 429, 429]
+  assert (server.requests, server.throttled) == (4, 2)
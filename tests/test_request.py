@@ -0,0 +1,78 @@
+import threading
+import time
+import pandas as pd
+from bench_market_history import synthetic_history
+from bench_requests import listings_page, responders
+from steamcrawl import FixtureServer, parsing, schemas
+from conftest import legacy_frame
+
+
+def test_paginated_market_history_matches_legacy_parser(make_request, history_responder):
+  contentObject = synthetic_history(250)
+  respond = history_responder(contentObject)
+  with FixtureServer(responders={'/market/myhistory/render/': respond}) as server:
+    df = make_request(server).get_market_history(count=250)
+  pages = [respond({'start': start, 'count': min(100, 250 - start)}) for start in [0, 100, 200]]
+  pd.testing.assert_frame_equal(df, legacy_frame(*pages))
+
+
+def test_pages_are_fetched_concurrently_in_order(make_request):
+  lock = threading.Lock()
+  inFlight = [0, 0]
+
+  def respond(params: dict):
+    with lock:
+      inFlight[0] += 1
+      inFlight[1] = max(inFlight[1], inFlight[0])
+    time.sleep(0.05)
+    with lock:
+      inFlight[0] -= 1
+    return listings_page(1000, int(params['start']), int(params['count']), '')
+
+  with FixtureServer(responders={'/market/search/render/': respond}) as server:
+    df = make_request(server, max_workers=3).get_all_listings(count=1000)
+
+  assert inFlight[1] == 3
+  assert df['hash_name'].tolist() == ['Item {}'.format(i) for i in range(1000)]
+
+
+def test_batch_keeps_the_errors_of_failed_items(make_request):
+  sizes = {'points': 24, 'apps': 10}
+  with FixtureServer(responders=responders(sizes)) as server:
+    request = make_request(server)
+    items = [('Item 1', '730'), ('Item 2', '440'), ('Item 3', '999')]
+    histories = request.get_price_history_many(items)
+    overviews = request.get_item_overview_many(items)
+
+  assert histories.groupby('item_name').size().to_dict() == {'Item 1': 24, 'Item 2': 24, 'Item 3': 1}
+  failed = histories[histories['item_name'] == 'Item 3']
+  assert failed['appid'].tolist() == ['999'] and 'not a valid appid' in failed['error'].iloc[0]
+  assert histories.loc[histories['item_name'] != 'Item 3', 'error'].isna().all()
+  assert overviews['item_name'].tolist() == ['Item 1', 'Item 2', 'Item 3']
+  assert overviews['error'].isna().tolist() == [True, True, False]
+
+
+def test_iter_pages_match_the_whole_result(make_request):
+  with FixtureServer(responders=responders({'listings': 450})) as server:
+    request = make_request(server)
+    whole = request.get_all_listings(count=450)
+    pages = list(request.iter_all_listings(count=450))
+    rest = list(request.iter_all_listings(start=420, as_records=True))
+
+  assert len(whole) == 450
+  assert [len(page) for page in pages] == [100, 100, 100, 100, 50]
+  assert whole['hash_name'].tolist() == ['Item {}'.format(i) for i in range(450)]
+  pd.testing.assert_frame_equal(parsing.concat_frames(pages, schemas.SCHEMAS['listings']), whole)
+  assert [record['hash_name'] for page in rest for record in page] == ['Item {}'.format(i) for i in range(420, 450)]
+
+
+def test_iter_pages_are_fetched_as_they_are_consumed(make_request):
+  with FixtureServer(responders=responders({'listings': 5000})) as server:
+    request = make_request(server, max_workers=2)
+    pages = request.iter_all_listings()
+    first = next(pages)
+    pages.close()
+    fetched = server.requests
+
+  assert len(first) == 100
+  assert fetched <= 1 + 2 + 2
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+from bench_requests import responders
+from steamcrawl import FixtureServer, schemas
+
+
+def test_columns_are_coerced_to_the_schema():
+  df = pd.DataFrame({
+    'sell_listings': ['1', '2', 'x'],
+    'sell_price': [1, 2, 3],
+    'app_name': ['Dota 2', 'Dota 2', 'Counter-Strike 2'],
+    'asset_description.commodity': [0, 1, 1],
+    'hash_name': ['a', 'b', 'c']
+  })
+  schemas.coerce(df, schemas.SCHEMAS['listings'])
+
+  assert df['sell_listings'].dtype == 'Int32' and df['sell_listings'].isna().tolist() == [False, False, True]
+  assert df['sell_price'].dtype == np.float32
+  assert df['app_name'].dtype == 'category'
+  assert df['asset_description.commodity'].dtype == np.int8
+  assert df['hash_name'].dtype == object
+
+
+def test_returned_frames_follow_their_schemas(make_request):
+  with FixtureServer(responders=responders({'listings': 150, 'points': 48, 'apps': 10, 'inventory': 20})) as server:
+    request = make_request(server)
+    frames = {
+      'listings': request.get_all_listings(count=150),
+      'price_history': request.get_price_history('Item 1', '730'),
+      'item_overview': request.get_item_overview('Item 1', '730'),
+      'inventory': request.get_game_item_inventory('1', '730')
+    }
+
+  for name, df in frames.items():
+    for column, dtype in schemas.SCHEMAS[name].items():
+      if column in df.columns:
+        assert df[column].dtype == dtype, (name, column)
+  assert frames['price_history']['median_price'].dtype == np.float32
+  assert frames['listings'].memory_usage(deep=True).sum() < frames['listings'].astype(object).memory_usage(deep=True).sum()
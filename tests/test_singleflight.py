@@ -0,0 +1,159 @@
+import asyncio
+import threading
+import pytest
+from steamcrawl import FixtureServer
+from steamcrawl.singleflight import AsyncSingleFlight, SingleFlight, request_key
+
+OVERVIEW = {'success': True, 'lowest_price': '$1.00', 'volume': '10', 'median_price': '$1.05'}
+
+
+def wait_for(condition):
+  while not condition():
+    threading.Event().wait(0.01)
+
+
+def test_request_keys_ignore_the_order_and_types_of_the_params():
+  assert request_key('api', {'start': 0, 'count': 10}) == request_key('api', {'count': '10', 'start': '0'})
+  assert request_key('api', {'start': 0}, 'a') != request_key('api', {'start': 0}, 'b')
+  assert request_key('api', None) == request_key('api', {})
+
+
+def test_waiting_threads_share_the_outstanding_call():
+  group = SingleFlight()
+  release = threading.Event()
+  calls, results = [], []
+
+  def fetch():
+    calls.append(1)
+    release.wait(5)
+    return {'value': 1}
+
+  threads = [threading.Thread(target=lambda: results.append(group.do('key', fetch))) for _ in range(4)]
+  for thread in threads:
+    thread.start()
+  wait_for(lambda: group.shared == 3)
+  release.set()
+  for thread in threads:
+    thread.join()
+
+  assert len(calls) == 1 and group.calls == 1
+  assert all(result is results[0] for result in results)
+  assert group.outstanding() == 0
+  # The call is finished, so the next one runs the function again.
+  assert group.do('key', lambda: 2) == 2 and group.calls == 2
+
+
+def test_waiting_threads_get_the_error_of_the_outstanding_call():
+  shared = []
+  group = SingleFlight(on_shared=shared.append)
+  release = threading.Event()
+  errors = []
+
+  def fetch():
+    release.wait(5)
+    raise ConnectionError('down')
+
+  def call():
+    try:
+      group.do('key', fetch)
+    except ConnectionError as e:
+      errors.append(e)
+
+  threads = [threading.Thread(target=call) for _ in range(3)]
+  for thread in threads:
+    thread.start()
+  wait_for(lambda: group.shared == 2)
+  release.set()
+  for thread in threads:
+    thread.join()
+
+  assert len(errors) == 3 and all(error is errors[0] for error in errors)
+  assert shared == ['key', 'key']
+  assert group.outstanding() == 0
+
+
+def test_coroutines_share_the_outstanding_call():
+  group = AsyncSingleFlight()
+  calls = []
+
+  async def fetch():
+    calls.append(1)
+    await asyncio.sleep(0.01)
+    return {'value': 1}
+
+  async def main():
+    return await asyncio.gather(*[group.do('key', fetch) for _ in range(4)], group.do('other', fetch))
+
+  results = asyncio.run(main())
+  assert len(calls) == 2 and group.calls == 2 and group.shared == 3
+  assert all(result is results[0] for result in results[:4])
+  assert group.outstanding() == 0
+
+
+def test_cancelling_a_waiting_coroutine_does_not_cancel_the_call():
+  group = AsyncSingleFlight()
+
+  async def fetch():
+    await asyncio.sleep(0.05)
+    return 1
+
+  async def main():
+    leader = asyncio.ensure_future(group.do('key', fetch))
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(group.do('key', fetch))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+      await waiter
+    return await leader
+
+  assert asyncio.run(main()) == 1
+
+
+def test_identical_requests_share_one_fetch(make_request):
+  release = threading.Event()
+  calls = []
+
+  def respond(params: dict) -> dict:
+    calls.append(params)
+    release.wait(5)
+    return OVERVIEW
+
+  with FixtureServer(responders={'/market/priceoverview/': respond}) as server:
+    request = make_request(server)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(request.get_item_overview('AK-47 | Redline (Field-Tested)', '')))
+               for _ in range(4)]
+    for thread in threads:
+      thread.start()
+    wait_for(lambda: request.single_flight.outstanding() > 0 and request.single_flight.shared == 3)
+    release.set()
+    for thread in threads:
+      thread.join()
+
+  assert len(calls) == 1
+  assert len(results) == 4 and all(result.equals(results[0]) for result in results)
+  # Each caller gets its own data frame.
+  assert len({id(result) for result in results}) == 4
+
+
+def test_requests_are_not_shared_without_coalescing(make_request):
+  barrier = threading.Barrier(3, timeout=5)
+  calls = []
+
+  def respond(params: dict) -> dict:
+    calls.append(params)
+    barrier.wait()
+    return OVERVIEW
+
+  with FixtureServer(responders={'/market/priceoverview/': respond}) as server:
+    request = make_request(server, coalesce=False)
+    threads = [threading.Thread(target=request.get_item_overview, args=('AK-47 | Redline (Field-Tested)', ''))
+               for _ in range(3)]
+    for thread in threads:
+      thread.start()
+    for thread in threads:
+      thread.join()
+
+  assert len(calls) == 3
+  assert request.single_flight is None
@@ -0,0 +1,76 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from bench_market_history import synthetic_history
+from bench_requests import listings_page
+from steamcrawl import FixtureServer, parsing
+
+pytest.importorskip('pyarrow')
+from steamcrawl import DatasetSink
+
+
+def price_history(days: int, item_name: str = 'AK-47 | Redline (Field-Tested)') -> pd.DataFrame:
+  """
+  Price history of one item with one point per day, like get_price_history() returns it.
+  """
+
+  return pd.DataFrame({
+    'date': pd.date_range('2014-01-01', periods=days, freq='D'),
+    'median_price': np.linspace(1, 10, days),
+    'volume_sold': np.arange(days) % 50,
+    'item_name': item_name
+  })
+
+
+@pytest.mark.parametrize('format', ['parquet', 'arrow'])
+def test_listings_round_trip(tmp_path, make_request, format):
+  responders = {'/market/search/render/': lambda params: listings_page(
+    300, int(params.get('start', 0)), int(params.get('count', 10)), params.get('appid', ''))}
+  with FixtureServer(responders=responders) as server:
+    with DatasetSink(str(tmp_path / 'listings'), 'listings', format=format) as sink:
+      assert sink.write_pages(make_request(server).iter_all_listings(count=300)) == 300
+
+  assert sorted(os.listdir(tmp_path / 'listings')) == ['appid=440', 'appid=570', 'appid=730']
+  df = sink.read()
+  assert len(df) == 300
+  assert df['sell_price'].dtype == np.float32
+  assert sorted(df['hash_name']) == sorted('Item {}'.format(i) for i in range(300))
+  assert len(sink.read(filters=[('appid', '=', 730)])) == 100
+
+
+def test_long_price_history_round_trip(tmp_path):
+  # More days than the 1024 partitions that one write of pyarrow accepts.
+  history = price_history(3200)
+  with DatasetSink(str(tmp_path / 'prices'), 'price_history') as sink:
+    sink.write(history, appid='730')
+    sink.write(price_history(10, 'Fracture Case'), appid=730)
+
+  assert os.listdir(tmp_path / 'prices') == ['appid=730']
+  assert len(os.listdir(tmp_path / 'prices' / 'appid=730')) == 1
+  df = sink.read(filters=[('item_name', '=', 'AK-47 | Redline (Field-Tested)')]).sort_values('date', ignore_index=True)
+  assert len(df) == 3200
+  assert df['date'].dtype == 'datetime64[ns]'
+  np.testing.assert_array_equal(df['date'].values, history['date'].values)
+  np.testing.assert_allclose(df['median_price'], history['median_price'], rtol=1e-6)
+
+
+def test_price_history_requires_an_appid(tmp_path):
+  with DatasetSink(str(tmp_path / 'prices'), 'price_history') as sink:
+    with pytest.raises(ValueError):
+      sink.write(price_history(5))
+  assert not os.path.exists(tmp_path / 'prices' / 'appid=')
+
+
+def test_market_history_round_trip(tmp_path):
+  contentObject = synthetic_history(400)
+  history = parsing.parse_market_history([contentObject[key] for key in ['assets', 'events', 'listings', 'purchases']])
+  with DatasetSink(str(tmp_path / 'history'), 'market_history', batch_rows=200) as sink:
+    sink.write(history)
+
+  partitions = {name for appid in os.listdir(tmp_path / 'history') for name in os.listdir(tmp_path / 'history' / appid)}
+  assert all(name.startswith('month=') for name in partitions)
+  df = sink.read()
+  assert len(df) == len(history)
+  assert df['time_event'].dtype == 'datetime64[ns]'
+  assert sorted(df['time_event']) == sorted(history['time_event'])
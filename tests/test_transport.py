@@ -0,0 +1,27 @@
+from steamcrawl import FixtureServer, Transport
+from steamcrawl.transport import resolve_url
+
+
+def test_base_urls_are_replaced():
+  base_urls = {'https://steamcommunity.com': 'http://127.0.0.1:8000'}
+  assert resolve_url('https://steamcommunity.com/market/search/render/', base_urls) == 'http://127.0.0.1:8000/market/search/render/'
+  assert resolve_url('https://store.steampowered.com/api/appdetails', base_urls) == 'https://store.steampowered.com/api/appdetails'
+
+
+def test_session_is_created_lazily_with_compression_and_keep_alive():
+  transport = Transport(pool_sizes={'steamcommunity.com': 20})
+  session = transport.session
+  assert transport.session is session
+  assert 'gzip' in session.headers['Accept-Encoding']
+  assert session.headers['Connection'] == 'keep-alive'
+  assert session.get_adapter('https://steamcommunity.com/market/').poolmanager.connection_pool_kw['maxsize'] == 20
+  assert session.get_adapter('https://store.steampowered.com/api/').poolmanager.connection_pool_kw['maxsize'] == 10
+
+
+def test_connections_are_kept_alive_between_requests():
+  with FixtureServer(responders={'/market/priceoverview/': lambda params: {'success': True}}) as server:
+    with Transport(base_urls=server.base_urls(), rate_limiter=False) as transport:
+      for _ in range(5):
+        assert transport.get('https://steamcommunity.com/market/priceoverview/').json() == {'success': True}
+      pool = transport.session.get_adapter(server.url).poolmanager.connection_from_url(server.url)
+      assert pool.num_connections == 1